@@ -47,7 +47,14 @@ def optimize_scan_config(
     *,
     base_config: dict[str, Any],
     run_scan: Callable[[dict[str, Any]], dict[str, Any]],
+    evaluate_candidate: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
 ) -> dict[str, Any]:
+    """Sweep scan thresholds and keep the config with the best modeled PnL.
+
+    When ``evaluate_candidate`` is given, every candidate is scored against a
+    feature matrix extracted once, and ``run_scan`` only executes for the
+    winning config. Otherwise each candidate runs a full scan.
+    """
     settings = resolve_backtest_settings(base_config)
     if not settings["auto_optimize_on_invoke"]:
         return {
@@ -69,6 +76,8 @@ def optimize_scan_config(
     bankroll = max(float(settings["bankroll_usd"]), 1.0)
     best_attempt = None
     best_result = None
+    best_candidate = None
+    evaluate = evaluate_candidate or run_scan
 
     for max_names_scored in settings.get("max_names_scored_candidates", []):
         for max_names_orders in settings.get("max_names_orders_candidates", []):
@@ -78,7 +87,7 @@ def optimize_scan_config(
                 candidate["max_names_scored"] = int(max_names_scored)
                 candidate["max_names_orders"] = int(max_names_orders)
                 candidate["min_conviction"] = float(min_conviction)
-                result = run_scan(candidate)
+                result = evaluate(candidate)
                 attempts += 1
                 modeled_pnl_pct = _modeled_pnl_pct(result, bankroll)
                 record = {
@@ -94,6 +103,7 @@ def optimize_scan_config(
                 if best_attempt is None or modeled_pnl_pct > best_attempt["modeled_pnl_pct"]:
                     best_attempt = record
                     best_result = result
+                    best_candidate = candidate
 
     if best_attempt is None:
         return {
@@ -111,6 +121,11 @@ def optimize_scan_config(
             "result": None,
         }
 
+    full_scan_count = attempts
+    if evaluate_candidate is not None:
+        best_result = run_scan(best_candidate)
+        full_scan_count = 1
+
     updated = deepcopy(base_config)
     updated["portfolio_notional_usd"] = round(bankroll, 2)
     updated["max_names_scored"] = best_attempt["selected_config"]["max_names_scored"]
@@ -132,6 +147,8 @@ def optimize_scan_config(
         "target_pnl_pct": float(settings["target_pnl_pct"]),
         "target_met": best_attempt["modeled_pnl_pct"] >= float(settings["target_pnl_pct"]),
         "attempt_count": attempts,
+        "full_scan_count": full_scan_count,
+        "evaluation": "feature_matrix" if evaluate_candidate is not None else "full_scan",
         "modeled_pnl_pct": best_attempt["modeled_pnl_pct"],
         "selected_config": best_attempt["selected_config"],
         "selected_targets": best_attempt["selected_targets"],
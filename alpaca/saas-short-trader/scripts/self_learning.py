@@ -22,8 +22,10 @@ import math
 import os
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import psycopg
 
 from serendb_bootstrap import resolve_dsn
@@ -43,6 +45,19 @@ PROMOTION_GATES = {
     "max_drawdown_deterioration_pct": 10.0,
     "min_horizon_wins": 2,
 }
+HORIZONS = ("5D", "10D", "20D")
+FEATURE_KEYS = ("f", "a", "s", "t", "p")
+TRAINING_CACHE_DIR = Path("state/learning_training")
+WEIGHT_SEARCH = {
+    "n_candidates": 4000,
+    "thresholds": (55.0, 60.0, 65.0, 70.0, 75.0),
+    "seed": 7,
+    # Upper bound on candidates x rows scored per chunk (keeps memory flat).
+    "chunk_cells": 4_000_000,
+    # Latest share of labelled days held out of the search and used to score
+    # the chosen challenger (and the champion) for promotion.
+    "holdout_fraction": 0.3,
+}
 
 
 @dataclass
@@ -161,9 +176,68 @@ def log_learning_event(
     conn.commit()
 
 
-def upsert_feature_snapshots(conn: psycopg.Connection, mode: str = "paper-sim") -> int:
+def read_label_watermark(conn: psycopg.Connection, mode: str) -> Dict[str, Optional[str]]:
+    """
+    Return the source watermark recorded by the last completed label-update for `mode`.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT details->'watermark'
+            FROM trading.learning_events
+            WHERE event_type = 'retrain'
+              AND status = 'completed'
+              AND details->>'stage' = 'label-update'
+              AND details->>'mode' = %s
+            ORDER BY event_time DESC
+            LIMIT 1
+            """,
+            (mode,),
+        )
+        row = cur.fetchone()
+    watermark = row[0] if row else None
+    if isinstance(watermark, str):
+        watermark = json.loads(watermark)
+    if not isinstance(watermark, dict):
+        return {"snapshot_ts": None, "mark_date": None}
+    return {"snapshot_ts": watermark.get("snapshot_ts"), "mark_date": watermark.get("mark_date")}
+
+
+def current_label_watermark(conn: psycopg.Connection, mode: str) -> Dict[str, Optional[str]]:
+    """
+    Capture the newest candidate score and position mark for `mode` before labeling starts.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT
+              (SELECT MAX(cs.created_at)
+                 FROM trading.candidate_scores cs
+                 JOIN trading.strategy_runs sr ON sr.run_id = cs.run_id
+                WHERE sr.mode = %s),
+              (SELECT MAX(pm.as_of_date)
+                 FROM trading.position_marks_daily pm
+                WHERE pm.mode = %s)
+            """,
+            (mode, mode),
+        )
+        row = cur.fetchone() or (None, None)
+    snapshot_ts, mark_date = row
+    return {
+        "snapshot_ts": snapshot_ts.isoformat() if snapshot_ts is not None else None,
+        "mark_date": mark_date.isoformat() if mark_date is not None else None,
+    }
+
+
+def upsert_feature_snapshots(
+    conn: psycopg.Connection,
+    mode: str = "paper-sim",
+    since: Optional[str] = None,
+) -> int:
     """
     Persist deterministic feature snapshots from candidate_scores for selected names.
+
+    When `since` is set only candidate scores created at or after it are copied.
     """
     with conn.cursor() as cur:
         cur.execute(
@@ -191,6 +265,7 @@ def upsert_feature_snapshots(conn: psycopg.Connection, mode: str = "paper-sim")
               FROM trading.candidate_scores cs
               JOIN trading.strategy_runs sr ON sr.run_id = cs.run_id
               WHERE sr.mode = %s
+                AND (%s::timestamptz IS NULL OR cs.created_at >= %s::timestamptz)
             )
             INSERT INTO trading.learning_feature_snapshots
               (run_id, mode, run_type, ticker, as_of_ts, policy_version, feature_vector, decision)
@@ -212,89 +287,99 @@ def upsert_feature_snapshots(conn: psycopg.Connection, mode: str = "paper-sim")
                   decision = EXCLUDED.decision
             """
             ,
-            (mode,),
+            (mode, since, since),
         )
         inserted = cur.rowcount if cur.rowcount is not None else 0
     conn.commit()
     return inserted
 
 
-def upsert_outcome_labels(conn: psycopg.Connection, mode: str = "paper-sim") -> int:
+def upsert_outcome_labels(
+    conn: psycopg.Connection,
+    mode: str = "paper-sim",
+    since_snapshot_ts: Optional[str] = None,
+    since_mark_date: Optional[str] = None,
+) -> int:
     """
     Create simple horizon labels using latest mark-to-market from position_marks_daily.
 
     If per-horizon realized outcomes are unavailable, this falls back to a shared mark-to-market
-    label with horizon-specific metadata.
+    label with horizon-specific metadata. Labeling is one INSERT ... SELECT; with a watermark only
+    snapshots taken since `since_snapshot_ts` or with marks dated on/after `since_mark_date` are
+    relabeled, otherwise every snapshot for the mode is.
     """
-    total = 0
-    horizons = ("5D", "10D", "20D")
-
     with conn.cursor() as cur:
         cur.execute(
             """
+            WITH targets AS (
+              SELECT fs.run_id, fs.ticker, fs.mode
+              FROM trading.learning_feature_snapshots fs
+              WHERE fs.mode = %(mode)s
+                AND (%(since_ts)s::timestamptz IS NULL OR fs.as_of_ts >= %(since_ts)s::timestamptz)
+              UNION
+              SELECT fs.run_id, fs.ticker, fs.mode
+              FROM trading.position_marks_daily pm
+              JOIN trading.learning_feature_snapshots fs
+                ON COALESCE(pm.scan_run_id, pm.source_run_id) = fs.run_id
+               AND fs.ticker = pm.ticker
+               AND fs.mode = pm.mode
+              WHERE pm.mode = %(mode)s
+                AND %(since_date)s::date IS NOT NULL
+                AND pm.as_of_date >= %(since_date)s::date
+            ),
+            latest AS (
+              SELECT DISTINCT ON (t.run_id, t.ticker)
+                t.run_id,
+                t.ticker,
+                COALESCE(pm.as_of_date, CURRENT_DATE) AS label_date,
+                COALESCE(pm.unrealized_pnl + pm.realized_pnl, 0) AS realized_pnl,
+                CASE
+                  WHEN COALESCE(pm.avg_entry_price, 0) > 0
+                       AND COALESCE(pm.qty, 0) <> 0
+                  THEN COALESCE((pm.unrealized_pnl + pm.realized_pnl) / NULLIF(ABS(pm.avg_entry_price * pm.qty), 0), 0)
+                  ELSE 0
+                END AS realized_return
+              FROM targets t
+              LEFT JOIN trading.position_marks_daily pm
+                ON COALESCE(pm.scan_run_id, pm.source_run_id) = t.run_id
+               AND pm.ticker = t.ticker
+               AND pm.mode = t.mode
+              ORDER BY t.run_id, t.ticker, pm.as_of_date DESC NULLS LAST
+            )
+            INSERT INTO trading.learning_outcome_labels
+              (run_id, ticker, horizon, label_date, realized_return, realized_pnl, beat_hurdle, stop_hit, target_hit, metadata)
             SELECT
-              fs.run_id,
-              fs.ticker,
-              COALESCE(pm.as_of_date, CURRENT_DATE) AS label_date,
-              COALESCE(pm.unrealized_pnl + pm.realized_pnl, 0) AS realized_pnl,
-              CASE
-                WHEN COALESCE(pm.avg_entry_price, 0) > 0
-                     AND COALESCE(pm.qty, 0) <> 0
-                THEN COALESCE((pm.unrealized_pnl + pm.realized_pnl) / NULLIF(ABS(pm.avg_entry_price * pm.qty), 0), 0)
-                ELSE 0
-              END AS realized_return
-            FROM trading.learning_feature_snapshots fs
-            LEFT JOIN trading.position_marks_daily pm
-              ON COALESCE(pm.scan_run_id, pm.source_run_id) = fs.run_id
-             AND pm.ticker = fs.ticker
-             AND pm.mode = fs.mode
-            WHERE fs.mode = %s
+              l.run_id,
+              l.ticker,
+              h.horizon,
+              l.label_date,
+              l.realized_return,
+              l.realized_pnl,
+              l.realized_return > 0,
+              FALSE,
+              FALSE,
+              jsonb_build_object('label_source', 'fallback_mark_to_market', 'horizon', h.horizon)
+            FROM latest l
+            CROSS JOIN (VALUES ('5D'), ('10D'), ('20D')) AS h(horizon)
+            ON CONFLICT (run_id, ticker, horizon) DO UPDATE
+              SET label_date = EXCLUDED.label_date,
+                  realized_return = EXCLUDED.realized_return,
+                  realized_pnl = EXCLUDED.realized_pnl,
+                  beat_hurdle = EXCLUDED.beat_hurdle,
+                  metadata = EXCLUDED.metadata
             """,
-            (mode,),
+            {"mode": mode, "since_ts": since_snapshot_ts, "since_date": since_mark_date},
         )
-        rows = cur.fetchall()
-
-    with conn.cursor() as cur:
-        for run_id, ticker, label_date, realized_pnl, realized_return in rows:
-            rpnl = safe_float(realized_pnl)
-            rret = safe_float(realized_return)
-            beat_hurdle = rret > 0.0
-            for horizon in horizons:
-                cur.execute(
-                    """
-                    INSERT INTO trading.learning_outcome_labels
-                      (run_id, ticker, horizon, label_date, realized_return, realized_pnl, beat_hurdle, stop_hit, target_hit, metadata)
-                    VALUES
-                      (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb)
-                    ON CONFLICT (run_id, ticker, horizon) DO UPDATE
-                      SET label_date = EXCLUDED.label_date,
-                          realized_return = EXCLUDED.realized_return,
-                          realized_pnl = EXCLUDED.realized_pnl,
-                          beat_hurdle = EXCLUDED.beat_hurdle,
-                          metadata = EXCLUDED.metadata
-                    """,
-                    (
-                        run_id,
-                        ticker,
-                        horizon,
-                        label_date,
-                        rret,
-                        rpnl,
-                        beat_hurdle,
-                        False,
-                        False,
-                        json.dumps({"label_source": "fallback_mark_to_market", "horizon": horizon}),
-                    ),
-                )
-                total += 1
+        total = cur.rowcount if cur.rowcount is not None else 0
     conn.commit()
     return total
 
 
-def load_training_rows(conn: psycopg.Connection) -> List[Dict[str, object]]:
-    with conn.cursor(row_factory=psycopg.rows.dict_row) as cur:
-        cur.execute(
-            """
+def load_training_rows(conn: psycopg.Connection, since: Optional[date] = None) -> List[Dict[str, object]]:
+    """
+    Load joined feature/label rows, optionally only labels dated on or after `since`.
+    """
+    query = """
             SELECT
               fs.run_id,
               fs.ticker,
@@ -309,10 +394,152 @@ def load_training_rows(conn: psycopg.Connection) -> List[Dict[str, object]]:
               ON lb.run_id = fs.run_id
              AND lb.ticker = fs.ticker
             """
-        )
+    params: Tuple[object, ...] = ()
+    if since is not None:
+        query += " WHERE lb.label_date >= %s"
+        params = (since,)
+    with conn.cursor(row_factory=psycopg.rows.dict_row) as cur:
+        cur.execute(query, params)
         return list(cur.fetchall())
 
 
+@dataclass
+class TrainingSet:
+    """
+    Feature/label history as aligned NumPy arrays (one row per run/ticker/horizon).
+    """
+
+    keys: np.ndarray  # "<run_id>|<ticker>|<horizon>"
+    features: np.ndarray  # (n, 5) in FEATURE_KEYS order
+    pnl: np.ndarray
+    horizon: np.ndarray  # index into HORIZONS, -1 if unknown
+    label_day: np.ndarray  # date ordinal, 0 if missing
+    beat_hurdle: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.keys.shape[0])
+
+    @classmethod
+    def empty(cls) -> "TrainingSet":
+        return cls(
+            keys=np.array([], dtype=str),
+            features=np.zeros((0, len(FEATURE_KEYS))),
+            pnl=np.zeros(0),
+            horizon=np.zeros(0, dtype=np.int64),
+            label_day=np.zeros(0, dtype=np.int64),
+            beat_hurdle=np.zeros(0, dtype=bool),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, object]]) -> "TrainingSet":
+        if not rows:
+            return cls.empty()
+        features = np.array(
+            [[safe_float((r.get("feature_vector") or {}).get(k)) for k in FEATURE_KEYS] for r in rows],
+            dtype=float,
+        )
+        horizon_index = {h: i for i, h in enumerate(HORIZONS)}
+        label_days = []
+        for r in rows:
+            label_date = r.get("label_date")
+            label_days.append(label_date.toordinal() if isinstance(label_date, date) else 0)
+        return cls(
+            keys=np.array([f"{r.get('run_id')}|{r.get('ticker')}|{r.get('horizon')}" for r in rows]),
+            features=features,
+            pnl=np.array([safe_float(r.get("realized_pnl")) for r in rows], dtype=float),
+            horizon=np.array([horizon_index.get(str(r.get("horizon")), -1) for r in rows], dtype=np.int64),
+            label_day=np.array(label_days, dtype=np.int64),
+            beat_hurdle=np.array([bool(r.get("beat_hurdle")) for r in rows], dtype=bool),
+        )
+
+    def merge(self, newer: "TrainingSet") -> "TrainingSet":
+        """Rows from `newer` replace rows with the same key; the rest are appended."""
+        if not len(newer):
+            return self
+        keep = ~np.isin(self.keys, newer.keys)
+        return TrainingSet(
+            keys=np.concatenate([self.keys[keep], newer.keys]),
+            features=np.concatenate([self.features[keep], newer.features]),
+            pnl=np.concatenate([self.pnl[keep], newer.pnl]),
+            horizon=np.concatenate([self.horizon[keep], newer.horizon]),
+            label_day=np.concatenate([self.label_day[keep], newer.label_day]),
+            beat_hurdle=np.concatenate([self.beat_hurdle[keep], newer.beat_hurdle]),
+        )
+
+    @property
+    def watermark(self) -> Optional[date]:
+        """Latest label_date held; labels on or after it are re-read next time."""
+        dated = self.label_day[self.label_day > 0]
+        return date.fromordinal(int(dated.max())) if dated.size else None
+
+    def subset(self, mask: np.ndarray) -> "TrainingSet":
+        return TrainingSet(
+            keys=self.keys[mask],
+            features=self.features[mask],
+            pnl=self.pnl[mask],
+            horizon=self.horizon[mask],
+            label_day=self.label_day[mask],
+            beat_hurdle=self.beat_hurdle[mask],
+        )
+
+    def split_holdout(self, fraction: float) -> Tuple["TrainingSet", "TrainingSet"]:
+        """
+        Split into (fit, holdout) by label date: the latest `fraction` of labelled
+        days is the holdout. Undated rows stay in fit. Fewer than two labelled
+        days leaves the holdout empty.
+        """
+        days = np.unique(self.label_day[self.label_day > 0])
+        n_holdout = min(len(days) - 1, int(math.ceil(len(days) * fraction))) if len(days) >= 2 else 0
+        if n_holdout <= 0:
+            return self, self.subset(np.zeros(len(self), dtype=bool))
+        holdout = self.label_day >= days[-n_holdout]
+        return self.subset(~holdout), self.subset(holdout)
+
+    def window(self) -> Tuple[Optional[date], Optional[date]]:
+        dated = self.label_day[self.label_day > 0]
+        if not dated.size:
+            return None, None
+        return date.fromordinal(int(dated.min())), date.fromordinal(int(dated.max()))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as handle:
+            np.savez(
+                handle,
+                keys=self.keys,
+                features=self.features,
+                pnl=self.pnl,
+                horizon=self.horizon,
+                label_day=self.label_day,
+                beat_hurdle=self.beat_hurdle,
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "TrainingSet":
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(**{name: data[name] for name in data.files})
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls.empty()
+
+
+def load_training_set(
+    conn: psycopg.Connection,
+    cache_path: Optional[Path] = None,
+    reload: bool = False,
+) -> TrainingSet:
+    """
+    Load training arrays, reading only labels dated on or after the cached watermark.
+    """
+    cached = TrainingSet.empty()
+    if cache_path is not None and not reload and cache_path.exists():
+        cached = TrainingSet.load(cache_path)
+    training = cached.merge(TrainingSet.from_rows(load_training_rows(conn, since=cached.watermark)))
+    if cache_path is not None:
+        training.save(cache_path)
+    return training
+
+
 def compute_candidate_weights(rows: List[Dict[str, object]]) -> Dict[str, float]:
     """
     Very simple deterministic learner:
@@ -422,6 +649,149 @@ def compute_metrics(rows: List[Dict[str, object]], weights: Dict[str, float], th
     )
 
 
+def evaluate_policies(
+    training: TrainingSet,
+    weights: np.ndarray,
+    thresholds: np.ndarray,
+    chunk_cells: int = WEIGHT_SEARCH["chunk_cells"],
+) -> Dict[str, np.ndarray]:
+    """
+    Score many (weights, threshold) candidates against the training set at once.
+
+    Vectorized equivalent of compute_metrics: weights is (k, 5) in FEATURE_KEYS
+    order, thresholds is (k,). Returns arrays of length k (horizon stats are
+    (k, len(HORIZONS))).
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    thresholds = np.broadcast_to(np.asarray(thresholds, dtype=float), (weights.shape[0],))
+    k = weights.shape[0]
+    n_h = len(HORIZONS)
+    out = {
+        "n_trades": np.zeros(k, dtype=np.int64),
+        "n_days": np.zeros(k, dtype=np.int64),
+        "net_pnl": np.zeros(k),
+        "hit_rate": np.zeros(k),
+        "max_drawdown": np.zeros(k),
+        "horizon_net_pnl": np.zeros((k, n_h)),
+        "horizon_hit_rate": np.zeros((k, n_h)),
+    }
+    if not len(training) or not k:
+        return out
+
+    # Same ordering as compute_metrics: by label_date (missing = today), stable.
+    sort_day = np.where(training.label_day > 0, training.label_day, date.today().toordinal())
+    order = np.lexsort((training.label_day, sort_day))
+    features = training.features[order]
+    pnl = training.pnl[order]
+    wins = (pnl > 0).astype(float)
+    day = training.label_day[order]
+    day_starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    horizon_onehot = (training.horizon[order][:, None] == np.arange(n_h)[None, :]).astype(float)
+
+    n = len(training)
+    step = max(1, int(chunk_cells) // n)
+    for lo in range(0, k, step):
+        hi = min(k, lo + step)
+        scores = np.clip(20.0 * (weights[lo:hi] @ features.T), 0.0, 100.0)
+        mask = scores >= thresholds[lo:hi, None]
+        maskf = mask.astype(float)
+
+        n_trades = mask.sum(axis=1)
+        out["n_trades"][lo:hi] = n_trades
+        out["net_pnl"][lo:hi] = maskf @ pnl
+        out["hit_rate"][lo:hi] = (maskf @ wins) / np.maximum(n_trades, 1)
+        out["n_days"][lo:hi] = (np.add.reduceat(mask, day_starts, axis=1) > 0).sum(axis=1)
+
+        curve = np.cumsum(maskf * pnl, axis=1)
+        peak = np.maximum.accumulate(np.maximum(curve, 0.0), axis=1)
+        out["max_drawdown"][lo:hi] = (peak - curve).max(axis=1)
+
+        h_trades = maskf @ horizon_onehot
+        out["horizon_net_pnl"][lo:hi] = maskf @ (horizon_onehot * pnl[:, None])
+        out["horizon_hit_rate"][lo:hi] = (maskf @ (horizon_onehot * wins[:, None])) / np.maximum(h_trades, 1)
+    return out
+
+
+def policy_metrics_at(evaluation: Dict[str, np.ndarray], index: int) -> PolicyMetrics:
+    return PolicyMetrics(
+        n_trades=int(evaluation["n_trades"][index]),
+        n_days=int(evaluation["n_days"][index]),
+        net_pnl=float(evaluation["net_pnl"][index]),
+        hit_rate=float(evaluation["hit_rate"][index]),
+        max_drawdown=float(evaluation["max_drawdown"][index]),
+        by_horizon={
+            h: {
+                "net_pnl": round(float(evaluation["horizon_net_pnl"][index, i]), 6),
+                "hit_rate": round(float(evaluation["horizon_hit_rate"][index, i]), 6),
+            }
+            for i, h in enumerate(HORIZONS)
+        },
+    )
+
+
+def _weights_vector(weights: Dict[str, float]) -> List[float]:
+    return [safe_float(weights.get(k)) for k in FEATURE_KEYS]
+
+
+def score_policy(training: TrainingSet, weights: Dict[str, float], threshold: float) -> PolicyMetrics:
+    evaluation = evaluate_policies(training, np.array([_weights_vector(weights)]), np.array([threshold]))
+    return policy_metrics_at(evaluation, 0)
+
+
+def search_policy(
+    training: TrainingSet,
+    n_candidates: int = WEIGHT_SEARCH["n_candidates"],
+    thresholds: Tuple[float, ...] = WEIGHT_SEARCH["thresholds"],
+    seed: int = WEIGHT_SEARCH["seed"],
+) -> Tuple[Dict[str, float], float, PolicyMetrics, Dict[str, object]]:
+    """
+    Random (Dirichlet) search over f/a/s/t weights x conviction thresholds.
+
+    The default weights and the mean-difference learner's weights are always
+    included. Candidates are ranked by net PnL minus max drawdown, among those
+    meeting the promotion trade-count gate when any do.
+    """
+    winners = training.features[training.beat_hurdle]
+    losers = training.features[~training.beat_hurdle]
+    seeds = [normalize_weights(DEFAULT_WEIGHTS)]
+    if len(winners) and len(losers):
+        diff = np.maximum(0.01, winners[:, :4].mean(axis=0) - losers[:, :4].mean(axis=0))
+        seeds.append(normalize_weights({**dict(zip(FEATURE_KEYS[:4], diff.tolist())), "p": 1.0}))
+
+    rng = np.random.default_rng(seed)
+    sampled = rng.dirichlet(np.ones(4), size=max(0, int(n_candidates)))
+    base = np.vstack([np.array([_weights_vector(w) for w in seeds]), np.c_[sampled, np.ones(len(sampled))]])
+    grid = np.asarray(thresholds, dtype=float)
+    weights = np.repeat(base, len(grid), axis=0)
+    cand_thresholds = np.tile(grid, len(base))
+
+    evaluation = evaluate_policies(training, weights, cand_thresholds)
+    objective = evaluation["net_pnl"] - evaluation["max_drawdown"]
+    eligible = evaluation["n_trades"] >= PROMOTION_GATES["min_trades"]
+    if eligible.any():
+        objective = np.where(eligible, objective, -np.inf)
+    best = int(np.argmax(objective))
+
+    best_weights = {k: round(float(v), 6) for k, v in zip(FEATURE_KEYS, weights[best])}
+    summary = {
+        "candidates_evaluated": int(len(weights)),
+        "eligible_candidates": int(eligible.sum()),
+        "best_objective": round(float(evaluation["net_pnl"][best] - evaluation["max_drawdown"][best]), 6),
+        "seed": seed,
+    }
+    return best_weights, float(cand_thresholds[best]), policy_metrics_at(evaluation, best), summary
+
+
+def get_policy_thresholds(conn: psycopg.Connection, policy_version: str) -> Dict[str, object]:
+    with conn.cursor(row_factory=psycopg.rows.dict_row) as cur:
+        cur.execute(
+            "SELECT thresholds FROM trading.learning_policy_versions WHERE policy_version = %s",
+            (policy_version,),
+        )
+        row = cur.fetchone()
+    return {**DEFAULT_THRESHOLDS, **((row or {}).get("thresholds") or {})}
+
+
 def get_policy(conn: psycopg.Connection, status: str) -> Optional[Tuple[str, Dict[str, float], Dict[str, object]]]:
     with conn.cursor(row_factory=psycopg.rows.dict_row) as cur:
         cur.execute(
@@ -493,8 +863,9 @@ def upsert_policy_assignments(
 def insert_challenger(
     conn: psycopg.Connection,
     weights: Dict[str, float],
-    metrics: PolicyMetrics,
+    metrics: Dict[str, object],
     training_window: Tuple[Optional[date], Optional[date]],
+    thresholds: Optional[Dict[str, object]] = None,
 ) -> str:
     version = make_policy_version()
     start, end = training_window
@@ -509,10 +880,10 @@ def insert_challenger(
             (
                 version,
                 json.dumps(weights),
-                json.dumps(DEFAULT_THRESHOLDS),
+                json.dumps(thresholds or DEFAULT_THRESHOLDS),
                 start,
                 end,
-                json.dumps(metrics.as_json()),
+                json.dumps(metrics),
                 "Auto-trained challenger",
             ),
         )
@@ -626,8 +997,15 @@ def run_label_update(conn: psycopg.Connection, mode: str) -> Dict[str, object]:
 
     champion = get_policy(conn, "champion")
     champion_version = champion[0] if champion else ensure_champion(conn)
-    snapshots = upsert_feature_snapshots(conn, mode=mode)
-    labels = upsert_outcome_labels(conn, mode=mode)
+    since = read_label_watermark(conn, mode)
+    watermark = current_label_watermark(conn, mode)
+    snapshots = upsert_feature_snapshots(conn, mode=mode, since=since["snapshot_ts"])
+    labels = upsert_outcome_labels(
+        conn,
+        mode=mode,
+        since_snapshot_ts=since["snapshot_ts"],
+        since_mark_date=since["mark_date"],
+    )
     assignments = upsert_policy_assignments(
         conn=conn,
         policy_version=champion_version,
@@ -640,24 +1018,47 @@ def run_label_update(conn: psycopg.Connection, mode: str) -> Dict[str, object]:
         "label_rows_upserted": labels,
         "policy_assignments_upserted": assignments,
         "champion_policy_version": champion_version,
+        "watermark": watermark,
         **event_details,
     }
     log_learning_event(conn, "retrain", "completed", None, {"stage": "label-update", **details})
     return details
 
 
-def run_retrain(conn: psycopg.Connection) -> Dict[str, object]:
+def run_retrain(
+    conn: psycopg.Connection,
+    training_cache: Optional[Path] = None,
+    reload_training: bool = False,
+) -> Dict[str, object]:
     log_learning_event(conn, "retrain", "started", None, {"stage": "retrain"})
-    rows = load_training_rows(conn)
-    if not rows:
+    training = load_training_set(conn, cache_path=training_cache, reload=reload_training)
+    if not len(training):
         details = {"message": "No training rows available."}
         log_learning_event(conn, "retrain", "blocked", None, details)
         return {"status": "blocked", **details}
 
-    weights = compute_candidate_weights(rows)
-    metrics = compute_metrics(rows, weights=weights, threshold=DEFAULT_THRESHOLDS["min_conviction"])
-    start, end = training_window(rows)
-    version = insert_challenger(conn, weights, metrics, (start, end))
+    # Select on the fit window only; promotion compares holdout scores, so the
+    # search's in-sample optimism never reaches the champion comparison.
+    fit, holdout = training.split_holdout(WEIGHT_SEARCH["holdout_fraction"])
+    weights, threshold, in_sample, search = search_policy(fit)
+    thresholds = {**DEFAULT_THRESHOLDS, "min_conviction": threshold}
+    metrics = score_policy(holdout, weights, threshold)
+    stored_metrics: Dict[str, object] = {
+        **metrics.as_json(),
+        "sample": "holdout",
+        "in_sample": in_sample.as_json(),
+        "holdout_window": [str(d) if d else None for d in holdout.window()],
+    }
+    champion = get_policy(conn, "champion")
+    if champion:
+        champion_version, champion_weights, _champion_metrics = champion
+        champion_threshold = safe_float(get_policy_thresholds(conn, champion_version).get("min_conviction"))
+        stored_metrics["champion_version"] = champion_version
+        stored_metrics["champion_holdout"] = score_policy(
+            holdout, {**DEFAULT_WEIGHTS, **(champion_weights or {})}, champion_threshold
+        ).as_json()
+    start, end = training.window()
+    version = insert_challenger(conn, weights, stored_metrics, (start, end), thresholds=thresholds)
     assignments = upsert_policy_assignments(
         conn=conn,
         policy_version=version,
@@ -671,7 +1072,12 @@ def run_retrain(conn: psycopg.Connection) -> Dict[str, object]:
         "training_window_start": str(start) if start else None,
         "training_window_end": str(end) if end else None,
         "weights": weights,
-        "metrics": metrics.as_json(),
+        "thresholds": thresholds,
+        "training_rows": len(training),
+        "fit_rows": len(fit),
+        "holdout_rows": len(holdout),
+        "search": search,
+        "metrics": stored_metrics,
     }
     log_learning_event(conn, "retrain", "completed", version, details)
     return details
@@ -689,7 +1095,14 @@ def run_promotion_check(conn: psycopg.Connection) -> Dict[str, object]:
 
     champion_version, _champ_w, champion_metrics_json = champion
     challenger_version, _chal_w, challenger_metrics_json = challenger
-    champion_metrics = metrics_from_json(champion_metrics_json)
+    # Prefer the champion's score on the challenger's holdout window so both
+    # policies are judged on the same out-of-sample labels.
+    if challenger_metrics_json.get("champion_version") == champion_version and challenger_metrics_json.get(
+        "champion_holdout"
+    ):
+        champion_metrics = metrics_from_json(challenger_metrics_json["champion_holdout"])
+    else:
+        champion_metrics = metrics_from_json(champion_metrics_json)
     challenger_metrics = metrics_from_json(challenger_metrics_json)
 
     pass_all, gate_details = evaluate_promotion(champion_metrics, challenger_metrics)
@@ -721,9 +1134,14 @@ def run_promotion_check(conn: psycopg.Connection) -> Dict[str, object]:
     return details
 
 
-def run_full(conn: psycopg.Connection, mode: str) -> Dict[str, object]:
+def run_full(
+    conn: psycopg.Connection,
+    mode: str,
+    training_cache: Optional[Path] = None,
+    reload_training: bool = False,
+) -> Dict[str, object]:
     label = run_label_update(conn, mode=mode)
-    retrain = run_retrain(conn)
+    retrain = run_retrain(conn, training_cache=training_cache, reload_training=reload_training)
     promotion = run_promotion_check(conn)
     return {"label_update": label, "retrain": retrain, "promotion_check": promotion}
 
@@ -746,6 +1164,11 @@ def parse_args() -> argparse.Namespace:
         choices=["paper", "paper-sim", "live"],
         help="Mode for label updates",
     )
+    parser.add_argument(
+        "--reload-training",
+        action="store_true",
+        help="Ignore the local training cache and reload all labels",
+    )
     return parser.parse_args()
 
 
@@ -758,17 +1181,24 @@ def main() -> None:
         database_name=args.database_name,
     )
 
+    training_cache = TRAINING_CACHE_DIR / f"{args.database_name}.npz"
+
     with psycopg.connect(dsn) as conn:
         ensure_champion(conn)
 
         if args.action == "label-update":
             out = run_label_update(conn, mode=args.mode)
         elif args.action == "retrain":
-            out = run_retrain(conn)
+            out = run_retrain(conn, training_cache=training_cache, reload_training=args.reload_training)
         elif args.action == "promotion-check":
             out = run_promotion_check(conn)
         else:
-            out = run_full(conn, mode=args.mode)
+            out = run_full(
+                conn,
+                mode=args.mode,
+                training_cache=training_cache,
+                reload_training=args.reload_training,
+            )
 
     print(json.dumps(out, indent=2, default=str))
 
@@ -63,6 +63,28 @@ CREATE TABLE IF NOT EXISTS trading.candidate_scores (
 CREATE INDEX IF NOT EXISTS idx_candidate_scores_run_id ON trading.candidate_scores(run_id);
 CREATE INDEX IF NOT EXISTS idx_candidate_scores_ticker ON trading.candidate_scores(ticker);
 
+-- Per-filing SEC keyword counts, ingested incrementally from sec-filings-intelligence
+-- so scans aggregate a compact table instead of pattern-matching raw filing text.
+CREATE TABLE IF NOT EXISTS trading.sec_filing_features (
+  ticker TEXT NOT NULL,
+  filing_key TEXT NOT NULL,
+  company_name TEXT,
+  filing_date DATE,
+  filing_type TEXT,
+  guidance_mentions INTEGER NOT NULL DEFAULT 0,
+  competition_mentions INTEGER NOT NULL DEFAULT 0,
+  ai_mentions INTEGER NOT NULL DEFAULT 0,
+  churn_mentions INTEGER NOT NULL DEFAULT 0,
+  search_vector TSVECTOR,
+  ingested_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (ticker, filing_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sec_filing_features_ticker_date
+  ON trading.sec_filing_features (ticker, filing_date DESC);
+CREATE INDEX IF NOT EXISTS idx_sec_filing_features_search
+  ON trading.sec_filing_features USING GIN (search_vector);
+
 CREATE TABLE IF NOT EXISTS trading.order_events (
   id BIGSERIAL PRIMARY KEY,
   run_id UUID NOT NULL REFERENCES trading.strategy_runs(run_id) ON DELETE CASCADE,
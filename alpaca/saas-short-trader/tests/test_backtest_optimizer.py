@@ -49,3 +49,35 @@ def test_optimize_scan_config_targets_100_bankroll() -> None:
     assert optimized["summary"]["target_met"] is True
     assert optimized["config"]["portfolio_notional_usd"] == 100.0
     assert optimized["summary"]["modeled_pnl_pct"] >= 25.0
+
+
+def test_optimize_scan_config_sweeps_feature_matrix_then_runs_one_scan() -> None:
+    base_config = {"universe": ["ADBE", "CRM", "NOW"]}
+    evaluated = []
+    scanned = []
+
+    def _evaluate(candidate: dict) -> dict:
+        evaluated.append(candidate)
+        pnl_pct = candidate["max_names_orders"] * 4.0 - (candidate["min_conviction"] - 55.0) * 0.1
+        return {
+            "selected": candidate["universe"][: candidate["max_names_orders"]],
+            "sim": {"net_pnl_20d": pnl_pct, "gross_exposure": 100.0},
+        }
+
+    def _run_scan(candidate: dict) -> dict:
+        scanned.append(candidate)
+        return {"status": "completed", **_evaluate(candidate)}
+
+    optimized = optimizer.optimize_scan_config(
+        base_config=base_config,
+        run_scan=_run_scan,
+        evaluate_candidate=_evaluate,
+    )
+
+    assert optimized["summary"]["attempt_count"] == 32
+    assert optimized["summary"]["full_scan_count"] == 1
+    assert optimized["summary"]["evaluation"] == "feature_matrix"
+    assert len(scanned) == 1
+    assert scanned[0]["max_names_orders"] == 8
+    assert scanned[0]["min_conviction"] == 55.0
+    assert optimized["result"]["status"] == "completed"
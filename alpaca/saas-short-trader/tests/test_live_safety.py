@@ -538,3 +538,204 @@ def test_live_scan_submits_orders_locally_without_simulated_marks(tmp_path: Path
     assert inserted[0]["broker"] == "alpaca_local_python"
     assert engine.storage.position_mark_calls == []
     assert engine.storage.pnl_calls == []
+
+
+def test_scan_feeds_fetch_concurrently(tmp_path: Path) -> None:
+    engine = _build_engine(tmp_path)
+    barrier = module.threading.Barrier(4, timeout=2)
+
+    def _feed(data_fn):
+        def _fetch(universe):
+            barrier.wait()
+            return module.FeedResult(ok=True, data=data_fn(universe))
+
+        return _fetch
+
+    engine.fetch_sec_features = _feed(lambda universe: {ticker: {"filing_count": 1} for ticker in universe})
+    engine.fetch_trends_features = _feed(lambda universe: {ticker: {"avg_interest": 40, "source": "google-trends"} for ticker in universe})
+    engine.fetch_news_features = _feed(lambda universe: {"_source": "perplexity", **{ticker: {"headline": "beat"} for ticker in universe}})
+    engine.fetch_market_features = _feed(lambda universe: {ticker: {"price": 250.0} for ticker in universe})
+
+    feeds = engine._fetch_scan_feeds("live", ["CRM"])
+
+    assert all(result.ok for result in feeds.values())
+    assert feeds["news-search"].data["_source"] == "perplexity"
+
+
+def test_live_feed_row_cache_skips_fresh_tickers(tmp_path: Path) -> None:
+    engine = _build_engine(tmp_path)
+    engine.feed_row_cache = module.FeedRowCache(tmp_path / "feed_cache.json")
+    requested = {"sec": [], "trends": [], "news": [], "market": []}
+
+    def _sec(universe):
+        requested["sec"].append(list(universe))
+        return module.FeedResult(ok=True, data={ticker: {"filing_count": 2} for ticker in universe})
+
+    def _trends(universe):
+        requested["trends"].append(list(universe))
+        return module.FeedResult(ok=True, data={ticker: {"avg_interest": 0, "source": "google-trends-fallback"} for ticker in universe})
+
+    def _news(universe):
+        requested["news"].append(list(universe))
+        return module.FeedResult(ok=True, data={"_source": "exa", **{ticker: {"headline": "churn", "source": "exa"} for ticker in universe}})
+
+    def _market(universe):
+        requested["market"].append(list(universe))
+        return module.FeedResult(ok=True, data={ticker: {"price": 250.0} for ticker in universe})
+
+    engine.fetch_sec_features = _sec
+    engine.fetch_trends_features = _trends
+    engine.fetch_news_features = _news
+    engine.fetch_market_features = _market
+
+    engine._fetch_scan_feeds("live", ["CRM", "NOW"])
+    engine.feed_row_cache = module.FeedRowCache(tmp_path / "feed_cache.json")
+    feeds = engine._fetch_scan_feeds("live", ["CRM", "NOW", "ZS"])
+
+    assert requested["sec"] == [["CRM", "NOW"], ["ZS"]]
+    assert requested["news"] == [["CRM", "NOW"], ["ZS"]]
+    # Fallback trend rows and market snapshots are never served from cache.
+    assert requested["trends"] == [["CRM", "NOW"], ["CRM", "NOW", "ZS"]]
+    assert requested["market"] == [["CRM", "NOW"], ["CRM", "NOW", "ZS"]]
+    assert sorted(feeds["sec-filings-intelligence"].data) == ["CRM", "NOW", "ZS"]
+    assert feeds["news-search"].data["_source"] == "exa"
+
+
+def test_feed_row_cache_expires_rows_after_ttl(tmp_path: Path) -> None:
+    cache = module.FeedRowCache(tmp_path / "feed_cache.json", {"google-trends": 60})
+    cache.store("google-trends", {"CRM": {"avg_interest": 55, "source": "google-trends"}}, now=1_000.0)
+
+    fresh, stale = cache.split("google-trends", ["CRM", "NOW"], now=1_030.0)
+    assert fresh == {"CRM": {"avg_interest": 55, "source": "google-trends"}}
+    assert stale == ["NOW"]
+
+    fresh, stale = cache.split("google-trends", ["CRM"], now=1_061.0)
+    assert fresh == {}
+    assert stale == ["CRM"]
+
+
+def test_evaluate_scan_candidate_matches_full_scoring_from_one_fetch(tmp_path: Path) -> None:
+    engine = _build_engine(tmp_path)
+    calls = {"sec": 0}
+    universe = ["ADBE", "CRM", "NOW", "ZS"]
+
+    def _sec(tickers):
+        calls["sec"] += 1
+        return module.FeedResult(
+            ok=True,
+            data={ticker: {"guidance_mentions": idx, "churn_mentions": idx} for idx, ticker in enumerate(tickers)},
+        )
+
+    engine.fetch_sec_features = _sec
+    engine.fetch_trends_features = lambda tickers: module.FeedResult(ok=True, data={ticker: {"avg_interest": 5} for ticker in tickers})
+    engine.fetch_news_features = lambda tickers: module.FeedResult(ok=True, data={"_source": "exa", **{ticker: {"news_score": 3.5} for ticker in tickers}})
+    engine.fetch_market_features = lambda tickers: module.FeedResult(ok=True, data={ticker: {"price": 100.0, "adv_usd": 30_000_000} for ticker in tickers})
+
+    features = engine.extract_scan_features("paper-sim", universe)
+    feeds = engine._fetch_scan_feeds("paper-sim", universe[:3])
+    for min_conviction in (55.0, 70.0):
+        candidate = {"max_names_scored": 3, "max_names_orders": 2, "min_conviction": min_conviction}
+        evaluated = engine.evaluate_scan_candidate(features, candidate)
+        scored = engine.score_universe(
+            universe=universe[:3],
+            sec_data=feeds["sec-filings-intelligence"].data,
+            trends_data=feeds["google-trends"].data,
+            news_data=feeds["news-search"].data,
+            market_data=feeds["alpaca"].data,
+            min_conviction=min_conviction,
+            max_names_orders=2,
+        )
+        assert evaluated["selected"] == [row["ticker"] for row in scored if row["selected"]]
+
+    assert calls["sec"] == 1
+
+
+class _SecFeatureStorage(_FakeStorage):
+    def __init__(self):
+        super().__init__()
+        self.features = {}
+
+    def get_sec_filing_watermarks(self, tickers):
+        return {ticker: module.date(2026, 3, 1) for ticker in tickers if ticker in self.features}
+
+    def upsert_sec_filing_features(self, rows):
+        for row in rows:
+            self.features.setdefault(row["ticker"], {})[row["filing_key"]] = row
+        return len(rows)
+
+    def get_sec_features(self, tickers):
+        return [
+            {
+                "ticker": ticker,
+                "latest_filing_date": max(row["filing_date"] for row in self.features[ticker].values()),
+                "filing_count": len(self.features[ticker]),
+                "guidance_mentions": sum(1 for row in self.features[ticker].values() if row["guidance_mentions"] > 0),
+            }
+            for ticker in tickers
+            if ticker in self.features
+        ]
+
+
+class _SecFilingSeren(_FakeSeren):
+    def __init__(self, rows, aggregates=None):
+        self.rows = rows
+        self.aggregates = aggregates or {}
+        self.queries = []
+
+    def call_publisher(self, publisher, method="GET", path="/", timeout=30, **kwargs):
+        assert publisher == "sec-filings-intelligence"
+        query = kwargs["query"]
+        self.queries.append(query)
+        if "LEFT JOIN public.filing" in query:
+            # Direct per-ticker aggregate over the filings (pre-ingest fallback).
+            return {"rows": [row for ticker, row in self.aggregates.items() if f"('{ticker}'," in query]}
+        return {"rows": list(self.rows)}
+
+    def extract_rows(self, response):
+        return response["rows"]
+
+
+def test_fetch_sec_features_reads_ingested_feature_table(tmp_path: Path) -> None:
+    engine = _build_engine(tmp_path)
+    engine.storage = _SecFeatureStorage()
+    engine.seren = _SecFilingSeren(
+        [{"ticker": "CRM", "filing_key": "k1", "filing_date": "2026-03-01", "guidance_mentions": 2}],
+        aggregates={
+            "CRM": {"ticker": "CRM", "filing_count": 1, "guidance_mentions": 1},
+            "NOW": {"ticker": "NOW", "filing_count": 0, "guidance_mentions": 0},
+        },
+    )
+
+    before = engine.fetch_sec_features(["CRM", "NOW"])
+    first = engine.run_sec_ingest(["CRM", "NOW"])
+    second = engine.run_sec_ingest(["CRM", "NOW"])
+    scanned = engine.fetch_sec_features(["CRM", "NOW"])
+
+    # Nothing ingested yet: the scan reads every ticker from the filings instead of failing.
+    assert before.ok is True
+    assert before.data["CRM"]["filing_count"] == 1
+    assert "LEFT JOIN public.filing" in engine.seren.queries[0]
+    assert first["ingested_filings"] == 1
+    assert second["status"] == "ok"
+    assert len(engine.seren.queries) == 4
+    assert "LIKE '%guidance%'" not in engine.seren.queries[1]
+    assert "('CRM', 'Salesforce', CAST(NULL AS DATE))" in engine.seren.queries[1]
+    assert "('CRM', 'Salesforce', DATE '2026-03-01')" in engine.seren.queries[2]
+    # Only the ticker the feature table does not cover falls back to the filings.
+    assert "('NOW'," in engine.seren.queries[3] and "('CRM'," not in engine.seren.queries[3]
+    assert scanned.ok is True
+    assert scanned.data["CRM"]["filing_count"] == 1
+    assert scanned.data["NOW"]["filing_count"] == 0
+
+
+def test_fetch_sec_features_fails_only_for_tickers_missing_after_fallback(tmp_path: Path) -> None:
+    engine = _build_engine(tmp_path)
+    engine.storage = _SecFeatureStorage()
+    engine.storage.features["CRM"] = {"k1": {"filing_date": "2026-03-01", "guidance_mentions": 0}}
+    engine.seren = _SecFilingSeren([], aggregates={})
+
+    result = engine.fetch_sec_features(["CRM", "NOW"])
+
+    assert result.ok is False
+    assert result.error.startswith("sec_features_missing: NOW")
+    assert list(result.data) == ["CRM"]
@@ -119,6 +119,8 @@ class Handler(BaseHTTPRequestHandler):
                     learning_mode=str(payload.get("learning_mode", "adaptive-paper")),
                     scheduled_window_start=payload.get("scheduled_window_start"),
                 )
+            elif run_type == "ingest-sec":
+                result = self.engine.run_sec_ingest(list(payload.get("universe", DEFAULT_UNIVERSE)))
             elif run_type == "monitor":
                 result = self.engine.run_monitor(mode=mode, run_profile=str(payload.get("run_profile", "continuous")))
             elif run_type == "post-close":
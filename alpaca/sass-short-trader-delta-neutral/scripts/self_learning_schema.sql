@@ -20,6 +20,8 @@ CREATE INDEX IF NOT EXISTS idx_learning_feature_run_id
   ON trading.learning_feature_snapshots(run_id);
 CREATE INDEX IF NOT EXISTS idx_learning_feature_ticker_time
   ON trading.learning_feature_snapshots(ticker, as_of_ts DESC);
+CREATE INDEX IF NOT EXISTS idx_learning_feature_mode_time
+  ON trading.learning_feature_snapshots(mode, as_of_ts DESC);
 
 CREATE TABLE IF NOT EXISTS trading.learning_outcome_labels (
   id BIGSERIAL PRIMARY KEY,
@@ -38,6 +40,14 @@ CREATE TABLE IF NOT EXISTS trading.learning_outcome_labels (
 
 CREATE INDEX IF NOT EXISTS idx_learning_labels_date
   ON trading.learning_outcome_labels(label_date DESC);
+CREATE INDEX IF NOT EXISTS idx_learning_labels_run_ticker
+  ON trading.learning_outcome_labels(run_id, ticker);
+
+-- Lookups used by set-based labeling in self_learning.py.
+CREATE INDEX IF NOT EXISTS idx_position_marks_run_ticker
+  ON trading.position_marks_daily((COALESCE(scan_run_id, source_run_id)), ticker);
+CREATE INDEX IF NOT EXISTS idx_candidate_scores_created_at
+  ON trading.candidate_scores(created_at DESC);
 
 CREATE TABLE IF NOT EXISTS trading.learning_policy_versions (
   policy_version TEXT PRIMARY KEY,
@@ -229,6 +229,117 @@ class SerenDBStorage:
                     )
             conn.commit()
 
+    def get_sec_filing_watermarks(self, tickers: List[str]) -> Dict[str, date]:
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT ticker, MAX(filing_date) AS latest_filing_date
+                    FROM trading.sec_filing_features
+                    WHERE ticker = ANY(%s)
+                    GROUP BY ticker
+                    """,
+                    (list(tickers),),
+                )
+                rows = cur.fetchall()
+        return {r["ticker"]: r["latest_filing_date"] for r in rows if r["latest_filing_date"] is not None}
+
+    def upsert_sec_filing_features(self, rows: List[Dict[str, Any]]) -> int:
+        params = [
+            (
+                r["ticker"],
+                r["filing_key"],
+                r.get("company_name"),
+                r.get("filing_date"),
+                r.get("filing_type"),
+                int(r.get("guidance_mentions") or 0),
+                int(r.get("competition_mentions") or 0),
+                int(r.get("ai_mentions") or 0),
+                int(r.get("churn_mentions") or 0),
+                r.get("search_text") or "",
+            )
+            for r in rows
+            if r.get("ticker") and r.get("filing_key")
+        ]
+        if not params:
+            return 0
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO trading.sec_filing_features
+                      (ticker, filing_key, company_name, filing_date, filing_type,
+                       guidance_mentions, competition_mentions, ai_mentions, churn_mentions, search_vector)
+                    VALUES
+                      (%s, %s, %s, %s, %s, %s, %s, %s, %s, to_tsvector('english', %s))
+                    ON CONFLICT (ticker, filing_key) DO UPDATE
+                    SET filing_date = EXCLUDED.filing_date,
+                        filing_type = EXCLUDED.filing_type,
+                        guidance_mentions = EXCLUDED.guidance_mentions,
+                        competition_mentions = EXCLUDED.competition_mentions,
+                        ai_mentions = EXCLUDED.ai_mentions,
+                        churn_mentions = EXCLUDED.churn_mentions,
+                        search_vector = EXCLUDED.search_vector,
+                        ingested_at = NOW()
+                    """,
+                    params,
+                )
+            conn.commit()
+        return len(params)
+
+    def get_sec_features(self, tickers: List[str]) -> List[Dict[str, Any]]:
+        """Aggregate per-ticker SEC features; mention columns count filings containing the term."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT
+                      ticker,
+                      MAX(filing_date) AS latest_filing_date,
+                      (ARRAY_AGG(filing_type ORDER BY filing_date DESC NULLS LAST))[1] AS latest_filing_type,
+                      COUNT(*) AS filing_count,
+                      COUNT(*) FILTER (WHERE guidance_mentions > 0) AS guidance_mentions,
+                      COUNT(*) FILTER (WHERE competition_mentions > 0) AS competition_mentions,
+                      COUNT(*) FILTER (WHERE ai_mentions > 0) AS ai_mentions,
+                      COUNT(*) FILTER (WHERE churn_mentions > 0) AS churn_mentions
+                    FROM trading.sec_filing_features
+                    WHERE ticker = ANY(%s)
+                    GROUP BY ticker
+                    ORDER BY ticker
+                    """,
+                    (list(tickers),),
+                )
+                rows = cur.fetchall()
+        out: List[Dict[str, Any]] = []
+        for r in rows:
+            row = dict(r)
+            if row.get("latest_filing_date") is not None:
+                row["latest_filing_date"] = row["latest_filing_date"].isoformat()
+            out.append(row)
+        return out
+
+    def search_sec_filings(self, query: str, tickers: Optional[List[str]] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Ad-hoc full-text term query over ingested filings, ranked by ts_rank."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT
+                      ticker,
+                      company_name,
+                      filing_date,
+                      filing_type,
+                      ts_rank(search_vector, websearch_to_tsquery('english', %s)) AS rank
+                    FROM trading.sec_filing_features
+                    WHERE search_vector @@ websearch_to_tsquery('english', %s)
+                      AND (%s::text[] IS NULL OR ticker = ANY(%s::text[]))
+                    ORDER BY rank DESC, filing_date DESC
+                    LIMIT %s
+                    """,
+                    (query, query, tickers, tickers, int(limit)),
+                )
+                return [dict(r) for r in cur.fetchall()]
+
     def insert_order_events(self, run_id: str, mode: str, events: List[Dict[str, Any]]) -> None:
         self.reporter.record_order_events(run_id, events)
         with self.connect() as conn:
@@ -77,6 +77,15 @@ def build_jobs(runner_url: str, webhook_secret: str, timezone: str, mode: str, l
         "persist_to_serendb": True,
     }
     return [
+        {
+            "name": "sass-short-trader-delta-neutral-sec-ingest",
+            "schedule": "45 7 * * 1-5",
+            "timezone": timezone,
+            "url": run_url,
+            "method": "POST",
+            "headers": headers,
+            "body": {**common, "run_type": "ingest-sec"},
+        },
         {
             "name": "sass-short-trader-delta-neutral-scan",
             "schedule": "15 8 * * 1-5",
@@ -10,6 +10,8 @@ import json
 import math
 import os
 import signal
+import threading
+import time
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from pathlib import Path
@@ -90,8 +92,27 @@ TICKER_COMPANY_MAP = {
 }
 
 WEIGHTS = {"f": 0.30, "a": 0.30, "s": 0.20, "t": 0.20, "p": 1.00}
+# Case-insensitive substrings counted per filing at ingestion; a ticker's
+# feature is the number of filings that mention any of the terms.
+SEC_FEATURE_TERMS = {
+    "guidance_mentions": ("guidance",),
+    "competition_mentions": ("competition",),
+    "ai_mentions": ("ai", "artificial intelligence"),
+    "churn_mentions": ("churn",),
+}
+SEC_SEARCH_EXCERPT_CHARS = 20_000
 LIVE_SAFETY_VERSION = "2026-03-16.alpaca-live-safety-v1"
 LIVE_SAFETY_STATE_PATH = Path("state/live_safety_state.json")
+FEED_CACHE_PATH = Path("state/feed_cache.json")
+# Filings and search interest move on a scale of hours to days, far slower than
+# the scan cadence; market snapshots must stay fresh so they are not cached.
+DEFAULT_FEED_CACHE_TTL_SECONDS = {
+    "sec-filings-intelligence": 6 * 3600,
+    "google-trends": 12 * 3600,
+    "news-search": 3600,
+    "alpaca": 0,
+}
+
 
 
 def clamp(value: float, lo: float, hi: float) -> float:
@@ -130,6 +151,125 @@ class LiveSafetyTimeout(TimeoutError):
     """Raised when a live safety operation exceeds the configured timeout."""
 
 
+def _call_all_in_daemon_threads(calls: Dict[str, Any], timeout_seconds: float) -> Dict[str, Tuple[bool, Any]]:
+    """Run every call in its own daemon thread against one shared deadline.
+
+    Returns ``{label: (ok, value_or_exception)}``; calls still running at the
+    deadline resolve to ``LiveSafetyTimeout``.
+    """
+    outcomes: Dict[str, Tuple[bool, Any]] = {}
+    lock = threading.Lock()
+    threads: Dict[str, threading.Thread] = {}
+
+    def _target(label: str, fn) -> None:
+        try:
+            outcome: Tuple[bool, Any] = (True, fn())
+        except BaseException as exc:  # noqa: BLE001
+            outcome = (False, exc)
+        with lock:
+            outcomes[label] = outcome
+
+    for label, fn in calls.items():
+        thread = threading.Thread(target=_target, args=(label, fn), name=f"{label}-timeout-guard", daemon=True)
+        threads[label] = thread
+        thread.start()
+
+    timeout = max(float(timeout_seconds), 0.0)
+    deadline = time.monotonic() + timeout
+    for thread in threads.values():
+        thread.join(timeout=max(deadline - time.monotonic(), 0.0) if timeout > 0 else None)
+
+    with lock:
+        results = dict(outcomes)
+    for label in calls:
+        if label not in results:
+            results[label] = (False, LiveSafetyTimeout(f"{label} timed out after {timeout:.2f}s"))
+    return results
+
+
+def _cacheable_feed_row(feed: str, row: Any) -> bool:
+    if not isinstance(row, dict):
+        return False
+    if str(row.get("source") or "").endswith("fallback"):
+        return False
+    if feed == "news-search":
+        return bool(row.get("headline"))
+    return True
+
+
+class FeedRowCache:
+    """Persistent per-feed, per-ticker TTL cache for publisher feed rows."""
+
+    def __init__(self, path: Path, ttl_seconds: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.ttl_seconds: Dict[str, float] = dict(DEFAULT_FEED_CACHE_TTL_SECONDS)
+        for feed, ttl in (ttl_seconds or {}).items():
+            self.ttl_seconds[str(feed)] = max(safe_float(ttl, 0.0), 0.0)
+        self.entries = self._load()
+        self.dirty = False
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional["FeedRowCache"]:
+        settings = dict(config or {})
+        if not settings.get("enabled", True):
+            return None
+        return cls(Path(settings.get("path") or FEED_CACHE_PATH), settings.get("ttl_seconds"))
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            if self.path.exists():
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+                if isinstance(raw, dict):
+                    return {str(feed): rows for feed, rows in raw.items() if isinstance(rows, dict)}
+        except (OSError, TypeError, ValueError, json.JSONDecodeError):
+            pass
+        return {}
+
+    def split(
+        self,
+        feed: str,
+        tickers: List[str],
+        now: Optional[float] = None,
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Return ``(fresh_rows, stale_tickers)`` for one feed."""
+        ttl = self.ttl_seconds.get(feed, 0.0)
+        if ttl <= 0:
+            return {}, list(tickers)
+        now = time.time() if now is None else now
+        cached = self.entries.get(feed, {})
+        fresh: Dict[str, Dict[str, Any]] = {}
+        stale: List[str] = []
+        for ticker in tickers:
+            entry = cached.get(ticker)
+            if (
+                isinstance(entry, dict)
+                and isinstance(entry.get("row"), dict)
+                and now - safe_float(entry.get("fetched_at"), 0.0) < ttl
+            ):
+                fresh[ticker] = dict(entry["row"])
+            else:
+                stale.append(ticker)
+        return fresh, stale
+
+    def store(self, feed: str, rows: Dict[str, Dict[str, Any]], now: Optional[float] = None) -> None:
+        if self.ttl_seconds.get(feed, 0.0) <= 0:
+            return
+        now = time.time() if now is None else now
+        bucket = self.entries.setdefault(feed, {})
+        for ticker, row in rows.items():
+            if str(ticker).startswith("_") or not _cacheable_feed_row(feed, row):
+                continue
+            bucket[ticker] = {"fetched_at": now, "row": row}
+            self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, sort_keys=True, default=str), encoding="utf-8")
+        self.dirty = False
+
+
 class StrategyEngine:
     def __init__(
         self,
@@ -137,6 +277,7 @@ class StrategyEngine:
         api_key: Optional[str] = None,
         strict_required_feeds: bool = True,
         live_controls: Optional[Dict[str, Any]] = None,
+        feed_cache: Optional[Dict[str, Any]] = None,
     ):
         self.storage = SerenDBStorage(dsn)
         self.strict_required_feeds = strict_required_feeds
@@ -145,6 +286,8 @@ class StrategyEngine:
         self.seren: Optional[SerenClient] = None
         self.live_controls = self._normalize_live_controls(live_controls)
         self.live_safety_state = self._load_live_safety_state()
+        self.scan_feed_cache: Dict[Tuple[str, ...], Dict[str, FeedResult]] = {}
+        self.feed_row_cache: Optional[FeedRowCache] = FeedRowCache.from_config(feed_cache)
         if self.api_key:
             self.seren = SerenClient(api_key=self.api_key)
 
@@ -186,6 +329,76 @@ class StrategyEngine:
         LIVE_SAFETY_STATE_PATH.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
         self.live_safety_state = payload
 
+    def _scan_feed_cache(self) -> Dict[Tuple[str, ...], Dict[str, FeedResult]]:
+        cache = getattr(self, "scan_feed_cache", None)
+        if cache is None:
+            cache = {}
+            self.scan_feed_cache = cache
+        return cache
+
+    def _fetch_scan_feeds(self, mode: str, universe: List[str]) -> Dict[str, FeedResult]:
+        cache_key = tuple(universe)
+        cache = self._scan_feed_cache()
+        if mode != "live":
+            # Feeds fetched for a wider universe (e.g. by the optimizer's
+            # feature extraction) already hold every row a narrower scan needs.
+            wanted = set(universe)
+            for cached_key, cached_feeds in cache.items():
+                if wanted.issubset(cached_key):
+                    return cached_feeds
+
+        fetchers = {
+            "sec-filings-intelligence": self.fetch_sec_features,
+            "google-trends": self.fetch_trends_features,
+            "news-search": self.fetch_news_features,
+            "alpaca": self.fetch_market_features,
+        }
+        row_cache: Optional[FeedRowCache] = getattr(self, "feed_row_cache", None)
+        cached_rows: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        stale_tickers: Dict[str, List[str]] = {}
+        for name in fetchers:
+            if row_cache is not None:
+                cached_rows[name], stale_tickers[name] = row_cache.split(name, universe)
+            else:
+                cached_rows[name], stale_tickers[name] = {}, list(universe)
+
+        # Every feed is fetched at once, so the scan waits on the slowest feed
+        # rather than the sum of all four.
+        pending = {
+            f"{name}_feed": (lambda fetcher=fetcher, tickers=stale_tickers[name]: fetcher(tickers))
+            for name, fetcher in fetchers.items()
+            if stale_tickers[name]
+        }
+        outcomes = _call_all_in_daemon_threads(pending, 0)
+
+        feeds: Dict[str, FeedResult] = {}
+        for name in fetchers:
+            data = dict(cached_rows[name])
+            outcome = outcomes.get(f"{name}_feed")
+            if outcome is None:
+                result = FeedResult(ok=True, data={})
+            else:
+                ok, value = outcome
+                result = value if ok else FeedResult(ok=False, data={}, error=str(value))
+                if row_cache is not None and result.ok:
+                    row_cache.store(name, result.data)
+            data.update(result.data)
+            if name == "news-search" and "_source" not in data:
+                data["_source"] = next(
+                    (str(row.get("source")) for row in cached_rows[name].values() if row.get("source")),
+                    "exa",
+                )
+            feeds[name] = FeedResult(ok=result.ok, data=data, error=result.error)
+
+        if row_cache is not None:
+            try:
+                row_cache.save()
+            except OSError:
+                pass
+        if mode != "live":
+            cache[cache_key] = feeds
+        return feeds
+
     def _live_operation_timeout_seconds(self) -> float:
         return max(safe_float(self.live_controls.get("operation_timeout_seconds"), 30.0), 0.0)
 
@@ -551,10 +764,11 @@ class StrategyEngine:
         orders: List[Dict[str, Any]] = []
         live_risk: Optional[Dict[str, Any]] = None
         try:
-            sec_result = self.fetch_sec_features(universe)
-            trends_result = self.fetch_trends_features(universe)
-            news_result = self.fetch_news_features(universe)
-            market_result = self.fetch_market_features(universe)
+            feed_results = self._fetch_scan_feeds(mode, universe)
+            sec_result = feed_results["sec-filings-intelligence"]
+            trends_result = feed_results["google-trends"]
+            news_result = feed_results["news-search"]
+            market_result = feed_results["alpaca"]
 
             feed_status = {
                 "sec-filings-intelligence": sec_result.ok,
@@ -1057,6 +1271,81 @@ class StrategyEngine:
         if not self.seren:
             return FeedResult(ok=False, data={}, error="SEREN_API_KEY missing")
 
+        try:
+            rows = self.storage.get_sec_features(tickers)
+        except LiveSafetyTimeout:
+            raise
+        except Exception:
+            # No feature table to read (e.g. SerenDB unavailable); scan the filings directly.
+            return self._fetch_sec_features_from_filings(tickers)
+
+        wanted = set(tickers)
+        data: Dict[str, Dict[str, Any]] = {row["ticker"]: row for row in rows if row.get("ticker") in wanted}
+        missing = [ticker for ticker in tickers if ticker not in data]
+        if not missing:
+            return FeedResult(ok=True, data=data)
+
+        # Ingestion runs as its own job (--run-type ingest-sec). Until it has covered a
+        # ticker (fresh install, newly added name), read that ticker from the filings.
+        fallback = self._fetch_sec_features_from_filings(missing)
+        data.update((ticker, fallback.data[ticker]) for ticker in missing if ticker in fallback.data)
+        still_missing = [ticker for ticker in tickers if ticker not in data]
+        if still_missing:
+            error = f"sec_features_missing: {', '.join(still_missing)}"
+            if fallback.error:
+                error = f"{error} ({fallback.error})"
+            return FeedResult(ok=False, data=data, error=error)
+        return FeedResult(ok=True, data=data)
+
+    def run_sec_ingest(self, universe: Optional[List[str]] = None) -> Dict[str, Any]:
+        tickers = list(universe or DEFAULT_UNIVERSE)
+        if not self.seren:
+            return {"status": "error", "run_type": "ingest-sec", "error": "SEREN_API_KEY missing"}
+        ingested = self.ingest_sec_filings(tickers)
+        return {"status": "ok", "run_type": "ingest-sec", "tickers": len(tickers), "ingested_filings": ingested}
+
+    def ingest_sec_filings(self, tickers: List[str]) -> int:
+        """Pull filings newer than each ticker's watermark into the SEC feature table."""
+        watermarks = self.storage.get_sec_filing_watermarks(tickers)
+        values_parts: List[str] = []
+        for ticker in tickers:
+            company = TICKER_COMPANY_MAP.get(ticker, ticker).replace("'", "''")
+            since = watermarks.get(ticker)
+            since_sql = f"DATE '{since.isoformat()}'" if since else "CAST(NULL AS DATE)"
+            values_parts.append(f"('{ticker}', '{company}', {since_sql})")
+        values = ", ".join(values_parts)
+        lowered = "LOWER(COALESCE(f.content, ''))"
+        count_columns = ",\n          ".join(
+            " + ".join(
+                f"(LENGTH({lowered}) - LENGTH(REPLACE({lowered}, '{term}', ''))) / {len(term)}"
+                for term in terms
+            )
+            + f" AS {column}"
+            for column, terms in SEC_FEATURE_TERMS.items()
+        )
+        query = f"""
+        WITH input(ticker, company_pattern, since) AS (
+          VALUES {values}
+        )
+        SELECT
+          i.ticker,
+          md5(CONCAT_WS('|', f.company_name, f.filing_type, f.filing_date::text, md5(COALESCE(f.content, '')))) AS filing_key,
+          f.company_name,
+          f.filing_date::date AS filing_date,
+          f.filing_type,
+          {count_columns},
+          LEFT(COALESCE(f.content, ''), {SEC_SEARCH_EXCERPT_CHARS}) AS search_text
+        FROM input i
+        JOIN public.filing f
+          ON LOWER(f.company_name) LIKE '%' || LOWER(i.company_pattern) || '%'
+        WHERE i.since IS NULL OR f.filing_date::date >= i.since
+        ORDER BY i.ticker, f.filing_date;
+        """
+        resp = self.seren.call_publisher("sec-filings-intelligence", method="POST", path="/", query=query, timeout=90)
+        rows = self.seren.extract_rows(resp)
+        return self.storage.upsert_sec_filing_features(rows)
+
+    def _fetch_sec_features_from_filings(self, tickers: List[str]) -> FeedResult:
         values_parts: List[str] = []
         for ticker in tickers:
             company = TICKER_COMPANY_MAP.get(ticker, ticker).replace("'", "''")
@@ -1303,6 +1592,50 @@ class StrategyEngine:
             }
         return out
 
+    def extract_scan_features(self, mode: str, universe: List[str], hedge_ticker: str = "QQQ") -> Dict[str, Any]:
+        """Fetch feeds once and cache threshold-independent factor rows for ``universe``."""
+        feeds = self._fetch_scan_feeds(mode, universe)
+        market_data = dict(feeds["alpaca"].data)
+        hedge_ticker = str(hedge_ticker or "").upper().strip()
+        if hedge_ticker and hedge_ticker not in market_data:
+            market_data.update(self.fetch_market_features([hedge_ticker]).data)
+        feature_rows = self.score_features(
+            universe=universe,
+            sec_data=feeds["sec-filings-intelligence"].data,
+            trends_data=feeds["google-trends"].data,
+            news_data=feeds["news-search"].data,
+            market_data=market_data,
+        )
+        return {
+            "universe": list(universe),
+            "rows": {row["ticker"]: row for row in feature_rows},
+            "market_data": market_data,
+        }
+
+    def evaluate_scan_candidate(self, features: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """Score one optimizer candidate against cached features without any I/O."""
+        universe = features["universe"][: int(candidate.get("max_names_scored", 30))]
+        feature_rows = [features["rows"][ticker] for ticker in universe if ticker in features["rows"]]
+        scored_rows = self.select_candidates(
+            feature_rows,
+            min_conviction=float(candidate.get("min_conviction", 65.0)),
+            max_names_orders=int(candidate.get("max_names_orders", 8)),
+        )
+        selected = [r for r in scored_rows if r["selected"]]
+        orders = self.build_orders(
+            selected_rows=selected,
+            market_data=features["market_data"],
+            portfolio_notional_usd=float(candidate.get("portfolio_notional_usd", 100000.0)),
+            hedge_ticker=str(candidate.get("hedge_ticker", "QQQ")),
+            hedge_ratio=float(candidate.get("hedge_ratio", 1.0)),
+            is_simulated=True,
+        )
+        return {
+            "status": "evaluated",
+            "selected": [r["ticker"] for r in selected],
+            "sim": self.simulate(selected, orders),
+        }
+
     def score_universe(
         self,
         universe: List[str],
@@ -1313,6 +1646,24 @@ class StrategyEngine:
         min_conviction: float,
         max_names_orders: int,
     ) -> List[Dict[str, Any]]:
+        feature_rows = self.score_features(
+            universe=universe,
+            sec_data=sec_data,
+            trends_data=trends_data,
+            news_data=news_data,
+            market_data=market_data,
+        )
+        return self.select_candidates(feature_rows, min_conviction=min_conviction, max_names_orders=max_names_orders)
+
+    def score_features(
+        self,
+        universe: List[str],
+        sec_data: Dict[str, Dict[str, Any]],
+        trends_data: Dict[str, Dict[str, Any]],
+        news_data: Dict[str, Dict[str, Any]],
+        market_data: Dict[str, Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Build per-ticker factor rows; nothing here depends on selection thresholds."""
         rows: List[Dict[str, Any]] = []
         for t in universe:
             sec = sec_data.get(t, {})
@@ -1389,6 +1740,15 @@ class StrategyEngine:
                 }
             )
 
+        return rows
+
+    @staticmethod
+    def select_candidates(
+        feature_rows: List[Dict[str, Any]],
+        min_conviction: float,
+        max_names_orders: int,
+    ) -> List[Dict[str, Any]]:
+        rows = [dict(row, selected=False, rank_no=None) for row in feature_rows]
         rows.sort(key=lambda x: x["conviction_0_100"], reverse=True)
         selected_count = 0
         for idx, r in enumerate(rows, start=1):
@@ -1610,7 +1970,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--api-key", default=os.getenv("SEREN_API_KEY", ""), help="Seren API key (required if --dsn not provided)")
     parser.add_argument("--project-name", default=os.getenv("SEREN_PROJECT_NAME", "alpaca-sass-short-trader-delta-neutral"))
     parser.add_argument("--database-name", default=os.getenv("SEREN_DATABASE_NAME", "alpaca_sass_short_bot_dn"))
-    parser.add_argument("--run-type", choices=["scan", "monitor", "post-close"], help="Execution run type")
+    parser.add_argument("--run-type", choices=["scan", "monitor", "post-close", "ingest-sec"], help="Execution run type")
     parser.add_argument("--mode", default="paper-sim", choices=["paper", "paper-sim", "live"])
     parser.add_argument("--strict-required-feeds", action="store_true", help="Block scan if required data feeds fail")
     parser.add_argument("--config", default="", help="Optional config JSON path")
@@ -1657,6 +2017,7 @@ def main() -> None:
         api_key=args.api_key or os.getenv("SEREN_API_KEY"),
         strict_required_feeds=bool(args.strict_required_feeds or config.get("strict_required_feeds", False)),
         live_controls=config.get("live_controls"),
+        feed_cache=config.get("feed_cache"),
     )
     engine.ensure_schema()
 
@@ -1684,8 +2045,25 @@ def main() -> None:
                 hedge_ratio=float(candidate.get("hedge_ratio", 1.0)),
             )
 
+        scan_features: Dict[str, Any] = {}
+
+        def _evaluate_candidate(candidate: Dict[str, Any]) -> Dict[str, Any]:
+            if not scan_features:
+                scan_features.update(
+                    engine.extract_scan_features(
+                        mode,
+                        candidate.get("universe", DEFAULT_UNIVERSE),
+                        hedge_ticker=str(candidate.get("hedge_ticker", "QQQ")),
+                    )
+                )
+            return engine.evaluate_scan_candidate(scan_features, candidate)
+
         if mode != "live":
-            optimized = optimize_scan_config(base_config=config, run_scan=_run_scan)
+            optimized = optimize_scan_config(
+                base_config=config,
+                run_scan=_run_scan,
+                evaluate_candidate=_evaluate_candidate,
+            )
             config = optimized["config"]
             optimization = optimized["summary"]
             if args.config:
@@ -1696,6 +2074,8 @@ def main() -> None:
             result = optimized["result"] or _run_scan(config)
         else:
             result = _run_scan(config)
+    elif args.run_type == "ingest-sec":
+        result = engine.run_sec_ingest(config.get("universe", DEFAULT_UNIVERSE))
     elif args.run_type == "monitor":
         result = engine.run_monitor(mode=mode, run_profile=config.get("run_profile", "single"), run_type="monitor")
     else:
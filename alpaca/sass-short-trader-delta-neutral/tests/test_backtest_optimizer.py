@@ -56,3 +56,31 @@ def test_optimize_scan_config_targets_100_bankroll() -> None:
     assert optimized["summary"]["target_met"] is True
     assert optimized["config"]["portfolio_notional_usd"] == 100.0
     assert optimized["summary"]["modeled_pnl_pct"] >= 25.0
+
+
+def test_optimize_scan_config_sweeps_feature_matrix_then_runs_one_scan() -> None:
+    base_config = {"hedge_ticker": "QQQ", "universe": ["ADBE", "CRM", "NOW"]}
+    scanned = []
+
+    def _evaluate(candidate: dict) -> dict:
+        pnl_pct = candidate["max_names_orders"] * 4.0 - abs(candidate["hedge_ratio"] - 0.5) * 10.0
+        return {
+            "selected": candidate["universe"][: candidate["max_names_orders"]],
+            "sim": {"net_pnl_20d": pnl_pct, "gross_exposure": 100.0},
+        }
+
+    def _run_scan(candidate: dict) -> dict:
+        scanned.append(candidate)
+        return {"status": "completed", **_evaluate(candidate)}
+
+    optimized = optimizer.optimize_scan_config(
+        base_config=base_config,
+        run_scan=_run_scan,
+        evaluate_candidate=_evaluate,
+    )
+
+    assert optimized["summary"]["attempt_count"] == 128
+    assert optimized["summary"]["full_scan_count"] == 1
+    assert len(scanned) == 1
+    assert scanned[0]["hedge_ratio"] == 0.5
+    assert optimized["config"]["hedge_ratio"] == 0.5
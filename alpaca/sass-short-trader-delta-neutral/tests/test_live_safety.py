@@ -318,3 +318,117 @@ def test_live_scan_submits_short_and_hedge_orders_locally(tmp_path: Path) -> Non
     assert {row["side"] for row in inserted} == {"SELL", "BUY"}
     assert engine.storage.position_mark_calls == []
     assert engine.storage.pnl_calls == []
+
+
+def test_feed_row_cache_serves_fresh_sec_rows_across_scans(tmp_path: Path) -> None:
+    engine = _build_engine(tmp_path)
+    engine.feed_row_cache = module.FeedRowCache(tmp_path / "feed_cache.json")
+    requested = []
+
+    def _sec(universe):
+        requested.append(list(universe))
+        return module.FeedResult(ok=True, data={ticker: {"filing_count": 3} for ticker in universe})
+
+    engine.fetch_sec_features = _sec
+    engine.fetch_trends_features = lambda universe: module.FeedResult(ok=True, data={ticker: {"avg_interest": 10, "source": "google-trends"} for ticker in universe})
+    engine.fetch_news_features = lambda universe: module.FeedResult(ok=True, data={"_source": "exa", **{ticker: {"headline": "beat", "source": "exa"} for ticker in universe}})
+    engine.fetch_market_features = lambda universe: module.FeedResult(ok=True, data={ticker: {"price": 100.0} for ticker in universe})
+
+    engine._fetch_scan_feeds("live", ["CRM"])
+    feeds = engine._fetch_scan_feeds("live", ["CRM", "NOW"])
+
+    assert requested == [["CRM"], ["NOW"]]
+    assert feeds["sec-filings-intelligence"].ok is True
+    assert feeds["sec-filings-intelligence"].data == {"CRM": {"filing_count": 3}, "NOW": {"filing_count": 3}}
+    assert (tmp_path / "feed_cache.json").exists()
+
+
+class _SecFeatureStorage(_FakeStorage):
+    def __init__(self):
+        super().__init__()
+        self.features = {}
+
+    def get_sec_filing_watermarks(self, tickers):
+        return {ticker: module.date(2026, 3, 1) for ticker in tickers if ticker in self.features}
+
+    def upsert_sec_filing_features(self, rows):
+        for row in rows:
+            self.features.setdefault(row["ticker"], {})[row["filing_key"]] = row
+        return len(rows)
+
+    def get_sec_features(self, tickers):
+        return [
+            {
+                "ticker": ticker,
+                "latest_filing_date": max(row["filing_date"] for row in self.features[ticker].values()),
+                "filing_count": len(self.features[ticker]),
+                "guidance_mentions": sum(1 for row in self.features[ticker].values() if row["guidance_mentions"] > 0),
+            }
+            for ticker in tickers
+            if ticker in self.features
+        ]
+
+
+class _SecFilingSeren(_FakeSeren):
+    def __init__(self, rows, aggregates=None):
+        self.rows = rows
+        self.aggregates = aggregates or {}
+        self.queries = []
+
+    def call_publisher(self, publisher, method="GET", path="/", timeout=30, **kwargs):
+        assert publisher == "sec-filings-intelligence"
+        query = kwargs["query"]
+        self.queries.append(query)
+        if "LEFT JOIN public.filing" in query:
+            # Direct per-ticker aggregate over the filings (pre-ingest fallback).
+            return {"rows": [row for ticker, row in self.aggregates.items() if f"('{ticker}'," in query]}
+        return {"rows": list(self.rows)}
+
+    def extract_rows(self, response):
+        return response["rows"]
+
+
+def test_fetch_sec_features_reads_ingested_feature_table(tmp_path: Path) -> None:
+    engine = _build_engine(tmp_path)
+    engine.storage = _SecFeatureStorage()
+    engine.seren = _SecFilingSeren(
+        [{"ticker": "CRM", "filing_key": "k1", "filing_date": "2026-03-01", "guidance_mentions": 2}],
+        aggregates={
+            "CRM": {"ticker": "CRM", "filing_count": 1, "guidance_mentions": 1},
+            "NOW": {"ticker": "NOW", "filing_count": 0, "guidance_mentions": 0},
+        },
+    )
+
+    before = engine.fetch_sec_features(["CRM", "NOW"])
+    first = engine.run_sec_ingest(["CRM", "NOW"])
+    second = engine.run_sec_ingest(["CRM", "NOW"])
+    scanned = engine.fetch_sec_features(["CRM", "NOW"])
+
+    # Nothing ingested yet: the scan reads every ticker from the filings instead of failing.
+    assert before.ok is True
+    assert before.data["CRM"]["filing_count"] == 1
+    assert "LEFT JOIN public.filing" in engine.seren.queries[0]
+    assert first["ingested_filings"] == 1
+    assert second["status"] == "ok"
+    assert len(engine.seren.queries) == 4
+    assert "LIKE '%guidance%'" not in engine.seren.queries[1]
+    assert "('CRM', 'Salesforce', CAST(NULL AS DATE))" in engine.seren.queries[1]
+    assert "('CRM', 'Salesforce', DATE '2026-03-01')" in engine.seren.queries[2]
+    # Only the ticker the feature table does not cover falls back to the filings.
+    assert "('NOW'," in engine.seren.queries[3] and "('CRM'," not in engine.seren.queries[3]
+    assert scanned.ok is True
+    assert scanned.data["CRM"]["filing_count"] == 1
+    assert scanned.data["NOW"]["filing_count"] == 0
+
+
+def test_fetch_sec_features_fails_only_for_tickers_missing_after_fallback(tmp_path: Path) -> None:
+    engine = _build_engine(tmp_path)
+    engine.storage = _SecFeatureStorage()
+    engine.storage.features["CRM"] = {"k1": {"filing_date": "2026-03-01", "guidance_mentions": 0}}
+    engine.seren = _SecFilingSeren([], aggregates={})
+
+    result = engine.fetch_sec_features(["CRM", "NOW"])
+
+    assert result.ok is False
+    assert result.error.startswith("sec_features_missing: NOW")
+    assert list(result.data) == ["CRM"]
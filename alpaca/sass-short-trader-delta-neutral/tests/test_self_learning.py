@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import importlib.util
+from datetime import date, timedelta
+from pathlib import Path
+import random
+import sys
+
+import numpy as np
+
+
+_SCRIPT_DIR = Path(__file__).resolve().parents[1] / "scripts"
+
+
+def _load_local_module(module_name: str):
+    script_dir = str(_SCRIPT_DIR)
+    sys.path[:] = [script_dir, *[path for path in sys.path if path != script_dir]]
+    spec = importlib.util.spec_from_file_location(
+        f"{Path(__file__).stem}_{module_name}",
+        _SCRIPT_DIR / f"{module_name}.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    assert spec is not None and spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+learning = _load_local_module("self_learning")
+
+
+def _rows(n: int, seed: int = 3, start: date = date(2026, 1, 5)) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        pnl = rng.uniform(-50.0, 60.0)
+        rows.append(
+            {
+                "run_id": f"run-{i // 6}",
+                "ticker": f"T{i % 6}",
+                "horizon": learning.HORIZONS[i % 3],
+                "label_date": start + timedelta(days=rng.randrange(40)),
+                "realized_pnl": pnl,
+                "beat_hurdle": pnl > 0,
+                "feature_vector": {k: rng.uniform(0.0, 5.0) for k in ("f", "a", "s", "t")} | {"p": rng.uniform(-1, 1)},
+            }
+        )
+    return rows
+
+
+def test_evaluate_policies_matches_scalar_compute_metrics() -> None:
+    rows = _rows(240)
+    training = learning.TrainingSet.from_rows(rows)
+    candidates = [
+        (learning.normalize_weights(learning.DEFAULT_WEIGHTS), 55.0),
+        ({"f": 0.1, "a": 0.2, "s": 0.3, "t": 0.4, "p": 1.0}, 50.0),
+        ({"f": 0.7, "a": 0.1, "s": 0.1, "t": 0.1, "p": 1.0}, 65.0),
+        ({"f": 0.25, "a": 0.25, "s": 0.25, "t": 0.25, "p": 1.0}, 101.0),
+    ]
+    weights = np.array([[w[k] for k in learning.FEATURE_KEYS] for w, _ in candidates])
+    thresholds = np.array([t for _, t in candidates])
+
+    evaluation = learning.evaluate_policies(training, weights, thresholds, chunk_cells=300)
+
+    for index, (w, threshold) in enumerate(candidates):
+        expected = learning.compute_metrics(rows, weights=w, threshold=threshold)
+        got = learning.policy_metrics_at(evaluation, index)
+        assert got.n_trades == expected.n_trades
+        assert got.n_days == expected.n_days
+        assert abs(got.net_pnl - expected.net_pnl) < 1e-6
+        assert abs(got.hit_rate - expected.hit_rate) < 1e-9
+        assert abs(got.max_drawdown - expected.max_drawdown) < 1e-6
+        for horizon in learning.HORIZONS:
+            assert abs(got.by_horizon[horizon]["net_pnl"] - expected.by_horizon[horizon]["net_pnl"]) < 1e-5
+            assert abs(got.by_horizon[horizon]["hit_rate"] - expected.by_horizon[horizon]["hit_rate"]) < 1e-5
+
+
+def test_search_policy_scores_thousands_of_candidates_and_beats_default() -> None:
+    training = learning.TrainingSet.from_rows(_rows(600, seed=11))
+
+    weights, threshold, metrics, summary = learning.search_policy(training, n_candidates=2000)
+
+    assert summary["candidates_evaluated"] == (2000 + 2) * len(learning.WEIGHT_SEARCH["thresholds"])
+    assert threshold in learning.WEIGHT_SEARCH["thresholds"]
+    assert abs(sum(weights[k] for k in ("f", "a", "s", "t")) - 1.0) < 1e-3
+    default_eval = learning.evaluate_policies(
+        training,
+        np.array([[learning.normalize_weights(learning.DEFAULT_WEIGHTS)[k] for k in learning.FEATURE_KEYS]]),
+        np.array([learning.DEFAULT_THRESHOLDS["min_conviction"]]),
+    )
+    default_objective = default_eval["net_pnl"][0] - default_eval["max_drawdown"][0]
+    # The default policy is always a candidate, so search can only match or beat it.
+    if default_eval["n_trades"][0] >= learning.PROMOTION_GATES["min_trades"] or summary["eligible_candidates"] == 0:
+        assert summary["best_objective"] >= float(default_objective) - 1e-6
+    assert metrics.n_trades >= learning.PROMOTION_GATES["min_trades"] or summary["eligible_candidates"] == 0
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=()):
+        since = params[0] if params else None
+        self.conn.calls.append(since)
+        self._rows = [r for r in self.conn.rows if since is None or r["label_date"] >= since]
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _Conn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def cursor(self, row_factory=None):
+        return _Cursor(self)
+
+
+def test_load_training_set_reads_only_labels_since_cached_watermark(tmp_path) -> None:
+    rows = _rows(60)
+    conn = _Conn(rows)
+    cache = tmp_path / "training.npz"
+
+    first = learning.load_training_set(conn, cache_path=cache)
+    assert len(first) == 60
+    assert conn.calls == [None]
+
+    watermark = max(r["label_date"] for r in rows)
+    updated = dict(rows[0], label_date=watermark + timedelta(days=1), realized_pnl=999.0)
+    conn.rows = [updated] + rows[1:]
+
+    second = learning.load_training_set(conn, cache_path=cache)
+
+    assert conn.calls[-1] == watermark
+    assert len(second) == 60  # the relabeled row replaced its older copy
+    assert 999.0 in second.pnl.tolist()
+    assert second.window()[1] == watermark + timedelta(days=1)
+
+
+class _LabelCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+        self._row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=()):
+        self.conn.statements.append((" ".join(query.split()), params))
+        if "FROM trading.learning_events" in query:
+            self._row = (self.conn.previous_watermark,)
+        elif "MAX(cs.created_at)" in query:
+            self._row = self.conn.sources
+        elif "INSERT INTO trading.learning_outcome_labels" in query:
+            self.rowcount = 3 * self.conn.labeled_snapshots
+        elif "INSERT INTO trading.learning_feature_snapshots" in query:
+            self.rowcount = self.conn.labeled_snapshots
+
+    def fetchone(self):
+        return self._row
+
+
+class _LabelConn:
+    def __init__(self, previous_watermark, sources, labeled_snapshots):
+        self.previous_watermark = previous_watermark
+        self.sources = sources
+        self.labeled_snapshots = labeled_snapshots
+        self.statements = []
+
+    def cursor(self, row_factory=None):
+        return _LabelCursor(self)
+
+    def commit(self):
+        pass
+
+
+def test_label_update_is_set_based_and_starts_from_previous_watermark(monkeypatch) -> None:
+    from datetime import datetime, timezone
+
+    monkeypatch.setattr(learning, "get_policy", lambda conn, status: ("v1.0.0", {}, {}))
+    monkeypatch.setattr(learning, "upsert_policy_assignments", lambda **kwargs: 0)
+    conn = _LabelConn(
+        previous_watermark={"snapshot_ts": "2026-02-01T00:00:00+00:00", "mark_date": "2026-02-01"},
+        sources=(datetime(2026, 2, 3, 15, 0, tzinfo=timezone.utc), date(2026, 2, 3)),
+        labeled_snapshots=500,
+    )
+
+    details = learning.run_label_update(conn, mode="paper-sim")
+
+    label_writes = [(q, p) for q, p in conn.statements if "INSERT INTO trading.learning_outcome_labels" in q]
+    assert len(label_writes) == 1  # one statement regardless of row count
+    query, params = label_writes[0]
+    assert "CROSS JOIN (VALUES ('5D'), ('10D'), ('20D'))" in query
+    assert "ON CONFLICT (run_id, ticker, horizon) DO UPDATE" in query
+    assert params == {"mode": "paper-sim", "since_ts": "2026-02-01T00:00:00+00:00", "since_date": "2026-02-01"}
+
+    snapshot_params = next(p for q, p in conn.statements if "INSERT INTO trading.learning_feature_snapshots" in q)
+    assert snapshot_params == ("paper-sim", "2026-02-01T00:00:00+00:00", "2026-02-01T00:00:00+00:00")
+
+    assert details["label_rows_upserted"] == 1500
+    assert details["watermark"] == {"snapshot_ts": "2026-02-03T15:00:00+00:00", "mark_date": "2026-02-03"}
+
+
+def test_label_update_without_history_relabels_everything() -> None:
+    conn = _LabelConn(previous_watermark=None, sources=(None, None), labeled_snapshots=0)
+
+    assert learning.read_label_watermark(conn, "paper-sim") == {"snapshot_ts": None, "mark_date": None}
+    learning.upsert_outcome_labels(conn, mode="paper-sim")
+
+    assert conn.statements[-1][1] == {"mode": "paper-sim", "since_ts": None, "since_date": None}
+
+
+def test_retrain_scores_challenger_and_champion_on_holdout_window(monkeypatch) -> None:
+    training = learning.TrainingSet.from_rows(_rows(600, seed=5))
+    captured = {}
+    monkeypatch.setattr(learning, "log_learning_event", lambda *args, **kwargs: None)
+    monkeypatch.setattr(learning, "load_training_set", lambda conn, cache_path=None, reload=False: training)
+    monkeypatch.setattr(learning, "upsert_policy_assignments", lambda **kwargs: 0)
+    monkeypatch.setattr(learning, "get_policy_thresholds", lambda conn, version: dict(learning.DEFAULT_THRESHOLDS))
+    monkeypatch.setattr(
+        learning,
+        "get_policy",
+        lambda conn, status: ("v1.0.0", dict(learning.DEFAULT_WEIGHTS), {"net_pnl": 1e9}) if status == "champion" else None,
+    )
+
+    def _insert(conn, weights, metrics, window, thresholds=None):
+        captured.update(weights=weights, metrics=metrics, thresholds=thresholds)
+        return "v-test"
+
+    monkeypatch.setattr(learning, "insert_challenger", _insert)
+
+    details = learning.run_retrain(conn=None)
+
+    fit, holdout = training.split_holdout(learning.WEIGHT_SEARCH["holdout_fraction"])
+    assert details["fit_rows"] + details["holdout_rows"] == len(training)
+    assert holdout.label_day.min() > fit.label_day.max()
+    metrics = captured["metrics"]
+    assert metrics["sample"] == "holdout"
+    threshold = captured["thresholds"]["min_conviction"]
+    expected = learning.score_policy(holdout, captured["weights"], threshold).as_json()
+    assert {k: metrics[k] for k in expected} == expected
+    assert metrics["in_sample"] == learning.search_policy(fit)[2].as_json()
+    champion_holdout = learning.score_policy(holdout, learning.DEFAULT_WEIGHTS, 65.0).as_json()
+    assert metrics["champion_holdout"] == champion_holdout
+
+    # Promotion compares against the champion's holdout score, not its stored metrics.
+    monkeypatch.setattr(
+        learning,
+        "get_policy",
+        lambda conn, status: ("v1.0.0", {}, {"net_pnl": 1e9}) if status == "champion" else ("v-test", {}, metrics),
+    )
+    result = learning.run_promotion_check(conn=None)
+    assert result["net_pnl_improvement_pct"] == round(
+        learning.pct_improvement(metrics["net_pnl"], champion_holdout["net_pnl"]), 6
+    )
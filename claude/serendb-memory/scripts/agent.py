@@ -13,6 +13,7 @@ from typing import Any
 from memory_service import (
     MemorySyncError,
     MemorySyncService,
+    MemoryWatcher,
     LocalState,
     build_service_config,
     desktop_block_reason,
@@ -71,22 +72,54 @@ def _load_or_bootstrap_config(config_path: Path, *, command: str) -> tuple[Path,
 
 
 def run_foreground_loop(service: MemorySyncService) -> dict[str, Any]:
+    watcher = None
+    if service.config.watch_mode != "poll":
+        watcher = MemoryWatcher(
+            service.config.memory_root,
+            debounce_seconds=service.config.debounce_seconds,
+        )
+        if not watcher.start():
+            watcher = None
+
     cycles = 0
     last_report: dict[str, Any] | None = None
     try:
+        if watcher is None:
+            while True:
+                cycles += 1
+                last_report = service.sync_once()
+                time.sleep(service.config.poll_interval_seconds)
+
+        # Event mode: a full rescan on start and every full_rescan_interval_seconds,
+        # changed files in between. Idle wakeups only re-check the offline queue.
+        next_rescan = 0.0
         while True:
-            cycles += 1
-            last_report = service.sync_once()
-            time.sleep(service.config.poll_interval_seconds)
+            now = time.monotonic()
+            if now >= next_rescan:
+                cycles += 1
+                last_report = service.sync_once()
+                next_rescan = now + service.config.full_rescan_interval_seconds
+                continue
+            timeout = min(next_rescan - now, service.config.poll_interval_seconds)
+            changed = watcher.wait_for_changes(timeout)
+            if changed:
+                cycles += 1
+                last_report = service.sync_paths(changed)
+            elif service.state.queue_count():
+                service.flush_queue()
     except KeyboardInterrupt:
         return {
             "status": "ok",
             "command": "start",
             "mode": "foreground",
+            "watch_mode": "poll" if watcher is None else "events",
             "cycles": cycles,
             "last_report": last_report or {},
             "stopped": "keyboard_interrupt",
         }
+    finally:
+        if watcher is not None:
+            watcher.stop()
 
 
 def run_once(
@@ -8,16 +8,19 @@ import os
 import platform
 import sqlite3
 import subprocess
+import threading
 import time
 import uuid
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from hashlib import sha256
 from pathlib import Path
-from typing import Any, Protocol
+from typing import Any, Callable, Iterable, Protocol
 
 import requests
 from cryptography.fernet import Fernet
+from requests.adapters import HTTPAdapter
 
 try:  # pragma: no cover - exercised through fallback behavior
     import keyring
@@ -31,18 +34,35 @@ except Exception:  # pragma: no cover - import failure fallback
     class NoKeyringError(KeyringError):
         pass
 
+try:  # pragma: no cover - optional dependency, polling is the fallback
+    from watchdog.observers import Observer
+except Exception:  # pragma: no cover - import failure fallback
+    Observer = None
+
 
 SERVICE_NAME = "claude-serendb-memory"
 MEMORY_INDEX_FILENAME = "MEMORY.md"
 DEFAULT_MEMORY_TYPE = "claude_preference"
 AUDIT_MEMORY_TYPE = "claude_memory_audit"
 PROJECT_NAMESPACE = uuid.UUID("0ad9da16-8123-4d8c-aa39-b09b6f29bda1")
+DEFAULT_REMEMBER_CONCURRENCY = 8
+DEFAULT_SYNC_BATCH_SIZE = 200
+MEMORY_PULL_LIMIT = 200
+DEFAULT_FULL_REFRESH_SECONDS = 3600
 
 
 class MemorySyncError(RuntimeError):
     """Raised when the memory skill cannot complete a requested action."""
 
 
+class RateLimitedError(MemorySyncError):
+    """Raised when SerenDB answers 429; ``retry_after`` echoes the Retry-After header."""
+
+    def __init__(self, message: str, *, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 @dataclass
 class MemoryFrontmatter:
     name: str | None = None
@@ -68,6 +88,30 @@ class QueuePayload:
     reason: str
 
 
+@dataclass
+class MemoryPage:
+    """One ``/api/memories`` response.
+
+    ``incremental`` pages hold only memories changed since the cursor that was
+    sent, plus ``deleted_ids`` for memories removed since then when the server
+    reports them; ``not_modified`` means the stored ETag still matches.
+    """
+
+    memories: list[dict[str, Any]]
+    etag: str | None = None
+    not_modified: bool = False
+    incremental: bool = False
+    deleted_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ProjectCursor:
+    since: str | None
+    etag: str | None
+    memories: list[dict[str, Any]]
+    refreshed_at: str | None = None
+
+
 @dataclass
 class ServiceConfig:
     memory_root: Path
@@ -75,11 +119,17 @@ class ServiceConfig:
     api_base_url: str = "https://api.serendb.com"
     memory_base_url: str = "https://memory.serendb.com"
     poll_interval_seconds: int = 3
+    watch_mode: str = "auto"
+    debounce_seconds: float = 0.25
+    full_rescan_interval_seconds: int = 300
     dry_run: bool = False
     install_service_on_install: bool = True
     start_after_install: bool = True
     auto_register_key: bool = True
     timeout_seconds: int = 5
+    remember_concurrency: int = DEFAULT_REMEMBER_CONCURRENCY
+    sync_batch_size: int = DEFAULT_SYNC_BATCH_SIZE
+    full_refresh_interval_seconds: int = DEFAULT_FULL_REFRESH_SECONDS
     service_name: str = SERVICE_NAME
 
 
@@ -158,6 +208,49 @@ def project_uuid(encoded_project: str) -> uuid.UUID:
     return uuid.uuid5(PROJECT_NAMESPACE, encoded_project)
 
 
+def memory_timestamp(memory: dict[str, Any]) -> str:
+    return str(memory.get("updated_at") or memory.get("created_at") or "")
+
+
+def merge_memories(
+    current: list[dict[str, Any]],
+    changes: list[dict[str, Any]],
+    *,
+    deleted_ids: Iterable[str] = (),
+    limit: int = MEMORY_PULL_LIMIT,
+) -> list[dict[str, Any]]:
+    """Overlay changed memories on a cached list, newest first, keyed by id (or content).
+
+    Ids in ``deleted_ids`` and changed memories carrying ``deleted_at`` are tombstones
+    and drop the cached entry.
+    """
+
+    def _key(memory: dict[str, Any]) -> str:
+        return str(memory.get("id") or content_hash(f"{memory.get('memory_type')}\n{memory.get('content')}"))
+
+    merged = {_key(memory): memory for memory in current}
+    for memory in changes:
+        if memory.get("deleted_at"):
+            merged.pop(_key(memory), None)
+        else:
+            merged[_key(memory)] = memory
+    for memory_id in deleted_ids:
+        merged.pop(str(memory_id), None)
+    return sorted(merged.values(), key=memory_timestamp, reverse=True)[:limit]
+
+
+def refresh_due(refreshed_at: str | None, interval_seconds: float, *, now: datetime | None = None) -> bool:
+    """True when a cursor's last full pull is missing or older than ``interval_seconds``."""
+    if not refreshed_at:
+        return True
+    try:
+        last = datetime.fromisoformat(refreshed_at)
+    except ValueError:
+        return True
+    current = now or datetime.now(tz=timezone.utc)
+    return current - last >= timedelta(seconds=interval_seconds)
+
+
 def content_hash(raw_content: str) -> str:
     return sha256(raw_content.encode("utf-8")).hexdigest()
 
@@ -235,6 +328,51 @@ class CredentialStore:
         return Fernet(secret.encode("ascii"))
 
 
+class AdaptiveBackoff:
+    """Pause shared by concurrent uploads: doubles on each 429 and halves on success."""
+
+    def __init__(
+        self,
+        *,
+        base_seconds: float = 0.5,
+        max_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.delay = 0.0
+        self._resume_at = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        while True:
+            with self._lock:
+                remaining = self._resume_at - self._clock()
+            if remaining <= 0:
+                return
+            self._sleep(remaining)
+
+    def throttled(self, retry_after: float | None = None) -> None:
+        with self._lock:
+            self.delay = min(max(self.delay * 2, self.base_seconds), self.max_seconds)
+            pause = max(self.delay, retry_after or 0.0)
+            self._resume_at = max(self._resume_at, self._clock() + pause)
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay > self.base_seconds else 0.0
+
+
+def _retry_after_seconds(value: str | None) -> float | None:
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
 class SerenCloudClient:
     def __init__(
         self,
@@ -244,12 +382,19 @@ class SerenCloudClient:
         memory_base_url: str,
         timeout_seconds: int = 5,
         session: requests.Session | None = None,
+        pool_size: int = DEFAULT_REMEMBER_CONCURRENCY,
     ) -> None:
         self.api_key = api_key
         self.api_base_url = api_base_url.rstrip("/")
         self.memory_base_url = memory_base_url.rstrip("/")
         self.timeout_seconds = timeout_seconds
-        self.session = session or requests.Session()
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self.backoff = AdaptiveBackoff()
 
     def validate_api_key(self) -> bool:
         try:
@@ -320,6 +465,11 @@ class SerenCloudClient:
             },
             timeout=self.timeout_seconds,
         )
+        if response.status_code == 429:
+            raise RateLimitedError(
+                f"MCP tool {tool_name} rate limited",
+                retry_after=_retry_after_seconds(response.headers.get("retry-after")),
+            )
         if response.status_code >= 400:
             raise MemorySyncError(
                 f"MCP tool {tool_name} failed: status={response.status_code} "
@@ -365,18 +515,65 @@ class SerenCloudClient:
             },
         )
 
-    def pull_memories(
+    def remember_many(
+        self,
+        items: list[tuple[str, str, uuid.UUID]],
+        *,
+        max_workers: int = DEFAULT_REMEMBER_CONCURRENCY,
+        max_attempts: int = 5,
+    ) -> list[Exception | None]:
+        """Remember ``(content, memory_type, project_id)`` items over the shared session.
+
+        The memory MCP endpoint takes one memory per ``remember`` call, so items
+        are sent as at most ``max_workers`` concurrent requests. A 429 pauses
+        every worker through ``self.backoff`` and the item is retried. Returns
+        one entry per item, in order: None on success, else the final error.
+        """
+
+        def _remember(item: tuple[str, str, uuid.UUID]) -> Exception | None:
+            for attempt in range(1, max_attempts + 1):
+                self.backoff.wait()
+                try:
+                    self.remember(*item)
+                except RateLimitedError as exc:
+                    self.backoff.throttled(exc.retry_after)
+                    if attempt == max_attempts:
+                        return exc
+                    continue
+                except Exception as exc:
+                    return exc
+                self.backoff.succeeded()
+                return None
+            return None
+
+        if max_workers <= 1 or len(items) <= 1:
+            return [_remember(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+            return list(pool.map(_remember, items))
+
+    def pull_memory_changes(
         self,
         project_id: uuid.UUID,
         *,
-        limit: int = 200,
-    ) -> list[dict[str, Any]]:
+        since: str | None = None,
+        etag: str | None = None,
+        limit: int = MEMORY_PULL_LIMIT,
+    ) -> MemoryPage:
+        """Conditional pull: ``If-None-Match`` when an ETag is known, else ``updated_since``."""
+        params: dict[str, Any] = {"project_id": str(project_id), "limit": limit}
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if etag:
+            headers["If-None-Match"] = etag
+        elif since:
+            params["updated_since"] = since
         response = self.session.get(
             f"{self.memory_base_url}/api/memories",
-            params={"project_id": str(project_id), "limit": limit},
-            headers={"Authorization": f"Bearer {self.api_key}"},
+            params=params,
+            headers=headers,
             timeout=self.timeout_seconds,
         )
+        if response.status_code == 304:
+            return MemoryPage(memories=[], etag=etag, not_modified=True)
         if response.status_code >= 400:
             raise MemorySyncError(
                 f"Failed to pull memories: status={response.status_code} body={response.text[:200]}"
@@ -385,7 +582,21 @@ class SerenCloudClient:
         memories = body.get("memories")
         if not isinstance(memories, list):
             raise MemorySyncError("Unexpected /api/memories response shape")
-        return memories
+        deleted_ids = body.get("deleted_ids")
+        return MemoryPage(
+            memories=memories,
+            etag=response.headers.get("etag"),
+            incremental="updated_since" in params,
+            deleted_ids=[str(item) for item in deleted_ids] if isinstance(deleted_ids, list) else [],
+        )
+
+    def pull_memories(
+        self,
+        project_id: uuid.UUID,
+        *,
+        limit: int = MEMORY_PULL_LIMIT,
+    ) -> list[dict[str, Any]]:
+        return self.pull_memory_changes(project_id, limit=limit).memories
 
 
 class LocalState:
@@ -431,8 +642,63 @@ class LocalState:
                   content_hash TEXT,
                   details_json TEXT NOT NULL
                 );
+                CREATE TABLE IF NOT EXISTS project_cursors (
+                  encoded_project TEXT PRIMARY KEY,
+                  since TEXT,
+                  etag TEXT,
+                  encrypted_memories TEXT NOT NULL,
+                  updated_at TEXT NOT NULL,
+                  refreshed_at TEXT
+                );
                 """
             )
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(project_cursors)")}
+            if "refreshed_at" not in columns:
+                connection.execute("ALTER TABLE project_cursors ADD COLUMN refreshed_at TEXT")
+
+    @staticmethod
+    def _insert_audit(
+        connection: sqlite3.Connection,
+        *,
+        event_type: str,
+        encoded_project: str,
+        source_file: str,
+        content_hash_value: str | None,
+        details: dict[str, Any],
+    ) -> None:
+        connection.execute(
+            """
+            INSERT INTO audit_events (
+              occurred_at, event_type, encoded_project, source_file, content_hash, details_json
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                now_iso(),
+                event_type,
+                encoded_project,
+                source_file,
+                content_hash_value,
+                json.dumps(details, sort_keys=True),
+            ),
+        )
+
+    @staticmethod
+    def _upsert_synced(
+        connection: sqlite3.Connection,
+        *,
+        encoded_project: str,
+        source_file: str,
+        content_hash_value: str,
+    ) -> None:
+        connection.execute(
+            """
+            INSERT INTO synced_files (encoded_project, source_file, content_hash, synced_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(encoded_project, source_file)
+            DO UPDATE SET content_hash = excluded.content_hash, synced_at = excluded.synced_at
+            """,
+            (encoded_project, source_file, content_hash_value, now_iso()),
+        )
 
     def record_audit(
         self,
@@ -444,20 +710,13 @@ class LocalState:
         details: dict[str, Any],
     ) -> None:
         with self._connect() as connection:
-            connection.execute(
-                """
-                INSERT INTO audit_events (
-                  occurred_at, event_type, encoded_project, source_file, content_hash, details_json
-                ) VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    now_iso(),
-                    event_type,
-                    encoded_project,
-                    source_file,
-                    content_hash_value,
-                    json.dumps(details, sort_keys=True),
-                ),
+            self._insert_audit(
+                connection,
+                event_type=event_type,
+                encoded_project=encoded_project,
+                source_file=source_file,
+                content_hash_value=content_hash_value,
+                details=details,
             )
 
     def last_synced_hash(self, encoded_project: str, source_file: str) -> str | None:
@@ -474,16 +733,43 @@ class LocalState:
 
     def upsert_synced(self, *, encoded_project: str, source_file: str, content_hash_value: str) -> None:
         with self._connect() as connection:
-            connection.execute(
-                """
-                INSERT INTO synced_files (encoded_project, source_file, content_hash, synced_at)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(encoded_project, source_file)
-                DO UPDATE SET content_hash = excluded.content_hash, synced_at = excluded.synced_at
-                """,
-                (encoded_project, source_file, content_hash_value, now_iso()),
+            self._upsert_synced(
+                connection,
+                encoded_project=encoded_project,
+                source_file=source_file,
+                content_hash_value=content_hash_value,
             )
 
+    def record_flush_results(self, outcomes: list[tuple[int, QueuePayload, Exception | None]]) -> None:
+        """Apply a batch of queue flush outcomes in one transaction."""
+        with self._connect() as connection:
+            for row_id, payload, error in outcomes:
+                if error is not None:
+                    self._insert_audit(
+                        connection,
+                        event_type="flush_failed",
+                        encoded_project=payload.encoded_project,
+                        source_file=payload.source_file,
+                        content_hash_value=payload.content_hash,
+                        details={"error": str(error)},
+                    )
+                    continue
+                connection.execute("DELETE FROM queue WHERE id = ?", (row_id,))
+                self._upsert_synced(
+                    connection,
+                    encoded_project=payload.encoded_project,
+                    source_file=payload.source_file,
+                    content_hash_value=payload.content_hash,
+                )
+                self._insert_audit(
+                    connection,
+                    event_type="flushed",
+                    encoded_project=payload.encoded_project,
+                    source_file=payload.source_file,
+                    content_hash_value=payload.content_hash,
+                    details={"queued_at": payload.created_at, "reason": payload.reason},
+                )
+
     def enqueue(self, payload: QueuePayload) -> None:
         serialized = json.dumps(payload.__dict__, sort_keys=True)
         encrypted = self.cipher.encrypt(serialized.encode("utf-8")).decode("ascii")
@@ -525,6 +811,55 @@ class LocalState:
             row = connection.execute("SELECT COUNT(*) AS total FROM queue").fetchone()
         return int(row["total"]) if row else 0
 
+    def project_cursor(self, encoded_project: str) -> ProjectCursor | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                """
+                SELECT since, etag, encrypted_memories, refreshed_at
+                FROM project_cursors WHERE encoded_project = ?
+                """,
+                (encoded_project,),
+            ).fetchone()
+        if row is None:
+            return None
+        decrypted = self.cipher.decrypt(str(row["encrypted_memories"]).encode("ascii"))
+        return ProjectCursor(
+            since=row["since"],
+            etag=row["etag"],
+            memories=json.loads(decrypted.decode("utf-8")),
+            refreshed_at=row["refreshed_at"],
+        )
+
+    def save_project_cursor(
+        self,
+        encoded_project: str,
+        *,
+        since: str | None,
+        etag: str | None,
+        memories: list[dict[str, Any]],
+        refreshed_at: str | None = None,
+    ) -> None:
+        """Store the pull cursor and the cached memories (encrypted like the queue).
+
+        ``refreshed_at`` is when ``memories`` last came from a full pull.
+        """
+        encrypted = self.cipher.encrypt(json.dumps(memories, sort_keys=True).encode("utf-8")).decode("ascii")
+        with self._connect() as connection:
+            connection.execute(
+                """
+                INSERT INTO project_cursors
+                  (encoded_project, since, etag, encrypted_memories, updated_at, refreshed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(encoded_project) DO UPDATE SET
+                  since = excluded.since,
+                  etag = excluded.etag,
+                  encrypted_memories = excluded.encrypted_memories,
+                  updated_at = excluded.updated_at,
+                  refreshed_at = excluded.refreshed_at
+                """,
+                (encoded_project, since, etag, encrypted, now_iso(), refreshed_at),
+            )
+
     def known_projects(self) -> list[str]:
         with self._connect() as connection:
             rows = connection.execute(
@@ -561,6 +896,103 @@ class LocalState:
         ]
 
 
+class _WatchdogHandler:
+    """Minimal watchdog event handler; the observer only calls ``dispatch``."""
+
+    IGNORED_EVENTS = {"deleted", "opened", "closed_no_write"}
+
+    def __init__(self, watcher: "MemoryWatcher") -> None:
+        self.watcher = watcher
+
+    def dispatch(self, event: Any) -> None:
+        if event.is_directory or event.event_type in self.IGNORED_EVENTS:
+            return
+        for raw_path in (event.src_path, getattr(event, "dest_path", "")):
+            if raw_path:
+                self.watcher.notify(Path(os.fsdecode(raw_path)))
+
+
+class MemoryWatcher:
+    """Collect changed memory files from filesystem events and release them once writes settle.
+
+    Each path is held until no event has touched it for ``debounce_seconds``, so
+    an editor's burst of writes turns into one sync of the final content.
+    """
+
+    def __init__(
+        self,
+        memory_root: Path,
+        *,
+        debounce_seconds: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.memory_root = memory_root
+        self.debounce_seconds = debounce_seconds
+        self._clock = clock
+        self._pending: dict[Path, float] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._observer: Any = None
+
+    def start(self) -> bool:
+        """Start native filesystem notifications; False means the caller should poll."""
+        if Observer is None:
+            return False
+        observer = Observer()
+        try:
+            observer.schedule(_WatchdogHandler(self), str(self.memory_root), recursive=True)
+            observer.start()
+        except OSError:
+            return False
+        self._observer = observer
+        return True
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+    def notify(self, path: Path) -> None:
+        if not should_intercept_path(path):
+            return
+        with self._lock:
+            self._pending[path] = self._clock()
+        self._wakeup.set()
+
+    def take_ready(self) -> tuple[list[Path], float | None]:
+        """Return settled paths and the seconds until the next pending path settles."""
+        now = self._clock()
+        ready: list[Path] = []
+        next_settle: float | None = None
+        with self._lock:
+            for path, last_event in list(self._pending.items()):
+                remaining = last_event + self.debounce_seconds - now
+                if remaining <= 0:
+                    ready.append(path)
+                    del self._pending[path]
+                elif next_settle is None or remaining < next_settle:
+                    next_settle = remaining
+            if not self._pending:
+                self._wakeup.clear()
+        return sorted(ready), next_settle
+
+    def wait_for_changes(self, timeout: float) -> list[Path]:
+        """Block until settled changes are available or ``timeout`` elapses."""
+        deadline = self._clock() + timeout
+        while True:
+            ready, next_settle = self.take_ready()
+            if ready:
+                return ready
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                return []
+            if next_settle is None:
+                self._wakeup.wait(remaining)
+            else:
+                time.sleep(min(next_settle, remaining))
+
+
 class MemorySyncService:
     def __init__(
         self,
@@ -584,7 +1016,29 @@ class MemorySyncService:
         except FileNotFoundError:
             return
 
-    def process_file(self, path: Path, *, reason: str) -> str:
+    def _remember_all(self, payloads: list[QueuePayload]) -> list[Exception | None]:
+        """Upload payloads, returning None or the error for each one in order."""
+        if self.cloud is None:
+            raise MemorySyncError("Cloud client is not configured")
+        items = [
+            (payload.raw_content, payload.memory_type, uuid.UUID(payload.project_id))
+            for payload in payloads
+        ]
+        remember_many = getattr(self.cloud, "remember_many", None)
+        if remember_many is not None:
+            return remember_many(items, max_workers=self.config.remember_concurrency)
+        results: list[Exception | None] = []
+        for item in items:
+            try:
+                self.cloud.remember(*item)
+            except Exception as exc:
+                results.append(exc)
+            else:
+                results.append(None)
+        return results
+
+    def _prepare_file(self, path: Path, *, reason: str) -> str | QueuePayload:
+        """Return a terminal outcome, or the payload still to be uploaded."""
         raw_content = path.read_text(encoding="utf-8")
         if not raw_content.strip():
             return "skipped"
@@ -627,89 +1081,137 @@ class MemorySyncService:
                 details={"reason": reason},
             )
             return "dry_run"
+        return payload
 
-        if self.cloud is None:
-            raise MemorySyncError("Cloud client is not configured")
-
-        try:
-            self.cloud.remember(payload.raw_content, payload.memory_type, project_id)
-            self.state.upsert_synced(
-                encoded_project=encoded_project,
-                source_file=source_file,
-                content_hash_value=hash_value,
-            )
-            self.state.record_audit(
-                event_type="persisted",
-                encoded_project=encoded_project,
-                source_file=source_file,
-                content_hash_value=hash_value,
-                details={"reason": reason, "memory_type": payload.memory_type},
-            )
-            self._safe_unlink(path)
-            return "persisted"
-        except Exception as exc:
-            self.state.enqueue(payload)
-            self.state.record_audit(
-                event_type="queued",
-                encoded_project=encoded_project,
-                source_file=source_file,
-                content_hash_value=hash_value,
-                details={"reason": reason, "error": str(exc)},
-            )
-            self._safe_unlink(path)
-            return "queued"
-
-    def flush_queue(self) -> dict[str, int]:
-        if self.config.dry_run:
-            return {"flushed": 0, "errors": 0}
-        if self.cloud is None:
-            raise MemorySyncError("Cloud client is not configured")
-
-        report = {"flushed": 0, "errors": 0}
-        for row_id, payload in self.state.queued_payloads():
+    def _finish_file(self, path: Path, payload: QueuePayload, error: Exception | None, *, reason: str) -> str:
+        if error is None:
             try:
-                self.cloud.remember(
-                    payload.raw_content,
-                    payload.memory_type,
-                    uuid.UUID(payload.project_id),
+                self.state.upsert_synced(
+                    encoded_project=payload.encoded_project,
+                    source_file=payload.source_file,
+                    content_hash_value=payload.content_hash,
                 )
-            except Exception as exc:
-                report["errors"] += 1
                 self.state.record_audit(
-                    event_type="flush_failed",
+                    event_type="persisted",
                     encoded_project=payload.encoded_project,
                     source_file=payload.source_file,
                     content_hash_value=payload.content_hash,
-                    details={"error": str(exc)},
+                    details={"reason": reason, "memory_type": payload.memory_type},
                 )
+                self._safe_unlink(path)
+                return "persisted"
+            except Exception as exc:
+                error = exc
+        self.state.enqueue(payload)
+        self.state.record_audit(
+            event_type="queued",
+            encoded_project=payload.encoded_project,
+            source_file=payload.source_file,
+            content_hash_value=payload.content_hash,
+            details={"reason": reason, "error": str(error)},
+        )
+        self._safe_unlink(path)
+        return "queued"
+
+    def process_files(self, paths: list[Path], *, reason: str) -> list[str]:
+        """Process files in order, uploading up to ``sync_batch_size`` memories at a time."""
+        outcomes: list[str] = []
+        batch_size = max(1, self.config.sync_batch_size)
+        for offset in range(0, len(paths), batch_size):
+            pending: list[tuple[int, Path, QueuePayload]] = []
+            for path in paths[offset : offset + batch_size]:
+                prepared = self._prepare_file(path, reason=reason)
+                if isinstance(prepared, QueuePayload):
+                    pending.append((len(outcomes), path, prepared))
+                    outcomes.append("queued")
+                else:
+                    outcomes.append(prepared)
+            if not pending:
                 continue
+            errors = self._remember_all([payload for _, _, payload in pending])
+            for (slot, path, payload), error in zip(pending, errors):
+                outcomes[slot] = self._finish_file(path, payload, error, reason=reason)
+        return outcomes
 
-            self.state.delete_queue_item(row_id)
-            self.state.upsert_synced(
-                encoded_project=payload.encoded_project,
-                source_file=payload.source_file,
-                content_hash_value=payload.content_hash,
-            )
-            self.state.record_audit(
-                event_type="flushed",
-                encoded_project=payload.encoded_project,
-                source_file=payload.source_file,
-                content_hash_value=payload.content_hash,
-                details={"queued_at": payload.created_at, "reason": payload.reason},
+    def process_file(self, path: Path, *, reason: str) -> str:
+        return self.process_files([path], reason=reason)[0]
+
+    def flush_queue(self) -> dict[str, int]:
+        if self.config.dry_run:
+            return {"flushed": 0, "errors": 0}
+        if self.cloud is None:
+            raise MemorySyncError("Cloud client is not configured")
+
+        report = {"flushed": 0, "errors": 0}
+        queued = self.state.queued_payloads()
+        batch_size = max(1, self.config.sync_batch_size)
+        for offset in range(0, len(queued), batch_size):
+            batch = queued[offset : offset + batch_size]
+            errors = self._remember_all([payload for _, payload in batch])
+            self.state.record_flush_results(
+                [(row_id, payload, error) for (row_id, payload), error in zip(batch, errors)]
             )
-            report["flushed"] += 1
+            failed = sum(1 for error in errors if error is not None)
+            report["errors"] += failed
+            report["flushed"] += len(batch) - failed
         return report
 
-    def _render_project_memories(self, encoded_project: str) -> str:
-        queued = self.state.queue_count()
+    def _pull_project_memories(self, encoded_project: str) -> list[dict[str, Any]]:
+        """Return the project's memories, fetching only what changed since the stored cursor.
+
+        Deletions arrive as tombstones when the server reports them. Either way, every
+        ``full_refresh_interval_seconds`` the cursor is ignored and a full pull replaces
+        the cached set, so memories deleted server-side cannot linger. Clients without
+        ``pull_memory_changes`` fall back to a full pull.
+        """
+        if self.cloud is None:
+            raise MemorySyncError("Cloud client is not configured")
         project_id = project_uuid(encoded_project)
+        pull_changes = getattr(self.cloud, "pull_memory_changes", None)
+        if pull_changes is None:
+            return self.cloud.pull_memories(project_id)
+
+        cursor = self.state.project_cursor(encoded_project)
+        if cursor is not None and refresh_due(cursor.refreshed_at, self.config.full_refresh_interval_seconds):
+            cursor = None
+        page = pull_changes(
+            project_id,
+            since=cursor.since if cursor else None,
+            etag=cursor.etag if cursor else None,
+        )
+        if cursor is not None and (
+            page.not_modified or (page.incremental and not page.memories and not page.deleted_ids)
+        ):
+            return cursor.memories
+        if cursor is not None and page.incremental:
+            memories = merge_memories(cursor.memories, page.memories, deleted_ids=page.deleted_ids)
+            refreshed_at = cursor.refreshed_at
+        else:
+            memories = merge_memories([], page.memories)
+            refreshed_at = now_iso()
+        since = max((memory_timestamp(memory) for memory in memories), default="") or None
+        self.state.save_project_cursor(
+            encoded_project,
+            since=since,
+            etag=page.etag,
+            memories=memories,
+            refreshed_at=refreshed_at,
+        )
+        return memories
+
+    def _render_project_memories(self, encoded_project: str, *, queued: int | None = None) -> str:
+        if queued is None:
+            queued = self.state.queue_count()
         if self.cloud is None:
             return self._placeholder_memory_index(queued)
 
         try:
-            memories = self.cloud.pull_memories(project_id)
+            memories = self._pull_project_memories(encoded_project)
         except Exception:
-            return self._placeholder_memory_index(queued)
+            cursor = self.state.project_cursor(encoded_project)
+            if cursor is None:
+                return self._placeholder_memory_index(queued)
+            memories = cursor.memories
 
         visible = [
             memory
@@ -760,22 +1262,37 @@ class MemorySyncService:
             lines.append(f"{queued} encrypted queue item(s) are waiting to flush.")
         return "\n".join(lines).rstrip() + "\n"
 
-    def render_all_indexes(self) -> int:
+    def render_indexes(self, project_names: Iterable[str]) -> int:
+        """Render indexes for the given projects; returns how many files were rewritten.
+
+        An index whose rendered content hashes the same as the file on disk is
+        left untouched, so unchanged projects cost no disk writes.
+        """
         rendered = 0
+        queued = self.state.queue_count()
+        for encoded_project in sorted(set(project_names)):
+            index_path = self.config.memory_root / encoded_project / MEMORY_INDEX_FILENAME
+            rendered_md = self._render_project_memories(encoded_project, queued=queued)
+            try:
+                current_hash = content_hash(index_path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, UnicodeDecodeError):
+                current_hash = None
+            if current_hash == content_hash(rendered_md):
+                continue
+            write_atomic(index_path, rendered_md)
+            rendered += 1
+        return rendered
+
+    def render_all_indexes(self) -> int:
         project_names = set(self.state.known_projects())
         project_names.update(
             child.name
             for child in self.config.memory_root.iterdir()
             if child.is_dir() and (child / "memory").exists()
         )
-        for encoded_project in sorted(project_names):
-            project_dir = self.config.memory_root / encoded_project
-            rendered_md = self._render_project_memories(encoded_project)
-            write_atomic(project_dir / MEMORY_INDEX_FILENAME, rendered_md)
-            rendered += 1
-        return rendered
+        return self.render_indexes(project_names)
 
-    def sync_once(self) -> dict[str, int]:
+    def _sync_files(self, paths: Iterable[Path], *, reason: str) -> tuple[dict[str, int], set[str]]:
         report = {
             "processed": 0,
             "persisted": 0,
@@ -786,17 +1303,37 @@ class MemorySyncService:
             "flush_errors": 0,
             "rendered": 0,
         }
-        for path in self.discover_memory_files():
+        projects: set[str] = set()
+        paths = list(paths)
+        for path, outcome in zip(paths, self.process_files(paths, reason=reason)):
             report["processed"] += 1
-            outcome = self.process_file(path, reason="scan")
             if outcome in report:
                 report[outcome] += 1
+            projects.add(encoded_project_from_path(path))
         flushed = self.flush_queue()
         report["flushed"] = flushed["flushed"]
         report["flush_errors"] = flushed["errors"]
+        return report, projects
+
+    def sync_once(self) -> dict[str, int]:
+        report, _ = self._sync_files(self.discover_memory_files(), reason="scan")
         report["rendered"] = self.render_all_indexes()
         return report
 
+    def sync_paths(self, paths: Iterable[Path]) -> dict[str, int]:
+        """Sync only the given changed files and re-render just their projects' indexes.
+
+        Paths that vanished or are not memory files (for example the watcher
+        seeing our own deletes) are ignored; the periodic full rescan covers
+        anything an event missed.
+        """
+        changed = sorted(
+            path for path in set(paths) if should_intercept_path(path) and path.is_file()
+        )
+        report, projects = self._sync_files(changed, reason="watch")
+        report["rendered"] = self.render_indexes(projects)
+        return report
+
     def install_service(self, *, config_path: Path, python_executable: str, agent_path: Path) -> dict[str, Any]:
         service_path = service_definition_path(self.config.service_name)
         service_path.parent.mkdir(parents=True, exist_ok=True)
@@ -987,11 +1524,19 @@ def build_service_config(config_data: dict[str, Any]) -> ServiceConfig:
         api_base_url=str(memory.get("api_base_url", "https://api.serendb.com")),
         memory_base_url=str(memory.get("memory_base_url", "https://memory.serendb.com")),
         poll_interval_seconds=int(inputs.get("poll_interval_seconds", 3)),
+        watch_mode=str(inputs.get("watch_mode", "auto")),
+        debounce_seconds=float(inputs.get("debounce_seconds", 0.25)),
+        full_rescan_interval_seconds=int(inputs.get("full_rescan_interval_seconds", 300)),
         dry_run=bool(config_data.get("dry_run", False)),
         install_service_on_install=bool(service.get("install_on_install", True)),
         start_after_install=bool(service.get("start_after_install", True)),
         auto_register_key=bool(service.get("auto_register_key", True)),
         timeout_seconds=int(service.get("timeout_seconds", 5)),
+        remember_concurrency=int(memory.get("remember_concurrency", DEFAULT_REMEMBER_CONCURRENCY)),
+        sync_batch_size=int(memory.get("sync_batch_size", DEFAULT_SYNC_BATCH_SIZE)),
+        full_refresh_interval_seconds=int(
+            memory.get("full_refresh_interval_seconds", DEFAULT_FULL_REFRESH_SECONDS)
+        ),
     )
 
 
@@ -1010,10 +1555,16 @@ def write_default_config(path: Path) -> Path:
             "memory_root": "~/.claude/projects",
             "state_dir": "~/.seren/claude-serendb-memory",
             "poll_interval_seconds": 3,
+            "watch_mode": "auto",
+            "debounce_seconds": 0.25,
+            "full_rescan_interval_seconds": 300,
         },
         "memory": {
             "api_base_url": "https://api.serendb.com",
             "memory_base_url": "https://memory.serendb.com",
+            "remember_concurrency": DEFAULT_REMEMBER_CONCURRENCY,
+            "sync_batch_size": DEFAULT_SYNC_BATCH_SIZE,
+            "full_refresh_interval_seconds": DEFAULT_FULL_REFRESH_SECONDS,
         },
         "service": {
             "install_on_install": True,
@@ -1035,6 +1586,7 @@ def ensure_cloud_client(config: ServiceConfig, state: LocalState) -> tuple[Seren
             api_base_url=config.api_base_url,
             memory_base_url=config.memory_base_url,
             timeout_seconds=config.timeout_seconds,
+            pool_size=config.remember_concurrency,
         )
         if client.validate_api_key():
             return client, source or "unknown"
@@ -1046,6 +1598,7 @@ def ensure_cloud_client(config: ServiceConfig, state: LocalState) -> tuple[Seren
         api_base_url=config.api_base_url,
         memory_base_url=config.memory_base_url,
         timeout_seconds=config.timeout_seconds,
+        pool_size=config.remember_concurrency,
     )
     api_key = bootstrap_client.create_api_key(name=SERVICE_NAME)
     stored_via = state.credentials.store_api_key(api_key)
@@ -1054,6 +1607,7 @@ def ensure_cloud_client(config: ServiceConfig, state: LocalState) -> tuple[Seren
         api_base_url=config.api_base_url,
         memory_base_url=config.memory_base_url,
         timeout_seconds=config.timeout_seconds,
+        pool_size=config.remember_concurrency,
     )
     return client, f"auto-registered:{stored_via}"
 
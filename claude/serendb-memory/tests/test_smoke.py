@@ -166,3 +166,243 @@ def test_failed_persist_is_encrypted_locally_then_flushes(tmp_path: Path) -> Non
     assert flush_report == {"flushed": 1, "errors": 0}
     assert state.queue_count() == 0
     assert len(working_cloud.remember_calls) == 1
+
+
+def test_watcher_debounces_write_bursts(tmp_path: Path) -> None:
+    now = [100.0]
+    watcher = memory_service.MemoryWatcher(tmp_path, debounce_seconds=0.5, clock=lambda: now[0])
+    target = tmp_path / "proj" / "memory" / "note.md"
+
+    watcher.notify(target)
+    watcher.notify(tmp_path / "proj" / "MEMORY.md")
+    now[0] += 0.4
+    watcher.notify(target)
+
+    assert watcher.take_ready() == ([], pytest.approx(0.5))
+    now[0] += 0.5
+    assert watcher.take_ready() == ([target], None)
+
+
+def test_watch_mode_syncs_only_changed_files(tmp_path: Path) -> None:
+    if memory_service.Observer is None:
+        pytest.skip("watchdog is not installed")
+    cloud = FakeCloudClient()
+    service, _, memory_root = _build_service(tmp_path, cloud=cloud)
+    (memory_root / "other-project" / "memory").mkdir(parents=True)
+    watcher = memory_service.MemoryWatcher(memory_root, debounce_seconds=0.05)
+    assert watcher.start()
+    try:
+        source = _write_memory_file(
+            memory_root,
+            encoded_project="watched-project",
+            name="fresh.md",
+            contents="Run the linter before committing.\n",
+        )
+        changed = watcher.wait_for_changes(timeout=5)
+    finally:
+        watcher.stop()
+
+    assert changed == [source]
+    report = service.sync_paths(changed)
+
+    assert report["persisted"] == 1
+    assert report["rendered"] == 1
+    assert not source.exists()
+    assert (memory_root / "watched-project" / "MEMORY.md").exists()
+    assert not (memory_root / "other-project" / "MEMORY.md").exists()
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, *, headers: dict[str, str] | None = None) -> None:
+        self.status_code = status_code
+        self.headers = {"content-type": "application/json", **(headers or {})}
+        self.text = '{"result": {"content": [{"text": "ok"}]}}'
+
+
+class _ThrottlingSession:
+    """Answers 429 to the first ``throttle`` posts, then fails one content value outright."""
+
+    def __init__(self, *, throttle: int) -> None:
+        self.throttle = throttle
+        self.posts: list[str] = []
+
+    def post(self, url: str, *, headers, json, timeout) -> _FakeResponse:
+        content = json["params"]["arguments"]["content"]
+        self.posts.append(content)
+        if len(self.posts) <= self.throttle:
+            return _FakeResponse(429, headers={"retry-after": "0"})
+        if content == "broken":
+            return _FakeResponse(500)
+        return _FakeResponse(200)
+
+
+def test_remember_many_backs_off_on_429_and_maps_results(tmp_path: Path) -> None:
+    session = _ThrottlingSession(throttle=3)
+    client = memory_service.SerenCloudClient(
+        api_key="key",
+        api_base_url="https://api.example",
+        memory_base_url="https://memory.example",
+        session=session,
+    )
+    pauses: list[float] = []
+    client.backoff = memory_service.AdaptiveBackoff(base_seconds=0.01, sleep=pauses.append, clock=lambda: 0.0)
+    client.backoff.wait = lambda: None  # keep the test instant; throttled() still records the delay
+    project_id = uuid.uuid4()
+    items = [(f"memory-{i}", "user", project_id) for i in range(20)] + [("broken", "user", project_id)]
+
+    results = client.remember_many(items, max_workers=4)
+
+    assert results[:20] == [None] * 20
+    assert isinstance(results[20], memory_service.MemorySyncError)
+    assert len(session.posts) == len(items) + 3
+    assert client.backoff.delay < 0.04
+
+
+def test_flush_queue_drains_backlog_with_per_item_results(tmp_path: Path) -> None:
+    class _BatchCloud(FakeCloudClient):
+        def __init__(self) -> None:
+            super().__init__()
+            self.batches: list[int] = []
+
+        def remember_many(self, items, *, max_workers: int):
+            self.batches.append(len(items))
+            results = []
+            for content, memory_type, project_id in items:
+                if "item-7 body" in content:
+                    results.append(RuntimeError("rejected"))
+                else:
+                    self.remember(content, memory_type, project_id)
+                    results.append(None)
+            return results
+
+    service, state, memory_root = _build_service(tmp_path, cloud=FakeCloudClient(fail_remember=True))
+    service.config.sync_batch_size = 200
+    for i in range(450):
+        _write_memory_file(
+            memory_root,
+            encoded_project="-Users-test-project",
+            name=f"item-{i}.md",
+            contents=f"---\nname: item-{i}\ntype: project\n---\nitem-{i} body\n",
+        )
+    assert service.sync_once()["queued"] == 450
+
+    cloud = _BatchCloud()
+    service.cloud = cloud
+    report = service.flush_queue()
+
+    assert cloud.batches == [200, 200, 50]
+    assert report == {"flushed": 449, "errors": 1}
+    assert state.queue_count() == 1
+    assert state.last_synced_hash("-Users-test-project", "item-8.md") is not None
+    assert state.last_synced_hash("-Users-test-project", "item-7.md") is None
+
+
+def test_incremental_render_pulls_changes_since_cursor_and_skips_unchanged_index(tmp_path: Path) -> None:
+    class _CursorCloud(FakeCloudClient):
+        def __init__(self) -> None:
+            super().__init__()
+            self.pulls: list[str | None] = []
+
+        def pull_memory_changes(self, project_id, *, since=None, etag=None, limit=200):
+            self.pulls.append(since)
+            memories = self.memories_by_project.get(str(project_id), [])
+            changed = [memory for memory in memories if since is None or memory["updated_at"] > since]
+            return memory_service.MemoryPage(memories=changed, incremental=since is not None)
+
+    cloud = _CursorCloud()
+    service, state, memory_root = _build_service(tmp_path, cloud=cloud)
+    encoded_project = "-Users-test-project"
+    project_key = str(memory_service.project_uuid(encoded_project))
+    cloud.memories_by_project[project_key] = [
+        {"id": "m1", "content": "first", "memory_type": "user", "updated_at": "2026-04-08T00:00:00Z"}
+    ]
+    index_path = memory_root / encoded_project / "MEMORY.md"
+
+    assert service.render_indexes([encoded_project]) == 1
+    written_at = index_path.stat().st_mtime_ns
+    assert service.render_indexes([encoded_project]) == 0
+    assert index_path.stat().st_mtime_ns == written_at
+    assert cloud.pulls == [None, "2026-04-08T00:00:00Z"]
+
+    cloud.memories_by_project[project_key].append(
+        {"id": "m2", "content": "second", "memory_type": "user", "updated_at": "2026-04-09T00:00:00Z"}
+    )
+    assert service.render_indexes([encoded_project]) == 1
+    rendered = index_path.read_text(encoding="utf-8")
+    assert "first" in rendered and "second" in rendered
+    assert state.project_cursor(encoded_project).since == "2026-04-09T00:00:00Z"
+
+
+def test_incremental_render_drops_tombstones_and_full_refresh_replaces_cache(tmp_path: Path) -> None:
+    class _DeletingCloud(FakeCloudClient):
+        def __init__(self) -> None:
+            super().__init__()
+            self.pulls: list[str | None] = []
+            self.deleted_ids: list[str] = []
+
+        def pull_memory_changes(self, project_id, *, since=None, etag=None, limit=200):
+            self.pulls.append(since)
+            memories = self.memories_by_project.get(str(project_id), [])
+            if since is None:
+                return memory_service.MemoryPage(memories=list(memories))
+            changed = [memory for memory in memories if memory["updated_at"] > since]
+            return memory_service.MemoryPage(memories=changed, incremental=True, deleted_ids=self.deleted_ids)
+
+    cloud = _DeletingCloud()
+    service, state, memory_root = _build_service(tmp_path, cloud=cloud)
+    encoded_project = "-Users-test-project"
+    project_key = str(memory_service.project_uuid(encoded_project))
+    cloud.memories_by_project[project_key] = [
+        {"id": "m1", "content": "first", "memory_type": "user", "updated_at": "2026-04-08T00:00:00Z"},
+        {"id": "m2", "content": "second", "memory_type": "user", "updated_at": "2026-04-09T00:00:00Z"},
+        {"id": "m3", "content": "third", "memory_type": "user", "updated_at": "2026-04-10T00:00:00Z"},
+    ]
+    index_path = memory_root / encoded_project / "MEMORY.md"
+    assert service.render_indexes([encoded_project]) == 1
+
+    # Tombstone reported by the server.
+    cloud.memories_by_project[project_key].pop(0)
+    cloud.deleted_ids = ["m1"]
+    assert service.render_indexes([encoded_project]) == 1
+    assert "first" not in index_path.read_text(encoding="utf-8")
+
+    # Silent server-side delete: invisible to updated_since until the full refresh is due.
+    cloud.deleted_ids = []
+    cloud.memories_by_project[project_key].pop(0)
+    assert service.render_indexes([encoded_project]) == 0
+    assert "second" in index_path.read_text(encoding="utf-8")
+
+    service.config.full_refresh_interval_seconds = 0
+    assert service.render_indexes([encoded_project]) == 1
+    rendered = index_path.read_text(encoding="utf-8")
+    assert "second" not in rendered and "third" in rendered
+    assert cloud.pulls == [None, "2026-04-10T00:00:00Z", "2026-04-10T00:00:00Z", None]
+    assert [memory["id"] for memory in state.project_cursor(encoded_project).memories] == ["m3"]
+
+
+def test_pull_memory_changes_sends_etag_and_handles_not_modified() -> None:
+    class _Response:
+        status_code = 304
+        headers: dict[str, str] = {}
+
+    class _Session:
+        def __init__(self) -> None:
+            self.requests: list[dict] = []
+
+        def get(self, url, *, params, headers, timeout):
+            self.requests.append({"params": params, "headers": headers})
+            return _Response()
+
+    session = _Session()
+    client = memory_service.SerenCloudClient(
+        api_key="key",
+        api_base_url="https://api.example",
+        memory_base_url="https://memory.example",
+        session=session,
+    )
+
+    page = client.pull_memory_changes(uuid.uuid4(), since="2026-04-08T00:00:00Z", etag='"v1"')
+
+    assert page.not_modified and page.etag == '"v1"'
+    assert session.requests[0]["headers"]["If-None-Match"] == '"v1"'
+    assert "updated_since" not in session.requests[0]["params"]
@@ -44,6 +44,7 @@ except ImportError:  # pragma: no cover
 from dca_engine import build_window, should_force_fill, window_progress
 from backtest_optimizer import optimize_invocation_config
 from coinbase_client import CoinbaseAPIError, CoinbaseClient, CoinbaseCredentials
+from indicator_engine import IndicatorEngine
 from logger import AuditLogger
 from optimizer import SUPPORTED_STRATEGIES, compute_rsi, decide_execution
 from portfolio_manager import PortfolioManager
@@ -787,6 +788,15 @@ def get_market_snapshot(client: CoinbaseClient | None, pair: str) -> dict[str, A
     }
 
 
+def get_price_history(client: CoinbaseClient | None, pair: str) -> list[Any]:
+    """Return daily OHLC rows for candle replay; mock runs have no real history."""
+    if client is None:
+        return []
+    ohlc_daily = client.get_ohlc(pair, interval=1440)
+    ohlc_daily_key = next((k for k in ohlc_daily.keys() if k != "last"), pair)
+    return list(ohlc_daily.get(ohlc_daily_key, []))
+
+
 def apply_risk_policy(
     *,
     config: dict[str, Any],
@@ -1447,15 +1457,49 @@ def _single_asset_mode(
     }
 
 
+def _mock_ohlc_rows(closes: list[float], *, interval_seconds: int, volume_usd: float) -> list[list[Any]]:
+    now_ts = int(_now().timestamp())
+    last_open = now_ts - (now_ts % interval_seconds)
+    first_open = last_open - (len(closes) - 1) * interval_seconds
+    rows: list[list[Any]] = []
+    for index, close in enumerate(closes):
+        rows.append(
+            [
+                first_open + index * interval_seconds,
+                close,
+                close,
+                close,
+                close,
+                close,
+                volume_usd / max(close, 1e-9),
+            ]
+        )
+    return rows
+
+
 def _scanner_market_rows(
     *,
     config: dict[str, Any],
     client: CoinbaseClient | None,
+    indicators: IndicatorEngine | None = None,
 ) -> list[dict[str, Any]]:
     rows: list[dict[str, Any]] = []
     scan_assets = list(config.get("runtime", {}).get("market_scan_assets", []))
+    learn_rewards: dict[str, Any] = {}
+    if indicators is not None and client is not None:
+        learn_rewards = client.get_learn_rewards()
     for pair in scan_assets:
         product_id = _normalize_product_id(pair)
+        if indicators is not None:
+            rows.append(
+                _scanner_indicator_row(
+                    client=client,
+                    product_id=product_id,
+                    indicators=indicators,
+                    learn_rewards=learn_rewards,
+                )
+            )
+            continue
         snap = get_market_snapshot(client, product_id)
         closes = [float(v) for v in snap.get("candles", [])]
         rsi = compute_rsi(closes, period=14)
@@ -1492,9 +1536,85 @@ def _scanner_market_rows(
                 "learn_reward_usd": float(snap.get("learn_reward_usd", 0.0)),
             }
         )
+    if indicators is not None:
+        indicators.flush()
     return rows
 
 
+def _scanner_indicator_row(
+    *,
+    client: CoinbaseClient | None,
+    product_id: str,
+    indicators: IndicatorEngine,
+    learn_rewards: dict[str, Any],
+) -> dict[str, Any]:
+    """Build one scanner row from incremental indicator state.
+
+    Only OHLC bars newer than the persisted state are requested, so per-run
+    cost scales with new bars rather than the full candle history.
+    """
+    if client is None:
+        snap = _mock_snapshot(product_id)
+        price = _float(snap["price"])
+        vwap = _float(snap["vwap"], fallback=price)
+        volume_24h = _float(snap.get("volume_24h_usd"))
+        market_cap = _float(snap.get("market_cap_usd"))
+        learn_reward_usd = _float(snap.get("learn_reward_usd"))
+        intraday_rows = _mock_ohlc_rows(
+            [float(v) for v in snap.get("candles", [])],
+            interval_seconds=900,
+            volume_usd=volume_24h / 96.0,
+        )
+        daily_rows = _mock_ohlc_rows(
+            [float(v) for v in snap.get("daily_closes", [])],
+            interval_seconds=86400,
+            volume_usd=_float(snap.get("avg_volume_30d_usd"), fallback=volume_24h),
+        )
+    else:
+        ticker = client.get_ticker(product_id)
+        row = ticker[next(iter(ticker.keys()))]
+        price = _float(row.get("c", [0])[0])
+        vwap = _float(row.get("p", [price, price])[1], fallback=price)
+        volume_24h = _float(row.get("v", [0, 0])[1]) * price
+        market_cap = 0.0
+        learn_reward_usd = _float(learn_rewards.get(_base_asset(product_id)), fallback=0.0)
+        ohlc_15m = client.get_ohlc(product_id, interval=15, since=indicators.last_bar_ts(product_id, "15m"))
+        intraday_rows = ohlc_15m.get(next((k for k in ohlc_15m.keys() if k != "last"), product_id), [])
+        ohlc_daily = client.get_ohlc(product_id, interval=1440, since=indicators.last_bar_ts(product_id, "1d"))
+        daily_rows = ohlc_daily.get(next((k for k in ohlc_daily.keys() if k != "last"), product_id), [])
+
+    fast = indicators.update(product_id, "15m", intraday_rows)
+    slow = indicators.update(product_id, "1d", daily_rows)
+    rsi = _float(fast["rsi_14"], fallback=50.0)
+    sma20 = _float(slow["sma_20"], fallback=price)
+    price_7d_ago = _float(slow["close_lag_7"], fallback=price)
+    avg_volume_30d = _float(slow["volume_usd_mean_30"])
+    if market_cap <= 0:
+        market_cap = max(avg_volume_30d * 60.0, 100_000_000.0)
+    listing_days = 999
+    if slow["first_bar_ts"]:
+        listing_days = int(max((_now().timestamp() - int(slow["first_bar_ts"])) / 86400.0, 0.0))
+
+    return {
+        "asset": product_id,
+        "price": price,
+        "volume_24h_usd": volume_24h,
+        "volume_ratio": volume_24h / avg_volume_30d if avg_volume_30d > 0 else 1.0,
+        "rsi_14": rsi,
+        "price_change_24h_pct": ((price - vwap) / max(vwap, 1e-9)) * 100.0,
+        "price_change_7d_pct": ((price - price_7d_ago) / max(price_7d_ago, 1e-9)) * 100.0,
+        "sma20": sma20,
+        "zscore_20": _float(slow["zscore_20"]),
+        "volatility_20_pct": _float(slow["volatility_20_pct"]),
+        "ema_20": _float(slow["ema_20"], fallback=price),
+        "new_listing_days": listing_days,
+        "accumulation_score": float(min(max((50.0 - abs(rsi - 50.0)) / 50.0, 0.0), 1.0)),
+        "market_cap_usd": market_cap,
+        "coinbase_verified": True,
+        "learn_reward_usd": learn_reward_usd,
+    }
+
+
 def _opportunity_scanner_mode(
     *,
     config: dict[str, Any],
@@ -1526,7 +1646,13 @@ def _opportunity_scanner_mode(
         require_coinbase_verified=bool(scanner_cfg.get("require_coinbase_verified", False)),
     )
 
-    rows = _scanner_market_rows(config=config, client=client)
+    rows = _scanner_market_rows(
+        config=config,
+        client=client,
+        # Mock bars are synthetic and stamped "now"; keep them out of the live state db.
+        indicators=IndicatorEngine(STATE_DB_PATH if client is not None else None),
+    )
+    rsi_by_pair = {str(row["asset"]): _float(row["rsi_14"], fallback=50.0) for row in rows}
     signals = scanner.scan(rows, base_allocations)
     signal_payloads = [signal.to_dict() for signal in signals]
 
@@ -1622,6 +1748,8 @@ def _opportunity_scanner_mode(
             use_usdc_routing=use_usdc_routing,
         )
         snap = route["snapshot"]
+        if requested_pair in rsi_by_pair:
+            snap["rsi_15m"] = rsi_by_pair[requested_pair]
         decision = decide_execution(
             strategy=strategy,
             snapshot=snap,
@@ -1851,6 +1979,7 @@ def run_once(
             optimized = optimize_invocation_config(
                 config=config,
                 get_snapshot=lambda pair: get_market_snapshot(client, pair),
+                get_history=lambda pair: get_price_history(client, pair),
             )
             config = optimized["config"]
             optimization = optimized["summary"]
@@ -7,6 +7,8 @@ from copy import deepcopy
 from typing import Any, Callable
 
 from optimizer import SUPPORTED_STRATEGIES
+from replay_backtester import PriceHistory, ReplayEngine
+from scanner import OpportunityScanner
 
 
 DEFAULT_BACKTEST_SETTINGS = {
@@ -14,6 +16,9 @@ DEFAULT_BACKTEST_SETTINGS = {
     "bankroll_usd": 100.0,
     "target_pnl_pct": 25.0,
     "horizon_days": 180,
+    "candle_replay": True,
+    "maker_fee_bps": 60.0,
+    "taker_fee_bps": 120.0,
 }
 
 PERIOD_DAYS = {
@@ -51,6 +56,9 @@ def resolve_backtest_settings(config: dict[str, Any]) -> dict[str, Any]:
     settings["bankroll_usd"] = float(settings.get("bankroll_usd", 100.0))
     settings["target_pnl_pct"] = float(settings.get("target_pnl_pct", 25.0))
     settings["horizon_days"] = int(settings.get("horizon_days", 180))
+    settings["candle_replay"] = bool(settings.get("candle_replay", True))
+    settings["maker_fee_bps"] = float(settings.get("maker_fee_bps", 60.0))
+    settings["taker_fee_bps"] = float(settings.get("taker_fee_bps", 120.0))
     return settings
 
 
@@ -129,11 +137,85 @@ def _candidate_assets(config: dict[str, Any], mode: str) -> list[str]:
     return ordered or ["BTC-USD", "ETH-USD", "SOL-USD"]
 
 
+def _spread_bps(snapshot: dict[str, Any]) -> float:
+    price = _float(snapshot.get("price", 0.0))
+    bid = _float(snapshot.get("bid", price), price)
+    ask = _float(snapshot.get("ask", price), price)
+    mid = (bid + ask) / 2.0
+    if mid <= 0 or ask < bid:
+        return 10.0
+    return ((ask - bid) / mid) * 10000.0
+
+
+def _build_replay_engine(
+    *,
+    config: dict[str, Any],
+    settings: dict[str, Any],
+    snapshots: dict[str, dict[str, Any]],
+    get_history: Callable[[str], list[Any]] | None,
+) -> ReplayEngine | None:
+    """Load OHLC history once per asset; return None when replay is unavailable."""
+    if get_history is None or not settings["candle_replay"]:
+        return None
+
+    histories: dict[str, PriceHistory] = {}
+    for asset in snapshots:
+        try:
+            rows = get_history(asset)
+        except Exception:  # noqa: BLE001
+            continue
+        history = PriceHistory.from_ohlc_rows(asset, rows or [])
+        if len(history):
+            histories[asset] = history.tail_days(int(settings["horizon_days"]))
+    if not histories:
+        return None
+
+    inputs = config.get("inputs", {})
+    try:
+        return ReplayEngine(
+            histories,
+            frequency=str(inputs.get("frequency", "weekly")).strip(),
+            window_hours=int(inputs.get("dca_window_hours", 24)),
+            maker_fee_bps=float(settings["maker_fee_bps"]),
+            taker_fee_bps=float(settings["taker_fee_bps"]),
+            spread_bps={asset: _spread_bps(snapshot) for asset, snapshot in snapshots.items()},
+            depth_scores={
+                asset: max(min(_float(snapshot.get("depth_score", 0.5), 0.5), 1.0), 0.0)
+                for asset, snapshot in snapshots.items()
+            },
+        )
+    except ValueError:
+        return None
+
+
+def _replay_scanner(config: dict[str, Any]) -> OpportunityScanner:
+    scanner_cfg = config.get("scanner", {})
+    return OpportunityScanner(
+        min_24h_volume_usd=_float(scanner_cfg.get("min_24h_volume_usd", 1_000_000), 1_000_000),
+        max_reallocation_pct=_float(scanner_cfg.get("max_reallocation_pct", 20.0), 20.0),
+        enabled_signals=list(scanner_cfg.get("signals", [])),
+    )
+
+
+def _allocations_from_rows(rows: list[dict[str, Any]]) -> dict[str, float]:
+    total_score = sum(max(row["modeled_pnl_pct"], 0.01) for row in rows) or 1.0
+    return {
+        row["asset"]: round(max(row["modeled_pnl_pct"], 0.01) / total_score, 6)
+        for row in rows
+    }
+
+
 def optimize_invocation_config(
     *,
     config: dict[str, Any],
     get_snapshot: Callable[[str], dict[str, Any]],
+    get_history: Callable[[str], list[Any]] | None = None,
 ) -> dict[str, Any]:
+    """Pick the asset/strategy/allocation mix with the best modeled PnL.
+
+    When ``get_history`` returns OHLC rows, every candidate is scored by the
+    candle-replay backtester; otherwise the snapshot heuristic is used.
+    """
     settings = resolve_backtest_settings(config)
     if not settings["auto_optimize_on_invoke"]:
         return {
@@ -153,25 +235,46 @@ def optimize_invocation_config(
     mode = str(config.get("inputs", {}).get("mode", "single_asset")).strip()
     frequency = str(config.get("inputs", {}).get("frequency", "weekly")).strip()
     bankroll = max(float(settings["bankroll_usd"]), 1.0)
-    strategies = list(SUPPORTED_STRATEGIES)
+    strategies = sorted(SUPPORTED_STRATEGIES)
     assets = _candidate_assets(config, mode)
+    snapshots = {asset: get_snapshot(asset) for asset in assets}
+    engine = _build_replay_engine(
+        config=config,
+        settings=settings,
+        snapshots=snapshots,
+        get_history=get_history,
+    )
 
     scores: list[dict[str, Any]] = []
-    for asset in assets:
-        snapshot = get_snapshot(asset)
-        for strategy in strategies:
+    if engine is not None:
+        for result in engine.replay_single_asset(
+            assets=assets,
+            strategies=strategies,
+            amount_usd=bankroll / 4.0,
+        ):
             scores.append(
                 {
-                    "asset": asset,
-                    "strategy": strategy,
-                    "modeled_pnl_pct": modeled_single_asset_pnl_pct(
-                        snapshot=snapshot,
-                        strategy=strategy,
-                        frequency=frequency,
-                        horizon_days=int(settings["horizon_days"]),
-                    ),
+                    "asset": next(iter(result.allocations)),
+                    "strategy": result.strategy,
+                    "modeled_pnl_pct": round(result.pnl_pct, 4),
+                    "max_drawdown_pct": round(result.max_drawdown_pct, 4),
                 }
             )
+    else:
+        for asset in assets:
+            for strategy in strategies:
+                scores.append(
+                    {
+                        "asset": asset,
+                        "strategy": strategy,
+                        "modeled_pnl_pct": modeled_single_asset_pnl_pct(
+                            snapshot=snapshots[asset],
+                            strategy=strategy,
+                            frequency=frequency,
+                            horizon_days=int(settings["horizon_days"]),
+                        ),
+                    }
+                )
 
     if not scores:
         return {
@@ -196,6 +299,8 @@ def optimize_invocation_config(
 
     selected_targets: list[str]
     selected_config: dict[str, Any]
+    attempt_count = len(scores)
+    max_drawdown_pct: float | None = None
 
     if mode == "single_asset":
         best = max(scores, key=lambda item: item["modeled_pnl_pct"])
@@ -205,6 +310,7 @@ def optimize_invocation_config(
         updated["inputs"]["dca_amount_usd"] = round(bankroll / 4.0, 2)
         selected_targets = [best["asset"]]
         modeled_pnl_pct = best["modeled_pnl_pct"]
+        max_drawdown_pct = best.get("max_drawdown_pct")
         selected_config = {
             "inputs": {
                 "asset": best["asset"],
@@ -218,8 +324,7 @@ def optimize_invocation_config(
         for row in scores:
             by_strategy.setdefault(row["strategy"], []).append(row)
 
-        strategy_choice = None
-        top_rows: list[dict[str, Any]] = []
+        top_rows_by_strategy: dict[str, list[dict[str, Any]]] = {}
         for strategy, rows in by_strategy.items():
             ranked = sorted(rows, key=lambda item: item["modeled_pnl_pct"], reverse=True)
             unique_rows: list[dict[str, Any]] = []
@@ -231,24 +336,58 @@ def optimize_invocation_config(
                 unique_rows.append(row)
                 if len(unique_rows) == 3:
                     break
-            average = sum(item["modeled_pnl_pct"] for item in unique_rows) / max(len(unique_rows), 1)
-            if strategy_choice is None or average > strategy_choice["average_modeled_pnl_pct"]:
-                strategy_choice = {
-                    "strategy": strategy,
-                    "average_modeled_pnl_pct": average,
-                    "rows": unique_rows,
-                }
+            top_rows_by_strategy[strategy] = unique_rows
+
+        strategy_choice = None
+        if engine is not None:
+            # Replay each strategy's basket with drift rebalancing (portfolio)
+            # or scanner reallocations (scanner) instead of averaging legs.
+            candidates = [
+                (strategy, _allocations_from_rows(rows))
+                for strategy, rows in top_rows_by_strategy.items()
+                if rows
+            ]
+            if mode == "portfolio":
+                window_amount = bankroll
+                threshold = _float(config.get("portfolio", {}).get("rebalance_threshold_pct", 5.0), 5.0)
+                scanner = None
+            else:
+                window_amount = bankroll / 3.0
+                threshold = 100.0
+                scanner = _replay_scanner(config)
+            results = engine.replay_portfolio(
+                candidates=candidates,
+                total_amount_usd=window_amount,
+                rebalance_threshold_pct=threshold,
+                scanner=scanner,
+            )
+            attempt_count += len(results)
+            for result in results:
+                if strategy_choice is None or result.pnl_pct > strategy_choice["average_modeled_pnl_pct"]:
+                    strategy_choice = {
+                        "strategy": result.strategy,
+                        "average_modeled_pnl_pct": result.pnl_pct,
+                        "rows": top_rows_by_strategy[result.strategy],
+                        "max_drawdown_pct": result.max_drawdown_pct,
+                    }
+        else:
+            for strategy, unique_rows in top_rows_by_strategy.items():
+                average = sum(item["modeled_pnl_pct"] for item in unique_rows) / max(len(unique_rows), 1)
+                if strategy_choice is None or average > strategy_choice["average_modeled_pnl_pct"]:
+                    strategy_choice = {
+                        "strategy": strategy,
+                        "average_modeled_pnl_pct": average,
+                        "rows": unique_rows,
+                    }
         top_rows = strategy_choice["rows"] if strategy_choice is not None else []
         modeled_pnl_pct = round(
-            sum(item["modeled_pnl_pct"] for item in top_rows) / max(len(top_rows), 1),
+            strategy_choice["average_modeled_pnl_pct"] if strategy_choice is not None else 0.0,
             4,
         )
+        if strategy_choice is not None and "max_drawdown_pct" in strategy_choice:
+            max_drawdown_pct = round(strategy_choice["max_drawdown_pct"], 4)
         selected_targets = [row["asset"] for row in top_rows]
-        total_score = sum(max(row["modeled_pnl_pct"], 0.01) for row in top_rows) or 1.0
-        allocations = {
-            row["asset"]: round(max(row["modeled_pnl_pct"], 0.01) / total_score, 6)
-            for row in top_rows
-        }
+        allocations = _allocations_from_rows(top_rows)
         if mode == "portfolio":
             updated.setdefault("portfolio", {})
             updated["portfolio"]["allocations"] = allocations
@@ -270,6 +409,7 @@ def optimize_invocation_config(
             "targets": allocations,
         }
 
+    method = "candle_replay" if engine is not None else "heuristic"
     operational_limit = round(bankroll + max(0.05, 0.01 * max(len(selected_targets), 1)), 2)
     updated["risk"]["max_daily_spend_usd"] = operational_limit
     updated["risk"]["max_notional_usd"] = operational_limit
@@ -279,21 +419,27 @@ def optimize_invocation_config(
             "selected_config": selected_config,
             "selected_targets": selected_targets,
             "last_modeled_pnl_pct": round(modeled_pnl_pct, 4),
-            "last_attempt_count": len(scores),
+            "last_attempt_count": attempt_count,
             "last_target_met": modeled_pnl_pct >= float(settings["target_pnl_pct"]),
+            "last_method": method,
         },
     )
-    return {
-        "config": updated,
-        "summary": {
-            "applied": True,
-            "bankroll_usd": round(bankroll, 2),
-            "target_pnl_pct": float(settings["target_pnl_pct"]),
-            "target_met": modeled_pnl_pct >= float(settings["target_pnl_pct"]),
-            "attempt_count": len(scores),
-            "modeled_pnl_pct": round(modeled_pnl_pct, 4),
-            "selected_config": selected_config,
-            "selected_targets": selected_targets,
-            "horizon_days": int(settings["horizon_days"]),
-        },
+    summary = {
+        "applied": True,
+        "method": method,
+        "bankroll_usd": round(bankroll, 2),
+        "target_pnl_pct": float(settings["target_pnl_pct"]),
+        "target_met": modeled_pnl_pct >= float(settings["target_pnl_pct"]),
+        "attempt_count": attempt_count,
+        "modeled_pnl_pct": round(modeled_pnl_pct, 4),
+        "selected_config": selected_config,
+        "selected_targets": selected_targets,
+        "horizon_days": int(settings["horizon_days"]),
     }
+    if engine is not None:
+        summary["replay"] = {
+            "bars": engine.bar_count,
+            "windows": engine.window_count,
+            "max_drawdown_pct": max_drawdown_pct,
+        }
+    return {"config": updated, "summary": summary}
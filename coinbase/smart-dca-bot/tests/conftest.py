@@ -12,10 +12,12 @@ SCRIPT_DIR = Path(__file__).resolve().parents[1] / "scripts"
 MODULE_NAMES = (
     "agent",
     "dca_engine",
+    "indicator_engine",
     "logger",
     "optimizer",
     "portfolio_manager",
     "position_tracker",
+    "replay_backtester",
     "scanner",
     "seren_api_client",
     "serendb_store",
@@ -7,9 +7,10 @@ import argparse
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from common import parse_dt, to_float, write_json
+from common import load_records, parse_dt, to_float, write_json
+from reconciliation_audit import MatchIndex
 
 
 def _days_between(start_iso: str, end_iso: str) -> int:
@@ -18,14 +19,29 @@ def _days_between(start_iso: str, end_iso: str) -> int:
     return (end - start).days
 
 
-def resolve(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def resolve(
+    records: List[Dict[str, Any]],
+    lot_disposals: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Resolve basis, gain and holding period; ``lot_disposals`` come from tax_lot_engine.py."""
     resolved_records: List[Dict[str, Any]] = []
+    lots = MatchIndex(lot_disposals) if lot_disposals else None
 
     for row in records:
         proceeds = to_float(row.get("proceeds_usd"))
         basis = to_float(row.get("cost_basis_usd"))
         gain = to_float(row.get("gain_loss_usd"))
         method = "as_provided"
+        lot_match: Optional[Dict[str, Any]] = None
+
+        if basis is None and lots is not None:
+            idx = lots.take(row)
+            if idx is not None and lot_disposals[idx].get("cost_basis_usd") is not None:
+                lot_match = lot_disposals[idx]
+                basis = to_float(lot_match["cost_basis_usd"])
+                method = f"tax_lots_{lot_match.get('basis_method', 'fifo')}"
+                if gain is None and proceeds is not None:
+                    gain = proceeds - basis
 
         if basis is None and proceeds is not None and gain is not None:
             basis = proceeds - gain
@@ -34,24 +50,25 @@ def resolve(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             gain = proceeds - basis
             method = "derived_from_proceeds_minus_basis"
 
-        acquired_at = parse_dt(row.get("acquired_at"))
+        acquired_at = parse_dt(row.get("acquired_at") or (lot_match or {}).get("acquired_at"))
         disposed_at = parse_dt(row.get("disposed_at"))
-        holding_period = row.get("holding_period")
+        holding_period = row.get("holding_period") or (lot_match or {}).get("holding_period")
         if not holding_period and acquired_at and disposed_at:
             days = _days_between(acquired_at, disposed_at)
             holding_period = "long-term" if days > 365 else "short-term"
 
-        resolved_records.append(
-            {
-                **row,
-                "acquired_at": acquired_at,
-                "disposed_at": disposed_at,
-                "cost_basis_usd": basis,
-                "gain_loss_usd": gain,
-                "holding_period": holding_period,
-                "basis_resolution_method": method,
-            }
-        )
+        resolved = {
+            **row,
+            "acquired_at": acquired_at,
+            "disposed_at": disposed_at,
+            "cost_basis_usd": basis,
+            "gain_loss_usd": gain,
+            "holding_period": holding_period,
+            "basis_resolution_method": method,
+        }
+        if lot_match is not None:
+            resolved["lots"] = lot_match.get("lots", [])
+        resolved_records.append(resolved)
 
     return resolved_records
 
@@ -60,6 +77,7 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Resolve cost basis and holding periods")
     parser.add_argument("--input", required=True, help="Input normalized JSON path")
     parser.add_argument("--output", required=True, help="Output JSON path")
+    parser.add_argument("--lots", default=None, help="tax_lot_engine.py disposals JSON used to supply missing basis")
     args = parser.parse_args()
 
     payload = json.loads(Path(args.input).read_text(encoding="utf-8"))
@@ -67,7 +85,7 @@ def main() -> None:
     if not isinstance(records, list):
         raise ValueError("Input must contain a list in 'records' or be a top-level array")
 
-    resolved = resolve(records)
+    resolved = resolve(records, lot_disposals=load_records(args.lots) if args.lots else None)
     write_json(args.output, {"count": len(resolved), "records": resolved})
     print(f"Resolved {len(resolved)} records -> {args.output}")
 
@@ -12,15 +12,164 @@ import base64
 import hashlib
 import hmac
 import json
+import sqlite3
+import threading
 import time
 import urllib.parse
 import urllib.request
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from common import parse_dt, to_float, write_json
 
 
 KRAKEN_API_BASE = "https://api.kraken.com"
+KRAKEN_HISTORY_START = 1378857600  # 2013-09-11, before Kraken's first trades
+
+# Private API counter per verification tier: (max counter, decay per second).
+# TradesHistory and Ledgers each add 2 to the counter.
+API_TIERS = {
+    "starter": (15, 0.33),
+    "intermediate": (20, 0.5),
+    "pro": (20, 1.0),
+}
+HISTORY_CALL_COST = 2
+DEFAULT_WINDOW_DAYS = 90
+# Kraken rejects out-of-order nonces unless the key has a nonce window, so one worker by default.
+DEFAULT_WORKERS = 1
+DEFAULT_CACHE_PATH = "state/kraken_history.db"
+# Windows that ended longer ago than this are treated as immutable and cached.
+SETTLE_SECONDS = 3600
+
+_nonce_lock = threading.Lock()
+_last_nonce = 0
+
+
+def _next_nonce() -> str:
+    """Strictly increasing nonce, safe to call from concurrent fetch workers."""
+    global _last_nonce
+    with _nonce_lock:
+        _last_nonce = max(_last_nonce + 1, int(time.time() * 1000))
+        return str(_last_nonce)
+
+
+class TokenBucket:
+    """Blocking token bucket mirroring Kraken's decaying private API counter."""
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_tier(cls, tier: str) -> "TokenBucket":
+        capacity, decay = API_TIERS[tier]
+        return cls(capacity, decay)
+
+    def acquire(self, cost: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                wait = (cost - self._tokens) / self.refill_per_second
+            self._sleep(wait)
+
+
+class HistoryCache:
+    """SQLite page cache and checkpoints for Kraken history windows.
+
+    Pages are keyed by (account, endpoint, window, ofs). A window is marked
+    complete once every page has been fetched, and complete windows are served
+    from the cache; an interrupted window resumes from its last cached page.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS history_pages (
+                  account TEXT NOT NULL,
+                  endpoint TEXT NOT NULL,
+                  window_start INTEGER NOT NULL,
+                  window_end INTEGER NOT NULL,
+                  ofs INTEGER NOT NULL,
+                  total INTEGER NOT NULL,
+                  entries TEXT NOT NULL,
+                  PRIMARY KEY (account, endpoint, window_start, window_end, ofs)
+                );
+                CREATE TABLE IF NOT EXISTS history_windows (
+                  account TEXT NOT NULL,
+                  endpoint TEXT NOT NULL,
+                  window_start INTEGER NOT NULL,
+                  window_end INTEGER NOT NULL,
+                  completed_at REAL NOT NULL,
+                  PRIMARY KEY (account, endpoint, window_start, window_end)
+                );
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.path), timeout=30)
+
+    def is_complete(self, account: str, endpoint: str, window: Tuple[int, int]) -> bool:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM history_windows WHERE account = ? AND endpoint = ? AND window_start = ? AND window_end = ?",
+                (account, endpoint, *window),
+            ).fetchone()
+        return row is not None
+
+    def pages(self, account: str, endpoint: str, window: Tuple[int, int]) -> List[Tuple[int, int, Dict[str, Any]]]:
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT ofs, total, entries FROM history_pages
+                WHERE account = ? AND endpoint = ? AND window_start = ? AND window_end = ?
+                ORDER BY ofs
+                """,
+                (account, endpoint, *window),
+            ).fetchall()
+        return [(ofs, total, json.loads(entries)) for ofs, total, entries in rows]
+
+    def save_page(
+        self,
+        account: str,
+        endpoint: str,
+        window: Tuple[int, int],
+        ofs: int,
+        total: int,
+        entries: Dict[str, Any],
+    ) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO history_pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (account, endpoint, *window, ofs, total, json.dumps(entries)),
+            )
+
+    def mark_complete(self, account: str, endpoint: str, window: Tuple[int, int]) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO history_windows VALUES (?, ?, ?, ?, ?)",
+                (account, endpoint, *window, time.time()),
+            )
 
 
 def _kraken_signature(urlpath: str, data: Dict[str, Any], secret: str) -> str:
@@ -41,7 +190,7 @@ def _kraken_request(
     """Make an authenticated POST request to the Kraken API."""
     url = KRAKEN_API_BASE + path
     data = params.copy() if params else {}
-    data["nonce"] = str(int(time.time() * 1000))
+    data["nonce"] = _next_nonce()
 
     sig = _kraken_signature(path, data, api_secret)
     postdata = urllib.parse.urlencode(data).encode("utf-8")
@@ -61,80 +210,168 @@ def _kraken_request(
     return payload.get("result", {})
 
 
-def fetch_trades(
+def _windows(start: Optional[int], end: Optional[int], window_days: int) -> List[Tuple[int, int]]:
+    """Split (start, end] into disjoint windows; Kraken's start is exclusive and end inclusive."""
+    lo = int(start) if start is not None else KRAKEN_HISTORY_START
+    hi = int(end) if end is not None else int(time.time())
+    step = max(1, window_days) * 86400
+    windows = []
+    while lo < hi:
+        windows.append((lo, min(lo + step, hi)))
+        lo += step
+    return windows
+
+
+def _probe_history(
+    path: str,
+    result_key: str,
     api_key: str,
     api_secret: str,
-    start: Optional[int] = None,
-    end: Optional[int] = None,
-) -> List[Dict[str, Any]]:
-    """Fetch all closed trades, paginating through results."""
-    all_trades: List[Dict[str, Any]] = []
+    end: int,
+    limiter: TokenBucket,
+) -> Tuple[Optional[Dict[str, Dict[str, Any]]], int]:
+    """Open-ended first call used when no start is given.
+
+    Returns ``(entries, 0)`` when one page holds the whole history. Otherwise
+    returns ``(None, start)`` where ``start`` sits just before the account's
+    earliest entry, so windows cover only the span the account has history for.
+    """
+    limiter.acquire(HISTORY_CALL_COST)
+    result = _kraken_request(path, api_key, api_secret, {"ofs": 0, "end": end})
+    page = result.get(result_key, {}) or {}
+    total = int(result.get("count", 0) or 0)
+    if len(page) >= total:
+        return page, 0
+
+    # Results are newest first, so the last offset is the earliest entry.
+    limiter.acquire(HISTORY_CALL_COST)
+    oldest = _kraken_request(path, api_key, api_secret, {"ofs": total - 1, "end": end}).get(result_key, {}) or {}
+    times = [float(entry.get("time") or 0) for entry in oldest.values()]
+    earliest = int(min(times)) if times else KRAKEN_HISTORY_START
+    # Kraken's start bound is exclusive.
+    return None, max(KRAKEN_HISTORY_START, earliest - 1)
+
+
+def _fetch_window(
+    path: str,
+    result_key: str,
+    api_key: str,
+    api_secret: str,
+    window: Tuple[int, int],
+    limiter: TokenBucket,
+    cache: Optional[HistoryCache],
+    account: str,
+) -> Dict[str, Dict[str, Any]]:
+    """Page through one time window, resuming from cached pages when possible."""
+    settled = window[1] <= time.time() - SETTLE_SECONDS
+    entries: Dict[str, Dict[str, Any]] = {}
     offset = 0
 
-    while True:
-        params: Dict[str, Any] = {"ofs": offset}
-        if start is not None:
-            params["start"] = start
-        if end is not None:
-            params["end"] = end
+    if cache is not None and settled:
+        for page_ofs, _total, page in cache.pages(account, path, window):
+            entries.update(page)
+            offset = max(offset, page_ofs + len(page))
+        if cache.is_complete(account, path, window):
+            return entries
 
+    while True:
+        limiter.acquire(HISTORY_CALL_COST)
         result = _kraken_request(
-            "/0/private/TradesHistory", api_key, api_secret, params
+            path, api_key, api_secret, {"ofs": offset, "start": window[0], "end": window[1]}
         )
-        trades = result.get("trades", {})
-        if not trades:
+        page = result.get(result_key, {}) or {}
+        total = int(result.get("count", 0) or 0)
+        if cache is not None and settled and page:
+            cache.save_page(account, path, window, offset, total, page)
+        entries.update(page)
+        offset += len(page)
+        if not page or offset >= total:
             break
 
-        for trade_id, trade_data in trades.items():
-            trade_data["trade_id"] = trade_id
-            all_trades.append(trade_data)
+    if cache is not None and settled:
+        cache.mark_complete(account, path, window)
+    return entries
 
-        count = result.get("count", 0)
-        offset += len(trades)
-        if offset >= count:
-            break
 
-        time.sleep(1)  # Rate limit: respect Kraken's API limits
+def _fetch_history(
+    path: str,
+    result_key: str,
+    id_field: str,
+    api_key: str,
+    api_secret: str,
+    start: Optional[int],
+    end: Optional[int],
+    cache_path: Optional[str],
+    workers: int,
+    window_days: int,
+    tier: str,
+) -> List[Dict[str, Any]]:
+    """Fetch disjoint time windows concurrently under the shared API rate limit."""
+    cache = HistoryCache(cache_path) if cache_path else None
+    account = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    limiter = TokenBucket.for_tier(tier)
+
+    probed: Optional[Dict[str, Dict[str, Any]]] = None
+    if start is None:
+        end = int(end) if end is not None else int(time.time())
+        probed, start = _probe_history(path, result_key, api_key, api_secret, end, limiter)
+    windows = _windows(start, end, window_days) if probed is None else []
+
+    merged: Dict[str, Dict[str, Any]] = dict(probed or {})
+    errors: List[BaseException] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [
+            pool.submit(_fetch_window, path, result_key, api_key, api_secret, window, limiter, cache, account)
+            for window in windows
+        ]
+        for future in futures:
+            try:
+                merged.update(future.result())
+            except Exception as exc:  # keep draining so finished windows are checkpointed
+                errors.append(exc)
+    if errors:
+        raise errors[0]
 
-    return all_trades
+    rows = []
+    for entry_id, entry_data in merged.items():
+        entry_data[id_field] = entry_id
+        rows.append(entry_data)
+    rows.sort(key=lambda row: float(row.get("time") or 0), reverse=True)
+    return rows
 
 
-def fetch_ledger(
+def fetch_trades(
     api_key: str,
     api_secret: str,
     start: Optional[int] = None,
     end: Optional[int] = None,
+    cache_path: Optional[str] = None,
+    workers: int = DEFAULT_WORKERS,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    tier: str = "starter",
 ) -> List[Dict[str, Any]]:
-    """Fetch all ledger entries, paginating through results."""
-    all_entries: List[Dict[str, Any]] = []
-    offset = 0
-
-    while True:
-        params: Dict[str, Any] = {"ofs": offset}
-        if start is not None:
-            params["start"] = start
-        if end is not None:
-            params["end"] = end
-
-        result = _kraken_request(
-            "/0/private/Ledgers", api_key, api_secret, params
-        )
-        ledger = result.get("ledger", {})
-        if not ledger:
-            break
-
-        for entry_id, entry_data in ledger.items():
-            entry_data["ledger_id"] = entry_id
-            all_entries.append(entry_data)
-
-        count = result.get("count", 0)
-        offset += len(ledger)
-        if offset >= count:
-            break
+    """Fetch all closed trades, newest first, resuming from ``cache_path`` when given."""
+    return _fetch_history(
+        "/0/private/TradesHistory", "trades", "trade_id",
+        api_key, api_secret, start, end, cache_path, workers, window_days, tier,
+    )
 
-        time.sleep(1)
 
-    return all_entries
+def fetch_ledger(
+    api_key: str,
+    api_secret: str,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    cache_path: Optional[str] = None,
+    workers: int = DEFAULT_WORKERS,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    tier: str = "starter",
+) -> List[Dict[str, Any]]:
+    """Fetch all ledger entries, newest first, resuming from ``cache_path`` when given."""
+    return _fetch_history(
+        "/0/private/Ledgers", "ledger", "ledger_id",
+        api_key, api_secret, start, end, cache_path, workers, window_days, tier,
+    )
 
 
 def _parse_pair(pair: str) -> tuple:
@@ -218,7 +455,36 @@ def main() -> None:
         default=None,
         help="Filter trades to a specific tax year (e.g., 2025)",
     )
+    parser.add_argument(
+        "--cache",
+        default=DEFAULT_CACHE_PATH,
+        help=f"SQLite page cache; settled windows are not refetched (default: {DEFAULT_CACHE_PATH}, '' disables)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent time windows (default: {DEFAULT_WORKERS}); more than 1 needs a nonce window on the API key",
+    )
+    parser.add_argument(
+        "--window-days",
+        type=int,
+        default=DEFAULT_WINDOW_DAYS,
+        help=f"Days per fetch window (default: {DEFAULT_WINDOW_DAYS})",
+    )
+    parser.add_argument(
+        "--api-tier",
+        choices=sorted(API_TIERS),
+        default="starter",
+        help="Kraken verification tier; sizes the API rate limiter (default: starter)",
+    )
     args = parser.parse_args()
+    fetch_options = {
+        "cache_path": args.cache or None,
+        "workers": args.workers,
+        "window_days": args.window_days,
+        "tier": args.api_tier,
+    }
 
     start_ts = None
     end_ts = None
@@ -234,13 +500,13 @@ def main() -> None:
 
     print(f"Fetching trades from Kraken API...")
     raw_trades = fetch_trades(
-        args.api_key, args.api_secret, start=start_ts, end=end_ts
+        args.api_key, args.api_secret, start=start_ts, end=end_ts, **fetch_options
     )
     print(f"  Fetched {len(raw_trades)} raw trades")
 
     print(f"Fetching ledger entries from Kraken API...")
     raw_ledger = fetch_ledger(
-        args.api_key, args.api_secret, start=start_ts, end=end_ts
+        args.api_key, args.api_secret, start=start_ts, end=end_ts, **fetch_options
     )
     print(f"  Fetched {len(raw_ledger)} ledger entries")
 
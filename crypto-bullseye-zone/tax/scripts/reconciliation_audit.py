@@ -5,9 +5,11 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from common import find_value, load_records, parse_dt, stable_id, to_float, write_json
 
@@ -86,12 +88,112 @@ def match_records(a: Dict[str, Any], b: Dict[str, Any], tolerance_seconds: int =
     return True
 
 
+QUANTITY_TOLERANCE = 1e-8
+
+
+def _quantity(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def _quantity_key(quantity: float) -> int:
+    return math.floor(quantity / QUANTITY_TOLERANCE)
+
+
+class MatchIndex:
+    """Unmatched comparison rows indexed by asset, quantity bucket and disposal time.
+
+    Timestamps and quantities are parsed once. Within an asset, rows are grouped
+    into quantity buckets one tolerance wide and each bucket keeps its timed rows
+    sorted, so a lookup bisects a time window instead of scanning every row.
+    ``take`` returns the lowest-index row that ``match_records`` would accept,
+    which is the row the original linear scan picked.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], tolerance_seconds: int = 86400) -> None:
+        self.tolerance_seconds = tolerance_seconds
+        self.remaining = len(rows)
+        self._matched = [False] * len(rows)
+        self._ts: List[Optional[float]] = []
+        self._qty: List[Optional[float]] = []
+        # asset -> quantity key (None for missing quantity) -> (sorted [(ts, idx)], [idx without ts])
+        self._buckets: Dict[str, Dict[Optional[int], Tuple[List[Tuple[float, int]], List[int]]]] = {}
+        for idx, row in enumerate(rows):
+            ts = _ts(row.get("disposed_at"))
+            qty = _quantity(row.get("quantity"))
+            self._ts.append(ts)
+            self._qty.append(qty)
+            asset = (row.get("asset") or "").upper()
+            key = _quantity_key(qty) if qty is not None else None
+            timed, untimed = self._buckets.setdefault(asset, {}).setdefault(key, ([], []))
+            if ts is None:
+                untimed.append(idx)
+            else:
+                timed.append((ts, idx))
+        for groups in self._buckets.values():
+            for timed, _ in groups.values():
+                timed.sort()
+
+    def _groups(self, asset: str, qty: Optional[float]) -> Iterable[Tuple[List[Tuple[float, int]], List[int]]]:
+        groups = self._buckets.get(asset)
+        if not groups:
+            return []
+        if qty is None:
+            return list(groups.values())
+        key = _quantity_key(qty)
+        # Float rounding can push a match one bucket further than the tolerance implies.
+        keys = (None, key - 2, key - 1, key, key + 1, key + 2)
+        return [groups[k] for k in keys if k in groups]
+
+    def _accepts(self, idx: int, qty: Optional[float], ts: Optional[float]) -> bool:
+        qb = self._qty[idx]
+        if qty is not None and qb is not None and abs(qty - qb) > QUANTITY_TOLERANCE:
+            return False
+        tb = self._ts[idx]
+        if ts is not None and tb is not None and abs(ts - tb) > self.tolerance_seconds:
+            return False
+        return True
+
+    def take(self, record: Dict[str, Any]) -> Optional[int]:
+        """Remove and return the index of the first unmatched row matching ``record``."""
+        asset = (record.get("asset") or "").upper()
+        qty = _quantity(record.get("quantity"))
+        ts = _ts(record.get("disposed_at"))
+        best: Optional[int] = None
+        for timed, untimed in self._groups(asset, qty):
+            if ts is None:
+                window = timed
+            else:
+                lo = bisect_left(timed, (ts - self.tolerance_seconds - 1, -1))
+                hi = bisect_right(timed, (ts + self.tolerance_seconds + 1, len(self._matched)))
+                window = timed[lo:hi]
+            for idx in [idx for _, idx in window] + untimed:
+                if (best is None or idx < best) and self._accepts(idx, qty, ts):
+                    best = idx
+        if best is not None:
+            self._remove(asset, best)
+        return best
+
+    def _remove(self, asset: str, idx: int) -> None:
+        self._matched[idx] = True
+        self.remaining -= 1
+        qty = self._qty[idx]
+        timed, untimed = self._buckets[asset][_quantity_key(qty) if qty is not None else None]
+        ts = self._ts[idx]
+        if ts is None:
+            untimed.remove(idx)
+        else:
+            del timed[bisect_left(timed, (ts, idx))]
+
+    def unmatched(self) -> List[int]:
+        return [idx for idx, matched in enumerate(self._matched) if not matched]
+
+
 def audit(
     resolved_rows: List[Dict[str, Any]],
     tax_rows: List[Dict[str, Any]],
     tolerance_seconds: int = 86400,
 ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
-    unmatched_tax: Set[int] = set(range(len(tax_rows)))
+    index = MatchIndex(tax_rows, tolerance_seconds=tolerance_seconds)
     exceptions: List[Dict[str, Any]] = []
     matched = 0
     unmatched_count = 0
@@ -101,14 +203,9 @@ def audit(
     gain_delta_total = 0.0
 
     for resolved in resolved_rows:
-        matched_pair = None
-        for idx in list(unmatched_tax):
-            tax = tax_rows[idx]
-            if match_records(resolved, tax, tolerance_seconds=tolerance_seconds):
-                matched_pair = (idx, tax)
-                break
-
-        if matched_pair is None:
+        idx = index.take(resolved)
+
+        if idx is None:
             unmatched_count += 1
             exceptions.append(
                 {
@@ -123,8 +220,7 @@ def audit(
             )
             continue
 
-        idx, tax = matched_pair
-        unmatched_tax.remove(idx)
+        tax = tax_rows[idx]
         matched += 1
 
         proceeds_delta = (resolved.get("proceeds_usd") or 0.0) - (tax.get("proceeds_usd") or 0.0)
@@ -152,7 +248,7 @@ def audit(
                 }
             )
 
-    for idx in unmatched_tax:
+    for idx in index.unmatched():
         tax = tax_rows[idx]
         unmatched_count += 1
         exceptions.append(
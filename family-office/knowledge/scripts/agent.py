@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 import os
 import re
@@ -18,6 +19,7 @@ import psycopg
 import requests
 
 from affiliates_webhook import fire_reward_webhook
+from knowledge_index import Bm25Index, tokenize
 import team_memory
 
 DEFAULT_DRY_RUN = True
@@ -45,6 +47,9 @@ STORAGE_COLLECTIONS = {
     "memory_nudges",
     "engagement_events",
 }
+# Text searched by LiveStorageConnector; also the expression behind its tsvector and trigram indexes.
+SEARCH_TEXT_SQL = "(COALESCE(title, '') || ' ' || COALESCE(summary, '') || ' ' || COALESCE(content, '') || ' ' || COALESCE(topic, ''))"
+SEARCH_CONFIG = "english"
 
 
 def parse_args() -> argparse.Namespace:
@@ -114,7 +119,7 @@ def _text_blob(payload: Any) -> str:
 
 
 def _tokenize(text: str) -> list[str]:
-    return [part for part in re.split(r"[^a-z0-9]+", text.lower()) if part]
+    return tokenize(text)
 
 
 def _topic_terms(topic: str) -> set[str]:
@@ -162,10 +167,33 @@ def _is_live_mode(config: dict[str, Any]) -> bool:
 
 
 class StorageConnector:
-    """In-memory storage adapter used as a local fallback."""
+    """In-memory storage adapter used as a local fallback.
+
+    Text queries are ranked with a per-collection BM25 index that is built on
+    first use and kept current by ``upsert``; only the returned page is copied.
+    """
 
     def __init__(self, records: dict[str, list[dict[str, Any]]] | None):
         self.records = deepcopy(records or {})
+        self._indexes: dict[str, Bm25Index] = {}
+        self._positions: dict[str, dict[Any, int]] = {}
+
+    def _index(self, collection: str) -> Bm25Index:
+        index = self._indexes.get(collection)
+        if index is None:
+            index = Bm25Index(self.records.get(collection, []), text_of=_text_blob)
+            self._indexes[collection] = index
+        return index
+
+    def _position_of(self, collection: str, record_id: Any) -> int | None:
+        positions = self._positions.get(collection)
+        if positions is None:
+            positions = {}
+            for position, item in enumerate(self.records.get(collection, [])):
+                if item.get("id"):
+                    positions.setdefault(item["id"], position)
+            self._positions[collection] = positions
+        return positions.get(record_id)
 
     def query(
         self,
@@ -177,43 +205,62 @@ class StorageConnector:
         descending: bool = True,
         sort_field: str = "updated_at",
     ) -> dict[str, Any]:
-        items = [deepcopy(item) for item in self.records.get(collection, [])]
+        items = self.records.get(collection, [])
         filters = filters or {}
-        filtered = [item for item in items if all(item.get(key) == value for key, value in filters.items())]
+
+        def _matches(item: dict[str, Any]) -> bool:
+            return all(item.get(key) == value for key, value in filters.items())
+
         if query_text:
-            scored: list[tuple[int, dict[str, Any]]] = []
-            for item in filtered:
-                score = _match_score(item, query_text)
-                if score > 0:
-                    candidate = deepcopy(item)
-                    candidate["match_score"] = score
-                    scored.append((score, candidate))
-            scored.sort(key=lambda pair: (pair[0], pair[1].get(sort_field, "")), reverse=True)
-            filtered = [item for _, item in scored]
+            if _topic_terms(query_text):
+                scores = self._index(collection).scores(query_text)
+            else:
+                scores = dict.fromkeys(range(len(items)), 1)
+            scored = [(score, items[slot]) for slot, score in scores.items() if _matches(items[slot])]
+
+            def rank(pair: tuple[float, dict[str, Any]]) -> tuple[Any, Any]:
+                return pair[0], pair[1].get(sort_field, "")
+
+            if top_k is None:
+                ranked = sorted(scored, key=rank, reverse=True)
+            else:
+                ranked = heapq.nlargest(top_k, scored, key=rank)
+            selected = []
+            for score, item in ranked:
+                candidate = deepcopy(item)
+                candidate["match_score"] = score
+                selected.append(candidate)
         else:
+            filtered = [item for item in items if _matches(item)]
             filtered.sort(key=lambda item: item.get(sort_field, ""), reverse=descending)
-        if top_k is not None:
-            filtered = filtered[:top_k]
+            if top_k is not None:
+                filtered = filtered[:top_k]
+            selected = [deepcopy(item) for item in filtered]
         return {
             "status": "ok",
             "connector": "storage",
             "action": "query",
             "collection": collection,
-            "records": filtered,
+            "records": selected,
         }
 
     def upsert(self, collection: str, record: dict[str, Any]) -> dict[str, Any]:
         items = self.records.setdefault(collection, [])
         record_id = record.get("id")
-        updated = False
-        if record_id:
-            for index, existing in enumerate(items):
-                if existing.get("id") == record_id:
-                    items[index] = deepcopy(record)
-                    updated = True
-                    break
-        if not updated:
-            items.append(deepcopy(record))
+        stored = deepcopy(record)
+        position = self._position_of(collection, record_id) if record_id else None
+        updated = position is not None
+        index = self._indexes.get(collection)
+        if position is not None:
+            items[position] = stored
+            if index is not None:
+                index.update(position, stored)
+        else:
+            items.append(stored)
+            if record_id:
+                self._positions[collection][record_id] = len(items) - 1
+            if index is not None:
+                index.add(stored)
         return {
             "status": "ok",
             "connector": "storage",
@@ -223,6 +270,9 @@ class StorageConnector:
             "updated": updated,
         }
 
+    def upsert_many(self, collection: str, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [self.upsert(collection, record) for record in records]
+
     def snapshot(self) -> dict[str, list[dict[str, Any]]]:
         return deepcopy(self.records)
 
@@ -498,7 +548,7 @@ class LiveStorageConnector:
         try:
             with self.conn.cursor() as cur:
                 cur.execute(
-                    """
+                    f"""
                     CREATE TABLE IF NOT EXISTS knowledge_records (
                         collection TEXT NOT NULL,
                         id TEXT NOT NULL,
@@ -521,11 +571,33 @@ class LiveStorageConnector:
                     );
                     CREATE INDEX IF NOT EXISTS idx_knowledge_records_collection_org_dept
                         ON knowledge_records (collection, organization_name, department);
+                    ALTER TABLE knowledge_records ADD COLUMN IF NOT EXISTS search_document tsvector
+                        GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}'::regconfig, {SEARCH_TEXT_SQL})) STORED;
+                    CREATE INDEX IF NOT EXISTS idx_knowledge_records_search_document
+                        ON knowledge_records USING GIN (search_document);
                     """
                 )
             self.conn.commit()
         except psycopg.errors.UniqueViolation:
             self.conn.rollback()
+        self.trigram_enabled = self._ensure_trigram_index()
+
+    def _ensure_trigram_index(self) -> bool:
+        """Enable pg_trgm fuzzy matching; returns False when the extension is unavailable."""
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                cur.execute(
+                    f"""
+                    CREATE INDEX IF NOT EXISTS idx_knowledge_records_search_trgm
+                        ON knowledge_records USING GIN ({SEARCH_TEXT_SQL} gin_trgm_ops)
+                    """
+                )
+            self.conn.commit()
+        except psycopg.Error:
+            self.conn.rollback()
+            return False
+        return True
 
     def query(
         self,
@@ -549,96 +621,167 @@ class LiveStorageConnector:
             if value is not None:
                 clauses.append(f"{field} = %s")
                 params.append(value)
-        if query_text:
-            clauses.append("(COALESCE(title, '') || ' ' || COALESCE(summary, '') || ' ' || COALESCE(content, '') || ' ' || COALESCE(topic, '')) ILIKE %s")
-            params.append(f"%{query_text}%")
-        limit_clause = ""
-        if top_k is not None:
-            limit_clause = " LIMIT %s"
-            params.append(top_k)
-        sql = f"""
-            SELECT payload
-            FROM knowledge_records
-            WHERE {' AND '.join(clauses)}
-            ORDER BY {order_column} {order_direction}, id ASC
-            {limit_clause}
-        """
-        with self.conn.cursor() as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchall()
+        order_by = f"{order_column} {order_direction}, id ASC"
+        if not query_text:
+            rows = self._select(clauses, params, order_by=order_by, top_k=top_k)
+        else:
+            # Ranked full-text match first; fall back to fuzzy trigram matching for typos and partial words.
+            rows = self._select(
+                [*clauses, f"search_document @@ websearch_to_tsquery('{SEARCH_CONFIG}', %s)"],
+                [*params, query_text],
+                score_sql=f"ts_rank_cd(search_document, websearch_to_tsquery('{SEARCH_CONFIG}', %s))",
+                score_params=[query_text],
+                order_by=order_by,
+                top_k=top_k,
+            )
+            if not rows and self.trigram_enabled:
+                rows = self._select(
+                    [*clauses, f"%s <%% {SEARCH_TEXT_SQL}"],
+                    [*params, query_text],
+                    score_sql=f"word_similarity(%s, {SEARCH_TEXT_SQL})",
+                    score_params=[query_text],
+                    order_by=order_by,
+                    top_k=top_k,
+                )
+            elif not rows:
+                rows = self._select(
+                    [*clauses, f"{SEARCH_TEXT_SQL} ILIKE %s"],
+                    [*params, f"%{query_text}%"],
+                    order_by=order_by,
+                    top_k=top_k,
+                )
+        records = []
+        for payload, score in rows:
+            record = deepcopy(payload)
+            if score is not None:
+                record["match_score"] = float(score)
+            records.append(record)
         return {
             "status": "ok",
             "connector": "storage",
             "action": "query",
             "collection": collection,
-            "records": [deepcopy(row[0]) for row in rows],
+            "records": records,
         }
 
+    def _select(
+        self,
+        clauses: list[str],
+        params: list[Any],
+        *,
+        order_by: str,
+        top_k: int | None,
+        score_sql: str | None = None,
+        score_params: list[Any] | None = None,
+    ) -> list[tuple[Any, Any]]:
+        score_column = score_sql or "NULL"
+        ordering = f"score DESC, {order_by}" if score_sql else order_by
+        limit_clause = " LIMIT %s" if top_k is not None else ""
+        sql = f"""
+            SELECT payload, {score_column} AS score
+            FROM knowledge_records
+            WHERE {' AND '.join(clauses)}
+            ORDER BY {ordering}
+            {limit_clause}
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(sql, [*(score_params or []), *params, *([top_k] if top_k is not None else [])])
+            return cur.fetchall()
+
     def upsert(self, collection: str, record: dict[str, Any]) -> dict[str, Any]:
-        payload = deepcopy(record)
+        return self.upsert_many(collection, [record])[0]
+
+    def upsert_many(self, collection: str, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Upsert records in one transaction, sent as a single pipelined batch."""
+        if not records:
+            return []
+        payloads = [deepcopy(record) for record in records]
+        rows = [
+            {
+                "collection": collection,
+                "id": str(record.get("id")),
+                "organization_name": record.get("organization_name"),
+                "department": record.get("department"),
+                "topic": record.get("topic"),
+                "owner_id": record.get("owner_id"),
+                "requester_id": record.get("requester_id"),
+                "access_scope": record.get("access_scope"),
+                "title": record.get("title"),
+                "headline": record.get("headline"),
+                "summary": record.get("summary"),
+                "content": record.get("content"),
+                "source": record.get("source"),
+                "stale_after_days": record.get("stale_after_days"),
+                "created_at": _parse_iso_date(record.get("created_at")),
+                "updated_at": _parse_iso_date(record.get("updated_at")),
+                "payload": _to_json_text(payload),
+            }
+            for record, payload in zip(records, payloads)
+        ]
+        try:
+            with self.conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO knowledge_records (
+                        collection, id, organization_name, department, topic, owner_id, requester_id,
+                        access_scope, title, headline, summary, content, source, stale_after_days,
+                        created_at, updated_at, payload
+                    ) VALUES (
+                        %(collection)s, %(id)s, %(organization_name)s, %(department)s, %(topic)s, %(owner_id)s, %(requester_id)s,
+                        %(access_scope)s, %(title)s, %(headline)s, %(summary)s, %(content)s, %(source)s, %(stale_after_days)s,
+                        %(created_at)s, %(updated_at)s, %(payload)s::jsonb
+                    )
+                    ON CONFLICT (collection, id) DO UPDATE SET
+                        organization_name = EXCLUDED.organization_name,
+                        department = EXCLUDED.department,
+                        topic = EXCLUDED.topic,
+                        owner_id = EXCLUDED.owner_id,
+                        requester_id = EXCLUDED.requester_id,
+                        access_scope = EXCLUDED.access_scope,
+                        title = EXCLUDED.title,
+                        headline = EXCLUDED.headline,
+                        summary = EXCLUDED.summary,
+                        content = EXCLUDED.content,
+                        source = EXCLUDED.source,
+                        stale_after_days = EXCLUDED.stale_after_days,
+                        created_at = EXCLUDED.created_at,
+                        updated_at = EXCLUDED.updated_at,
+                        payload = EXCLUDED.payload
+                    """,
+                    rows,
+                )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return [
+            {
+                "status": "ok",
+                "connector": "storage",
+                "action": "upsert",
+                "collection": collection,
+                "record": payload,
+                "updated": True,
+            }
+            for payload in payloads
+        ]
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        collections = sorted(STORAGE_COLLECTIONS)
         with self.conn.cursor() as cur:
             cur.execute(
                 """
-                INSERT INTO knowledge_records (
-                    collection, id, organization_name, department, topic, owner_id, requester_id,
-                    access_scope, title, headline, summary, content, source, stale_after_days,
-                    created_at, updated_at, payload
-                ) VALUES (
-                    %(collection)s, %(id)s, %(organization_name)s, %(department)s, %(topic)s, %(owner_id)s, %(requester_id)s,
-                    %(access_scope)s, %(title)s, %(headline)s, %(summary)s, %(content)s, %(source)s, %(stale_after_days)s,
-                    %(created_at)s, %(updated_at)s, %(payload)s::jsonb
-                )
-                ON CONFLICT (collection, id) DO UPDATE SET
-                    organization_name = EXCLUDED.organization_name,
-                    department = EXCLUDED.department,
-                    topic = EXCLUDED.topic,
-                    owner_id = EXCLUDED.owner_id,
-                    requester_id = EXCLUDED.requester_id,
-                    access_scope = EXCLUDED.access_scope,
-                    title = EXCLUDED.title,
-                    headline = EXCLUDED.headline,
-                    summary = EXCLUDED.summary,
-                    content = EXCLUDED.content,
-                    source = EXCLUDED.source,
-                    stale_after_days = EXCLUDED.stale_after_days,
-                    created_at = EXCLUDED.created_at,
-                    updated_at = EXCLUDED.updated_at,
-                    payload = EXCLUDED.payload
+                SELECT collection, jsonb_agg(payload ORDER BY updated_at DESC, id ASC)
+                FROM knowledge_records
+                WHERE collection = ANY(%s)
+                GROUP BY collection
                 """,
-                {
-                    "collection": collection,
-                    "id": str(record.get("id")),
-                    "organization_name": record.get("organization_name"),
-                    "department": record.get("department"),
-                    "topic": record.get("topic"),
-                    "owner_id": record.get("owner_id"),
-                    "requester_id": record.get("requester_id"),
-                    "access_scope": record.get("access_scope"),
-                    "title": record.get("title"),
-                    "headline": record.get("headline"),
-                    "summary": record.get("summary"),
-                    "content": record.get("content"),
-                    "source": record.get("source"),
-                    "stale_after_days": record.get("stale_after_days"),
-                    "created_at": _parse_iso_date(record.get("created_at")),
-                    "updated_at": _parse_iso_date(record.get("updated_at")),
-                    "payload": _to_json_text(payload),
-                },
+                (collections,),
             )
-        self.conn.commit()
-        return {
-            "status": "ok",
-            "connector": "storage",
-            "action": "upsert",
-            "collection": collection,
-            "record": payload,
-            "updated": True,
+            grouped = {collection: records for collection, records in cur.fetchall()}
+        snapshot: dict[str, list[dict[str, Any]]] = {
+            collection: list(grouped.get(collection) or []) for collection in collections
         }
-
-    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
-        snapshot: dict[str, list[dict[str, Any]]] = {}
-        for collection in sorted(STORAGE_COLLECTIONS):
-            snapshot[collection] = self.query(collection)["records"]
         snapshot["_meta"] = [
             {
                 "project_id": self.project_id,
@@ -855,7 +998,7 @@ def archive_transcript(storage: StorageConnector | LiveStorageConnector, request
 
 
 def persist_knowledge_entries(storage: StorageConnector | LiveStorageConnector, entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    return [storage.upsert("knowledge_entries", entry) for entry in entries]
+    return storage.upsert_many("knowledge_entries", entries)
 
 
 def retrieve_candidate_entries(storage: StorageConnector | LiveStorageConnector, request: dict[str, Any]) -> dict[str, Any]:
@@ -1087,8 +1230,7 @@ def run_once(config: dict[str, Any], dry_run: bool) -> dict[str, Any]:
 
         # --- Team Memory: distill structured memory objects from entries ---
         memory_objects = team_memory.distill_structured_memories(knowledge_entries, request)
-        for mem in memory_objects:
-            storage.upsert("memory_objects", mem)
+        storage.upsert_many("memory_objects", memory_objects)
 
         # --- Load existing memories for resurfacing/digest/validation ---
         all_memories_response = storage.query("memory_objects", filters={"organization_name": request["organization_name"]})
@@ -1116,9 +1258,13 @@ def run_once(config: dict[str, Any], dry_run: bool) -> dict[str, Any]:
         proactive_memories: list[dict[str, Any]] = []
         if request["mode"] == "retrieve" and all_memories:
             proactive_memories = team_memory.find_memories_to_resurface(all_memories, request["query_text"] or request["topic"], request["current_date"])
-            for mem in proactive_memories:
-                event = team_memory.build_engagement_event(event_type="reuse", memory_id=mem.get("id", ""), user_id=request["requester_id"], current_date=request["current_date"])
-                storage.upsert("engagement_events", event)
+            storage.upsert_many(
+                "engagement_events",
+                [
+                    team_memory.build_engagement_event(event_type="reuse", memory_id=mem.get("id", ""), user_id=request["requester_id"], current_date=request["current_date"])
+                    for mem in proactive_memories
+                ],
+            )
 
         candidate_entries = retrieve_candidate_entries(storage, request)
         if request["mode"] == "capture":
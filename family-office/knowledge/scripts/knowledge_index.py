@@ -0,0 +1,101 @@
+"""In-process BM25 inverted index for the local knowledge storage connector.
+
+Documents are addressed by their slot in a collection's record list. Each
+slot's term frequencies are computed once per record version (on ``add`` or
+``update``), so queries only walk the postings of the query terms.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, Iterable
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    return [part for part in _TOKEN_SPLIT.split(text.lower()) if part]
+
+
+class Bm25Index:
+    """Okapi BM25 over a mutable list of records.
+
+    ``text_of`` turns a record into the text that is indexed. A record matches
+    a query when it contains at least one query term, the same rule as the
+    term-overlap scan this replaces; BM25 only changes how matches are ranked.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[dict[str, Any]],
+        *,
+        text_of: Callable[[dict[str, Any]], str],
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ) -> None:
+        self.text_of = text_of
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[int, int]] = {}
+        self._terms: list[Counter[str]] = []
+        self._lengths: list[int] = []
+        self._total_length = 0
+        for record in records:
+            self.add(record)
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def _index(self, slot: int, record: dict[str, Any]) -> None:
+        terms = Counter(tokenize(self.text_of(record)))
+        self._terms[slot] = terms
+        length = sum(terms.values())
+        self._lengths[slot] = length
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[slot] = frequency
+
+    def _unindex(self, slot: int) -> None:
+        for term in self._terms[slot]:
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths[slot]
+
+    def add(self, record: dict[str, Any]) -> int:
+        """Index a record appended to the end of the list and return its slot."""
+        self._terms.append(Counter())
+        self._lengths.append(0)
+        slot = len(self._lengths) - 1
+        self._index(slot, record)
+        return slot
+
+    def update(self, slot: int, record: dict[str, Any]) -> None:
+        """Re-index ``slot`` after its record was replaced by a new version."""
+        self._unindex(slot)
+        self._index(slot, record)
+
+    def scores(self, query_text: str) -> dict[int, float]:
+        """Return BM25 scores for every slot containing at least one query term."""
+        count = len(self._lengths)
+        if not count:
+            return {}
+        average_length = (self._total_length / count) or 1.0
+        lengths = self._lengths
+        k1 = self.k1
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query_text)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1.0 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for slot, frequency in postings.items():
+                norm = k1 * (1.0 - self.b + self.b * lengths[slot] / average_length)
+                scores[slot] = scores.get(slot, 0.0) + idf * frequency * (k1 + 1.0) / (frequency + norm)
+        return scores
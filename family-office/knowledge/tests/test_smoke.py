@@ -147,7 +147,8 @@ def test_retrieve_workflow_applies_access_and_freshness_and_logs_event(monkeypat
     freshness = {entry["id"]: entry["freshness"] for entry in result["retrieval_results"]["records"]}
 
     assert result["normalized_request"]["mode"] == "retrieve"
-    assert result_ids == ["entry-fresh", "entry-stale"]
+    # BM25 ranks the stale note first: it repeats "tax strategy" in its summary.
+    assert result_ids == ["entry-stale", "entry-fresh"]
     assert freshness["entry-fresh"] == "fresh"
     assert freshness["entry-stale"] == "stale"
     assert len(result["storage_state"]["retrieval_events"]) == 1
@@ -231,6 +232,31 @@ def test_diff_workflow_compares_current_brief_against_first_brief() -> None:
     assert {"field": "priorities", "change": "added", "value": "Close Fund IV anchor"} in changes
 
 
+def test_storage_query_ranks_with_bm25_index_kept_current_by_upsert() -> None:
+    agent = _load_agent_module()
+    records = [
+        {"id": f"entry-{i}", "department": "investments" if i % 2 else "ops", "summary": f"note {i}", "updated_at": "2026-03-01"}
+        for i in range(50)
+    ]
+    records[3]["summary"] = "trust distribution schedule"
+    records[7]["summary"] = "trust trust distribution"
+    storage = agent.StorageConnector({"knowledge_entries": records})
+
+    response = storage.query("knowledge_entries", filters={"department": "investments"}, query_text="trust distribution", top_k=5)
+    assert [record["id"] for record in response["records"]] == ["entry-7", "entry-3"]
+    assert response["records"][0]["match_score"] > response["records"][1]["match_score"]
+
+    response["records"][0]["summary"] = "mutated by caller"
+    storage.upsert("knowledge_entries", {"id": "entry-3", "department": "investments", "summary": "trust", "updated_at": "2026-03-02"})
+    storage.upsert("knowledge_entries", {"id": "entry-99", "department": "investments", "summary": "distribution waterfall"})
+
+    ranked = storage.query("knowledge_entries", query_text="distribution")["records"]
+    assert [record["id"] for record in ranked] == ["entry-99", "entry-7"]
+    assert storage.query("knowledge_entries", query_text="schedule")["records"] == []
+    assert storage.snapshot()["knowledge_entries"][7]["summary"] == "trust trust distribution"
+    assert len(storage.snapshot()["knowledge_entries"]) == 51
+
+
 def test_live_storage_uses_direct_connection_string_without_gateway_bootstrap(monkeypatch) -> None:
     agent = _load_agent_module()
 
@@ -296,3 +322,88 @@ def test_live_storage_uses_direct_connection_string_without_gateway_bootstrap(mo
         assert storage.snapshot()["_meta"] == [{"project_id": "", "branch_id": "", "database_name": "knowledge"}]
     finally:
         storage.close()
+
+
+def test_live_storage_ranks_full_text_with_trigram_fallback_and_batches_writes(monkeypatch) -> None:
+    agent = _load_agent_module()
+
+    class RecordingCursor:
+        def __init__(self, conn: "RecordingConnection") -> None:
+            self.conn = conn
+            self.rows: list = []
+
+        def execute(self, sql: str, params=None) -> None:
+            text = " ".join(sql.split())
+            self.conn.statements.append((text, params))
+            self.rows = []
+            if "websearch_to_tsquery" in text and text.startswith("SELECT"):
+                self.rows = self.conn.fts_rows
+            elif "word_similarity" in text:
+                self.rows = [({"id": "fuzzy"}, 0.6)]
+            elif "jsonb_agg" in text:
+                self.rows = [("briefs", [{"id": "brief-1"}])]
+
+        def executemany(self, sql: str, rows) -> None:
+            self.conn.batches.append(list(rows))
+
+        def fetchall(self) -> list:
+            return self.rows
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb) -> None:
+            return None
+
+    class RecordingConnection:
+        def __init__(self) -> None:
+            self.statements: list = []
+            self.batches: list = []
+            self.commits = 0
+            self.fts_rows: list = [({"id": "ranked"}, 0.25)]
+
+        def cursor(self) -> RecordingCursor:
+            return RecordingCursor(self)
+
+        def commit(self) -> None:
+            self.commits += 1
+
+        def rollback(self) -> None:
+            return None
+
+        def close(self) -> None:
+            return None
+
+    conn = RecordingConnection()
+    monkeypatch.setattr(agent.psycopg, "connect", lambda _dsn: conn)
+    config = {"storage": {"mode": "serendb", "connection_string": "postgresql://example/knowledge"}}
+    storage = agent.LiveStorageConnector(config, {"organization_name": "Rendero Trust"}, object())
+
+    assert storage.trigram_enabled
+    schema = " ".join(statement for statement, _ in conn.statements)
+    assert "search_document tsvector GENERATED ALWAYS AS" in schema
+    assert "USING GIN (search_document)" in schema
+    assert "gin_trgm_ops" in schema
+
+    ranked = storage.query("knowledge_entries", filters={"department": "investments"}, query_text="tax strategy", top_k=3)
+    assert ranked["records"] == [{"id": "ranked", "match_score": 0.25}]
+    sql, params = conn.statements[-1]
+    assert "ORDER BY score DESC, updated_at DESC, id ASC" in sql
+    assert params == ["tax strategy", "knowledge_entries", "investments", "tax strategy", 3]
+
+    conn.fts_rows = []
+    fuzzy = storage.query("knowledge_entries", query_text="tax stratgy")
+    assert fuzzy["records"] == [{"id": "fuzzy", "match_score": 0.6}]
+    assert "word_similarity" in conn.statements[-1][0]
+
+    commits_before = conn.commits
+    writes = storage.upsert_many("knowledge_entries", [{"id": "a", "title": "A"}, {"id": "b", "title": "B"}])
+    assert [write["record"]["id"] for write in writes] == ["a", "b"]
+    assert [row["id"] for row in conn.batches[-1]] == ["a", "b"]
+    assert conn.commits == commits_before + 1
+
+    statements_before = len(conn.statements)
+    snapshot = storage.snapshot()
+    assert len(conn.statements) == statements_before + 1
+    assert snapshot["briefs"] == [{"id": "brief-1"}]
+    assert snapshot["knowledge_entries"] == []
@@ -37,7 +37,12 @@ def _load_normalizer_module():
     return module
 
 
-def _fetch_kraken_trades(api_key: str, api_secret: str, tax_year: Optional[int]) -> List[Dict[str, Any]]:
+def _fetch_kraken_trades(
+    api_key: str,
+    api_secret: str,
+    tax_year: Optional[int],
+    cache_path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
     """Fetch and normalize trades from Kraken API."""
     from kraken_api_fetcher import fetch_trades, normalize_trades
 
@@ -50,7 +55,7 @@ def _fetch_kraken_trades(api_key: str, api_secret: str, tax_year: Optional[int])
         end_ts = int(datetime(tax_year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
 
     print("Fetching trades from Kraken API...")
-    raw_trades = fetch_trades(api_key, api_secret, start=start_ts, end=end_ts)
+    raw_trades = fetch_trades(api_key, api_secret, start=start_ts, end=end_ts, cache_path=cache_path)
     print(f"  Fetched {len(raw_trades)} raw trades")
 
     normalized = normalize_trades(raw_trades)
@@ -65,6 +70,11 @@ def main() -> None:
     parser.add_argument("--kraken-api-key", default=None, help="Kraken API key for transaction verification")
     parser.add_argument("--kraken-api-secret", default=None, help="Kraken API secret for transaction verification")
     parser.add_argument("--tax-year", type=int, default=None, help="Tax year to filter Kraken API results")
+    parser.add_argument(
+        "--kraken-cache",
+        default="state/kraken_history.db",
+        help="SQLite cache of Kraken history pages; re-runs only fetch new trades ('' disables)",
+    )
     parser.add_argument("--output-dir", required=True, help="Output directory for JSON artifacts")
     args = parser.parse_args()
 
@@ -86,7 +96,12 @@ def main() -> None:
 
     if args.kraken_api_key and args.kraken_api_secret:
         # Kraken API verification mode
-        kraken_dispositions = _fetch_kraken_trades(args.kraken_api_key, args.kraken_api_secret, args.tax_year)
+        kraken_dispositions = _fetch_kraken_trades(
+            args.kraken_api_key,
+            args.kraken_api_secret,
+            args.tax_year,
+            cache_path=args.kraken_cache or None,
+        )
         comparison_rows = normalize_kraken_trades(kraken_dispositions)
         write_json(str(output_dir / "kraken_trades.json"), {
             "count": len(kraken_dispositions),
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""Stream an acquisition/disposal/transfer ledger through per-asset tax lots."""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from common import load_records, parse_dt, stable_id, to_float, write_json
+
+
+METHODS = ("fifo", "lifo", "hifo", "specific_id")
+STATE_VERSION = 1
+LONG_TERM_DAYS = 365
+QUANTITY_EPSILON = 1e-12
+
+ACQUIRE = "acquire"
+DISPOSE = "dispose"
+TRANSFER_IN = "transfer_in"
+TRANSFER_OUT = "transfer_out"
+EVENT_TYPES = (ACQUIRE, DISPOSE, TRANSFER_IN, TRANSFER_OUT)
+
+FIAT_CODES = ("USD", "EUR", "GBP", "CAD", "JPY", "AUD", "CHF")
+KRAKEN_ASSET_ALIASES = {"XBT": "BTC", "XDG": "DOGE"}
+# Kraken's legacy X/Z-prefixed codes. Only these lose their prefix: newer
+# listings such as ZETA, ZEUS or XTZ are already plain tickers.
+KRAKEN_LEGACY_ASSETS = {
+    "XXBT": "BTC",
+    "XETH": "ETH",
+    "XLTC": "LTC",
+    "XXRP": "XRP",
+    "XXLM": "XLM",
+    "XXMR": "XMR",
+    "XZEC": "ZEC",
+    "XETC": "ETC",
+    "XMLN": "MLN",
+    "XREP": "REP",
+    "XXDG": "DOGE",
+    "ZUSD": "USD",
+    "ZEUR": "EUR",
+    "ZGBP": "GBP",
+    "ZCAD": "CAD",
+    "ZJPY": "JPY",
+    "ZAUD": "AUD",
+}
+# Plain codes Kraken pairs are priced in. Longest first, so XBTUSDT splits at
+# USDT rather than USD.
+KRAKEN_PAIR_SUFFIXES = sorted(
+    list(FIAT_CODES) + ["XBT", "ETH", "USDT", "USDC", "DAI", "DOT"],
+    key=len,
+    reverse=True,
+)
+
+
+def _parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _holding_period(acquired_at: Optional[datetime], disposed_at: datetime) -> Optional[str]:
+    if acquired_at is None:
+        return None
+    return "long-term" if (disposed_at - acquired_at).days > LONG_TERM_DAYS else "short-term"
+
+
+class Lot:
+    """An open acquisition lot; ``remaining`` shrinks as disposals consume it."""
+
+    __slots__ = ("lot_id", "asset", "quantity", "remaining", "cost_usd", "acquired_at", "seq")
+
+    def __init__(
+        self,
+        lot_id: str,
+        asset: str,
+        quantity: float,
+        cost_usd: Optional[float],
+        acquired_at: Optional[str],
+        seq: int,
+        remaining: Optional[float] = None,
+    ) -> None:
+        self.lot_id = lot_id
+        self.asset = asset
+        self.quantity = quantity
+        self.remaining = quantity if remaining is None else remaining
+        self.cost_usd = cost_usd
+        self.acquired_at = acquired_at
+        self.seq = seq
+
+    @property
+    def unit_cost(self) -> Optional[float]:
+        if self.cost_usd is None or self.quantity <= 0:
+            return None
+        return self.cost_usd / self.quantity
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "lot_id": self.lot_id,
+            "asset": self.asset,
+            "quantity": self.quantity,
+            "remaining": self.remaining,
+            "cost_usd": self.cost_usd,
+            "acquired_at": self.acquired_at,
+            "seq": self.seq,
+        }
+
+
+class _AssetLots:
+    """Open lots for one asset, ordered for the chosen relief method.
+
+    FIFO keeps a deque; LIFO and HIFO keep heaps. Lots consumed out of order
+    (specific identification) are left in place and skipped once empty.
+    """
+
+    def __init__(self, method: str) -> None:
+        self.method = method
+        self.queue: Deque[Lot] = deque()
+        self.heap: List[Tuple[Tuple[Any, ...], Lot]] = []
+        self.by_id: Dict[str, Lot] = {}
+
+    def _key(self, lot: Lot) -> Tuple[Any, ...]:
+        if self.method == "lifo":
+            return (-lot.seq,)
+        unit_cost = lot.unit_cost
+        # HIFO: highest unit cost first; lots with unknown basis are relieved last.
+        return (unit_cost is None, -(unit_cost or 0.0), lot.seq)
+
+    def add(self, lot: Lot) -> None:
+        self.by_id[lot.lot_id] = lot
+        if self.method in ("lifo", "hifo"):
+            heapq.heappush(self.heap, (self._key(lot), lot))
+        else:
+            self.queue.append(lot)
+
+    def next_lot(self) -> Optional[Lot]:
+        if self.method in ("lifo", "hifo"):
+            while self.heap and self.heap[0][1].remaining <= QUANTITY_EPSILON:
+                heapq.heappop(self.heap)
+            return self.heap[0][1] if self.heap else None
+        while self.queue and self.queue[0].remaining <= QUANTITY_EPSILON:
+            self.queue.popleft()
+        return self.queue[0] if self.queue else None
+
+    def open_lots(self) -> List[Lot]:
+        return sorted(
+            (lot for lot in self.by_id.values() if lot.remaining > QUANTITY_EPSILON),
+            key=lambda lot: lot.seq,
+        )
+
+    def drop_empty(self, lot: Lot) -> None:
+        if lot.remaining <= QUANTITY_EPSILON:
+            self.by_id.pop(lot.lot_id, None)
+
+
+class TaxLotEngine:
+    """Relieve disposals against per-asset lot inventories in one pass.
+
+    Events must arrive in ``(timestamp, event_id)`` order (see ``sort_events``).
+    ``state()`` checkpoints the open lots and the last processed event so a
+    later run with new trades only processes events past that watermark.
+    """
+
+    def __init__(self, method: str = "fifo") -> None:
+        if method not in METHODS:
+            raise ValueError(f"Unsupported lot method: {method}")
+        self.method = method
+        self.assets: Dict[str, _AssetLots] = {}
+        self.seq = 0
+        self.watermark: Optional[Tuple[str, str]] = None
+        self.skipped_events = 0
+
+    def _lots(self, asset: str) -> _AssetLots:
+        lots = self.assets.get(asset)
+        if lots is None:
+            lots = self.assets[asset] = _AssetLots(self.method)
+        return lots
+
+    def _add_lot(self, event: Dict[str, Any]) -> None:
+        quantity = event["quantity"]
+        self.seq += 1
+        acquired_at = event.get("acquired_at")
+        if acquired_at is None and event["type"] == ACQUIRE:
+            acquired_at = event["timestamp"]
+        # A transfer in carries the original lot's basis and date when the ledger
+        # supplies them; otherwise both stay unknown rather than restarting the
+        # holding period at the arrival date.
+        lot = Lot(
+            lot_id=event.get("lot_id") or event["event_id"],
+            asset=event["asset"],
+            quantity=quantity,
+            cost_usd=event.get("cost_usd"),
+            acquired_at=acquired_at,
+            seq=self.seq,
+        )
+        self._lots(event["asset"]).add(lot)
+
+    def _relieve(self, event: Dict[str, Any]) -> Tuple[List[Tuple[Lot, float]], float]:
+        """Consume ``event['quantity']`` from open lots; return (lot, qty) splits and any shortfall."""
+        lots = self._lots(event["asset"])
+        needed = event["quantity"]
+        splits: List[Tuple[Lot, float]] = []
+
+        for lot_id in event.get("lot_ids") or ():
+            if needed <= QUANTITY_EPSILON:
+                break
+            lot = lots.by_id.get(lot_id)
+            if lot is None or lot.remaining <= QUANTITY_EPSILON:
+                continue
+            take = min(lot.remaining, needed)
+            lot.remaining -= take
+            needed -= take
+            splits.append((lot, take))
+            lots.drop_empty(lot)
+
+        while needed > QUANTITY_EPSILON:
+            lot = lots.next_lot()
+            if lot is None:
+                break
+            take = min(lot.remaining, needed)
+            lot.remaining -= take
+            needed -= take
+            splits.append((lot, take))
+            lots.drop_empty(lot)
+
+        return splits, max(needed, 0.0)
+
+    def _dispose(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        disposed_at = _parse_ts(event["timestamp"])
+        quantity = event["quantity"]
+        proceeds = event.get("proceeds_usd")
+        splits, shortfall = self._relieve(event)
+
+        lot_rows: List[Dict[str, Any]] = []
+        basis_total = 0.0
+        basis_complete = shortfall <= QUANTITY_EPSILON
+        periods = set()
+        for lot, take in splits:
+            basis = lot.cost_usd * take / lot.quantity if lot.cost_usd is not None else None
+            lot_proceeds = proceeds * take / quantity if proceeds is not None and quantity > 0 else None
+            period = _holding_period(_parse_ts(lot.acquired_at) if lot.acquired_at else None, disposed_at)
+            if basis is None:
+                basis_complete = False
+            else:
+                basis_total += basis
+            periods.add(period)
+            lot_rows.append(
+                {
+                    "lot_id": lot.lot_id,
+                    "acquired_at": lot.acquired_at,
+                    "quantity": take,
+                    "cost_basis_usd": basis,
+                    "proceeds_usd": lot_proceeds,
+                    "gain_loss_usd": lot_proceeds - basis if lot_proceeds is not None and basis is not None else None,
+                    "holding_period": period,
+                }
+            )
+
+        cost_basis = basis_total if basis_complete else None
+        if shortfall > QUANTITY_EPSILON:
+            periods.add(None)
+        holding_period = periods.pop() if len(periods) == 1 else "mixed"
+        return {
+            "record_id": event["event_id"],
+            "asset": event["asset"],
+            "quantity": quantity,
+            "disposed_at": event["timestamp"],
+            "proceeds_usd": proceeds,
+            "cost_basis_usd": cost_basis,
+            "gain_loss_usd": proceeds - cost_basis if proceeds is not None and cost_basis is not None else None,
+            "holding_period": holding_period,
+            "acquired_at": min((row["acquired_at"] for row in lot_rows if row["acquired_at"]), default=None),
+            "basis_method": self.method,
+            "unmatched_quantity": shortfall,
+            "lots": lot_rows,
+        }
+
+    def process(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply one canonical event; return a disposal record for taxable disposals."""
+        key = (event["timestamp"], event["event_id"])
+        if self.watermark is not None and key <= self.watermark:
+            self.skipped_events += 1
+            return None
+        self.watermark = key
+
+        kind = event["type"]
+        if kind in (ACQUIRE, TRANSFER_IN):
+            self._add_lot(event)
+            return None
+        if kind == DISPOSE:
+            return self._dispose(event)
+        if kind == TRANSFER_OUT:
+            # Moving coins out of the tracked account is not taxable; the lots just leave.
+            self._relieve(event)
+            return None
+        raise ValueError(f"Unknown event type: {kind}")
+
+    def run(self, events: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for event in events:
+            record = self.process(event)
+            if record is not None:
+                yield record
+
+    def open_lots(self) -> List[Dict[str, Any]]:
+        return [lot.to_dict() for asset in sorted(self.assets) for lot in self.assets[asset].open_lots()]
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "method": self.method,
+            "seq": self.seq,
+            "watermark": list(self.watermark) if self.watermark else None,
+            "open_lots": self.open_lots(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "TaxLotEngine":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported tax lot state version: {state.get('version')}")
+        engine = cls(method=state["method"])
+        engine.seq = int(state.get("seq") or 0)
+        watermark = state.get("watermark")
+        engine.watermark = (watermark[0], watermark[1]) if watermark else None
+        for row in state.get("open_lots", []):
+            engine._lots(row["asset"]).add(
+                Lot(
+                    lot_id=row["lot_id"],
+                    asset=row["asset"],
+                    quantity=row["quantity"],
+                    cost_usd=row.get("cost_usd"),
+                    acquired_at=row.get("acquired_at"),
+                    seq=row["seq"],
+                    remaining=row["remaining"],
+                )
+            )
+        return engine
+
+
+def normalize_event(row: Dict[str, Any], idx: int = 0) -> Optional[Dict[str, Any]]:
+    """Coerce a ledger row into the canonical event schema, or None if unusable."""
+    kind = (row.get("type") or "").strip().lower()
+    asset = (row.get("asset") or "").strip().upper()
+    quantity = to_float(row.get("quantity"))
+    timestamp = parse_dt(row.get("timestamp"))
+    if kind not in EVENT_TYPES or not asset or quantity is None or quantity <= 0 or timestamp is None:
+        return None
+    lot_ids = row.get("lot_ids")
+    if isinstance(lot_ids, str):
+        lot_ids = [part.strip() for part in lot_ids.split(",") if part.strip()]
+    return {
+        "event_id": str(row.get("event_id") or stable_id([kind, asset, quantity, timestamp, idx])),
+        "type": kind,
+        "asset": asset,
+        "quantity": quantity,
+        "timestamp": timestamp,
+        "cost_usd": to_float(row.get("cost_usd")),
+        "proceeds_usd": to_float(row.get("proceeds_usd")),
+        "acquired_at": parse_dt(row.get("acquired_at")),
+        "lot_id": row.get("lot_id"),
+        "lot_ids": lot_ids or None,
+    }
+
+
+def sort_events(events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return sorted(events, key=lambda event: (event["timestamp"], event["event_id"]))
+
+
+def canonical_asset(code: str) -> str:
+    """Map a Kraken asset code (``XXBT``, ``ZUSD``, ``XBT``, ``SOL``) to its common ticker."""
+    asset = (code or "").strip().upper()
+    if asset in KRAKEN_LEGACY_ASSETS:
+        return KRAKEN_LEGACY_ASSETS[asset]
+    return KRAKEN_ASSET_ALIASES.get(asset, asset)
+
+
+def split_kraken_pair(pair: str) -> Tuple[str, str]:
+    """Split a Kraken pair into canonical (base, pricing) assets; pricing is "" if unknown.
+
+    A legacy 4-character quote (``XXBTZUSD``, ``XETHXXBT``, ``USDTZUSD``) is only
+    split off when the rest is itself a legacy or plain quote code; otherwise the
+    pair is split at a plain quote, so ``XTZUSD`` is XTZ/USD and ``ZRXXBT`` ZRX/BTC.
+    """
+    pair = (pair or "").strip().upper().replace("/", "")
+    base, quote = pair[:-4], pair[-4:]
+    if quote in KRAKEN_LEGACY_ASSETS and (base in KRAKEN_LEGACY_ASSETS or base in KRAKEN_PAIR_SUFFIXES):
+        return canonical_asset(base), canonical_asset(quote)
+    for suffix in KRAKEN_PAIR_SUFFIXES:
+        if pair.endswith(suffix) and len(pair) > len(suffix):
+            return canonical_asset(pair[: -len(suffix)]), canonical_asset(suffix)
+    return canonical_asset(pair), ""
+
+
+def events_from_kraken(
+    raw_trades: List[Dict[str, Any]],
+    raw_ledger: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Build canonical events from Kraken TradesHistory and Ledgers payloads.
+
+    USD-priced buys become acquisitions (cost includes the fee) and sells become
+    disposals (proceeds net of the fee). Crypto-to-crypto trades emit both legs:
+    the asset given up is disposed of and the asset received is acquired, with
+    USD values left unresolved. Ledger deposits and withdrawals become transfers
+    in and out; transfers in have unknown basis and acquisition date.
+    """
+    events: List[Dict[str, Any]] = []
+
+    def add(row: Dict[str, Any]) -> None:
+        event = normalize_event(row)
+        if event is not None:
+            events.append(event)
+
+    for trade in raw_trades:
+        trade_type = trade.get("type")
+        if trade_type not in ("buy", "sell") or trade.get("time") is None:
+            continue
+        base, pricing = split_kraken_pair(trade.get("pair", ""))
+        trade_id = trade.get("trade_id")
+        timestamp = datetime.fromtimestamp(float(trade["time"]), tz=timezone.utc)
+        cost = to_float(trade.get("cost"))
+        fee = to_float(trade.get("fee")) or 0.0
+        usd = pricing == "USD" and cost is not None
+        add(
+            {
+                "event_id": trade_id,
+                "type": ACQUIRE if trade_type == "buy" else DISPOSE,
+                "asset": base,
+                "quantity": trade.get("vol"),
+                "timestamp": timestamp,
+                "cost_usd": cost + fee if usd and trade_type == "buy" else None,
+                "proceeds_usd": cost - fee if usd and trade_type == "sell" else None,
+            }
+        )
+        if not pricing or pricing in FIAT_CODES or cost is None:
+            continue
+        # Kraken charges the fee in the pricing asset: a buy spends cost + fee of
+        # it, a sell receives cost - fee.
+        add(
+            {
+                "event_id": f"{trade_id}:{pricing}" if trade_id else None,
+                "type": DISPOSE if trade_type == "buy" else ACQUIRE,
+                "asset": pricing,
+                "quantity": cost + fee if trade_type == "buy" else cost - fee,
+                "timestamp": timestamp,
+            }
+        )
+
+    for entry in raw_ledger or []:
+        entry_type = entry.get("type")
+        if entry_type not in ("deposit", "withdrawal") or entry.get("time") is None:
+            continue
+        asset = canonical_asset(entry.get("asset", ""))
+        if asset in FIAT_CODES:
+            continue
+        add(
+            {
+                "event_id": entry.get("ledger_id") or entry.get("refid"),
+                "type": TRANSFER_IN if entry_type == "deposit" else TRANSFER_OUT,
+                "asset": asset,
+                "quantity": abs(to_float(entry.get("amount")) or 0.0),
+                "timestamp": datetime.fromtimestamp(float(entry["time"]), tz=timezone.utc),
+            }
+        )
+
+    return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve disposals against tax lots")
+    parser.add_argument("--ledger", default=None, help="Canonical event CSV/JSON/JSONL path")
+    parser.add_argument("--kraken-trades", default=None, help="kraken_api_fetcher.py output JSON path")
+    parser.add_argument("--method", choices=METHODS, default="fifo", help="Lot relief method (default: fifo)")
+    parser.add_argument("--state", default=None, help="Checkpoint JSON path; resumed from and rewritten after the run")
+    parser.add_argument("--output", required=True, help="Output disposals JSON path")
+    args = parser.parse_args()
+
+    if not args.ledger and not args.kraken_trades:
+        parser.error("Provide either --ledger or --kraken-trades")
+
+    if args.kraken_trades:
+        payload = json.loads(Path(args.kraken_trades).read_text(encoding="utf-8"))
+        events = events_from_kraken(payload.get("raw_trades", []), payload.get("raw_ledger", []))
+    else:
+        events = []
+        for idx, row in enumerate(load_records(args.ledger)):
+            event = normalize_event(row, idx)
+            if event is not None:
+                events.append(event)
+
+    state_path = Path(args.state) if args.state else None
+    if state_path and state_path.exists():
+        engine = TaxLotEngine.from_state(json.loads(state_path.read_text(encoding="utf-8")))
+        if engine.method != args.method:
+            parser.error(f"Checkpoint uses {engine.method}; pass --method {engine.method} or a new --state path")
+    else:
+        engine = TaxLotEngine(method=args.method)
+
+    disposals = list(engine.run(sort_events(events)))
+    write_json(args.output, {"count": len(disposals), "method": engine.method, "records": disposals})
+    if state_path:
+        write_json(str(state_path), engine.state())
+    print(
+        f"Resolved {len(disposals)} disposals from {len(events) - engine.skipped_events} new events "
+        f"({engine.skipped_events} already checkpointed) -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,21 +8,25 @@ import json
 import os
 import uuid
 from collections import Counter
+from contextlib import ExitStack
 from datetime import datetime, timezone
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from bridge_1099da import merge_bridge_records, parse_1099da_csv
-from carf_parser import parse_carf_xml
+from carf_parser import stream_carf_xml
 from csv_normalizer import parse_casp_csv, parse_user_csv
 from currency_normalizer import normalize_fiat_values
-from dac8_parser import parse_dac8_xml
-from enrichment import enrich_tax_treatments, resolve_cost_basis
+from dac8_parser import stream_dac8_xml
+from fx_rate_store import DEFAULT_DB_PATH as DEFAULT_FX_DB_PATH, FxRateStore
+from enrichment import enrich_tax_treatments, iter_cost_basis
 from jurisdiction_detector import detect_jurisdictions
 from logger import AuditLogger
 from notifications import build_notifications
 from reconciliation_engine import ToleranceConfig, reconcile_transactions
 from report_generator import generate_reconciliation_outputs
+from row_spool import RowSpool
 from seren_api_client import SerenAPIError, SerenAPIKeyManager
 from serendb_store import SerenDBStore
 from transfer_tracker import reconcile_transfers
@@ -63,6 +67,9 @@ def _default_config() -> dict[str, Any]:
             "enable_dac8_extensions": True,
             "enable_transfer_tracking": True,
             "enable_bridge_1099da": True,
+            "columnar_reconciliation": False,
+            "fx_rates_db": "state/fx_rates.db",
+            "fx_rates_csv": "",
         },
         "cpa": {
             "materiality_threshold_usd": 1000.0,
@@ -155,15 +162,17 @@ def ensure_seren_api_key(config: dict[str, Any]) -> str:
     return manager.ensure_api_key(auto_register=auto_register)
 
 
-def _parse_report_file(path: str, *, enable_dac8_extensions: bool) -> tuple[dict[str, str], list[dict[str, Any]]]:
+def _parse_report_file(path: str, *, enable_dac8_extensions: bool) -> tuple[dict[str, str], Iterable[dict[str, Any]]]:
     file_path = Path(path)
     suffix = file_path.suffix.lower()
 
     if suffix == ".xml":
-        head = file_path.read_text(encoding="utf-8", errors="ignore")[:5000]
+        # XML reports stream lazily; only the head is read to sniff DAC8 markers.
+        with file_path.open("r", encoding="utf-8", errors="ignore") as handle:
+            head = handle.read(5000)
         if enable_dac8_extensions and ("DAC8" in head or "EUMemberState" in head):
-            return parse_dac8_xml(file_path)
-        return parse_carf_xml(file_path)
+            return stream_dac8_xml(file_path)
+        return stream_carf_xml(file_path)
 
     if suffix == ".csv":
         casp_name = file_path.stem.split("_", 1)[0]
@@ -190,11 +199,36 @@ def _report_formats(report_metadatas: list[dict[str, str]]) -> list[str]:
     )
 
 
-def _tax_treatment_breakdown(rows: list[dict[str, Any]]) -> dict[str, int]:
-    counts = Counter(str(row.get("tax_treatment") or "unknown") for row in rows)
+def _tax_treatment_breakdown(counts: Counter[str]) -> dict[str, int]:
     return {key: int(value) for key, value in sorted(counts.items())}
 
 
+# Rows per normalize/classify batch while streaming spooled CARF rows.
+ENRICH_CHUNK_ROWS = 5_000
+
+
+def _enrich_carf_rows(
+    sorted_rows: Iterable[dict[str, Any]],
+    *,
+    home_currency: str,
+    fx_store: FxRateStore | None,
+    cost_basis_method: str,
+) -> Iterator[dict[str, Any]]:
+    """Normalize fiat, classify tax treatment and resolve cost basis for timestamp-ordered rows.
+
+    Rows are converted a chunk at a time, so only one chunk plus the open lots
+    are in memory; per-row results match the list-based stages.
+    """
+    rows = iter(sorted_rows)
+
+    def _classified() -> Iterator[dict[str, Any]]:
+        while chunk := list(islice(rows, ENRICH_CHUNK_ROWS)):
+            normalized = normalize_fiat_values(rows=chunk, home_currency=home_currency, fx_store=fx_store)
+            yield from enrich_tax_treatments(normalized)
+
+    return iter_cost_basis(_classified(), method=cost_basis_method)
+
+
 def _year_from_iso(value: str, default_year: int = 2026) -> str:
     raw = (value or "").strip()
     if not raw:
@@ -205,6 +239,18 @@ def _year_from_iso(value: str, default_year: int = 2026) -> str:
         return str(default_year)
 
 
+def _open_fx_store(input_cfg: dict[str, Any]) -> FxRateStore | None:
+    """Open the dated FX store, loading ``fx_rates_csv`` first; None falls back to static rates."""
+    db_path = Path(str(input_cfg.get("fx_rates_db") or DEFAULT_FX_DB_PATH))
+    csv_path = str(input_cfg.get("fx_rates_csv") or "")
+    if not csv_path and not db_path.exists():
+        return None
+    store = FxRateStore(db_path)
+    if csv_path:
+        store.load_ecb_csv(csv_path)
+    return store
+
+
 def run_once(
     *,
     config_path: str,
@@ -275,6 +321,7 @@ def run_once(
     jurisdictions: dict[str, Any] = {}
     report_metadatas: list[dict[str, str]] = []
 
+    spools = ExitStack()
     try:
         input_cfg = config["inputs"]
         ts_tolerance_seconds = int(float(input_cfg["timestamp_tolerance_hours"]) * 3600)
@@ -284,7 +331,9 @@ def run_once(
         home_currency = str(input_cfg.get("home_currency", "USD")).upper().strip() or "USD"
         cost_basis_method = str(input_cfg.get("cost_basis_method", "fifo")).lower()
 
-        carf_rows: list[dict[str, Any]] = []
+        # CARF rows are spilled to disk as they stream out of the parsers; every later
+        # stage reads them back lazily instead of holding the whole report set.
+        parsed_rows = spools.enter_context(RowSpool())
 
         for report in carf_reports:
             metadata, rows = _parse_report_file(
@@ -294,11 +343,14 @@ def run_once(
             report_id = str(metadata.get("report_id") or Path(report).stem)
             metadata["report_id"] = report_id
 
-            for row in rows:
-                row["report_id"] = str(row.get("report_id") or report_id)
+            def _with_report_id(stream: Iterable[dict[str, Any]], report_id: str = report_id) -> Iterator[dict[str, Any]]:
+                for row in stream:
+                    row["report_id"] = str(row.get("report_id") or report_id)
+                    yield row
+
+            parsed_rows.extend(_with_report_id(rows))
 
             report_metadatas.append(metadata)
-            carf_rows.extend(rows)
             store.persist_raw_report(metadata)
 
         user_rows: list[dict[str, Any]] = []
@@ -312,11 +364,12 @@ def run_once(
             for row in bridge_rows:
                 row["report_id"] = bridge_report_id
 
-            carf_rows, bridge_stats = merge_bridge_records(
-                primary_records=carf_rows,
+            _, bridge_stats = merge_bridge_records(
+                primary_records=parsed_rows,
                 bridge_records=bridge_rows,
                 timestamp_tolerance_seconds=ts_tolerance_seconds,
                 quantity_tolerance_pct=qty_tolerance_pct,
+                in_place=True,
             )
 
             if bridge_rows:
@@ -334,24 +387,29 @@ def run_once(
                 store.persist_raw_report(bridge_meta)
 
         # Step 2 enrichment: normalize fiat values, classify tax treatment, then resolve cost basis.
-        carf_rows = normalize_fiat_values(rows=carf_rows, home_currency=home_currency)
-        user_rows = normalize_fiat_values(rows=user_rows, home_currency=home_currency)
-        carf_rows = enrich_tax_treatments(carf_rows)
-        carf_rows = resolve_cost_basis(carf_rows, method=cost_basis_method)
-
-        carf_by_txid = {
-            str(row.get("transaction_id", "")): row
-            for row in carf_rows
-            if str(row.get("transaction_id", ""))
-        }
+        # Cost basis needs timestamp order, so rows are re-read sorted and spooled again.
+        fx_store = _open_fx_store(input_cfg)
+        carf_rows = spools.enter_context(RowSpool())
+        carf_rows.extend(
+            _enrich_carf_rows(
+                parsed_rows.iter_by_timestamp(),
+                home_currency=home_currency,
+                fx_store=fx_store,
+                cost_basis_method=cost_basis_method,
+            )
+        )
+        user_rows = normalize_fiat_values(rows=user_rows, home_currency=home_currency, fx_store=fx_store)
+        if fx_store is not None:
+            fx_store.close()
+        parsed_rows.close()
 
         jurisdictions = detect_jurisdictions(
             report_metadatas=report_metadatas,
-            normalized_records=carf_rows + user_rows,
+            normalized_records=chain(carf_rows, user_rows),
         )
 
         recon = reconcile_transactions(
-            carf_records=carf_rows,
+            carf_records=iter(carf_rows),
             user_records=user_rows,
             tolerance=ToleranceConfig(
                 timestamp_tolerance_seconds=ts_tolerance_seconds,
@@ -359,14 +417,17 @@ def run_once(
                 fiat_tolerance_pct=fiat_tolerance_pct,
             ),
             materiality_threshold_usd=materiality,
+            columnar=bool(input_cfg.get("columnar_reconciliation", False)),
         )
 
-        for match in recon["matches"]:
-            carf_txid = str(match.get("carf_transaction_id", "") or "")
-            if not carf_txid:
-                continue
-            carf_row = carf_by_txid.get(carf_txid)
-            if not carf_row:
+        # The first len(carf_rows) matches line up with the CARF rows, so one more
+        # pass annotates them and gathers the per-row counts.
+        treatment_counts: Counter[str] = Counter()
+        conversion_missing = sum(1 for row in user_rows if bool(row.get("currency_conversion_missing")))
+        for match, carf_row in zip(recon["matches"], carf_rows):
+            treatment_counts[str(carf_row.get("tax_treatment") or "unknown")] += 1
+            conversion_missing += int(bool(carf_row.get("currency_conversion_missing")))
+            if not str(match.get("carf_transaction_id", "") or ""):
                 continue
             match["carf_sub_type"] = str(carf_row.get("sub_type", ""))
             match["carf_tax_treatment"] = str(carf_row.get("tax_treatment", ""))
@@ -392,14 +453,8 @@ def run_once(
         summary = {
             **recon["summary"],
             "home_currency": home_currency,
-            "tax_treatment_breakdown": _tax_treatment_breakdown(carf_rows),
-            "currency_conversion_missing_count": int(
-                sum(
-                    1
-                    for row in (carf_rows + user_rows)
-                    if bool(row.get("currency_conversion_missing"))
-                )
-            ),
+            "tax_treatment_breakdown": _tax_treatment_breakdown(treatment_counts),
+            "currency_conversion_missing_count": int(conversion_missing),
             "bridge": bridge_stats,
             "transfer_tracking": transfer_summary,
             "jurisdictions": jurisdictions,
@@ -470,6 +525,7 @@ def run_once(
             "disclaimer": IMPORTANT_DISCLAIMER,
         }
     finally:
+        spools.close()
         store.close()
 
 
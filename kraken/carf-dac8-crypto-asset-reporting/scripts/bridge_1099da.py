@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import csv
-from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from matching_index import TimeWindowIndex, epoch_seconds
 from schemas.carf_common import NormalizedTransaction, normalize_asset, parse_timestamp
 
 
@@ -39,13 +39,12 @@ def _key_asset(row: dict[str, Any]) -> str:
     return str(row.get("asset_disposed") or row.get("asset_acquired") or "").upper()
 
 
-def _parse_iso(value: str) -> datetime | None:
-    if not value:
-        return None
-    try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00"))
-    except ValueError:
-        return None
+def _key_qty(row: dict[str, Any]) -> float:
+    return float(row.get("quantity_disposed", 0.0) or row.get("quantity_acquired", 0.0) or 0.0)
+
+
+def _key(row: dict[str, Any]) -> tuple[str, float | None, float]:
+    return _key_asset(row), epoch_seconds(str(row.get("timestamp", ""))), _key_qty(row)
 
 
 def merge_bridge_records(
@@ -54,61 +53,44 @@ def merge_bridge_records(
     bridge_records: list[dict[str, Any]],
     timestamp_tolerance_seconds: int,
     quantity_tolerance_pct: float,
+    in_place: bool = False,
 ) -> tuple[list[dict[str, Any]], dict[str, int]]:
-    merged = list(primary_records)
-    consumed_primary: set[int] = set()
-
-    asset_index: dict[str, list[int]] = {}
-    for idx, row in enumerate(merged):
-        asset = _key_asset(row)
-        if asset:
-            asset_index.setdefault(asset, []).append(idx)
+    """Append bridge rows not already reported by a primary record; flag the dual-reported ones.
+
+    ``in_place`` merges into ``primary_records`` itself (e.g. a ``RowSpool``)
+    instead of a copied list; matched rows are written back by index.
+    """
+    merged = primary_records if in_place else list(primary_records)
+    primary_count = len(merged)
+    index = TimeWindowIndex(
+        map(_key, merged),
+        timestamp_tolerance_seconds=timestamp_tolerance_seconds,
+        quantity_tolerance_pct=quantity_tolerance_pct,
+    )
 
     dual_reported = 0
     for bridge in bridge_records:
-        matched = False
-        candidates = asset_index.get(_key_asset(bridge), [])
-
-        for idx in candidates:
-            if idx in consumed_primary:
-                continue
-            primary = merged[idx]
-            primary_qty = float(primary.get("quantity_disposed", 0.0) or primary.get("quantity_acquired", 0.0) or 0.0)
-            bridge_qty = float(bridge.get("quantity_disposed", 0.0) or bridge.get("quantity_acquired", 0.0) or 0.0)
-
-            qty_base = max(abs(primary_qty), abs(bridge_qty), 1.0)
-            qty_pct = abs(primary_qty - bridge_qty) / qty_base * 100.0
-            if qty_pct > quantity_tolerance_pct:
-                continue
-
-            left = _parse_iso(str(primary.get("timestamp", "")))
-            right = _parse_iso(str(bridge.get("timestamp", "")))
-            if left and right:
-                ts_delta = abs((left - right).total_seconds())
-                if ts_delta > timestamp_tolerance_seconds:
-                    continue
-
-            primary.setdefault("raw_data", {})
-            if isinstance(primary["raw_data"], dict):
-                primary["raw_data"]["dual_reported"] = True
-                primary["raw_data"]["dual_report_sources"] = [
-                    primary.get("source_format", "CARF"),
-                    bridge.get("source_format", "1099DA"),
-                ]
-            consumed_primary.add(idx)
-            matched = True
-            dual_reported += 1
-            break
-
-        if not matched:
+        key = _key(bridge)
+        idx = index.find(*key, consume=True)
+
+        if idx is None:
             merged.append(bridge)
-            idx = len(merged) - 1
-            asset = _key_asset(bridge)
-            if asset:
-                asset_index.setdefault(asset, []).append(idx)
+            index.add(*key)
+            continue
+
+        primary = merged[idx]
+        primary.setdefault("raw_data", {})
+        if isinstance(primary["raw_data"], dict):
+            primary["raw_data"]["dual_reported"] = True
+            primary["raw_data"]["dual_report_sources"] = [
+                primary.get("source_format", "CARF"),
+                bridge.get("source_format", "1099DA"),
+            ]
+        merged[idx] = primary
+        dual_reported += 1
 
     return merged, {
         "bridge_total": len(bridge_records),
         "dual_reported": dual_reported,
-        "bridge_added": len(merged) - len(primary_records),
+        "bridge_added": len(merged) - primary_count,
     }
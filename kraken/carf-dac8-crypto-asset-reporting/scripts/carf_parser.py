@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from defusedxml import ElementTree as DET
 
@@ -9,126 +9,201 @@ from schemas.carf_common import NormalizedTransaction, normalize_asset, parse_ti
 from schemas.carf_exchange import canonical_exchange_type
 
 
+TRANSACTION_TAGS = {"transactionreport", "transaction", "cryptotransaction"}
+HEADER_TAGS = {"messagespec", "header", "reportheader"}
+
+HEADER_FIELDS: dict[str, list[str]] = {
+    "report_id": ["MessageRefId", "ReportId", "MessageReferenceId"],
+    "casp_name": ["CaspName", "ReportingFI", "SendingCompanyName"],
+    "casp_jurisdiction": ["CaspJurisdiction", "SendingCompanyIN", "CountryCode"],
+    "reporting_year": ["ReportingYear", "TaxYear", "Year"],
+    "created_at": ["Timestamp", "CreatedAt"],
+    "user_tin_hash": ["UserTINHash", "TinHash", "TINHash"],
+}
+
+TRANSACTION_FIELDS: dict[str, list[str]] = {
+    "transaction_id": ["TransactionId", "TxId", "UniqueTransactionId"],
+    "timestamp": ["Timestamp", "TransactionDate", "DateTime", "TransactionDateTime"],
+    "transaction_type": ["TransactionType", "Type", "Category"],
+    "sub_type": ["SubType", "TransactionSubType", "CarfCode"],
+    "asset_acquired": ["AssetAcquired", "AssetIn", "BuyAsset", "ReceivedAsset"],
+    "asset_disposed": ["AssetDisposed", "AssetOut", "SellAsset", "SentAsset"],
+    "quantity_acquired": ["QuantityAcquired", "AmountIn", "BuyAmount", "ReceivedAmount"],
+    "quantity_disposed": ["QuantityDisposed", "AmountOut", "SellAmount", "SentAmount"],
+    "fiat_value": ["FiatValue", "Proceeds", "GrossAmount"],
+    "fiat_currency": ["FiatCurrency", "Currency", "ProceedsCurrency"],
+    "fee": ["Fee", "Commission", "TradingFee"],
+    "fee_currency": ["FeeCurrency", "CommissionCurrency"],
+    "jurisdiction": ["Jurisdiction", "TaxJurisdiction", "CountryCode"],
+}
+
+
 def _local(tag: str) -> str:
     if "}" in tag:
         return tag.rsplit("}", 1)[1]
     return tag
 
 
-def _find_text(node: Any, names: list[str]) -> str:
-    wanted = {value.lower() for value in names}
-    for child in list(node):
-        if _local(child.tag).lower() in wanted and child.text:
-            return child.text.strip()
-    return ""
+class _FieldResolver:
+    """Map child tags to field names, resolving each distinct tag once per document.
 
+    Aliases are matched case-insensitively on the local name, so namespaced and
+    renamed schemas cost one lookup per tag rather than one scan per field per node.
+    """
 
-def _find_direct_child(parent: Any, names: list[str]) -> Any | None:
-    wanted = {value.lower() for value in names}
-    for child in list(parent):
-        if _local(child.tag).lower() in wanted:
-            return child
-    return None
+    def __init__(self, fields: dict[str, list[str]]) -> None:
+        self._aliases = {alias.lower(): name for name, aliases in fields.items() for alias in aliases}
+        self._by_tag: dict[str, str | None] = {}
 
+    def field_for(self, tag: Any) -> str | None:
+        try:
+            return self._by_tag[tag]
+        except KeyError:
+            name = self._aliases.get(_local(tag).lower()) if isinstance(tag, str) else None
+            self._by_tag[tag] = name
+            return name
 
-def _message_spec(root: Any) -> Any:
-    node = _find_direct_child(root, ["MessageSpec", "Header", "ReportHeader"])
-    return node if node is not None else root
+    def collect(self, child: Any, values: dict[str, str]) -> None:
+        """Record ``child``'s text for its field unless an earlier sibling already set it."""
+        name = self.field_for(child.tag)
+        if name is not None and name not in values and child.text:
+            values[name] = child.text.strip()
 
+    def extract(self, node: Any) -> dict[str, str]:
+        values: dict[str, str] = {}
+        for child in node:
+            self.collect(child, values)
+        return values
 
-def _metadata_from_root(root: Any, file_path: Path) -> dict[str, str]:
-    msg = _message_spec(root)
-    report_id = _find_text(msg, ["MessageRefId", "ReportId", "MessageReferenceId"]) or file_path.stem
-    casp_name = _find_text(msg, ["CaspName", "ReportingFI", "SendingCompanyName"]) or "unknown_casp"
-    casp_j = _find_text(msg, ["CaspJurisdiction", "SendingCompanyIN", "CountryCode"]) or "UNKNOWN"
 
-    year = _find_text(msg, ["ReportingYear", "TaxYear", "Year"])
+def _metadata_from_values(values: dict[str, str], file_path: Path) -> dict[str, str]:
+    report_id = values.get("report_id") or file_path.stem
+    casp_name = values.get("casp_name") or "unknown_casp"
+    casp_j = values.get("casp_jurisdiction") or "UNKNOWN"
+
+    year = values.get("reporting_year", "")
     if not year:
-        meta_ts = parse_timestamp(_find_text(msg, ["Timestamp", "CreatedAt"]))
+        meta_ts = parse_timestamp(values.get("created_at", ""))
         guess = meta_ts.year if meta_ts else 2026
         year = str(max(1900, min(2100, guess)))
 
-    user_tin = _find_text(msg, ["UserTINHash", "TinHash", "TINHash"])
-
     return {
         "report_id": report_id,
         "casp_name": casp_name,
         "casp_jurisdiction": casp_j,
         "reporting_year": year,
-        "user_tin_hash": user_tin,
+        "user_tin_hash": values.get("user_tin_hash", ""),
         "report_format": "CARF_XML",
         "source_file": str(file_path),
     }
 
 
-def parse_carf_xml(path: str | Path) -> tuple[dict[str, str], list[dict[str, object]]]:
+def _read_header(file_path: Path) -> dict[str, str]:
+    """Stream until the report header closes and build report metadata from it.
+
+    Stops at the end of the header for the usual header-first layout. Without a
+    header element, fields set directly under the root are used, as before.
+    """
+    resolver = _FieldResolver(HEADER_FIELDS)
+    root_values: dict[str, str] = {}
+    stack: list[Any] = []
+    with file_path.open("rb") as handle:
+        for event, elem in DET.iterparse(handle, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                continue
+            stack.pop()
+            if len(stack) == 1:
+                if _local(elem.tag).lower() in HEADER_TAGS:
+                    return _metadata_from_values(resolver.extract(elem), file_path)
+                resolver.collect(elem, root_values)
+            in_header = len(stack) > 1 and _local(stack[1].tag).lower() in HEADER_TAGS
+            if stack and not in_header:
+                elem.clear()
+                stack[-1].remove(elem)
+    return _metadata_from_values(root_values, file_path)
+
+
+def _number(value: str) -> float:
+    return float(value or 0.0)
+
+
+def _transaction_row(
+    values: dict[str, str],
+    idx: int,
+    node_name: str,
+    metadata: dict[str, str],
+) -> dict[str, object]:
+    fiat_currency = normalize_asset(values.get("fiat_currency"))
+    tx = NormalizedTransaction(
+        transaction_id=values.get("transaction_id") or f"tx-{idx}",
+        timestamp=parse_timestamp(values.get("timestamp", "")),
+        transaction_type=canonical_exchange_type(values.get("transaction_type", "")),
+        sub_type=values.get("sub_type", "").upper(),
+        asset_acquired=normalize_asset(values.get("asset_acquired")),
+        quantity_acquired=_number(values.get("quantity_acquired", "")),
+        asset_disposed=normalize_asset(values.get("asset_disposed")),
+        quantity_disposed=_number(values.get("quantity_disposed", "")),
+        fiat_value=_number(values.get("fiat_value", "")),
+        fiat_currency=fiat_currency,
+        fee=_number(values.get("fee", "")),
+        fee_currency=normalize_asset(values.get("fee_currency")) or fiat_currency,
+        jurisdiction=str(values.get("jurisdiction") or metadata["casp_jurisdiction"]),
+        casp_name=str(metadata["casp_name"]),
+        source_format="CARF_XML",
+        raw_data={"source_node": node_name, "report_id": metadata["report_id"]},
+    )
+    row = tx.as_dict()
+    row["report_id"] = metadata["report_id"]
+    return row
+
+
+def _iter_transactions(file_path: Path, metadata: dict[str, str]) -> Iterator[dict[str, object]]:
+    """Yield transaction rows in one secure iterparse pass with bounded memory.
+
+    Finished elements are detached from their parent unless they sit inside a
+    transaction still being read, so only the open ancestor chain and the
+    current transaction subtree are held at any time.
+    """
+    resolver = _FieldResolver(TRANSACTION_FIELDS)
+    stack: list[Any] = []
+    ordinals: dict[int, int] = {}
+    open_transactions = 0
+    count = 0
+    with file_path.open("rb") as handle:
+        for event, elem in DET.iterparse(handle, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                if _local(elem.tag).lower() in TRANSACTION_TAGS:
+                    count += 1
+                    ordinals[id(elem)] = count
+                    open_transactions += 1
+                continue
+
+            stack.pop()
+            is_transaction = id(elem) in ordinals
+            if is_transaction:
+                open_transactions -= 1
+                yield _transaction_row(
+                    resolver.extract(elem), ordinals.pop(id(elem)), _local(elem.tag), metadata
+                )
+            if stack and (is_transaction or open_transactions == 0):
+                elem.clear()
+                stack[-1].remove(elem)
+    metadata["total_records"] = str(count)
+
+
+def stream_carf_xml(path: str | Path) -> tuple[dict[str, str], Iterator[dict[str, object]]]:
+    """Return report metadata and a lazy iterator of normalized transaction rows.
+
+    ``metadata["total_records"]`` is filled in once the iterator is exhausted.
+    """
     file_path = Path(path)
-    tree = DET.parse(file_path)
-    root = tree.getroot()
-
-    metadata = _metadata_from_root(root, file_path)
-
-    tx_nodes: list[Any] = []
-    for node in root.iter():
-        name = _local(node.tag).lower()
-        if name in {"transactionreport", "transaction", "cryptotransaction"}:
-            tx_nodes.append(node)
-
-    records: list[dict[str, object]] = []
-    for idx, node in enumerate(tx_nodes, start=1):
-        transaction_id = _find_text(node, ["TransactionId", "TxId", "UniqueTransactionId"]) or f"tx-{idx}"
-        timestamp = parse_timestamp(
-            _find_text(node, ["Timestamp", "TransactionDate", "DateTime", "TransactionDateTime"])
-        )
-        tx_type = canonical_exchange_type(_find_text(node, ["TransactionType", "Type", "Category"]))
-        sub_type = _find_text(node, ["SubType", "TransactionSubType", "CarfCode"]).upper()
-
-        acquired_asset = normalize_asset(
-            _find_text(node, ["AssetAcquired", "AssetIn", "BuyAsset", "ReceivedAsset"])
-        )
-        disposed_asset = normalize_asset(
-            _find_text(node, ["AssetDisposed", "AssetOut", "SellAsset", "SentAsset"])
-        )
-
-        quantity_acquired = float(
-            _find_text(node, ["QuantityAcquired", "AmountIn", "BuyAmount", "ReceivedAmount"]) or 0.0
-        )
-        quantity_disposed = float(
-            _find_text(node, ["QuantityDisposed", "AmountOut", "SellAmount", "SentAmount"]) or 0.0
-        )
-
-        fiat_value = float(_find_text(node, ["FiatValue", "Proceeds", "GrossAmount"]) or 0.0)
-        fiat_currency = normalize_asset(_find_text(node, ["FiatCurrency", "Currency", "ProceedsCurrency"]))
-
-        fee = float(_find_text(node, ["Fee", "Commission", "TradingFee"]) or 0.0)
-        fee_currency = normalize_asset(_find_text(node, ["FeeCurrency", "CommissionCurrency"])) or fiat_currency
-
-        jurisdiction = (
-            _find_text(node, ["Jurisdiction", "TaxJurisdiction", "CountryCode"])
-            or metadata["casp_jurisdiction"]
-        )
-
-        tx = NormalizedTransaction(
-            transaction_id=transaction_id,
-            timestamp=timestamp,
-            transaction_type=tx_type,
-            sub_type=sub_type,
-            asset_acquired=acquired_asset,
-            quantity_acquired=quantity_acquired,
-            asset_disposed=disposed_asset,
-            quantity_disposed=quantity_disposed,
-            fiat_value=fiat_value,
-            fiat_currency=fiat_currency,
-            fee=fee,
-            fee_currency=fee_currency,
-            jurisdiction=str(jurisdiction),
-            casp_name=str(metadata["casp_name"]),
-            source_format="CARF_XML",
-            raw_data={"source_node": _local(node.tag), "report_id": metadata["report_id"]},
-        )
-        row = tx.as_dict()
-        row["report_id"] = metadata["report_id"]
-        records.append(row)
-
-    metadata["total_records"] = str(len(records))
+    metadata = _read_header(file_path)
+    return metadata, _iter_transactions(file_path, metadata)
+
+
+def parse_carf_xml(path: str | Path) -> tuple[dict[str, str], list[dict[str, object]]]:
+    metadata, rows = stream_carf_xml(path)
+    records = list(rows)
     return metadata, records
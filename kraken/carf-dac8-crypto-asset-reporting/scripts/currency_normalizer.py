@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import Any
 
+from fx_rate_store import FxRateStore
+
 # Offline-friendly default rates to USD for deterministic local execution.
-# For production, these can be replaced by cached ECB/Fed feed snapshots.
+# Used when no dated FxRateStore is supplied or it has no rate for the date.
 USD_RATES = {
     "USD": 1.0,
     "EUR": 1.08,
@@ -29,22 +32,75 @@ def _convert(value: float, from_ccy: str, to_ccy: str) -> tuple[float, float | N
     return usd_value / dst, src / dst
 
 
+def _rate_day(row: dict[str, Any]) -> str | None:
+    raw = str(row.get("timestamp", "") or "")
+    if not raw:
+        return None
+    try:
+        parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.date().isoformat()
+
+
+def _dated_rates(
+    fx_store: FxRateStore,
+    keys: list[tuple[str, str | None]],
+    home: str,
+) -> dict[tuple[str, str], tuple[float, str]]:
+    """Resolve ``currency -> home`` rates for every (currency, day) with one range read per currency.
+
+    Each rate comes with the publication date it was taken from; for a cross
+    rate that is the older of its two legs.
+    """
+    days_by_currency: dict[str, set[str]] = {}
+    for currency, day in keys:
+        if day and currency != home:
+            days_by_currency.setdefault(currency, set()).add(day)
+            days_by_currency.setdefault(home, set()).add(day)
+
+    per_base: dict[tuple[str, str], tuple[float, str | None] | None] = {}
+    for currency, days in days_by_currency.items():
+        ordered = sorted(days)
+        per_base.update(zip(((currency, day) for day in ordered), fx_store.rates_on(currency, ordered)))
+
+    rates: dict[tuple[str, str], tuple[float, str]] = {}
+    for currency, days in days_by_currency.items():
+        for day in days:
+            src = per_base.get((currency, day))
+            dst = per_base.get((home, day))
+            if src and dst and src[0]:
+                published = min(found for found in (src[1], dst[1]) if found)
+                rates[(currency, day)] = (dst[0] / src[0], published)
+    return rates
+
+
 def normalize_fiat_values(
     *,
     rows: list[dict[str, Any]],
     home_currency: str,
+    fx_store: FxRateStore | None = None,
 ) -> list[dict[str, Any]]:
     normalized: list[dict[str, Any]] = []
     home = (home_currency or "USD").upper().strip()
 
-    for row in rows:
+    keys = [(str(row.get("fiat_currency", "") or home).upper(), _rate_day(row)) for row in rows]
+    dated = _dated_rates(fx_store, keys, home) if fx_store is not None else {}
+
+    for row, (fiat_currency, day) in zip(rows, keys):
         updated = dict(row)
         raw_data = dict(updated.get("raw_data") or {})
 
         fiat_value = float(updated.get("fiat_value", 0.0) or 0.0)
-        fiat_currency = str(updated.get("fiat_currency", "") or home).upper()
 
-        value_home, rate = _convert(fiat_value, fiat_currency, home)
+        dated_rate = dated.get((fiat_currency, day)) if day else None
+        if dated_rate is not None:
+            rate, updated["fx_rate_date"] = dated_rate
+            value_home = fiat_value * rate
+        else:
+            value_home, rate = _convert(fiat_value, fiat_currency, home)
         updated["fiat_value_home"] = round(value_home, 8)
         updated["home_currency"] = home
 
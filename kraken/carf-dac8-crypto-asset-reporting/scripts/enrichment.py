@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from collections import deque
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 CARF_TREATMENT = {
     "CARF401": "income_fmv_at_receipt",
@@ -40,12 +40,16 @@ def enrich_tax_treatments(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
 
 
 def resolve_cost_basis(rows: list[dict[str, Any]], method: str = "fifo") -> list[dict[str, Any]]:
+    sorted_rows = sorted(rows, key=lambda row: str(row.get("timestamp", "")))
+    return list(iter_cost_basis(sorted_rows, method=method))
+
+
+def iter_cost_basis(sorted_rows: Iterable[dict[str, Any]], method: str = "fifo") -> Iterator[dict[str, Any]]:
+    """Lazy ``resolve_cost_basis`` for rows already in timestamp order; only open lots are held."""
     if method.lower() not in {"fifo", "lifo", "specific"}:
         method = "fifo"
 
-    sorted_rows = sorted(rows, key=lambda row: str(row.get("timestamp", "")))
     lots: dict[str, deque[dict[str, float | str]]] = {}
-    output: list[dict[str, Any]] = []
 
     for row in sorted_rows:
         item = dict(row)
@@ -105,6 +109,4 @@ def resolve_cost_basis(rows: list[dict[str, Any]], method: str = "fifo") -> list
                 raw_data["cost_basis_warning"] = "insufficient_lot_inventory"
                 item["raw_data"] = raw_data
 
-        output.append(item)
-
-    return output
+        yield item
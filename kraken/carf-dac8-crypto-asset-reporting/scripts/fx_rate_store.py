@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import csv
+import sqlite3
+from collections import OrderedDict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+# ECB reference rates are quoted as units of currency per 1 EUR.
+ECB_BASE = "EUR"
+DEFAULT_DB_PATH = "state/fx_rates.db"
+# Long enough to bridge weekends and the Easter/Christmas TARGET closures.
+MAX_LOOKBACK_DAYS = 7
+DEFAULT_CACHE_SIZE = 65_536
+
+
+class FxRateStore:
+    """Daily FX rates per currency in a local sqlite table.
+
+    Rates are stored against one base currency (EUR for ECB files). A lookup on
+    a date without a published rate uses the nearest prior business day, up to
+    ``MAX_LOOKBACK_DAYS`` back. Resolved (currency, date) pairs are kept in an
+    in-process LRU so repeated runs over the same report avoid sqlite entirely.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_DB_PATH, *, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fx_rates (
+              base TEXT NOT NULL,
+              quote TEXT NOT NULL,
+              rate_date TEXT NOT NULL,
+              rate REAL NOT NULL,
+              PRIMARY KEY (base, quote, rate_date)
+            ) WITHOUT ROWID
+            """
+        )
+        self._cache: OrderedDict[tuple[str, str], tuple[float, str | None] | None] = OrderedDict()
+        self._cache_size = cache_size
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def load_ecb_csv(self, path: str | Path, *, base: str = ECB_BASE) -> int:
+        """Bulk-load an ECB-style wide CSV (``Date,USD,JPY,...``); returns rows written."""
+        base = base.upper()
+
+        def _rows() -> Iterable[tuple[str, str, str, float]]:
+            with Path(path).open("r", encoding="utf-8", newline="") as handle:
+                reader = csv.reader(handle)
+                header = [column.strip().upper() for column in next(reader, [])]
+                for record in reader:
+                    if not record or not record[0].strip():
+                        continue
+                    rate_date = date.fromisoformat(record[0].strip()).isoformat()
+                    for quote, raw in zip(header[1:], record[1:]):
+                        raw = raw.strip()
+                        if not quote or not raw or raw.upper() == "N/A":
+                            continue
+                        yield base, quote, rate_date, float(raw)
+
+        with self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO fx_rates (base, quote, rate_date, rate) VALUES (?, ?, ?, ?)",
+                _rows(),
+            )
+            written = self._conn.total_changes - before
+        self._cache.clear()
+        return written
+
+    def coverage(self) -> tuple[str, str] | None:
+        first, last = self._conn.execute("SELECT MIN(rate_date), MAX(rate_date) FROM fx_rates").fetchone()
+        return (first, last) if first else None
+
+    def _remember(self, key: tuple[str, str], rate: tuple[float, str | None] | None) -> None:
+        self._cache[key] = rate
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def rates_on(
+        self, currency: str, dates: list[str], *, base: str = ECB_BASE
+    ) -> list[tuple[float, str | None] | None]:
+        """Return ``(rate, rate_date)`` of ``currency`` per ``base`` for each ISO date.
+
+        ``rate_date`` is the publication date of the rate used (the nearest prior
+        business day), or None for the base currency itself; an entry is None when
+        no rate is close enough. Dates missing from the LRU are resolved with one
+        range read over ``[earliest - lookback, latest]`` and a vectorized
+        nearest-prior search.
+        """
+        quote = (currency or "").upper().strip()
+        base = base.upper()
+        if quote == base:
+            return [(1.0, None)] * len(dates)
+
+        results: list[tuple[float, str | None] | None] = [None] * len(dates)
+        pending: dict[str, list[int]] = {}
+        for position, day in enumerate(dates):
+            key = (quote, day)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                results[position] = self._cache[key]
+            else:
+                pending.setdefault(day, []).append(position)
+        if not pending:
+            return results
+
+        wanted = sorted(pending)
+        floor = (date.fromisoformat(wanted[0]) - timedelta(days=MAX_LOOKBACK_DAYS)).isoformat()
+        rows = self._conn.execute(
+            "SELECT rate_date, rate FROM fx_rates WHERE base = ? AND quote = ? AND rate_date BETWEEN ? AND ? "
+            "ORDER BY rate_date",
+            (base, quote, floor, wanted[-1]),
+        ).fetchall()
+
+        published = [day for day, _ in rows]
+        known = np.array([date.fromisoformat(day).toordinal() for day in published], dtype=np.int64)
+        rates = np.array([rate for _, rate in rows], dtype=np.float64)
+        asked = np.array([date.fromisoformat(day).toordinal() for day in wanted], dtype=np.int64)
+        prior = np.searchsorted(known, asked, side="right") - 1
+        usable = prior >= 0
+        usable[usable] &= asked[usable] - known[prior[usable]] <= MAX_LOOKBACK_DAYS
+
+        for day, ok, slot in zip(wanted, usable.tolist(), prior.tolist()):
+            rate = (float(rates[slot]), published[slot]) if ok else None
+            self._remember((quote, day), rate)
+            for position in pending[day]:
+                results[position] = rate
+        return results
+
+    def rate_on(self, currency: str, day: str, *, base: str = ECB_BASE) -> float | None:
+        found = self.rates_on(currency, [day], base=base)[0]
+        return found[0] if found else None
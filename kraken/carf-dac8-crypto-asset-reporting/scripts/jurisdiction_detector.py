@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Iterable
 
 DEADLINES = {
     "EU": "2027-09-30",
@@ -29,7 +29,7 @@ def _normalize_jurisdiction(value: str) -> str:
 def detect_jurisdictions(
     *,
     report_metadatas: list[dict[str, Any]],
-    normalized_records: list[dict[str, Any]],
+    normalized_records: Iterable[dict[str, Any]],
 ) -> dict[str, Any]:
     casp_jurisdictions: set[str] = set()
     user_jurisdictions: set[str] = set()
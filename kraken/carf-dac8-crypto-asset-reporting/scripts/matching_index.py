@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+
+def epoch_seconds(value: str) -> float | None:
+    """Parse an ISO timestamp to epoch seconds; naive values are read as UTC."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def qty_delta_pct(left: float, right: float) -> float:
+    base = max(abs(left), abs(right), 1.0)
+    return abs(left - right) / base * 100.0
+
+
+class _Bucket:
+    __slots__ = ("epochs", "timed", "untimed")
+
+    def __init__(self) -> None:
+        self.epochs: list[float] = []
+        self.timed: list[int] = []
+        self.untimed: list[int] = []
+
+
+class TimeWindowIndex:
+    """Per-asset candidates sorted by epoch for tolerance-window matching.
+
+    Entries are addressed by insertion position. ``find`` returns the lowest
+    position whose quantity and timestamp fall within tolerance, the same row a
+    first-match scan over the original list would pick, but only inspects rows
+    inside the timestamp window. Rows without a timestamp match any time, as in
+    the list scans this replaces. A blank asset never matches unless
+    ``blank_asset_matches_any`` makes it a wildcard on either side. Consumed
+    rows are dropped from their bucket so later lookups never revisit them.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[tuple[str, float | None, float]],
+        *,
+        timestamp_tolerance_seconds: float,
+        quantity_tolerance_pct: float,
+        blank_asset_matches_any: bool = False,
+    ) -> None:
+        self.timestamp_tolerance_seconds = timestamp_tolerance_seconds
+        self.quantity_tolerance_pct = quantity_tolerance_pct
+        self.blank_asset_matches_any = blank_asset_matches_any
+        self._assets: list[str] = []
+        self._epochs: list[float | None] = []
+        self._quantities: list[float] = []
+        self._buckets: dict[str, _Bucket] = {}
+
+        timed: dict[str, list[tuple[float, int]]] = {}
+        for asset, epoch, quantity in entries:
+            idx = self._append(asset, epoch, quantity)
+            if epoch is None:
+                self._bucket(asset).untimed.append(idx)
+            else:
+                timed.setdefault(asset, []).append((epoch, idx))
+        for asset, pairs in timed.items():
+            pairs.sort()
+            bucket = self._bucket(asset)
+            bucket.epochs = [epoch for epoch, _ in pairs]
+            bucket.timed = [idx for _, idx in pairs]
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def _append(self, asset: str, epoch: float | None, quantity: float) -> int:
+        self._assets.append(asset)
+        self._epochs.append(epoch)
+        self._quantities.append(quantity)
+        return len(self._assets) - 1
+
+    def _bucket(self, asset: str) -> _Bucket:
+        bucket = self._buckets.get(asset)
+        if bucket is None:
+            bucket = self._buckets[asset] = _Bucket()
+        return bucket
+
+    def add(self, asset: str, epoch: float | None, quantity: float) -> int:
+        """Index one more row after the existing ones and return its position."""
+        idx = self._append(asset, epoch, quantity)
+        bucket = self._bucket(asset)
+        if epoch is None:
+            bucket.untimed.append(idx)
+        else:
+            pos = bisect_right(bucket.epochs, epoch)
+            bucket.epochs.insert(pos, epoch)
+            bucket.timed.insert(pos, idx)
+        return idx
+
+    def _candidate_buckets(self, asset: str) -> list[_Bucket]:
+        if not self.blank_asset_matches_any:
+            bucket = self._buckets.get(asset) if asset else None
+            return [bucket] if bucket is not None else []
+        if not asset:
+            return list(self._buckets.values())
+        return [bucket for key in (asset, "") if (bucket := self._buckets.get(key)) is not None]
+
+    def find(self, asset: str, epoch: float | None, quantity: float, *, consume: bool = False) -> int | None:
+        """Return the first matching position, removing it from the index if ``consume``."""
+        tolerance = self.quantity_tolerance_pct
+        quantities = self._quantities
+        best: int | None = None
+        for bucket in self._candidate_buckets(asset):
+            if epoch is None:
+                lo, hi = 0, len(bucket.timed)
+            else:
+                lo = bisect_left(bucket.epochs, epoch - self.timestamp_tolerance_seconds)
+                hi = bisect_right(bucket.epochs, epoch + self.timestamp_tolerance_seconds)
+            for idx in bucket.timed[lo:hi]:
+                if (best is None or idx < best) and qty_delta_pct(quantity, quantities[idx]) <= tolerance:
+                    best = idx
+            # Untimed rows are kept in position order, so the first hit is the lowest.
+            for idx in bucket.untimed:
+                if best is not None and idx > best:
+                    break
+                if qty_delta_pct(quantity, quantities[idx]) <= tolerance:
+                    best = idx
+                    break
+        if best is not None and consume:
+            self.consume(best)
+        return best
+
+    def consume(self, idx: int) -> None:
+        bucket = self._buckets[self._assets[idx]]
+        epoch = self._epochs[idx]
+        if epoch is None:
+            bucket.untimed.pop(bisect_left(bucket.untimed, idx))
+            return
+        lo = bisect_left(bucket.epochs, epoch)
+        pos = lo + bucket.timed[lo:bisect_right(bucket.epochs, epoch)].index(idx)
+        del bucket.epochs[pos]
+        del bucket.timed[pos]
+
+    def between(self, asset: str, start: float, end: float) -> Iterator[int]:
+        """Yield unconsumed timestamped positions for ``asset`` with ``start <= epoch < end``."""
+        bucket = self._buckets.get(asset)
+        if bucket is None:
+            return iter(())
+        lo = bisect_left(bucket.epochs, start)
+        hi = bisect_left(bucket.epochs, end)
+        return iter(bucket.timed[lo:hi])
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+import numpy as np
 
 
 @dataclass(slots=True)
@@ -76,6 +79,10 @@ def _fiat_home(row: dict[str, Any]) -> float:
     return float(row.get("fiat_value", 0.0) or 0.0)
 
 
+def _record_qty(row: dict[str, Any]) -> float:
+    return float(row.get("quantity_disposed", 0.0) or row.get("quantity_acquired", 0.0) or 0.0)
+
+
 def _build_user_index(user_records: list[dict[str, Any]]) -> dict[str, list[int]]:
     index: dict[str, list[int]] = {}
     for idx, row in enumerate(user_records):
@@ -88,9 +95,150 @@ def _build_user_index(user_records: list[dict[str, Any]]) -> dict[str, list[int]
     return index
 
 
-def reconcile_transactions(
+# Delta assigned when either side lacks a timestamp.
+MISSING_TS_DELTA = 999_999
+
+
+def _candidate_limits(tolerance: ToleranceConfig) -> tuple[float, float]:
+    return (
+        max(tolerance.quantity_tolerance_pct * 4.0, 5.0),
+        max(tolerance.timestamp_tolerance_seconds * 2, 172_800),
+    )
+
+
+def _unmatched_carf_entry(carf: dict[str, Any], materiality_threshold_usd: float) -> dict[str, Any]:
+    delta_value = _fiat_home(carf)
+    return {
+        "carf_transaction_id": str(carf.get("transaction_id", "")),
+        "user_transaction_id": "",
+        "match_status": "unmatched_carf",
+        "match_confidence": 0.0,
+        "match_method": "none",
+        "delta_quantity": _record_qty(carf),
+        "delta_fiat_value": delta_value,
+        "delta_timestamp_seconds": 0,
+        "discrepancy_type": "missing",
+        "resolution": _resolution_for(
+            discrepancy_type="missing",
+            delta_fiat_value=delta_value,
+            materiality_threshold_usd=materiality_threshold_usd,
+        ),
+        "resolution_notes": "No corresponding user transaction found.",
+    }
+
+
+def _unmatched_user_entry(user: dict[str, Any], materiality_threshold_usd: float) -> dict[str, Any]:
+    delta_value = _fiat_home(user)
+    return {
+        "carf_transaction_id": "",
+        "user_transaction_id": str(user.get("transaction_id", "")),
+        "match_status": "unmatched_user",
+        "match_confidence": 0.0,
+        "match_method": "none",
+        "delta_quantity": _record_qty(user),
+        "delta_fiat_value": delta_value,
+        "delta_timestamp_seconds": 0,
+        "discrepancy_type": "missing",
+        "resolution": _resolution_for(
+            discrepancy_type="missing",
+            delta_fiat_value=delta_value,
+            materiality_threshold_usd=materiality_threshold_usd,
+        ),
+        "resolution_notes": "User transaction has no corresponding CARF record.",
+    }
+
+
+def _match_entry(
+    *,
+    carf: dict[str, Any],
+    user: dict[str, Any],
+    best_metrics: dict[str, float | int],
+    best_score: float,
+    tolerance: ToleranceConfig,
+    materiality_threshold_usd: float,
+) -> dict[str, Any]:
+    qty_delta = float(best_metrics["carf_qty"]) - float(best_metrics["user_qty"])
+    value_delta = float(best_metrics["carf_value"]) - float(best_metrics["user_value"])
+    ts_delta = int(best_metrics["ts_delta"])
+
+    qty_delta_pct = float(best_metrics["qty_delta_pct"])
+    value_delta_pct = float(best_metrics["value_delta_pct"])
+
+    within_tolerance = (
+        qty_delta_pct <= tolerance.quantity_tolerance_pct
+        and value_delta_pct <= tolerance.fiat_tolerance_pct
+        and ts_delta <= tolerance.timestamp_tolerance_seconds
+    )
+
+    if within_tolerance:
+        discrepancy_type = ""
+        match_status = "matched"
+        resolution = "auto_resolved"
+        notes = "Exact/near-exact within configured tolerances."
+    else:
+        discrepancy_type = _classify_discrepancy(
+            qty_delta_pct=qty_delta_pct,
+            fiat_delta_pct=value_delta_pct,
+            ts_delta_seconds=ts_delta,
+            tolerance=tolerance,
+            fee_delta=float(best_metrics["fee_delta"]),
+        )
+        match_status = "discrepancy"
+        resolution = _resolution_for(
+            discrepancy_type=discrepancy_type,
+            delta_fiat_value=value_delta,
+            materiality_threshold_usd=materiality_threshold_usd,
+        )
+        notes = f"{discrepancy_type} delta detected."
+
+    if bool(carf.get("currency_conversion_missing")) or bool(user.get("currency_conversion_missing")):
+        notes += " Missing FX conversion rates; reconciliation used raw fiat values."
+
+    confidence = max(0.0, 1.0 - min(1.0, best_score / 100.0))
+    method = "exact" if within_tolerance else "fuzzy"
+
+    return {
+        "carf_transaction_id": str(carf.get("transaction_id", "")),
+        "user_transaction_id": str(user.get("transaction_id", "")),
+        "match_status": match_status,
+        "match_confidence": round(confidence, 4),
+        "match_method": method,
+        "delta_quantity": round(qty_delta, 10),
+        "delta_fiat_value": round(value_delta, 4),
+        "delta_timestamp_seconds": ts_delta,
+        "discrepancy_type": discrepancy_type,
+        "resolution": resolution,
+        "resolution_notes": notes,
+    }
+
+
+def _summarize(
+    carf_count: int,
+    user_records: list[dict[str, Any]],
+    matches: list[dict[str, Any]],
+) -> dict[str, Any]:
+    summary = {
+        "total_carf_records": carf_count,
+        "total_user_records": len(user_records),
+        "matched_count": sum(1 for item in matches if item["match_status"] == "matched"),
+        "discrepancy_count": sum(1 for item in matches if item["match_status"] == "discrepancy"),
+        "unmatched_carf_count": sum(1 for item in matches if item["match_status"] == "unmatched_carf"),
+        "unmatched_user_count": sum(1 for item in matches if item["match_status"] == "unmatched_user"),
+        "auto_resolved_count": sum(1 for item in matches if item["resolution"] == "auto_resolved"),
+        "needs_review_count": sum(1 for item in matches if item["resolution"] == "needs_review"),
+        "cpa_escalation_count": sum(1 for item in matches if item["resolution"] == "cpa_escalation"),
+    }
+
+    return {
+        "matches": matches,
+        "summary": summary,
+    }
+
+
+
+def _reconcile_rowwise(
     *,
-    carf_records: list[dict[str, Any]],
+    carf_records: Iterable[dict[str, Any]],
     user_records: list[dict[str, Any]],
     tolerance: ToleranceConfig,
     materiality_threshold_usd: float,
@@ -98,6 +246,7 @@ def reconcile_transactions(
     matches: list[dict[str, Any]] = []
     unmatched_user_indices = set(range(len(user_records)))
     user_index = _build_user_index(user_records)
+    qty_limit, ts_limit = _candidate_limits(tolerance)
 
     for carf in carf_records:
         best_index = None
@@ -105,7 +254,7 @@ def reconcile_transactions(
         best_metrics: dict[str, float | int] = {}
 
         carf_ts = _parse_ts(str(carf.get("timestamp", "")))
-        carf_qty = float(carf.get("quantity_disposed", 0.0) or carf.get("quantity_acquired", 0.0) or 0.0)
+        carf_qty = _record_qty(carf)
         carf_value = _fiat_home(carf)
         carf_assets = _asset_keys(carf)
 
@@ -122,16 +271,16 @@ def reconcile_transactions(
             user = user_records[idx]
 
             user_ts = _parse_ts(str(user.get("timestamp", "")))
-            user_qty = float(user.get("quantity_disposed", 0.0) or user.get("quantity_acquired", 0.0) or 0.0)
+            user_qty = _record_qty(user)
             user_value = _fiat_home(user)
 
             qty_delta_pct = _abs_pct_delta(carf_qty, user_qty)
             value_delta_pct = _abs_pct_delta(carf_value, user_value) if (carf_value or user_value) else 0.0
-            ts_delta = abs(int((carf_ts - user_ts).total_seconds())) if (carf_ts and user_ts) else 999_999
+            ts_delta = abs(int((carf_ts - user_ts).total_seconds())) if (carf_ts and user_ts) else MISSING_TS_DELTA
 
-            if qty_delta_pct > max(tolerance.quantity_tolerance_pct * 4.0, 5.0):
+            if qty_delta_pct > qty_limit:
                 continue
-            if ts_delta > max(tolerance.timestamp_tolerance_seconds * 2, 172_800):
+            if ts_delta > ts_limit:
                 continue
 
             score = qty_delta_pct * 10.0 + value_delta_pct + (ts_delta / 3600.0)
@@ -150,122 +299,186 @@ def reconcile_transactions(
                 }
 
         if best_index is None:
-            delta_value = carf_value
-            matches.append(
-                {
-                    "carf_transaction_id": str(carf.get("transaction_id", "")),
-                    "user_transaction_id": "",
-                    "match_status": "unmatched_carf",
-                    "match_confidence": 0.0,
-                    "match_method": "none",
-                    "delta_quantity": float(carf.get("quantity_disposed", 0.0) or carf.get("quantity_acquired", 0.0) or 0.0),
-                    "delta_fiat_value": delta_value,
-                    "delta_timestamp_seconds": 0,
-                    "discrepancy_type": "missing",
-                    "resolution": _resolution_for(
-                        discrepancy_type="missing",
-                        delta_fiat_value=delta_value,
-                        materiality_threshold_usd=materiality_threshold_usd,
-                    ),
-                    "resolution_notes": "No corresponding user transaction found.",
-                }
-            )
+            matches.append(_unmatched_carf_entry(carf, materiality_threshold_usd))
             continue
 
         unmatched_user_indices.discard(best_index)
-        user = user_records[best_index]
-        qty_delta = float(best_metrics["carf_qty"]) - float(best_metrics["user_qty"])
-        value_delta = float(best_metrics["carf_value"]) - float(best_metrics["user_value"])
-        ts_delta = int(best_metrics["ts_delta"])
-
-        qty_delta_pct = float(best_metrics["qty_delta_pct"])
-        value_delta_pct = float(best_metrics["value_delta_pct"])
-
-        within_tolerance = (
-            qty_delta_pct <= tolerance.quantity_tolerance_pct
-            and value_delta_pct <= tolerance.fiat_tolerance_pct
-            and ts_delta <= tolerance.timestamp_tolerance_seconds
-        )
-
-        if within_tolerance:
-            discrepancy_type = ""
-            match_status = "matched"
-            resolution = "auto_resolved"
-            notes = "Exact/near-exact within configured tolerances."
-        else:
-            discrepancy_type = _classify_discrepancy(
-                qty_delta_pct=qty_delta_pct,
-                fiat_delta_pct=value_delta_pct,
-                ts_delta_seconds=ts_delta,
+        matches.append(
+            _match_entry(
+                carf=carf,
+                user=user_records[best_index],
+                best_metrics=best_metrics,
+                best_score=best_score,
                 tolerance=tolerance,
-                fee_delta=float(best_metrics["fee_delta"]),
-            )
-            match_status = "discrepancy"
-            resolution = _resolution_for(
-                discrepancy_type=discrepancy_type,
-                delta_fiat_value=value_delta,
                 materiality_threshold_usd=materiality_threshold_usd,
             )
-            notes = f"{discrepancy_type} delta detected."
+        )
 
-        if bool(carf.get("currency_conversion_missing")) or bool(user.get("currency_conversion_missing")):
-            notes += " Missing FX conversion rates; reconciliation used raw fiat values."
+    # Every CARF row adds exactly one entry above, in iteration order.
+    carf_count = len(matches)
+    for idx in sorted(unmatched_user_indices):
+        matches.append(_unmatched_user_entry(user_records[idx], materiality_threshold_usd))
 
-        confidence = max(0.0, 1.0 - min(1.0, best_score / 100.0))
-        method = "exact" if within_tolerance else "fuzzy"
+    return _summarize(carf_count, user_records, matches)
 
-        matches.append(
-            {
-                "carf_transaction_id": str(carf.get("transaction_id", "")),
-                "user_transaction_id": str(user.get("transaction_id", "")),
-                "match_status": match_status,
-                "match_confidence": round(confidence, 4),
-                "match_method": method,
-                "delta_quantity": round(qty_delta, 10),
-                "delta_fiat_value": round(value_delta, 4),
-                "delta_timestamp_seconds": ts_delta,
-                "discrepancy_type": discrepancy_type,
-                "resolution": resolution,
-                "resolution_notes": notes,
-            }
-        )
 
-    for idx in sorted(unmatched_user_indices):
-        user = user_records[idx]
-        delta_value = _fiat_home(user)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROS = 1_000_000
+
+
+def _epoch_micros(value: str) -> int | None:
+    ts = _parse_ts(value)
+    if ts is None:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - _EPOCH) // timedelta(microseconds=1)
+
+
+class _UserColumns:
+    """User records as NumPy columns, bucketed by asset and sorted by time.
+
+    Epochs are integer microseconds so whole-second deltas truncate exactly as
+    ``timedelta.total_seconds()`` does in the row-wise engine.
+    """
+
+    def __init__(self, user_records: list[dict[str, Any]]) -> None:
+        epochs = [_epoch_micros(str(row.get("timestamp", ""))) for row in user_records]
+        self.qty = np.array([_record_qty(row) for row in user_records], dtype=np.float64)
+        self.value = np.array([_fiat_home(row) for row in user_records], dtype=np.float64)
+        self.available = np.ones(len(user_records), dtype=bool)
+        self.timed: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.untimed: dict[str, np.ndarray] = {}
+
+        for key, indices in _build_user_index(user_records).items():
+            timed = sorted((epochs[idx], idx) for idx in indices if epochs[idx] is not None)
+            self.timed[key] = (
+                np.array([epoch for epoch, _ in timed], dtype=np.int64),
+                np.array([idx for _, idx in timed], dtype=np.int64),
+            )
+            self.untimed[key] = np.array([idx for idx in indices if epochs[idx] is None], dtype=np.int64)
+
+    def candidates(self, key: str, carf_epoch: int | None, ts_limit: float) -> tuple[np.ndarray, np.ndarray]:
+        """Return unconsumed user indices for ``key`` inside ``ts_limit`` and their second deltas."""
+        if key not in self.timed:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        epochs, timed = self.timed[key]
+        untimed = self.untimed[key]
+        parts: list[np.ndarray] = []
+        deltas: list[np.ndarray] = []
+        if carf_epoch is not None:
+            # floor(|delta| / 1s) <= ts_limit  <=>  |delta| < (floor(ts_limit) + 1) seconds.
+            reach = (math.floor(ts_limit) + 1) * _MICROS
+            lo = int(np.searchsorted(epochs, carf_epoch - reach, side="right"))
+            hi = int(np.searchsorted(epochs, carf_epoch + reach, side="left"))
+            parts.append(timed[lo:hi])
+            deltas.append(np.abs(epochs[lo:hi] - carf_epoch) // _MICROS)
+        if MISSING_TS_DELTA <= ts_limit:
+            missing = untimed if carf_epoch is not None else np.concatenate([timed, untimed])
+            parts.append(missing)
+            deltas.append(np.full(len(missing), MISSING_TS_DELTA, dtype=np.int64))
+        if not parts:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        indices = np.concatenate(parts)
+        ts_delta = np.concatenate(deltas)
+        keep = self.available[indices]
+        return indices[keep], ts_delta[keep]
+
+
+def _abs_pct_delta_columns(left: float, right: np.ndarray) -> np.ndarray:
+    base = np.maximum(np.maximum(abs(left), np.abs(right)), 1.0)
+    return np.abs(left - right) / base * 100.0
+
+
+def _reconcile_columnar(
+    *,
+    carf_records: Iterable[dict[str, Any]],
+    user_records: list[dict[str, Any]],
+    tolerance: ToleranceConfig,
+    materiality_threshold_usd: float,
+) -> dict[str, Any]:
+    matches: list[dict[str, Any]] = []
+    columns = _UserColumns(user_records)
+    qty_limit, ts_limit = _candidate_limits(tolerance)
+
+    for carf in carf_records:
+        carf_qty = _record_qty(carf)
+        carf_value = _fiat_home(carf)
+        carf_epoch = _epoch_micros(str(carf.get("timestamp", "")))
+        keys = sorted(_asset_keys(carf)) or ["_EMPTY"]
+
+        windows = [columns.candidates(key, carf_epoch, ts_limit) for key in keys]
+        indices = np.concatenate([window[0] for window in windows])
+        ts_delta = np.concatenate([window[1] for window in windows])
+
+        user_qty = columns.qty[indices]
+        user_value = columns.value[indices]
+        qty_delta_pct = _abs_pct_delta_columns(carf_qty, user_qty)
+        value_delta_pct = _abs_pct_delta_columns(carf_value, user_value)
+        score = qty_delta_pct * 10.0 + value_delta_pct + ts_delta / 3600.0
+        eligible = (qty_delta_pct <= qty_limit) & (ts_delta <= ts_limit)
+
+        if not eligible.any():
+            matches.append(_unmatched_carf_entry(carf, materiality_threshold_usd))
+            continue
+
+        # Greedy one-to-one: lowest score wins, ties go to the earliest user record.
+        best_score = score[eligible].min()
+        tied = np.flatnonzero(eligible & (score == best_score))
+        pick = int(tied[np.argmin(indices[tied])])
+        best_index = int(indices[pick])
+        columns.available[best_index] = False
+        user = user_records[best_index]
         matches.append(
-            {
-                "carf_transaction_id": "",
-                "user_transaction_id": str(user.get("transaction_id", "")),
-                "match_status": "unmatched_user",
-                "match_confidence": 0.0,
-                "match_method": "none",
-                "delta_quantity": float(user.get("quantity_disposed", 0.0) or user.get("quantity_acquired", 0.0) or 0.0),
-                "delta_fiat_value": delta_value,
-                "delta_timestamp_seconds": 0,
-                "discrepancy_type": "missing",
-                "resolution": _resolution_for(
-                    discrepancy_type="missing",
-                    delta_fiat_value=delta_value,
-                    materiality_threshold_usd=materiality_threshold_usd,
-                ),
-                "resolution_notes": "User transaction has no corresponding CARF record.",
-            }
+            _match_entry(
+                carf=carf,
+                user=user,
+                best_metrics={
+                    "qty_delta_pct": float(qty_delta_pct[pick]),
+                    "value_delta_pct": float(value_delta_pct[pick]),
+                    "ts_delta": int(ts_delta[pick]),
+                    "carf_qty": carf_qty,
+                    "user_qty": float(user_qty[pick]),
+                    "carf_value": carf_value,
+                    "user_value": float(user_value[pick]),
+                    "fee_delta": float(carf.get("fee", 0.0) or 0.0) - float(user.get("fee", 0.0) or 0.0),
+                },
+                best_score=float(best_score),
+                tolerance=tolerance,
+                materiality_threshold_usd=materiality_threshold_usd,
+            )
         )
 
-    summary = {
-        "total_carf_records": len(carf_records),
-        "total_user_records": len(user_records),
-        "matched_count": sum(1 for item in matches if item["match_status"] == "matched"),
-        "discrepancy_count": sum(1 for item in matches if item["match_status"] == "discrepancy"),
-        "unmatched_carf_count": sum(1 for item in matches if item["match_status"] == "unmatched_carf"),
-        "unmatched_user_count": sum(1 for item in matches if item["match_status"] == "unmatched_user"),
-        "auto_resolved_count": sum(1 for item in matches if item["resolution"] == "auto_resolved"),
-        "needs_review_count": sum(1 for item in matches if item["resolution"] == "needs_review"),
-        "cpa_escalation_count": sum(1 for item in matches if item["resolution"] == "cpa_escalation"),
-    }
+    carf_count = len(matches)
+    for idx in np.flatnonzero(columns.available):
+        matches.append(_unmatched_user_entry(user_records[int(idx)], materiality_threshold_usd))
 
-    return {
-        "matches": matches,
-        "summary": summary,
-    }
+    return _summarize(carf_count, user_records, matches)
+
+
+def reconcile_transactions(
+    *,
+    carf_records: Iterable[dict[str, Any]],
+    user_records: list[dict[str, Any]],
+    tolerance: ToleranceConfig,
+    materiality_threshold_usd: float,
+    columnar: bool = False,
+) -> dict[str, Any]:
+    """Match CARF rows to user rows in report order, each taking its best-scoring free candidate.
+
+    ``carf_records`` is read once, so it can be a lazy stream; the first
+    entries of ``matches`` line up one-to-one with it.
+
+    ``columnar`` scores candidates as NumPy arrays limited to the timestamp
+    window instead of looping over every same-asset user record; results are
+    the same as the row-wise engine.
+    """
+    engine = _reconcile_columnar if columnar else _reconcile_rowwise
+    return engine(
+        carf_records=carf_records,
+        user_records=user_records,
+        tolerance=tolerance,
+        materiality_threshold_usd=materiality_threshold_usd,
+    )
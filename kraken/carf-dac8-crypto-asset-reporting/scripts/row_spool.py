@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import tempfile
+from typing import Any, Iterable, Iterator
+
+FETCH_ROWS = 2_000
+
+
+class RowSpool:
+    """Transaction rows spilled to a temporary sqlite file instead of a list.
+
+    Rows are addressed by insertion index, like list items, and can be read
+    back in insertion order or in ``(timestamp, index)`` order. Each pass reads
+    the file in pages of ``FETCH_ROWS`` rows, so memory stays flat however
+    large the reports are. The file is removed on ``close``.
+    """
+
+    def __init__(self, directory: str | None = None) -> None:
+        handle, self.path = tempfile.mkstemp(prefix="carf-rows-", suffix=".db", dir=directory)
+        os.close(handle)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode = OFF")
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.execute(
+            "CREATE TABLE rows (idx INTEGER PRIMARY KEY, ts TEXT NOT NULL, body BLOB NOT NULL)"
+        )
+        self._count = 0
+        self._sorted_index = False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "RowSpool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def _encode(row: dict[str, Any]) -> tuple[str, bytes]:
+        return str(row.get("timestamp", "")), pickle.dumps(row, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def append(self, row: dict[str, Any]) -> None:
+        self.extend((row,))
+
+    def extend(self, rows: Iterable[dict[str, Any]]) -> None:
+        start = self._count
+        payloads = ((start + offset, *self._encode(row)) for offset, row in enumerate(rows))
+        with self._conn:
+            self._conn.executemany("INSERT INTO rows (idx, ts, body) VALUES (?, ?, ?)", payloads)
+        self._count = self._conn.execute("SELECT COALESCE(MAX(idx) + 1, 0) FROM rows").fetchone()[0]
+
+    def __getitem__(self, idx: int) -> dict[str, Any]:
+        found = self._conn.execute("SELECT body FROM rows WHERE idx = ?", (idx,)).fetchone()
+        if found is None:
+            raise IndexError(idx)
+        return pickle.loads(found[0])
+
+    def __setitem__(self, idx: int, row: dict[str, Any]) -> None:
+        ts, body = self._encode(row)
+        with self._conn:
+            self._conn.execute("UPDATE rows SET ts = ?, body = ? WHERE idx = ?", (ts, body, idx))
+
+    def _scan(self, order_by: str) -> Iterator[dict[str, Any]]:
+        cursor = self._conn.execute(f"SELECT body FROM rows ORDER BY {order_by}")
+        while True:
+            page = cursor.fetchmany(FETCH_ROWS)
+            if not page:
+                return
+            for (body,) in page:
+                yield pickle.loads(body)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self._scan("idx")
+
+    def iter_by_timestamp(self) -> Iterator[dict[str, Any]]:
+        """Rows ordered by timestamp text, ties in insertion order (as ``sorted`` would)."""
+        if not self._sorted_index:
+            self._conn.execute("CREATE INDEX rows_ts ON rows (ts, idx)")
+            self._sorted_index = True
+        return self._scan("ts, idx")
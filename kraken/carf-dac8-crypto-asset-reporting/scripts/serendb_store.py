@@ -4,7 +4,8 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+from itertools import islice
+from typing import Any, Iterable
 
 try:
     import psycopg
@@ -107,6 +108,22 @@ CREATE TABLE IF NOT EXISTS reconciliation_sessions (
 );
 """
 
+CARF_TRANSACTION_COLUMNS = (
+    "report_id", "session_id", "transaction_id", "timestamp", "transaction_type",
+    "sub_type", "asset_acquired", "quantity_acquired", "asset_disposed",
+    "quantity_disposed", "fiat_value", "fiat_currency", "fee", "fee_currency",
+    "casp_name", "jurisdiction", "source_format", "raw_data",
+)
+
+USER_TRANSACTION_COLUMNS = (
+    "session_id", "transaction_id", "timestamp", "transaction_type", "sub_type",
+    "asset_acquired", "quantity_acquired", "asset_disposed", "quantity_disposed",
+    "fiat_value", "fiat_currency", "fee", "fee_currency", "source", "raw_data",
+)
+
+# Rows per COPY + merge round trip; bounds client memory for large sessions.
+COPY_CHUNK_ROWS = 10_000
+
 
 class SerenDBStore:
     def __init__(self, dsn: str | None) -> None:
@@ -242,51 +259,87 @@ class SerenDBStore:
             )
         self.conn.commit()
 
-    def persist_carf_transactions(self, session_id: str, rows: list[dict[str, Any]]) -> dict[str, int]:
-        if not self.enabled or not rows:
+    def _bulk_insert(
+        self,
+        *,
+        table: str,
+        columns: tuple[str, ...],
+        payloads: Iterable[tuple[Any, ...]],
+        merge_sql: str,
+        chunk_size: int,
+    ) -> dict[str, int]:
+        """COPY payloads into a temp staging table chunk by chunk and merge each chunk with one INSERT.
+
+        ``merge_sql`` reads ``{stage}`` (which carries a ``seq`` column in input
+        order) and must return ``id, transaction_id``.
+        """
+        assert self.conn is not None
+        stage = f"{table}_stage"
+        column_list = ", ".join(columns)
+        rows_map: dict[str, int] = {}
+        numbered = enumerate(payloads)
+
+        with self.conn.cursor() as cur:
+            cur.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DROP AS "
+                f"SELECT 0::BIGINT AS seq, {column_list} FROM {table} WITH NO DATA"
+            )
+            while chunk := list(islice(numbered, chunk_size)):
+                with cur.copy(f"COPY {stage} (seq, {column_list}) FROM STDIN") as copy:
+                    for seq, payload in chunk:
+                        copy.write_row((seq, *payload))
+                cur.execute(merge_sql.format(stage=stage, columns=column_list))
+                rows_map.update((str(transaction_id), int(row_id)) for row_id, transaction_id in cur.fetchall())
+                cur.execute(f"TRUNCATE {stage}")
+
+        self.conn.commit()
+        return rows_map
+
+    def persist_carf_transactions(
+        self,
+        session_id: str,
+        rows: Iterable[dict[str, Any]],
+        *,
+        chunk_size: int = COPY_CHUNK_ROWS,
+    ) -> dict[str, int]:
+        if not self.enabled:
             return {}
         self.connect()
-        assert self.conn is not None
 
-        payloads: list[tuple[Any, ...]] = []
-        for row in rows:
-            payloads.append(
-                (
-                    str(row.get("report_id") or ""),
-                    session_id,
-                    str(row.get("transaction_id") or ""),
-                    row.get("timestamp") or "1970-01-01T00:00:00+00:00",
-                    str(row.get("transaction_type") or "exchange"),
-                    str(row.get("sub_type") or "") or None,
-                    str(row.get("asset_acquired") or "") or None,
-                    float(row.get("quantity_acquired") or 0.0),
-                    str(row.get("asset_disposed") or "") or None,
-                    float(row.get("quantity_disposed") or 0.0),
-                    float(row.get("fiat_value") or 0.0),
-                    str(row.get("fiat_currency") or "") or None,
-                    float(row.get("fee") or 0.0),
-                    str(row.get("fee_currency") or "") or None,
-                    str(row.get("casp_name") or "") or None,
-                    str(row.get("jurisdiction") or "") or None,
-                    str(row.get("source_format") or "") or None,
-                    json.dumps(row.get("raw_data", {})),
-                )
+        payloads = (
+            (
+                str(row.get("report_id") or ""),
+                session_id,
+                str(row.get("transaction_id") or ""),
+                row.get("timestamp") or "1970-01-01T00:00:00+00:00",
+                str(row.get("transaction_type") or "exchange"),
+                str(row.get("sub_type") or "") or None,
+                str(row.get("asset_acquired") or "") or None,
+                float(row.get("quantity_acquired") or 0.0),
+                str(row.get("asset_disposed") or "") or None,
+                float(row.get("quantity_disposed") or 0.0),
+                float(row.get("fiat_value") or 0.0),
+                str(row.get("fiat_currency") or "") or None,
+                float(row.get("fee") or 0.0),
+                str(row.get("fee_currency") or "") or None,
+                str(row.get("casp_name") or "") or None,
+                str(row.get("jurisdiction") or "") or None,
+                str(row.get("source_format") or "") or None,
+                json.dumps(row.get("raw_data", {})),
             )
+            for row in rows
+        )
 
-        with self.conn.cursor() as cur:
-            cur.executemany(
-                """
-                INSERT INTO carf_transactions (
-                    report_id, session_id, transaction_id, timestamp, transaction_type,
-                    sub_type, asset_acquired, quantity_acquired, asset_disposed,
-                    quantity_disposed, fiat_value, fiat_currency, fee, fee_currency,
-                    casp_name, jurisdiction, source_format, raw_data
-                ) VALUES (
-                    %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s
-                )
+        # DISTINCT ON keeps the last copy of a repeated key, as sequential upserts did.
+        return self._bulk_insert(
+            table="carf_transactions",
+            columns=CARF_TRANSACTION_COLUMNS,
+            payloads=payloads,
+            merge_sql="""
+                INSERT INTO carf_transactions ({columns})
+                SELECT DISTINCT ON (session_id, report_id, transaction_id) {columns}
+                FROM {stage}
+                ORDER BY session_id, report_id, transaction_id, seq DESC
                 ON CONFLICT (session_id, report_id, transaction_id) DO UPDATE SET
                     timestamp = EXCLUDED.timestamp,
                     transaction_type = EXCLUDED.transaction_type,
@@ -303,77 +356,54 @@ class SerenDBStore:
                     jurisdiction = EXCLUDED.jurisdiction,
                     source_format = EXCLUDED.source_format,
                     raw_data = EXCLUDED.raw_data
-                """,
-                payloads,
-            )
-            cur.execute(
-                """
-                SELECT id, transaction_id
-                FROM carf_transactions
-                WHERE session_id = %s
-                """,
-                (session_id,),
-            )
-            rows_map = {str(transaction_id): int(row_id) for row_id, transaction_id in cur.fetchall()}
+                RETURNING id, transaction_id
+            """,
+            chunk_size=chunk_size,
+        )
 
-        self.conn.commit()
-        return rows_map
-
-    def persist_user_transactions(self, session_id: str, rows: list[dict[str, Any]]) -> dict[str, int]:
-        if not self.enabled or not rows:
+    def persist_user_transactions(
+        self,
+        session_id: str,
+        rows: Iterable[dict[str, Any]],
+        *,
+        chunk_size: int = COPY_CHUNK_ROWS,
+    ) -> dict[str, int]:
+        if not self.enabled:
             return {}
         self.connect()
-        assert self.conn is not None
 
-        payloads: list[tuple[Any, ...]] = []
-        for row in rows:
-            payloads.append(
-                (
-                    session_id,
-                    str(row.get("transaction_id") or ""),
-                    row.get("timestamp") or "1970-01-01T00:00:00+00:00",
-                    str(row.get("transaction_type") or "exchange"),
-                    str(row.get("sub_type") or "") or None,
-                    str(row.get("asset_acquired") or "") or None,
-                    float(row.get("quantity_acquired") or 0.0),
-                    str(row.get("asset_disposed") or "") or None,
-                    float(row.get("quantity_disposed") or 0.0),
-                    float(row.get("fiat_value") or 0.0),
-                    str(row.get("fiat_currency") or "") or None,
-                    float(row.get("fee") or 0.0),
-                    str(row.get("fee_currency") or "") or None,
-                    str(row.get("source_format", row.get("source", "user_csv"))),
-                    json.dumps(row.get("raw_data", {})),
-                )
-            )
-
-        with self.conn.cursor() as cur:
-            cur.executemany(
-                """
-                INSERT INTO user_transactions (
-                    session_id, transaction_id, timestamp, transaction_type, sub_type,
-                    asset_acquired, quantity_acquired, asset_disposed, quantity_disposed,
-                    fiat_value, fiat_currency, fee, fee_currency, source, raw_data
-                ) VALUES (
-                    %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s
-                )
-                """,
-                payloads,
+        payloads = (
+            (
+                session_id,
+                str(row.get("transaction_id") or ""),
+                row.get("timestamp") or "1970-01-01T00:00:00+00:00",
+                str(row.get("transaction_type") or "exchange"),
+                str(row.get("sub_type") or "") or None,
+                str(row.get("asset_acquired") or "") or None,
+                float(row.get("quantity_acquired") or 0.0),
+                str(row.get("asset_disposed") or "") or None,
+                float(row.get("quantity_disposed") or 0.0),
+                float(row.get("fiat_value") or 0.0),
+                str(row.get("fiat_currency") or "") or None,
+                float(row.get("fee") or 0.0),
+                str(row.get("fee_currency") or "") or None,
+                str(row.get("source_format", row.get("source", "user_csv"))),
+                json.dumps(row.get("raw_data", {})),
             )
-            cur.execute(
-                """
-                SELECT id, transaction_id
-                FROM user_transactions
-                WHERE session_id = %s
-                """,
-                (session_id,),
-            )
-            rows_map = {str(transaction_id): int(row_id) for row_id, transaction_id in cur.fetchall()}
+            for row in rows
+        )
 
-        self.conn.commit()
-        return rows_map
+        return self._bulk_insert(
+            table="user_transactions",
+            columns=USER_TRANSACTION_COLUMNS,
+            payloads=payloads,
+            merge_sql="""
+                INSERT INTO user_transactions ({columns})
+                SELECT {columns} FROM {stage} ORDER BY seq
+                RETURNING id, transaction_id
+            """,
+            chunk_size=chunk_size,
+        )
 
     def persist_reconciliation_results(
         self,
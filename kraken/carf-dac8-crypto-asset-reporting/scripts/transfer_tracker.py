@@ -1,18 +1,13 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any
+from itertools import chain
+from typing import Any, Iterable, Iterator
 
+from matching_index import TimeWindowIndex, epoch_seconds
 from schemas.carf_transfer import is_transfer_type
 
 
-def _parse_ts(value: str) -> datetime | None:
-    if not value:
-        return None
-    try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00"))
-    except ValueError:
-        return None
+WASH_SALE_WINDOW_DAYS = 30
 
 
 def _asset(row: dict[str, Any]) -> str:
@@ -23,91 +18,90 @@ def _qty(row: dict[str, Any]) -> float:
     return float(row.get("quantity_disposed", 0.0) or row.get("quantity_acquired", 0.0) or 0.0)
 
 
+def _entry(row: dict[str, Any]) -> tuple[str, float | None, float]:
+    return _asset(row), epoch_seconds(str(row.get("timestamp", ""))), _qty(row)
+
+
 def reconcile_transfers(
     *,
-    carf_records: list[dict[str, Any]],
+    carf_records: Iterable[dict[str, Any]],
     user_records: list[dict[str, Any]],
     timestamp_tolerance_seconds: int,
     quantity_tolerance_pct: float,
 ) -> dict[str, Any]:
+    """Match CARF transfers to user transfers and flag wash-sale / misclassification signals.
+
+    ``carf_records`` is iterated twice (a list or ``RowSpool``); only the
+    transfer rows and index keys are held in memory.
+    """
     carf_transfers = [row for row in carf_records if is_transfer_type(str(row.get("transaction_type", "")))]
     user_transfers = [row for row in user_records if is_transfer_type(str(row.get("transaction_type", "")))]
     user_non_transfer = [row for row in user_records if not is_transfer_type(str(row.get("transaction_type", "")))]
 
     matched = 0
     unmatched: list[str] = []
-    consumed: set[int] = set()
     misclassified_as_disposition: list[str] = []
 
-    for carf in carf_transfers:
-        found = False
-        c_asset = _asset(carf)
-        c_qty = _qty(carf)
-        c_ts = _parse_ts(str(carf.get("timestamp", "")))
-
-        for idx, user in enumerate(user_transfers):
-            if idx in consumed:
-                continue
-            if c_asset and _asset(user) and c_asset != _asset(user):
-                continue
-
-            u_qty = _qty(user)
-            base = max(abs(c_qty), abs(u_qty), 1.0)
-            qty_delta_pct = abs(c_qty - u_qty) / base * 100.0
-            if qty_delta_pct > quantity_tolerance_pct:
-                continue
-
-            u_ts = _parse_ts(str(user.get("timestamp", "")))
-            if c_ts and u_ts and abs((c_ts - u_ts).total_seconds()) > timestamp_tolerance_seconds:
-                continue
+    tolerances = {
+        "timestamp_tolerance_seconds": timestamp_tolerance_seconds,
+        "quantity_tolerance_pct": quantity_tolerance_pct,
+        "blank_asset_matches_any": True,
+    }
+    transfer_index = TimeWindowIndex(map(_entry, user_transfers), **tolerances)
+    non_transfer_index = TimeWindowIndex(map(_entry, user_non_transfer), **tolerances)
 
-            consumed.add(idx)
+    for carf in carf_transfers:
+        c_asset, c_ts, c_qty = _entry(carf)
+        if transfer_index.find(c_asset, c_ts, c_qty, consume=True) is not None:
             matched += 1
-            found = True
-            break
-
-        if not found:
-            unmatched.append(str(carf.get("transaction_id", "")))
-            for user in user_non_transfer:
-                if c_asset and _asset(user) and c_asset != _asset(user):
-                    continue
-                base = max(abs(c_qty), abs(_qty(user)), 1.0)
-                qty_delta_pct = abs(c_qty - _qty(user)) / base * 100.0
-                if qty_delta_pct > quantity_tolerance_pct:
-                    continue
-                u_ts = _parse_ts(str(user.get("timestamp", "")))
-                if c_ts and u_ts and abs((c_ts - u_ts).total_seconds()) > timestamp_tolerance_seconds:
-                    continue
-                misclassified_as_disposition.append(str(carf.get("transaction_id", "")))
-                break
+            continue
+
+        unmatched.append(str(carf.get("transaction_id", "")))
+        if non_transfer_index.find(c_asset, c_ts, c_qty) is not None:
+            misclassified_as_disposition.append(str(carf.get("transaction_id", "")))
 
     # Heuristic wash-sale signal: same-asset disposition and reacquisition within 30 days.
     wash_sale_candidates: list[str] = []
-    exchange_events = [row for row in (carf_records + user_records) if not is_transfer_type(str(row.get("transaction_type", "")))]
+    # Only (disposed, acquired) flags are kept per exchange event, not the rows.
+    event_flags: list[tuple[bool, bool]] = []
+
+    def _exchange_entries() -> Iterator[tuple[str, float | None, float]]:
+        for row in chain(carf_records, user_records):
+            if is_transfer_type(str(row.get("transaction_type", ""))):
+                continue
+            event_flags.append(
+                (
+                    float(row.get("quantity_disposed", 0.0) or 0.0) > 0,
+                    float(row.get("quantity_acquired", 0.0) or 0.0) > 0,
+                )
+            )
+            yield _entry(row)
+
+    event_index = TimeWindowIndex(_exchange_entries(), **tolerances)
+    carf_by_txid: dict[str, dict[str, Any]] = {}
+    for row in carf_transfers:
+        carf_by_txid.setdefault(str(row.get("transaction_id", "")), row)
+
+    day = 24 * 60 * 60
     for txid in unmatched:
-        row = next((item for item in carf_transfers if str(item.get("transaction_id", "")) == txid), None)
+        row = carf_by_txid.get(txid)
         if row is None:
             continue
         ref_asset = _asset(row)
-        ref_ts = _parse_ts(str(row.get("timestamp", "")))
-        if not ref_asset or not ref_ts:
+        ref_ts = epoch_seconds(str(row.get("timestamp", "")))
+        if not ref_asset or ref_ts is None:
             continue
 
+        # Whole-day distance of at most 30, as timedelta.days counts it (floored).
         saw_disposition = False
         saw_reacquire = False
-        for event in exchange_events:
-            if _asset(event) != ref_asset:
-                continue
-            event_ts = _parse_ts(str(event.get("timestamp", "")))
-            if not event_ts:
-                continue
-            days = abs((event_ts - ref_ts).days)
-            if days > 30:
-                continue
-            if float(event.get("quantity_disposed", 0.0) or 0.0) > 0:
-                saw_disposition = True
-            if float(event.get("quantity_acquired", 0.0) or 0.0) > 0:
-                saw_reacquire = True
+        window = event_index.between(
+            ref_asset, ref_ts - WASH_SALE_WINDOW_DAYS * day, ref_ts + (WASH_SALE_WINDOW_DAYS + 1) * day
+        )
+        for idx in window:
+            disposed, acquired = event_flags[idx]
+            saw_disposition = saw_disposition or disposed
+            saw_reacquire = saw_reacquire or acquired
             if saw_disposition and saw_reacquire:
                 wash_sale_candidates.append(txid)
                 break
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
 from bridge_1099da import merge_bridge_records
+from matching_index import TimeWindowIndex, qty_delta_pct
+from row_spool import RowSpool
 from transfer_tracker import reconcile_transfers
 
+# Large synthetic-ledger runs are benchmarks, not unit tests; opt in with RUN_SLOW_TESTS=1.
+slow = pytest.mark.skipif(os.getenv("RUN_SLOW_TESTS") != "1", reason="set RUN_SLOW_TESTS=1 to run")
+
 
 def test_bridge_dedup_does_not_reuse_primary_record() -> None:
     primary = [
@@ -86,3 +97,112 @@ def test_transfer_tracker_flags_wash_sale_and_misclassification() -> None:
     assert summary["unmatched_transfer_ids"] == ["carf-transfer-1"]
     assert summary["potential_transfer_as_disposition_ids"] == ["carf-transfer-1"]
     assert summary["potential_wash_sale_ids"] == ["carf-transfer-1"]
+
+
+def _naive_first_match(rows, asset, ts, qty, consumed, *, wildcard, ts_tol, qty_tol):
+    for idx, row in enumerate(rows):
+        if idx in consumed:
+            continue
+        if wildcard:
+            if asset and row["asset"] and asset != row["asset"]:
+                continue
+        elif not asset or asset != row["asset"]:
+            continue
+        if qty_delta_pct(qty, row["qty"]) > qty_tol:
+            continue
+        if ts is not None and row["ts"] is not None and abs(ts - row["ts"]) > ts_tol:
+            continue
+        return idx
+    return None
+
+
+@pytest.mark.parametrize("wildcard", [False, True])
+def test_time_window_index_matches_first_match_scan(wildcard: bool) -> None:
+    rng = random.Random(7)
+
+    def _row():
+        return {
+            "asset": rng.choice(["BTC", "ETH", ""]),
+            "ts": None if rng.random() < 0.1 else float(rng.randrange(0, 20_000)),
+            "qty": rng.choice([0.5, 1.0, 1.001, 2.0, 250.0]),
+        }
+
+    rows = [_row() for _ in range(400)]
+    index = TimeWindowIndex(
+        ((row["asset"], row["ts"], row["qty"]) for row in rows),
+        timestamp_tolerance_seconds=600,
+        quantity_tolerance_pct=0.5,
+        blank_asset_matches_any=wildcard,
+    )
+    consumed: set[int] = set()
+    for _ in range(600):
+        probe = _row()
+        expected = _naive_first_match(
+            rows, probe["asset"], probe["ts"], probe["qty"], consumed, wildcard=wildcard, ts_tol=600, qty_tol=0.5
+        )
+        assert index.find(probe["asset"], probe["ts"], probe["qty"], consume=True) == expected
+        if expected is not None:
+            consumed.add(expected)
+        elif rng.random() < 0.5:
+            rows.append(probe)
+            index.add(probe["asset"], probe["ts"], probe["qty"])
+
+
+@slow
+def test_transfer_tracker_handles_50k_transfers() -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    carf_records = []
+    user_records = []
+    for i in range(50_000):
+        when = start + timedelta(minutes=10 * i)
+        asset = ("BTC", "ETH", "SOL")[i % 3]
+        carf_records.append({
+            "transaction_id": f"carf-{i}", "timestamp": when.isoformat(), "transaction_type": "relevant_transfer",
+            "asset_disposed": asset, "quantity_disposed": 1.0 + (i % 7) / 10,
+        })
+        if i % 10:
+            user_records.append({
+                "transaction_id": f"user-{i}", "timestamp": (when + timedelta(minutes=3)).isoformat(),
+                "transaction_type": "relevant_transfer", "asset_disposed": asset,
+                "quantity_disposed": 1.0 + (i % 7) / 10,
+            })
+
+    summary = reconcile_transfers(
+        carf_records=carf_records,
+        user_records=user_records,
+        timestamp_tolerance_seconds=300,
+        quantity_tolerance_pct=0.5,
+    )
+
+    assert summary["matched_transfer_count"] == 45_000
+    assert summary["unmatched_transfer_ids"] == [f"carf-{i}" for i in range(0, 50_000, 10)]
+
+
+def test_row_spool_matches_list_semantics_and_removes_its_file() -> None:
+    rows = [
+        {"transaction_id": "b", "timestamp": "2026-01-02T00:00:00+00:00"},
+        {"transaction_id": "a", "timestamp": "2026-01-01T00:00:00+00:00"},
+        {"transaction_id": "c", "timestamp": "2026-01-02T00:00:00+00:00"},
+    ]
+    with RowSpool() as spool:
+        spool.extend(iter(rows[:2]))
+        spool.append(rows[2])
+        assert len(spool) == 3
+        assert list(spool) == rows
+        assert spool[1]["transaction_id"] == "a"
+
+        spool[0] = {**rows[0], "timestamp": "2025-12-31T00:00:00+00:00"}
+        ordered = [row["transaction_id"] for row in spool.iter_by_timestamp()]
+        assert ordered == ["b", "a", "c"]
+
+        bridge = [dict(rows[1], transaction_id="1099-a", source_format="1099DA_CSV")]
+        _, stats = merge_bridge_records(
+            primary_records=spool,
+            bridge_records=bridge,
+            timestamp_tolerance_seconds=60,
+            quantity_tolerance_pct=0.01,
+            in_place=True,
+        )
+        assert len(spool) == 3 + stats["bridge_added"]
+        path = spool.path
+    assert not os.path.exists(path)
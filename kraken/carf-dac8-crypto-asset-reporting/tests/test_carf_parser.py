@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import tracemalloc
 from pathlib import Path
 
-from carf_parser import parse_carf_xml
-from dac8_parser import parse_dac8_xml
+from carf_parser import parse_carf_xml, stream_carf_xml
+from dac8_parser import parse_dac8_xml, stream_dac8_xml
 
 
 FIXTURES = Path(__file__).resolve().parent / "fixtures"
@@ -23,3 +24,74 @@ def test_parse_dac8_xml_flags_extensions() -> None:
     flags = [row.get("raw_data", {}).get("dac8_flags", []) for row in rows]
     assert any("dac8_emoney" in row_flags for row_flags in flags)
     assert any("dac8_high_value_nft" in row_flags for row_flags in flags)
+
+
+def _write_report(path: Path, count: int) -> Path:
+    tx = (
+        "<TransactionReport><TransactionId>tx-{i}</TransactionId>"
+        "<Timestamp>2026-01-10T10:00:00Z</Timestamp><TransactionType>exchange</TransactionType>"
+        "<AssetDisposed>BTC</AssetDisposed><QuantityDisposed>0.25</QuantityDisposed>"
+        "<FiatValue>9000</FiatValue><FiatCurrency>USD</FiatCurrency></TransactionReport>"
+    )
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write("<CARFStatusMessage><MessageSpec><MessageRefId>BIG</MessageRefId>"
+                     "<CaspName>Kraken</CaspName></MessageSpec><Body>")
+        for i in range(count):
+            handle.write(tx.format(i=i))
+        handle.write("</Body></CARFStatusMessage>")
+    return path
+
+
+def _peak_streaming_memory(path: Path) -> int:
+    tracemalloc.start()
+    try:
+        _, rows = stream_carf_xml(path)
+        for _ in rows:
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_stream_carf_xml_yields_lazily_and_counts_at_end() -> None:
+    metadata, rows = stream_carf_xml(FIXTURES / "sample_carf.xml")
+    assert metadata["report_id"] == "CARF-REPORT-2026-001"
+    assert "total_records" not in metadata
+
+    first = next(rows)
+    assert first["transaction_id"] == "carf-tx-001"
+    assert len(list(rows)) == 2
+    assert metadata["total_records"] == "3"
+
+
+def test_stream_resolves_namespaced_aliases_and_late_header(tmp_path: Path) -> None:
+    report = tmp_path / "ns.xml"
+    report.write_text(
+        '<r:Root xmlns:r="urn:carf"><r:Body>'
+        "<r:CryptoTransaction><r:TxId>a</r:TxId><r:Type>trade</r:Type><r:AmountIn>2</r:AmountIn>"
+        "<r:Currency>eur</r:Currency></r:CryptoTransaction>"
+        "<r:CryptoTransaction><r:Type>trade</r:Type></r:CryptoTransaction>"
+        "</r:Body><r:Header><r:ReportId>R9</r:ReportId><r:CountryCode>DE</r:CountryCode></r:Header></r:Root>",
+        encoding="utf-8",
+    )
+
+    metadata, rows = parse_carf_xml(report)
+
+    assert metadata["report_id"] == "R9"
+    assert [row["transaction_id"] for row in rows] == ["a", "tx-2"]
+    assert rows[0]["quantity_acquired"] == 2.0
+    assert rows[0]["fiat_currency"] == "EUR"
+    assert rows[1]["jurisdiction"] == "DE"
+
+
+def test_stream_dac8_xml_flags_rows_lazily() -> None:
+    metadata, rows = stream_dac8_xml(FIXTURES / "sample_dac8.xml")
+    assert metadata["report_format"] == "DAC8_XML"
+    assert all(row["source_format"] == "DAC8_XML" for row in rows)
+
+
+def test_streaming_peak_memory_does_not_grow_with_report_size(tmp_path: Path) -> None:
+    small = _peak_streaming_memory(_write_report(tmp_path / "small.xml", 2_000))
+    large = _peak_streaming_memory(_write_report(tmp_path / "large.xml", 40_000))
+
+    assert large < small * 2
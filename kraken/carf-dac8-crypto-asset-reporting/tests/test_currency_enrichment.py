@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+from datetime import date, timedelta
+
+import pytest
+
 from currency_normalizer import normalize_fiat_values
+from fx_rate_store import FxRateStore
 from enrichment import enrich_tax_treatments, resolve_cost_basis
 
 
@@ -54,3 +59,74 @@ def test_enrichment_sets_tax_treatment_and_cost_basis() -> None:
     assert sell["cost_basis_home"] == 5000.0
     assert sell["gain_loss_home"] == 1000.0
     assert sell["holding_period_days"] == 45
+
+
+ECB_CSV = """Date,USD,JPY,GBP,
+2024-03-29,N/A,N/A,N/A,
+2024-03-28,1.0811,163.52,0.8551,
+2024-03-27,1.0824,163.77,0.8570,
+2023-01-02,1.0683,140.33,0.8868,
+"""
+
+
+@pytest.fixture
+def fx_store(tmp_path):
+    csv_path = tmp_path / "eurofxref-hist.csv"
+    csv_path.write_text(ECB_CSV, encoding="utf-8")
+    store = FxRateStore(tmp_path / "fx.db")
+    assert store.load_ecb_csv(csv_path) == 9
+    yield store
+    store.close()
+
+
+def test_fx_store_uses_nearest_prior_business_day(fx_store: FxRateStore) -> None:
+    # Good Friday and Easter Monday 2024 fall back to Thursday; a week-old gap does not resolve.
+    rates = fx_store.rates_on("USD", ["2024-03-27", "2024-03-29", "2024-04-01", "2024-04-05", "2022-12-30"])
+    assert rates == [
+        (1.0824, "2024-03-27"),
+        (1.0811, "2024-03-28"),
+        (1.0811, "2024-03-28"),
+        None,
+        None,
+    ]
+    assert fx_store.rate_on("EUR", "2024-03-29") == 1.0
+
+
+def test_dated_rates_convert_by_transaction_date(fx_store: FxRateStore) -> None:
+    rows = [
+        {"transaction_id": "old", "timestamp": "2023-01-02T09:00:00+00:00", "fiat_value": 1000.0, "fiat_currency": "EUR"},
+        {"transaction_id": "new", "timestamp": "2024-03-30T12:00:00Z", "fiat_value": 1000.0, "fiat_currency": "GBP"},
+        {"transaction_id": "gap", "timestamp": "2025-06-01T00:00:00+00:00", "fiat_value": 1000.0, "fiat_currency": "EUR"},
+    ]
+
+    old, new, gap = normalize_fiat_values(rows=rows, home_currency="USD", fx_store=fx_store)
+
+    assert old["fiat_value_home"] == pytest.approx(1068.3)
+    assert old["fx_rate_date"] == "2023-01-02"
+    assert new["fx_rate_used"] == pytest.approx(round(1.0811 / 0.8551, 12))
+    # Saturday 2024-03-30 (Good Friday weekend) uses Thursday's published rate.
+    assert new["fx_rate_date"] == "2024-03-28"
+    # No ECB rate within the lookback window: the static table still converts.
+    assert gap["fiat_value_home"] == 1080.0
+    assert "fx_rate_date" not in gap
+
+
+def test_dated_normalization_reads_each_currency_once(fx_store: FxRateStore, monkeypatch) -> None:
+    start = date(2023, 1, 2)
+    rows = [
+        {
+            "transaction_id": f"tx-{i}",
+            "timestamp": f"{(start + timedelta(days=i % 500)).isoformat()}T10:00:00+00:00",
+            "fiat_value": 100.0,
+            "fiat_currency": ("EUR", "GBP", "JPY")[i % 3],
+        }
+        for i in range(200_000)
+    ]
+    calls: list[str] = []
+    rates_on = fx_store.rates_on
+    monkeypatch.setattr(fx_store, "rates_on", lambda currency, days: calls.append(currency) or rates_on(currency, days))
+
+    normalized = normalize_fiat_values(rows=rows, home_currency="USD", fx_store=fx_store)
+
+    assert sorted(calls) == ["EUR", "GBP", "JPY", "USD"]
+    assert normalized[0]["fx_rate_date"] == "2023-01-02"
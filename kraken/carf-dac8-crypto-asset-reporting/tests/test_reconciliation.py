@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
 from reconciliation_engine import ToleranceConfig, reconcile_transactions
 
 
@@ -71,3 +76,54 @@ def test_reconcile_transactions_mixed_results() -> None:
     assert summary["discrepancy_count"] >= 1
     assert summary["unmatched_carf_count"] >= 1
     assert summary["cpa_escalation_count"] >= 1
+
+
+def _random_records(rng: random.Random, prefix: str, count: int) -> list[dict[str, object]]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows: list[dict[str, object]] = []
+    for i in range(count):
+        asset = rng.choice(["BTC", "ETH", "SOL", ""])
+        when = start + timedelta(seconds=rng.randrange(0, 20 * 86400), microseconds=rng.randrange(0, 1_000_000))
+        rows.append(
+            {
+                "transaction_id": f"{prefix}{i}",
+                "timestamp": "" if rng.random() < 0.05 else when.isoformat(),
+                "transaction_type": "exchange",
+                "asset_disposed": asset,
+                "quantity_disposed": round(rng.uniform(0.1, 3.0), 4),
+                "asset_acquired": rng.choice(["USD", "ETH", ""]),
+                "quantity_acquired": round(rng.uniform(10, 5000), 2),
+                "fiat_value": round(rng.uniform(10, 5000), 2),
+                "fee": rng.choice([0.0, 1.5, 4.0]),
+            }
+        )
+    return rows
+
+
+@pytest.mark.parametrize("ts_hours", [1, 24, 300])
+def test_columnar_engine_matches_rowwise_engine(ts_hours: int) -> None:
+    rng = random.Random(ts_hours)
+    user = _random_records(rng, "u", 600)
+    # CARF rows are perturbed copies of user rows plus some strays.
+    carf = []
+    for i, row in enumerate(rng.sample(user, 450)):
+        twin = dict(row, transaction_id=f"c{i}")
+        twin["quantity_disposed"] = round(float(row["quantity_disposed"]) * rng.choice([1.0, 1.001, 1.03]), 6)
+        twin["fiat_value"] = round(float(row["fiat_value"]) * rng.choice([1.0, 1.004, 1.2]), 2)
+        if row["timestamp"]:
+            shift = timedelta(seconds=rng.choice([0, 59, 3 * 3600, 30 * 3600]))
+            twin["timestamp"] = (datetime.fromisoformat(str(row["timestamp"])) + shift).isoformat()
+        carf.append(twin)
+    carf += _random_records(rng, "x", 100)
+    tolerance = ToleranceConfig(timestamp_tolerance_seconds=ts_hours * 3600)
+
+    rowwise = reconcile_transactions(
+        carf_records=carf, user_records=user, tolerance=tolerance, materiality_threshold_usd=500.0
+    )
+    columnar = reconcile_transactions(
+        carf_records=carf, user_records=user, tolerance=tolerance, materiality_threshold_usd=500.0, columnar=True
+    )
+
+    assert columnar["summary"] == rowwise["summary"]
+    assert columnar["matches"] == rowwise["matches"]
+    assert {item["discrepancy_type"] for item in rowwise["matches"]} >= {"", "missing", "quantity", "timezone"}
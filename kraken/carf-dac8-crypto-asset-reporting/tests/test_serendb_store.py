@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import serendb_store
+from serendb_store import SerenDBStore
+
+
+class _FakeCopy:
+    def __init__(self, cursor: "_FakeCursor") -> None:
+        self.cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def write_row(self, row) -> None:
+        self.cursor.staged.append(row)
+
+
+class _FakeCursor:
+    """Records SQL and returns one id per staged row on merge, like INSERT ... RETURNING."""
+
+    def __init__(self, conn: "_FakeConn") -> None:
+        self.conn = conn
+        self.staged: list[tuple] = []
+        self.returned: list[tuple[int, str]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def copy(self, statement: str) -> _FakeCopy:
+        self.conn.statements.append(statement)
+        return _FakeCopy(self)
+
+    def execute(self, query: str, params=None) -> None:
+        self.conn.statements.append(" ".join(query.split()))
+        if query.lstrip().startswith("INSERT"):
+            self.conn.chunks.append(len(self.staged))
+            transaction_index = 3 if "carf_transactions" in query else 2
+            self.returned = [
+                (len(self.conn.chunks) * 1000 + offset, row[transaction_index])
+                for offset, row in enumerate(self.staged)
+            ]
+        elif query.startswith("TRUNCATE"):
+            self.staged = []
+
+    def fetchall(self):
+        return self.returned
+
+    def executemany(self, query, params):  # pragma: no cover - must not be used for bulk rows
+        raise AssertionError("bulk persistence should COPY, not executemany")
+
+
+class _FakeConn:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.chunks: list[int] = []
+        self.commits = 0
+
+    def cursor(self) -> _FakeCursor:
+        return _FakeCursor(self)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+
+def _store(monkeypatch) -> tuple[SerenDBStore, _FakeConn]:
+    monkeypatch.setattr(serendb_store, "psycopg", object())
+    store = SerenDBStore("postgresql://example")
+    store.conn = _FakeConn()
+    return store, store.conn
+
+
+def test_carf_transactions_copy_into_staging_in_chunks(monkeypatch) -> None:
+    store, conn = _store(monkeypatch)
+    rows = (
+        {"report_id": "r1", "transaction_id": f"tx-{i}", "timestamp": "2026-01-10T10:00:00+00:00", "raw_data": {}}
+        for i in range(25)
+    )
+
+    id_map = store.persist_carf_transactions("session-1", rows, chunk_size=10)
+
+    assert conn.chunks == [10, 10, 5]
+    assert conn.commits == 1
+    assert id_map["tx-0"] == 1000 and id_map["tx-24"] == 3004
+    assert len(id_map) == 25
+    assert conn.statements[0].startswith("CREATE TEMP TABLE IF NOT EXISTS carf_transactions_stage ON COMMIT DROP")
+    assert conn.statements[1].startswith("COPY carf_transactions_stage (seq, report_id, session_id")
+    merge = conn.statements[2]
+    assert "SELECT DISTINCT ON (session_id, report_id, transaction_id)" in merge
+    assert "ON CONFLICT (session_id, report_id, transaction_id) DO UPDATE" in merge
+    assert merge.endswith("RETURNING id, transaction_id")
+
+
+def test_user_transactions_keep_input_order(monkeypatch) -> None:
+    store, conn = _store(monkeypatch)
+    rows = [{"transaction_id": "u1", "source": "user_csv"}, {"transaction_id": "u2", "source": "user_csv"}]
+
+    id_map = store.persist_user_transactions("session-1", rows)
+
+    assert id_map == {"u1": 1000, "u2": 1001}
+    assert any("FROM user_transactions_stage ORDER BY seq" in statement for statement in conn.statements)
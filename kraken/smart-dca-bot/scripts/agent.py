@@ -43,6 +43,7 @@ except ImportError:  # pragma: no cover
 
 from dca_engine import build_window, should_force_fill, window_progress
 from backtest_optimizer import optimize_invocation_config
+from indicator_engine import IndicatorEngine
 from kraken_client import KrakenAPIError, KrakenClient, KrakenCredentials
 from logger import AuditLogger
 from optimizer import SUPPORTED_STRATEGIES, compute_rsi, decide_execution
@@ -740,6 +741,15 @@ def get_market_snapshot(client: KrakenClient | None, pair: str) -> dict[str, Any
     }
 
 
+def get_price_history(client: KrakenClient | None, pair: str) -> list[Any]:
+    """Return daily OHLC rows for candle replay; mock runs have no real history."""
+    if client is None:
+        return []
+    ohlc_daily = client.get_ohlc(pair, interval=1440)
+    ohlc_daily_key = next((k for k in ohlc_daily.keys() if k != "last"), pair)
+    return list(ohlc_daily.get(ohlc_daily_key, []))
+
+
 def apply_risk_policy(
     *,
     config: dict[str, Any],
@@ -1228,14 +1238,38 @@ def _single_asset_mode(
     }
 
 
+def _mock_ohlc_rows(closes: list[float], *, interval_seconds: int, volume_usd: float) -> list[list[Any]]:
+    now_ts = int(_now().timestamp())
+    last_open = now_ts - (now_ts % interval_seconds)
+    first_open = last_open - (len(closes) - 1) * interval_seconds
+    rows: list[list[Any]] = []
+    for index, close in enumerate(closes):
+        rows.append(
+            [
+                first_open + index * interval_seconds,
+                close,
+                close,
+                close,
+                close,
+                close,
+                volume_usd / max(close, 1e-9),
+            ]
+        )
+    return rows
+
+
 def _scanner_market_rows(
     *,
     config: dict[str, Any],
     client: KrakenClient | None,
+    indicators: IndicatorEngine | None = None,
 ) -> list[dict[str, Any]]:
     rows: list[dict[str, Any]] = []
     scan_assets = list(config.get("runtime", {}).get("market_scan_assets", []))
     for pair in scan_assets:
+        if indicators is not None:
+            rows.append(_scanner_indicator_row(client=client, pair=pair, indicators=indicators))
+            continue
         snap = get_market_snapshot(client, pair)
         closes = [float(v) for v in snap.get("candles", [])]
         rsi = compute_rsi(closes, period=14)
@@ -1269,9 +1303,75 @@ def _scanner_market_rows(
                 "accumulation_score": float(min(max((50.0 - abs(rsi - 50.0)) / 50.0, 0.0), 1.0)),
             }
         )
+    if indicators is not None:
+        indicators.flush()
     return rows
 
 
+def _scanner_indicator_row(
+    *,
+    client: KrakenClient | None,
+    pair: str,
+    indicators: IndicatorEngine,
+) -> dict[str, Any]:
+    """Build one scanner row from incremental indicator state.
+
+    Only OHLC bars newer than the persisted state are requested, so per-run
+    cost scales with new bars rather than the full candle history.
+    """
+    if client is None:
+        snap = _mock_snapshot(pair)
+        price = _float(snap["price"])
+        vwap = _float(snap["vwap"], fallback=price)
+        volume_24h = _float(snap.get("volume_24h_usd"))
+        intraday_rows = _mock_ohlc_rows(
+            [float(v) for v in snap.get("candles", [])],
+            interval_seconds=900,
+            volume_usd=volume_24h / 96.0,
+        )
+        daily_rows = _mock_ohlc_rows(
+            [float(v) for v in snap.get("daily_closes", [])],
+            interval_seconds=86400,
+            volume_usd=_float(snap.get("avg_volume_30d_usd"), fallback=volume_24h),
+        )
+    else:
+        ticker = client.get_ticker(pair)
+        row = ticker[next(iter(ticker.keys()))]
+        price = _float(row.get("c", [0])[0])
+        vwap = _float(row.get("p", [price, price])[1], fallback=price)
+        volume_24h = _float(row.get("v", [0, 0])[1]) * price
+        ohlc_15m = client.get_ohlc(pair, interval=15, since=indicators.last_bar_ts(pair, "15m"))
+        intraday_rows = ohlc_15m.get(next((k for k in ohlc_15m.keys() if k != "last"), pair), [])
+        ohlc_daily = client.get_ohlc(pair, interval=1440, since=indicators.last_bar_ts(pair, "1d"))
+        daily_rows = ohlc_daily.get(next((k for k in ohlc_daily.keys() if k != "last"), pair), [])
+
+    fast = indicators.update(pair, "15m", intraday_rows)
+    slow = indicators.update(pair, "1d", daily_rows)
+    rsi = _float(fast["rsi_14"], fallback=50.0)
+    sma20 = _float(slow["sma_20"], fallback=price)
+    price_7d_ago = _float(slow["close_lag_7"], fallback=price)
+    avg_volume_30d = _float(slow["volume_usd_mean_30"])
+    listing_days = 999
+    if slow["first_bar_ts"]:
+        listing_days = int(max((_now().timestamp() - int(slow["first_bar_ts"])) / 86400.0, 0.0))
+
+    return {
+        "asset": pair,
+        "price": price,
+        "volume_24h_usd": volume_24h,
+        "volume_ratio": volume_24h / avg_volume_30d if avg_volume_30d > 0 else 1.0,
+        "rsi_14": rsi,
+        "price_change_24h_pct": ((price - vwap) / max(vwap, 1e-9)) * 100.0,
+        "price_change_7d_pct": ((price - price_7d_ago) / max(price_7d_ago, 1e-9)) * 100.0,
+        "sma20": sma20,
+        "zscore_20": _float(slow["zscore_20"]),
+        "volatility_20_pct": _float(slow["volatility_20_pct"]),
+        "ema_20": _float(slow["ema_20"], fallback=price),
+        "new_listing_days": listing_days,
+        "accumulation_score": float(min(max((50.0 - abs(rsi - 50.0)) / 50.0, 0.0), 1.0)),
+    }
+
+
 def _scanner_mode(
     *,
     config: dict[str, Any],
@@ -1301,7 +1401,13 @@ def _scanner_mode(
         enabled_signals=list(scanner_cfg.get("signals", [])),
     )
 
-    rows = _scanner_market_rows(config=config, client=client)
+    rows = _scanner_market_rows(
+        config=config,
+        client=client,
+        # Mock bars are synthetic and stamped "now"; keep them out of the live state db.
+        indicators=IndicatorEngine(STATE_DB_PATH if client is not None else None),
+    )
+    rsi_by_pair = {str(row["asset"]): _float(row["rsi_14"], fallback=50.0) for row in rows}
     signals = scanner.scan(rows, base_allocations)
     signal_payloads = [signal.to_dict() for signal in signals]
 
@@ -1391,6 +1497,8 @@ def _scanner_mode(
         pair = str(order["asset"])
         notional = _float(order["notional_usd"])
         snap = get_market_snapshot(client, pair)
+        if pair in rsi_by_pair:
+            snap["rsi_15m"] = rsi_by_pair[pair]
         decision = decide_execution(
             strategy=strategy,
             snapshot=snap,
@@ -1600,6 +1708,7 @@ def run_once(
             optimized = optimize_invocation_config(
                 config=config,
                 get_snapshot=lambda pair: get_market_snapshot(client, pair),
+                get_history=lambda pair: get_price_history(client, pair),
             )
             config = optimized["config"]
             optimization = optimized["summary"]
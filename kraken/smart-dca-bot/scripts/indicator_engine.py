@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""Incremental indicator state for scanner and execution signals.
+
+Each indicator keeps O(window) state and consumes one bar at a time, so a run
+only feeds the bars that closed since the previous run. State is persisted in
+the local run-state sqlite database next to the ``runs`` table.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import sqlite3
+from collections import deque
+from copy import deepcopy
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    from datetime import UTC
+except ImportError:  # pragma: no cover
+    from datetime import timezone
+
+    UTC = timezone.utc
+
+
+STATE_VERSION = 1
+# Bar length per timeframe, used to spot resume gaps wider than one OHLC page.
+TIMEFRAME_SECONDS = {"15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}
+
+
+def _float(value: Any, fallback: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return fallback
+
+
+class WilderRSI:
+    """Relative strength index with Wilder smoothing."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = int(period)
+        self.prev_close: float | None = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0
+
+    def update(self, close: float) -> None:
+        if self.prev_close is None:
+            self.prev_close = close
+            return
+        delta = close - self.prev_close
+        gain = max(delta, 0.0)
+        loss = max(-delta, 0.0)
+        self.prev_close = close
+        self.count += 1
+        if self.count <= self.period:
+            # Seed with the simple average of the first ``period`` moves.
+            self.avg_gain += gain / self.period
+            self.avg_loss += loss / self.period
+            return
+        self.avg_gain = ((self.avg_gain * (self.period - 1)) + gain) / self.period
+        self.avg_loss = ((self.avg_loss * (self.period - 1)) + loss) / self.period
+
+    @property
+    def value(self) -> float:
+        if self.count < self.period:
+            return 50.0
+        if self.avg_loss == 0:
+            return 100.0
+        rs = self.avg_gain / self.avg_loss
+        return 100.0 - (100.0 / (1.0 + rs))
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "period": self.period,
+            "prev_close": self.prev_close,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> WilderRSI:
+        indicator = cls(int(state.get("period", 14)))
+        prev_close = state.get("prev_close")
+        indicator.prev_close = None if prev_close is None else float(prev_close)
+        indicator.avg_gain = _float(state.get("avg_gain"))
+        indicator.avg_loss = _float(state.get("avg_loss"))
+        indicator.count = int(state.get("count", 0))
+        return indicator
+
+
+class EMA:
+    """Exponential moving average seeded with the first ``period`` values' mean."""
+
+    def __init__(self, period: int = 20) -> None:
+        self.period = int(period)
+        self.alpha = 2.0 / (self.period + 1.0)
+        self.ema: float | None = None
+        self.count = 0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        if self.ema is None:
+            self.ema = value
+        elif self.count <= self.period:
+            self.ema += (value - self.ema) / self.count
+        else:
+            self.ema += self.alpha * (value - self.ema)
+
+    @property
+    def value(self) -> float | None:
+        return self.ema
+
+    def to_state(self) -> dict[str, Any]:
+        return {"period": self.period, "ema": self.ema, "count": self.count}
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> EMA:
+        indicator = cls(int(state.get("period", 20)))
+        ema = state.get("ema")
+        indicator.ema = None if ema is None else float(ema)
+        indicator.count = int(state.get("count", 0))
+        return indicator
+
+
+class RollingWindow:
+    """Fixed-size window with running sums for mean, deviation and z-score."""
+
+    def __init__(self, window: int = 20) -> None:
+        self.window = int(window)
+        self.values: deque[float] = deque(maxlen=self.window)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, value: float) -> None:
+        if len(self.values) == self.window:
+            evicted = self.values[0]
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def mean(self) -> float | None:
+        if not self.values:
+            return None
+        return self.total / len(self.values)
+
+    @property
+    def std(self) -> float:
+        count = len(self.values)
+        if count < 2:
+            return 0.0
+        variance = (self.total_sq - (self.total * self.total) / count) / (count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def zscore(self) -> float:
+        std = self.std
+        if not self.values or std <= 0:
+            return 0.0
+        return (self.values[-1] - (self.mean or 0.0)) / std
+
+    def lag(self, bars: int) -> float | None:
+        """Value ``bars`` positions before the newest one."""
+        if bars < 0 or bars >= len(self.values):
+            return None
+        return self.values[-1 - bars]
+
+    def to_state(self) -> dict[str, Any]:
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> RollingWindow:
+        indicator = cls(int(state.get("window", 20)))
+        for value in state.get("values", []):
+            indicator.update(float(value))
+        return indicator
+
+
+class RollingVWAP:
+    """Volume-weighted average price over the last ``window`` bars."""
+
+    def __init__(self, window: int = 20) -> None:
+        self.window = int(window)
+        self.bars: deque[tuple[float, float]] = deque(maxlen=self.window)
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    def update(self, price: float, volume: float) -> None:
+        if len(self.bars) == self.window:
+            old_price, old_volume = self.bars[0]
+            self.price_volume -= old_price * old_volume
+            self.volume -= old_volume
+        self.bars.append((price, volume))
+        self.price_volume += price * volume
+        self.volume += volume
+
+    @property
+    def value(self) -> float | None:
+        if self.volume > 0:
+            return self.price_volume / self.volume
+        if self.bars:
+            return sum(price for price, _ in self.bars) / len(self.bars)
+        return None
+
+    def to_state(self) -> dict[str, Any]:
+        return {"window": self.window, "bars": [list(bar) for bar in self.bars]}
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> RollingVWAP:
+        indicator = cls(int(state.get("window", 20)))
+        for price, volume in state.get("bars", []):
+            indicator.update(float(price), float(volume))
+        return indicator
+
+
+class RollingVolatility:
+    """Sample standard deviation of log returns over ``window`` bars, in percent."""
+
+    def __init__(self, window: int = 20) -> None:
+        self.prev_close: float | None = None
+        self.returns = RollingWindow(window)
+
+    def update(self, close: float) -> None:
+        if self.prev_close is not None and self.prev_close > 0 and close > 0:
+            self.returns.update(math.log(close / self.prev_close))
+        self.prev_close = close
+
+    @property
+    def value(self) -> float:
+        return self.returns.std * 100.0
+
+    def to_state(self) -> dict[str, Any]:
+        return {"prev_close": self.prev_close, "returns": self.returns.to_state()}
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> RollingVolatility:
+        returns = RollingWindow.from_state(state.get("returns", {}))
+        indicator = cls(returns.window)
+        indicator.returns = returns
+        prev_close = state.get("prev_close")
+        indicator.prev_close = None if prev_close is None else float(prev_close)
+        return indicator
+
+
+class IndicatorSet:
+    """All streaming indicators tracked for one (asset, timeframe) series."""
+
+    def __init__(self) -> None:
+        self.rsi = WilderRSI(14)
+        self.ema = EMA(20)
+        self.vwap = RollingVWAP(20)
+        self.volatility = RollingVolatility(20)
+        self.closes = RollingWindow(20)
+        self.volume_usd = RollingWindow(30)
+        self.first_bar_ts: int | None = None
+        self.last_bar_ts: int | None = None
+        self.bar_count = 0
+
+    def update(self, bar: list[Any]) -> None:
+        ts = int(_float(bar[0]))
+        close = _float(bar[4])
+        high = _float(bar[2], close)
+        low = _float(bar[3], close)
+        vwap = _float(bar[5]) if len(bar) > 5 else 0.0
+        volume = _float(bar[6]) if len(bar) > 6 else 0.0
+        typical = vwap if vwap > 0 else (high + low + close) / 3.0
+
+        self.rsi.update(close)
+        self.ema.update(close)
+        self.vwap.update(typical, volume)
+        self.volatility.update(close)
+        self.closes.update(close)
+        self.volume_usd.update(volume * close)
+        if self.first_bar_ts is None:
+            self.first_bar_ts = ts
+        self.last_bar_ts = ts
+        self.bar_count += 1
+
+    def values(self) -> dict[str, Any]:
+        return {
+            "rsi_14": round(self.rsi.value, 6),
+            "ema_20": self.ema.value,
+            "vwap_20": self.vwap.value,
+            "volatility_20_pct": round(self.volatility.value, 6),
+            "sma_20": self.closes.mean if self.closes.full else None,
+            "zscore_20": round(self.closes.zscore, 6),
+            "close_lag_7": self.closes.lag(7),
+            "volume_usd_mean_30": self.volume_usd.mean,
+            "first_bar_ts": self.first_bar_ts,
+            "last_bar_ts": self.last_bar_ts,
+            "bar_count": self.bar_count,
+        }
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "rsi": self.rsi.to_state(),
+            "ema": self.ema.to_state(),
+            "vwap": self.vwap.to_state(),
+            "volatility": self.volatility.to_state(),
+            "closes": self.closes.to_state(),
+            "volume_usd": self.volume_usd.to_state(),
+            "first_bar_ts": self.first_bar_ts,
+            "last_bar_ts": self.last_bar_ts,
+            "bar_count": self.bar_count,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> IndicatorSet:
+        indicators = cls()
+        if int(state.get("version", 0)) != STATE_VERSION:
+            return indicators
+        indicators.rsi = WilderRSI.from_state(state.get("rsi", {}))
+        indicators.ema = EMA.from_state(state.get("ema", {}))
+        indicators.vwap = RollingVWAP.from_state(state.get("vwap", {}))
+        indicators.volatility = RollingVolatility.from_state(state.get("volatility", {}))
+        indicators.closes = RollingWindow.from_state(state.get("closes", {}))
+        indicators.volume_usd = RollingWindow.from_state(state.get("volume_usd", {}))
+        first_ts = state.get("first_bar_ts")
+        last_ts = state.get("last_bar_ts")
+        indicators.first_bar_ts = None if first_ts is None else int(first_ts)
+        indicators.last_bar_ts = None if last_ts is None else int(last_ts)
+        indicators.bar_count = int(state.get("bar_count", 0))
+        return indicators
+
+
+class IndicatorEngine:
+    """Feeds new OHLC bars into persisted per-asset indicator state.
+
+    With ``db_path=None`` the state lives only in memory (used for mock market
+    data, which must never seed the live state database).
+    """
+
+    def __init__(self, db_path: str | Path | None) -> None:
+        self.db_path = Path(db_path) if db_path is not None else None
+        self._sets: dict[tuple[str, str], IndicatorSet] | None = None
+        self._dirty: set[tuple[str, str]] = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS indicator_state (
+                asset TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                last_bar_ts INTEGER,
+                state_json TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (asset, timeframe)
+            )
+            """
+        )
+        return conn
+
+    def _load(self) -> dict[tuple[str, str], IndicatorSet]:
+        if self._sets is None:
+            self._sets = {}
+            if self.db_path is None:
+                return self._sets
+            with self._connect() as conn:
+                rows = conn.execute("SELECT asset, timeframe, state_json FROM indicator_state").fetchall()
+            for asset, timeframe, state_json in rows:
+                try:
+                    state = json.loads(state_json)
+                except json.JSONDecodeError:
+                    continue
+                self._sets[(asset, timeframe)] = IndicatorSet.from_state(state)
+        return self._sets
+
+    def last_bar_ts(self, asset: str, timeframe: str) -> int | None:
+        indicators = self._load().get((asset.upper(), timeframe))
+        return indicators.last_bar_ts if indicators is not None else None
+
+    def update(self, asset: str, timeframe: str, rows: Iterable[list[Any]]) -> dict[str, Any]:
+        """Commit closed bars newer than the stored state and return current values.
+
+        The newest row is the still-forming bar: it is folded into the returned
+        values but not persisted, so the next run sees its final close.
+        """
+        key = (asset.upper(), timeframe)
+        sets = self._load()
+        indicators = sets.setdefault(key, IndicatorSet())
+        bars = sorted(
+            (row for row in rows if isinstance(row, (list, tuple)) and len(row) >= 5),
+            key=lambda row: _float(row[0]),
+        )
+        forming = bars[-1] if bars else None
+        interval = TIMEFRAME_SECONDS.get(timeframe)
+        if indicators.last_bar_ts is not None and interval is not None:
+            newer = [bar for bar in bars if int(_float(bar[0])) > indicators.last_bar_ts]
+            if newer and int(_float(newer[0][0])) > indicators.last_bar_ts + interval:
+                # Kraken serves at most one page of recent bars, so a long
+                # outage leaves a hole; reseed from the bars we have rather
+                # than fold across it. Listing age survives the reseed.
+                first_bar_ts = indicators.first_bar_ts
+                indicators = sets[key] = IndicatorSet()
+                indicators.first_bar_ts = first_bar_ts
+                self._dirty.add(key)
+        for bar in bars[:-1]:
+            ts = int(_float(bar[0]))
+            if indicators.last_bar_ts is not None and ts <= indicators.last_bar_ts:
+                continue
+            indicators.update(bar)
+            self._dirty.add(key)
+
+        if forming is None or (
+            indicators.last_bar_ts is not None and int(_float(forming[0])) <= indicators.last_bar_ts
+        ):
+            return indicators.values()
+        preview = deepcopy(indicators)
+        preview.update(forming)
+        return preview.values()
+
+    def flush(self) -> int:
+        """Persist changed indicator state in one transaction."""
+        if not self._dirty or self._sets is None:
+            return 0
+        if self.db_path is None:
+            flushed = len(self._dirty)
+            self._dirty.clear()
+            return flushed
+        now = datetime.now(tz=UTC).isoformat()
+        payload = [
+            (
+                asset,
+                timeframe,
+                self._sets[(asset, timeframe)].last_bar_ts,
+                json.dumps(self._sets[(asset, timeframe)].to_state(), sort_keys=True),
+                now,
+            )
+            for asset, timeframe in sorted(self._dirty)
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO indicator_state (asset, timeframe, last_bar_ts, state_json, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(asset, timeframe) DO UPDATE SET
+                    last_bar_ts = excluded.last_bar_ts,
+                    state_json = excluded.state_json,
+                    updated_at = excluded.updated_at
+                """,
+                payload,
+            )
+            conn.commit()
+        self._dirty.clear()
+        return len(payload)
@@ -113,7 +113,10 @@ def decide_execution(
         )
 
     if strategy == "momentum_dip":
-        rsi_15m = compute_rsi(candles, period=14)
+        if snapshot.get("rsi_15m") is not None:
+            rsi_15m = float(snapshot["rsi_15m"])
+        else:
+            rsi_15m = compute_rsi(candles, period=14)
         dip = price <= low_24h * 1.02
         should_execute = (rsi_15m < 30.0 and dip) or window_progress > 0.90
         confidence = 90.0 - abs(30.0 - rsi_15m)
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""Candle-replay backtester for the Kraken Smart DCA bot.
+
+Replays historical OHLC bars through the same decision path the live agent
+uses: ``dca_engine`` windows, ``optimizer.decide_execution``, portfolio drift
+rebalancing and scanner reallocations. Price arrays and per-checkpoint market
+snapshots are built once per asset, so many strategy/allocation
+configurations are evaluated in a single pass over the cached data.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from dca_engine import UTC, build_window, floor_to_frequency, should_force_fill, window_progress
+from optimizer import ExecutionDecision, compute_rsi, decide_execution
+from portfolio_manager import PortfolioManager
+from scanner import OpportunityScanner
+
+
+# Progress points sampled inside every DCA window. The last point lands on the
+# window end, which is where the live agent forces a market fill.
+REPLAY_CHECKPOINTS = (0.0, 0.25, 0.5, 0.75, 1.0)
+MIN_REPLAY_BARS = 30
+DAY_SECONDS = 86400
+
+
+def _float(raw: Any, fallback: float = 0.0) -> float:
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return fallback
+
+
+@dataclass
+class PriceHistory:
+    """Column-oriented OHLC arrays for one asset, oldest bar first."""
+
+    asset: str
+    timestamps: list[int]
+    opens: list[float]
+    highs: list[float]
+    lows: list[float]
+    closes: list[float]
+    vwaps: list[float]
+    volumes: list[float]
+    interval_seconds: int = DAY_SECONDS
+
+    @classmethod
+    def from_ohlc_rows(
+        cls,
+        asset: str,
+        rows: Iterable[Any],
+        interval_seconds: int = DAY_SECONDS,
+    ) -> PriceHistory:
+        """Build arrays from exchange rows shaped ``[time, open, high, low, close, vwap, volume, ...]``."""
+        parsed: dict[int, tuple[float, float, float, float, float, float]] = {}
+        for row in rows:
+            if not isinstance(row, (list, tuple)) or len(row) < 5:
+                continue
+            ts = int(_float(row[0]))
+            close = _float(row[4])
+            if ts <= 0 or close <= 0:
+                continue
+            open_px = _float(row[1], close) or close
+            high = max(_float(row[2], close), open_px, close)
+            low = min(_float(row[3], close) or close, open_px, close)
+            vwap = _float(row[5]) if len(row) > 5 else 0.0
+            if vwap <= 0:
+                vwap = (high + low + close) / 3.0
+            volume = _float(row[6]) if len(row) > 6 else 0.0
+            parsed[ts] = (open_px, high, low, close, vwap, volume)
+
+        ordered = sorted(parsed.items())
+        return cls(
+            asset=asset,
+            timestamps=[ts for ts, _ in ordered],
+            opens=[values[0] for _, values in ordered],
+            highs=[values[1] for _, values in ordered],
+            lows=[values[2] for _, values in ordered],
+            closes=[values[3] for _, values in ordered],
+            vwaps=[values[4] for _, values in ordered],
+            volumes=[values[5] for _, values in ordered],
+            interval_seconds=int(interval_seconds),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def start_ts(self) -> int:
+        return self.timestamps[0]
+
+    @property
+    def end_ts(self) -> int:
+        return self.timestamps[-1] + self.interval_seconds
+
+    def tail_days(self, days: int) -> PriceHistory:
+        """Return the bars covering the most recent ``days`` days."""
+        if not self.timestamps or days <= 0:
+            return self
+        cutoff = self.end_ts - (int(days) * DAY_SECONDS)
+        start = bisect_right(self.timestamps, cutoff - 1)
+        return PriceHistory(
+            asset=self.asset,
+            timestamps=self.timestamps[start:],
+            opens=self.opens[start:],
+            highs=self.highs[start:],
+            lows=self.lows[start:],
+            closes=self.closes[start:],
+            vwaps=self.vwaps[start:],
+            volumes=self.volumes[start:],
+            interval_seconds=self.interval_seconds,
+        )
+
+    def _path(self, index: int) -> tuple[float, float, float, float]:
+        # Bullish bars are assumed to print their low first, bearish bars their high.
+        open_px, close = self.opens[index], self.closes[index]
+        if close >= open_px:
+            return open_px, self.lows[index], self.highs[index], close
+        return open_px, self.highs[index], self.lows[index], close
+
+    def price_at(self, index: int, fraction: float) -> float:
+        """Approximate the intrabar price along an open/extreme/extreme/close path."""
+        path = self._path(index)
+        position = min(max(fraction, 0.0), 1.0) * 3.0
+        segment = min(int(position), 2)
+        local = position - segment
+        return path[segment] + (path[segment + 1] - path[segment]) * local
+
+    def low_before(self, index: int, fraction: float) -> float:
+        """Lowest price printed on the intrabar path from the open up to ``fraction``."""
+        path = self._path(index)
+        lowest = self.price_at(index, fraction)
+        for vertex, point in enumerate(path):
+            if vertex / 3.0 <= fraction:
+                lowest = min(lowest, point)
+        return lowest
+
+    def low_after(self, index: int, fraction: float) -> float:
+        """Lowest price reachable on the intrabar path from ``fraction`` to the bar close."""
+        path = self._path(index)
+        lowest = self.price_at(index, fraction)
+        for vertex, point in enumerate(path):
+            if vertex / 3.0 >= fraction:
+                lowest = min(lowest, point)
+        return lowest
+
+
+@dataclass(frozen=True)
+class ReplayCheckpoint:
+    window_index: int
+    timestamp: int
+    progress: float
+    force_fill: bool
+
+
+@dataclass
+class MarketTape:
+    """Cached per-checkpoint snapshots for one asset."""
+
+    history: PriceHistory
+    bar_indexes: list[int]
+    prices: list[float]
+    reachable_lows: list[float]
+    snapshots: list[dict[str, Any]]
+
+
+@dataclass
+class ReplayResult:
+    strategy: str
+    allocations: dict[str, float]
+    invested_usd: float
+    fees_usd: float
+    final_value_usd: float
+    pnl_pct: float
+    max_drawdown_pct: float
+    fill_count: int
+    window_count: int
+    scanner_signal_count: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "strategy": self.strategy,
+            "allocations": dict(self.allocations),
+            "invested_usd": round(self.invested_usd, 2),
+            "fees_usd": round(self.fees_usd, 4),
+            "final_value_usd": round(self.final_value_usd, 2),
+            "pnl_pct": round(self.pnl_pct, 4),
+            "max_drawdown_pct": round(self.max_drawdown_pct, 4),
+            "fill_count": self.fill_count,
+            "window_count": self.window_count,
+            "scanner_signal_count": self.scanner_signal_count,
+        }
+
+
+@dataclass
+class _Account:
+    strategy: str
+    allocations: dict[str, float]
+    units: dict[str, float] = field(default_factory=dict)
+    budgets: dict[str, float] = field(default_factory=dict)
+    invested_usd: float = 0.0
+    fees_usd: float = 0.0
+    fill_count: int = 0
+    peak_ratio: float = 1.0
+    max_drawdown_pct: float = 0.0
+    signal_count: int = 0
+
+
+def build_replay_schedule(
+    *,
+    start_ts: int,
+    end_ts: int,
+    frequency: str,
+    window_hours: int,
+) -> list[ReplayCheckpoint]:
+    """Enumerate the DCA windows fully covered by ``[start_ts, end_ts]`` and their checkpoints."""
+    checkpoints: list[ReplayCheckpoint] = []
+    start = datetime.fromtimestamp(start_ts, tz=UTC)
+    end = datetime.fromtimestamp(end_ts, tz=UTC)
+
+    window_starts: list[datetime] = []
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        anchor = floor_to_frequency(day, frequency)
+        if not window_starts or anchor != window_starts[-1]:
+            window_starts.append(anchor)
+        day += timedelta(days=1)
+
+    window_index = 0
+    for anchor in window_starts:
+        window = build_window(now=anchor, frequency=frequency, window_hours=window_hours)
+        if window.start < start or window.end > end:
+            continue
+        for point in REPLAY_CHECKPOINTS:
+            moment = window.start + timedelta(seconds=window.duration_seconds * point)
+            checkpoints.append(
+                ReplayCheckpoint(
+                    window_index=window_index,
+                    timestamp=int(moment.timestamp()),
+                    progress=window_progress(window, moment),
+                    force_fill=should_force_fill(window, moment),
+                )
+            )
+        window_index += 1
+    return checkpoints
+
+
+def build_market_tape(
+    history: PriceHistory,
+    schedule: list[ReplayCheckpoint],
+    *,
+    spread_bps: float = 10.0,
+    depth_score: float = 0.5,
+) -> MarketTape:
+    """Precompute the snapshot ``decide_execution`` sees at each checkpoint."""
+    bar_indexes: list[int] = []
+    prices: list[float] = []
+    reachable_lows: list[float] = []
+    snapshots: list[dict[str, Any]] = []
+    half_spread = max(spread_bps, 0.0) / 20000.0
+    last_index = len(history) - 1
+
+    for checkpoint in schedule:
+        index = bisect_right(history.timestamps, checkpoint.timestamp) - 1
+        index = min(max(index, 0), last_index)
+        fraction = (checkpoint.timestamp - history.timestamps[index]) / max(history.interval_seconds, 1)
+        fraction = min(max(fraction, 0.0), 1.0)
+        price = history.price_at(index, fraction)
+        previous = max(index - 1, 0)
+        candles = history.closes[max(index - 19, 0) : index] + [price]
+
+        bar_indexes.append(index)
+        prices.append(price)
+        reachable_lows.append(history.low_after(index, fraction))
+        snapshots.append(
+            {
+                "pair": history.asset,
+                "price": price,
+                # Prior bar VWAP avoids peeking at the rest of the current bar.
+                "vwap": history.vwaps[previous],
+                "bid": price * (1.0 - half_spread),
+                "ask": price * (1.0 + half_spread),
+                "low_24h": min(history.lows[previous], history.low_before(index, fraction)),
+                "high_24h": max(history.highs[previous], price),
+                "depth_score": depth_score,
+                "candles": candles,
+            }
+        )
+
+    return MarketTape(
+        history=history,
+        bar_indexes=bar_indexes,
+        prices=prices,
+        reachable_lows=reachable_lows,
+        snapshots=snapshots,
+    )
+
+
+class ReplayEngine:
+    """Evaluates many DCA configurations over shared cached market tapes."""
+
+    def __init__(
+        self,
+        histories: dict[str, PriceHistory],
+        *,
+        frequency: str,
+        window_hours: int,
+        maker_fee_bps: float,
+        taker_fee_bps: float,
+        spread_bps: dict[str, float] | None = None,
+        depth_scores: dict[str, float] | None = None,
+    ) -> None:
+        usable = {asset: history for asset, history in histories.items() if len(history) >= MIN_REPLAY_BARS}
+        if not usable:
+            raise ValueError(f"candle replay needs at least {MIN_REPLAY_BARS} bars for one asset")
+        start_ts = max(history.start_ts for history in usable.values())
+        end_ts = min(history.end_ts for history in usable.values())
+        self.schedule = build_replay_schedule(
+            start_ts=start_ts,
+            end_ts=end_ts,
+            frequency=frequency,
+            window_hours=window_hours,
+        )
+        if not self.schedule:
+            raise ValueError("candle replay history does not cover a complete DCA window")
+        self.window_count = self.schedule[-1].window_index + 1
+        self.maker_fee = max(float(maker_fee_bps), 0.0) / 10000.0
+        self.taker_fee = max(float(taker_fee_bps), 0.0) / 10000.0
+        self.tapes = {
+            asset: build_market_tape(
+                history,
+                self.schedule,
+                spread_bps=float((spread_bps or {}).get(asset, 10.0)),
+                depth_score=float((depth_scores or {}).get(asset, 0.5)),
+            )
+            for asset, history in usable.items()
+        }
+        self._decisions: dict[tuple[str, str, int], ExecutionDecision] = {}
+        self._scanner_rows: dict[int, list[dict[str, Any]]] = {}
+
+    @property
+    def assets(self) -> list[str]:
+        return list(self.tapes)
+
+    @property
+    def bar_count(self) -> int:
+        return max(len(tape.history) for tape in self.tapes.values())
+
+    def _decision(self, asset: str, strategy: str, step: int) -> ExecutionDecision:
+        key = (asset, strategy, step)
+        cached = self._decisions.get(key)
+        if cached is None:
+            checkpoint = self.schedule[step]
+            cached = decide_execution(
+                strategy=strategy,
+                snapshot=self.tapes[asset].snapshots[step],
+                window_progress=checkpoint.progress,
+                force_fill=checkpoint.force_fill,
+            )
+            self._decisions[key] = cached
+        return cached
+
+    def _try_fill(self, account: _Account, asset: str, step: int) -> None:
+        budget = account.budgets.get(asset, 0.0)
+        if budget <= 0:
+            return
+        decision = self._decision(asset, account.strategy, step)
+        if not decision.should_execute:
+            return
+        tape = self.tapes[asset]
+        snapshot = tape.snapshots[step]
+        if decision.order_type == "market" or decision.limit_price is None:
+            fill_price = float(snapshot["ask"])
+            fee_rate = self.taker_fee
+        else:
+            limit_price = float(decision.limit_price)
+            if limit_price < tape.reachable_lows[step]:
+                return
+            fill_price = limit_price
+            fee_rate = self.maker_fee
+        if fill_price <= 0:
+            return
+        fee = budget * fee_rate
+        account.units[asset] = account.units.get(asset, 0.0) + ((budget - fee) / fill_price)
+        account.invested_usd += budget
+        account.fees_usd += fee
+        account.fill_count += 1
+        account.budgets[asset] = 0.0
+
+    def _mark(self, account: _Account, step: int) -> float:
+        value = sum(units * self.tapes[asset].prices[step] for asset, units in account.units.items())
+        if account.invested_usd > 0:
+            ratio = value / account.invested_usd
+            account.peak_ratio = max(account.peak_ratio, ratio)
+            drawdown = (1.0 - (ratio / account.peak_ratio)) * 100.0
+            account.max_drawdown_pct = max(account.max_drawdown_pct, drawdown)
+        return value
+
+    def _result(self, account: _Account) -> ReplayResult:
+        value = self._mark(account, len(self.schedule) - 1)
+        pnl_pct = ((value - account.invested_usd) / account.invested_usd) * 100.0 if account.invested_usd > 0 else 0.0
+        return ReplayResult(
+            strategy=account.strategy,
+            allocations=dict(account.allocations),
+            invested_usd=account.invested_usd,
+            fees_usd=account.fees_usd,
+            final_value_usd=value,
+            pnl_pct=pnl_pct,
+            max_drawdown_pct=account.max_drawdown_pct,
+            fill_count=account.fill_count,
+            window_count=self.window_count,
+            scanner_signal_count=account.signal_count,
+        )
+
+    def _scanner_market_rows(self, step: int) -> list[dict[str, Any]]:
+        cached = self._scanner_rows.get(step)
+        if cached is not None:
+            return cached
+        rows: list[dict[str, Any]] = []
+        for asset, tape in self.tapes.items():
+            history = tape.history
+            index = tape.bar_indexes[step]
+            price = tape.prices[step]
+            closes = history.closes[max(index - 14, 0) : index] + [price]
+            rsi = compute_rsi(closes, period=14)
+            volumes_usd = [
+                history.volumes[i] * history.closes[i] for i in range(max(index - 30, 0), index)
+            ]
+            last_volume = volumes_usd[-1] if volumes_usd else 0.0
+            avg_volume = sum(volumes_usd) / len(volumes_usd) if volumes_usd else 0.0
+            trailing = history.closes[max(index - 20, 0) : index]
+            sma20 = sum(trailing) / len(trailing) if len(trailing) >= 20 else price
+            rows.append(
+                {
+                    "asset": asset,
+                    "price": price,
+                    "volume_24h_usd": last_volume,
+                    "volume_ratio": last_volume / avg_volume if avg_volume > 0 else 1.0,
+                    "rsi_14": rsi,
+                    "sma20": sma20,
+                    "new_listing_days": int((history.timestamps[index] - history.start_ts) / DAY_SECONDS),
+                    "accumulation_score": min(max((50.0 - abs(rsi - 50.0)) / 50.0, 0.0), 1.0),
+                }
+            )
+        self._scanner_rows[step] = rows
+        return rows
+
+    def replay_single_asset(
+        self,
+        *,
+        assets: Iterable[str],
+        strategies: Iterable[str],
+        amount_usd: float,
+    ) -> list[ReplayResult]:
+        """Replay one fixed-notional buy per window for every (asset, strategy) pair."""
+        accounts = [
+            _Account(strategy=strategy, allocations={asset: 1.0})
+            for asset in assets
+            if asset in self.tapes
+            for strategy in strategies
+        ]
+        current_window = -1
+        for step, checkpoint in enumerate(self.schedule):
+            if checkpoint.window_index != current_window:
+                current_window = checkpoint.window_index
+                for account in accounts:
+                    account.budgets = {asset: float(amount_usd) for asset in account.allocations}
+            for account in accounts:
+                for asset in account.allocations:
+                    self._try_fill(account, asset, step)
+                if checkpoint.force_fill:
+                    self._mark(account, step)
+        return [self._result(account) for account in accounts]
+
+    def replay_portfolio(
+        self,
+        *,
+        candidates: list[tuple[str, dict[str, float]]],
+        total_amount_usd: float,
+        rebalance_threshold_pct: float,
+        scanner: OpportunityScanner | None = None,
+    ) -> list[ReplayResult]:
+        """Replay allocation-aware DCA for ``(strategy, allocations)`` candidates.
+
+        Each window starts with the same drift-aware buy plan the agent builds in
+        portfolio mode. When ``scanner`` is given, the strongest signal shifts
+        weight from the largest allocation before planning, as an approved
+        scanner suggestion would.
+        """
+        manager = PortfolioManager()
+        accounts: list[_Account] = []
+        for strategy, allocations in candidates:
+            targets = {asset: weight for asset, weight in allocations.items() if asset in self.tapes}
+            if targets:
+                accounts.append(_Account(strategy=strategy, allocations=manager.normalize_allocations(targets)))
+
+        current_window = -1
+        for step, checkpoint in enumerate(self.schedule):
+            if checkpoint.window_index != current_window:
+                current_window = checkpoint.window_index
+                signals = []
+                if scanner is not None:
+                    signals = scanner.scan(self._scanner_market_rows(step), {})
+                for account in accounts:
+                    targets = dict(account.allocations)
+                    if signals:
+                        targets = self._apply_signal(targets, signals[0], manager)
+                        account.signal_count += 1
+                    values = {
+                        asset: account.units.get(asset, 0.0) * self.tapes[asset].prices[step]
+                        for asset in targets
+                    }
+                    total_value = sum(values.values())
+                    if total_value > 0:
+                        current = {asset: value / total_value for asset, value in values.items()}
+                    else:
+                        current = dict(targets)
+                    plan = manager.build_dca_buy_plan(
+                        total_dca_amount_usd=float(total_amount_usd),
+                        targets=targets,
+                        current=current,
+                        rebalance_threshold_pct=rebalance_threshold_pct,
+                    )
+                    account.budgets = {
+                        str(order["asset"]): float(order["notional_usd"])
+                        for order in plan["orders"]
+                        if str(order["asset"]) in self.tapes
+                    }
+            for account in accounts:
+                for asset in list(account.budgets):
+                    self._try_fill(account, asset, step)
+                if checkpoint.force_fill:
+                    self._mark(account, step)
+        return [self._result(account) for account in accounts]
+
+    def _apply_signal(
+        self,
+        targets: dict[str, float],
+        signal: Any,
+        manager: PortfolioManager,
+    ) -> dict[str, float]:
+        reallocation = float(signal.reallocation_pct) / 100.0
+        source_asset = max(targets.items(), key=lambda row: row[1])[0]
+        target_asset = str(signal.asset)
+        if source_asset == target_asset or reallocation <= 0 or target_asset not in self.tapes:
+            return targets
+        shifted = dict(targets)
+        shifted[source_asset] = max(shifted[source_asset] - reallocation, 0.0)
+        shifted[target_asset] = shifted.get(target_asset, 0.0) + reallocation
+        return manager.normalize_allocations(shifted)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import importlib.util
+import math
+from pathlib import Path
+import sqlite3
+import sys
+
+
+_SCRIPT_DIR = Path(__file__).resolve().parents[1] / "scripts"
+
+
+def _load_local_module(module_name: str):
+    script_dir = str(_SCRIPT_DIR)
+    sys.path[:] = [script_dir, *[path for path in sys.path if path != script_dir]]
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(
+        f"{Path(__file__).stem}_{module_name}",
+        _SCRIPT_DIR / f"{module_name}.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    assert spec is not None and spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+indicator_engine = _load_local_module("indicator_engine")
+IndicatorEngine = indicator_engine.IndicatorEngine
+
+
+def _rows(count: int, *, start_ts: int = 1_704_067_200, step: int = 900) -> list[list]:
+    rows = []
+    for index in range(count):
+        close = 100.0 + 5.0 * math.sin(index / 3.0) + index * 0.1
+        rows.append([start_ts + index * step, close, close * 1.01, close * 0.99, close, close, 10.0 + index])
+    return rows
+
+
+def _reference_wilder_rsi(closes: list[float], period: int = 14) -> float:
+    deltas = [curr - prev for prev, curr in zip(closes, closes[1:])]
+    avg_gain = sum(max(d, 0.0) for d in deltas[:period]) / period
+    avg_loss = sum(max(-d, 0.0) for d in deltas[:period]) / period
+    for delta in deltas[period:]:
+        avg_gain = (avg_gain * (period - 1) + max(delta, 0.0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-delta, 0.0)) / period
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+def test_wilder_rsi_matches_batch_reference() -> None:
+    closes = [row[4] for row in _rows(60)]
+    rsi = indicator_engine.WilderRSI(14)
+    for close in closes:
+        rsi.update(close)
+    assert math.isclose(rsi.value, _reference_wilder_rsi(closes), rel_tol=1e-9)
+
+
+def test_rolling_window_tracks_mean_std_and_lag() -> None:
+    window = indicator_engine.RollingWindow(5)
+    for value in [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]:
+        window.update(value)
+    assert window.mean == 5.0
+    assert math.isclose(window.std, math.sqrt(2.5))
+    assert window.lag(0) == 7.0
+    assert window.lag(4) == 3.0
+    assert window.lag(5) is None
+
+
+def test_incremental_runs_match_single_pass_and_persist_state(tmp_path: Path) -> None:
+    rows = _rows(80)
+    db_path = tmp_path / "state" / "dca_runs.db"
+
+    first = IndicatorEngine(db_path)
+    first.update("xbtusd", "15m", rows[:50])
+    assert first.flush() == 1
+
+    second = IndicatorEngine(db_path)
+    # The forming bar from the first run (index 49) was not committed.
+    assert second.last_bar_ts("XBTUSD", "15m") == rows[48][0]
+    incremental = second.update("XBTUSD", "15m", rows[45:])
+    second.flush()
+
+    single_pass = IndicatorEngine(tmp_path / "fresh.db").update("XBTUSD", "15m", rows)
+    for key in ("rsi_14", "ema_20", "vwap_20", "volatility_20_pct", "sma_20", "zscore_20", "close_lag_7"):
+        assert math.isclose(incremental[key], single_pass[key], rel_tol=1e-9), key
+    assert incremental["bar_count"] == single_pass["bar_count"] == 80
+
+    with sqlite3.connect(db_path) as conn:
+        stored = conn.execute("SELECT asset, timeframe, last_bar_ts FROM indicator_state").fetchall()
+    assert stored == [("XBTUSD", "15m", rows[78][0])]
+
+
+def test_flush_is_noop_without_new_bars(tmp_path: Path) -> None:
+    engine = IndicatorEngine(tmp_path / "state.db")
+    rows = _rows(30)
+    engine.update("ETHUSD", "1d", rows)
+    assert engine.flush() == 1
+    engine.update("ETHUSD", "1d", rows[-2:])
+    assert engine.flush() == 0
+
+
+def test_resume_gap_longer_than_one_page_reseeds_from_available_bars(tmp_path: Path) -> None:
+    db_path = tmp_path / "state.db"
+    rows = _rows(1000)
+    first = IndicatorEngine(db_path)
+    first.update("XBTUSD", "15m", rows[:40])
+    first.flush()
+
+    # Kraken only returns the latest 720 bars, so bars 40..279 are never seen.
+    resumed = IndicatorEngine(db_path).update("XBTUSD", "15m", rows[280:])
+    fresh = IndicatorEngine(None).update("XBTUSD", "15m", rows[280:])
+    for key in ("rsi_14", "ema_20", "sma_20", "zscore_20", "close_lag_7"):
+        assert math.isclose(resumed[key], fresh[key], rel_tol=1e-9), key
+    assert resumed["first_bar_ts"] == rows[0][0]
+
+
+def test_in_memory_engine_never_touches_disk(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    engine = IndicatorEngine(None)
+    engine.update("XBTUSD", "15m", _rows(30))
+    assert engine.flush() == 1
+    assert engine.last_bar_ts("XBTUSD", "15m") == _rows(30)[28][0]
+    assert list(tmp_path.iterdir()) == []
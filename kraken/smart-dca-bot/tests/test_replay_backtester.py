@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import importlib.util
+import math
+from pathlib import Path
+import sys
+
+
+_SCRIPT_DIR = Path(__file__).resolve().parents[1] / "scripts"
+_MODULES_TO_CLEAR = (
+    "backtest_optimizer",
+    "dca_engine",
+    "optimizer",
+    "portfolio_manager",
+    "replay_backtester",
+    "scanner",
+)
+
+
+def _load_local_module(module_name: str):
+    script_dir = str(_SCRIPT_DIR)
+    sys.path[:] = [script_dir, *[path for path in sys.path if path != script_dir]]
+    for cached_name in _MODULES_TO_CLEAR:
+        sys.modules.pop(cached_name, None)
+    spec = importlib.util.spec_from_file_location(
+        f"{Path(__file__).stem}_{module_name}",
+        _SCRIPT_DIR / f"{module_name}.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    assert spec is not None and spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+replay = _load_local_module("replay_backtester")
+backtest = _load_local_module("backtest_optimizer")
+
+_START_TS = 1_704_067_200  # 2024-01-01T00:00:00Z, a Monday
+
+
+def _ohlc_rows(*, base: float, drift: float, days: int = 180) -> list[list[str]]:
+    rows: list[list[str]] = []
+    previous = base
+    for day in range(days):
+        close = base * (1.0 + drift * day) * (1.0 + 0.06 * math.sin(day / 4.0))
+        open_px = previous
+        high = max(open_px, close) * 1.015
+        low = min(open_px, close) * 0.985
+        rows.append(
+            [
+                _START_TS + day * 86400,
+                f"{open_px:.6f}",
+                f"{high:.6f}",
+                f"{low:.6f}",
+                f"{close:.6f}",
+                f"{(high + low + close) / 3.0:.6f}",
+                "25000.0",
+                100,
+            ]
+        )
+        previous = close
+    return rows
+
+
+_HISTORY = {
+    "XBTUSD": _ohlc_rows(base=40_000.0, drift=0.004),
+    "ETHUSD": _ohlc_rows(base=2_000.0, drift=0.001),
+    "SOLUSD": _ohlc_rows(base=100.0, drift=-0.002),
+}
+
+
+def _snapshot(pair: str) -> dict:
+    close = float(_HISTORY[pair][-1][4])
+    return {"price": close, "vwap": close, "bid": close * 0.9995, "ask": close * 1.0005, "depth_score": 0.7}
+
+
+def _engine(frequency: str = "weekly"):
+    histories = {
+        pair: replay.PriceHistory.from_ohlc_rows(pair, rows)
+        for pair, rows in _HISTORY.items()
+    }
+    return replay.ReplayEngine(
+        histories,
+        frequency=frequency,
+        window_hours=24,
+        maker_fee_bps=25.0,
+        taker_fee_bps=40.0,
+    )
+
+
+def test_schedule_covers_complete_windows_with_forced_end() -> None:
+    engine = _engine()
+    assert engine.window_count == 26
+    last_window = [cp for cp in engine.schedule if cp.window_index == engine.window_count - 1]
+    assert [cp.progress for cp in last_window] == list(replay.REPLAY_CHECKPOINTS)
+    assert last_window[-1].force_fill is True
+    assert not any(cp.force_fill for cp in last_window[:-1])
+
+
+def test_single_asset_replay_scores_every_configuration_in_one_pass() -> None:
+    engine = _engine()
+    strategies = sorted(backtest.SUPPORTED_STRATEGIES)
+    results = engine.replay_single_asset(assets=list(_HISTORY), strategies=strategies, amount_usd=25.0)
+
+    assert len(results) == len(_HISTORY) * len(strategies)
+    for result in results:
+        # Every window either fills on a signal or is forced at its end.
+        assert result.fill_count == engine.window_count
+        assert math.isclose(result.invested_usd, 25.0 * engine.window_count)
+        assert result.fees_usd > 0
+
+    by_asset = {}
+    for result in results:
+        by_asset.setdefault(next(iter(result.allocations)), []).append(result.pnl_pct)
+    assert min(by_asset["XBTUSD"]) > max(by_asset["SOLUSD"])
+
+
+def test_portfolio_replay_uses_drift_plan_and_scanner_shifts() -> None:
+    engine = _engine()
+    targets = {"XBTUSD": 0.5, "ETHUSD": 0.3, "SOLUSD": 0.2}
+    [portfolio] = engine.replay_portfolio(
+        candidates=[("simple", targets)],
+        total_amount_usd=100.0,
+        rebalance_threshold_pct=5.0,
+    )
+    assert math.isclose(portfolio.invested_usd, 100.0 * engine.window_count, rel_tol=1e-6)
+
+    scanner = replay.OpportunityScanner(
+        min_24h_volume_usd=0.0,
+        max_reallocation_pct=20.0,
+        enabled_signals=["oversold_rsi", "mean_reversion", "new_listing"],
+    )
+    [scanned] = engine.replay_portfolio(
+        candidates=[("simple", targets)],
+        total_amount_usd=100.0,
+        rebalance_threshold_pct=100.0,
+        scanner=scanner,
+    )
+    assert scanned.scanner_signal_count > 0
+
+
+def test_optimizer_prefers_candle_replay_when_history_is_available() -> None:
+    config = {
+        "inputs": {"mode": "single_asset", "asset": "XBTUSD", "frequency": "weekly", "dca_window_hours": 24},
+        "runtime": {"market_scan_assets": ["ETHUSD", "SOLUSD"]},
+        "backtest": {"bankroll_usd": 100.0, "target_pnl_pct": 5.0},
+    }
+    result = backtest.optimize_invocation_config(
+        config=config,
+        get_snapshot=_snapshot,
+        get_history=lambda pair: _HISTORY[pair],
+    )
+    summary = result["summary"]
+    assert summary["method"] == "candle_replay"
+    assert summary["attempt_count"] == 3 * len(backtest.SUPPORTED_STRATEGIES)
+    assert summary["selected_targets"] == ["XBTUSD"]
+    assert summary["replay"]["windows"] == 26
+    assert result["config"]["backtest"]["last_method"] == "candle_replay"
+
+
+def test_optimizer_replays_portfolio_baskets_per_strategy() -> None:
+    config = {
+        "inputs": {"mode": "portfolio", "frequency": "weekly", "dca_window_hours": 24},
+        "portfolio": {"allocations": {"XBTUSD": 0.5, "ETHUSD": 0.3, "SOLUSD": 0.2}},
+    }
+    result = backtest.optimize_invocation_config(
+        config=config,
+        get_snapshot=_snapshot,
+        get_history=lambda pair: _HISTORY[pair],
+    )
+    summary = result["summary"]
+    strategies = len(backtest.SUPPORTED_STRATEGIES)
+    assert summary["method"] == "candle_replay"
+    assert summary["attempt_count"] == 3 * strategies + strategies
+    assert set(result["config"]["portfolio"]["allocations"]) == set(_HISTORY)
+
+
+def test_optimizer_falls_back_to_heuristic_without_history() -> None:
+    config = {"inputs": {"mode": "single_asset", "asset": "XBTUSD"}}
+    result = backtest.optimize_invocation_config(
+        config=config,
+        get_snapshot=_snapshot,
+        get_history=lambda pair: [],
+    )
+    assert result["summary"]["method"] == "heuristic"
+    assert "replay" not in result["summary"]
@@ -12,10 +12,12 @@ _MODULES_TO_CLEAR = (
     "agent",
     "backtest_optimizer",
     "dca_engine",
+    "indicator_engine",
     "logger",
     "optimizer",
     "portfolio_manager",
     "position_tracker",
+    "replay_backtester",
     "scanner",
     "seren_api_client",
     "serendb_store",
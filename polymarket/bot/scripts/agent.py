@@ -19,6 +19,10 @@ import json
 import os
 import re
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from copy import deepcopy
 
 # --- Force unbuffered stdout so piped/background output is visible immediately ---
@@ -29,7 +33,7 @@ if not sys.stdout.isatty():
 # --- End unbuffered stdout fix ---
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
@@ -39,6 +43,7 @@ from polymarket_client import PolymarketClient
 from position_tracker import PositionTracker
 from logger import TradingLogger
 from serendb_storage import SerenDBStorage
+from analysis_cache import AnalysisCache
 import kelly
 import calibration
 from risk_guards import (
@@ -49,6 +54,20 @@ from risk_guards import (
 )
 
 
+# Publishers behind research_opportunity and estimate_fair_value; each gets its
+# own concurrency limit during the analysis stage.
+RESEARCH_PUBLISHER = 'perplexity'
+FAIR_VALUE_PUBLISHER = 'seren-models'
+DEFAULT_ANALYSIS_SETTINGS = {
+    'max_workers': 10,
+    'cycle_deadline_seconds': 300.0,
+    'publisher_concurrency': {
+        RESEARCH_PUBLISHER: 6,
+        FAIR_VALUE_PUBLISHER: 6,
+    },
+}
+
+
 class TradingAgent:
     """Autonomous Polymarket trading agent"""
 
@@ -136,6 +155,17 @@ class TradingAgent:
         self.min_liquidity = float(self.config.get('min_liquidity', 10000.0))
         self.stale_price_demotion = float(self.config.get('stale_price_demotion', 0.1))
 
+        # Concurrent analysis stage (research + fair value)
+        self.analysis_settings = self._resolve_analysis_settings(self.config.get('analysis', {}))
+        try:
+            self.analysis_cache = AnalysisCache.from_config(
+                self.config.get('analysis_cache', {}),
+                base_dir=self.config_path.parent,
+            )
+        except Exception as e:
+            print(f"⚠️  Analysis cache unavailable: {e}")
+            self.analysis_cache = None
+
         # Market selection sanity gates
         self.max_divergence = float(self.config.get('max_divergence', 0.50))
         self.min_buy_price = float(self.config.get('min_buy_price', 0.02))
@@ -914,6 +944,156 @@ class TradingAgent:
         print(f"  Ranked {len(markets)} markets → kept top {len(enriched)} candidates (dropped {dropped})")
         return enriched
 
+    @staticmethod
+    def _resolve_analysis_settings(raw: Any) -> Dict[str, Any]:
+        raw = raw if isinstance(raw, dict) else {}
+        concurrency = dict(DEFAULT_ANALYSIS_SETTINGS['publisher_concurrency'])
+        for publisher, limit in (raw.get('publisher_concurrency') or {}).items():
+            concurrency[str(publisher)] = max(1, int(limit))
+        return {
+            'max_workers': max(1, int(raw.get('max_workers', DEFAULT_ANALYSIS_SETTINGS['max_workers']))),
+            'cycle_deadline_seconds': max(
+                0.0,
+                float(raw.get('cycle_deadline_seconds', DEFAULT_ANALYSIS_SETTINGS['cycle_deadline_seconds'])),
+            ),
+            'publisher_concurrency': concurrency,
+        }
+
+    def _analyze_market(
+        self,
+        market: Dict,
+        slots: Dict[str, threading.BoundedSemaphore],
+    ) -> Optional[Dict[str, Any]]:
+        """Research one market and estimate its fair value (runs on a worker thread)."""
+        cache = getattr(self, 'analysis_cache', None)
+        if cache is not None:
+            try:
+                cached = cache.get(market['question'], market['price'])
+            except Exception as e:
+                print(f"    ⚠️  Analysis cache read failed: {e}")
+                cached = None
+            if cached:
+                return {
+                    'research': cached['research'],
+                    'fair_value': cached['fair_value'],
+                    'confidence': cached['confidence'],
+                    'cached': True,
+                }
+
+        with slots[RESEARCH_PUBLISHER]:
+            research = self.research_opportunity(market['question'])
+        if not research:
+            return None
+
+        with slots[FAIR_VALUE_PUBLISHER]:
+            fair_value, confidence = self.estimate_fair_value(
+                market['question'],
+                market['price'],
+                research
+            )
+        if not fair_value:
+            return None
+
+        analysis = {
+            'research': research,
+            'fair_value': fair_value,
+            'confidence': confidence,
+        }
+        if cache is not None:
+            try:
+                cache.put(
+                    market['question'],
+                    market['price'],
+                    analysis,
+                    seconds_to_resolution=self._seconds_to_resolution(market),
+                )
+            except Exception as e:
+                print(f"    ⚠️  Analysis cache write failed: {e}")
+        return analysis
+
+    def _seconds_to_resolution(self, market: Dict) -> Optional[float]:
+        """Time left before the market resolves, from end_date or days_to_resolution."""
+        end_dt = self._iso_to_datetime(market.get('end_date') or '')
+        if end_dt is not None:
+            return (end_dt - datetime.now(timezone.utc)).total_seconds()
+        days = market.get('days_to_resolution')
+        if days is None:
+            return None
+        return self._safe_float(days) * 86400.0
+
+    def analyze_markets(self, markets: List[Dict]) -> Iterator[Tuple[Dict, Optional[Dict[str, Any]]]]:
+        """
+        Run research + fair value for many markets concurrently
+
+        Markets are analyzed on a bounded thread pool with a concurrency limit
+        per publisher. Results are yielded in the input (rank) order as soon as
+        every earlier market has finished, so callers can size and place orders
+        while later markets are still in flight. Markets still running when the
+        per-cycle deadline expires are skipped.
+
+        Args:
+            markets: Ranked markets to analyze
+
+        Yields:
+            (market, analysis) where analysis is None if research or the
+            fair value estimate failed
+        """
+        self._last_analysis_skipped = 0
+        if not markets:
+            return
+
+        settings = getattr(self, 'analysis_settings', None) or self._resolve_analysis_settings({})
+        slots = {
+            publisher: threading.BoundedSemaphore(limit)
+            for publisher, limit in settings['publisher_concurrency'].items()
+        }
+        deadline_seconds = settings['cycle_deadline_seconds']
+        deadline = time.monotonic() + deadline_seconds if deadline_seconds > 0 else None
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(settings['max_workers'], len(markets)),
+            thread_name_prefix='polymarket-analysis',
+        )
+        futures = [executor.submit(self._analyze_market, market, slots) for market in markets]
+        index_of = {future: index for index, future in enumerate(futures)}
+        finished: Dict[int, Any] = {}
+        pending = set(futures)
+        next_index = 0
+
+        def _result(future) -> Optional[Dict[str, Any]]:
+            try:
+                return future.result()
+            except Exception as e:
+                print(f"    ⚠️  Analysis failed: {e}")
+                return None
+
+        try:
+            while next_index < len(futures):
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    finished[index_of[future]] = future
+                while next_index in finished:
+                    yield markets[next_index], _result(finished.pop(next_index))
+                    next_index += 1
+
+            # Deadline hit: keep whatever already finished, still in rank order.
+            for index in range(next_index, len(futures)):
+                if futures[index].done():
+                    yield markets[index], _result(futures[index])
+                else:
+                    self._last_analysis_skipped += 1
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if self._last_analysis_skipped:
+            print(
+                f"  ⏱️  Analysis deadline ({deadline_seconds:.0f}s) reached; "
+                f"skipped {self._last_analysis_skipped} market(s)"
+            )
+
     def research_opportunity(self, market_question: str) -> str:
         """
         Research a market using Perplexity
@@ -1251,8 +1431,17 @@ class TradingAgent:
             self.logger.notify_api_error(str(e))
             return False
 
+    def _mark_stage(self, name: str) -> None:
+        """Record wall time spent since the previous stage mark."""
+        now = time.monotonic()
+        started = getattr(self, '_stage_started', now)
+        self.last_stage_timings[name] = round(now - started, 3)
+        self._stage_started = now
+
     def run_scan_cycle(self):
         """Run a single scan cycle"""
+        self.last_stage_timings: Dict[str, float] = {}
+        self._stage_started = time.monotonic()
         print("=" * 60)
         print(f"🔍 Polymarket Scan Starting - {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC")
         print("=" * 60)
@@ -1344,9 +1533,12 @@ class TradingAgent:
         if balances['serenbucks'] < 5.0:
             self.logger.notify_low_balance('serenbucks', balances['serenbucks'], 20.0)
 
+        self._mark_stage('risk')
+
         # Stage 1: Broad fetch
         print("Scanning markets...")
         markets = self.scan_markets(limit=self.scan_limit)
+        self._mark_stage('fetch')
         print(f"  Fetched: {len(markets)} markets")
         print()
 
@@ -1369,79 +1561,80 @@ class TradingAgent:
         # Stage 2: Cheap heuristic ranking — no LLM
         print("Ranking candidates (no LLM)...")
         candidates = self.rank_candidates(markets, limit=self.candidate_limit)
+        self._mark_stage('rank')
         analyze_batch = candidates[:self.analyze_limit]
         print(f"  Candidates: {len(candidates)}, will analyze: {len(analyze_batch)}")
         print()
 
-        # Stage 3: Deep LLM analysis
-        opportunities = []
-        for market in analyze_batch:
-            print(f"Evaluating: \"{market['question']}\"")
-            print(f"  Current price: {market['price'] * 100:.1f}%")
-            print(f"  Liquidity: ${market['liquidity']:.2f}")
-
-            research = self.research_opportunity(market['question'])
-            if not research:
-                continue
-
-            fair_value, confidence = self.estimate_fair_value(
-                market['question'],
-                market['price'],
-                research
-            )
-            if not fair_value:
-                continue
-
-            # Save prediction for calibration tracking
-            if self.storage:
-                try:
-                    self.storage.save_prediction({
-                        'market_id': market['market_id'],
-                        'market_question': market['question'],
-                        'predicted_fair_value': fair_value,
-                        'market_price_at_prediction': market['price'],
-                        'edge_calculated': abs(fair_value - market['price']),
-                        'prediction_timestamp': datetime.now(timezone.utc).isoformat(),
-                        'confidence': confidence,
-                    })
-                except Exception:
-                    pass  # Non-blocking
-
-            opp = self.evaluate_opportunity(market, research, fair_value, confidence)
-            if opp:
-                opportunities.append(opp)
-
+        # Stage 3: Deep LLM analysis (concurrent); opportunities are sized and
+        # executed in rank order as soon as their analysis completes. SerenDB
+        # writes from this stage are queued and flushed together afterwards.
+        with self.storage.batch() if self.storage else nullcontext():
+            opportunities = []
+            trades_executed = 0
+            capital_deployed = 0.0
+            analyzed = 0
+            cache_hits = 0
+            for market, analysis in self.analyze_markets(analyze_batch):
+                analyzed += 1
+                print(f"Evaluating: \"{market['question']}\"")
+                print(f"  Current price: {market['price'] * 100:.1f}%")
+                print(f"  Liquidity: ${market['liquidity']:.2f}")
+
+                if not analysis:
+                    continue
+                if analysis.get('cached'):
+                    cache_hits += 1
+                    print(f"  ♻️  Reusing cached analysis (fair value {analysis['fair_value'] * 100:.1f}%)")
+                research = analysis['research']
+                fair_value = analysis['fair_value']
+                confidence = analysis['confidence']
+
+                # Save prediction for calibration tracking
+                if self.storage:
+                    try:
+                        self.storage.save_prediction({
+                            'market_id': market['market_id'],
+                            'market_question': market['question'],
+                            'predicted_fair_value': fair_value,
+                            'market_price_at_prediction': market['price'],
+                            'edge_calculated': abs(fair_value - market['price']),
+                            'prediction_timestamp': datetime.now(timezone.utc).isoformat(),
+                            'confidence': confidence,
+                        })
+                    except Exception:
+                        pass  # Non-blocking
+
+                opp = self.evaluate_opportunity(market, research, fair_value, confidence)
+                if opp:
+                    opportunities.append(opp)
+                    if self.execute_trade(opp):
+                        trades_executed += 1
+                        capital_deployed += opp['position_size']
+
+                print()
+
+            self._mark_stage('analysis')
+            print(f"📊 Found {len(opportunities)} opportunities")
             print()
 
-        print(f"📊 Found {len(opportunities)} opportunities")
-        print()
-
-        # Execute trades
-        trades_executed = 0
-        capital_deployed = 0.0
-
-        for opp in opportunities:
-            if self.execute_trade(opp):
-                trades_executed += 1
-                capital_deployed += opp['position_size']
-
-        api_cost = len(analyze_batch) * 0.05  # ~$0.05 per market (research + estimate)
-        self.logger.log_scan_result(
-            dry_run=self.dry_run,
-            markets_scanned=len(markets),
-            opportunities_found=len(opportunities),
-            trades_executed=trades_executed,
-            capital_deployed=capital_deployed,
-            api_cost=api_cost,
-            serenbucks_balance=balances['serenbucks'],
-            polymarket_balance=balances['polymarket']
-        )
+            api_cost = (analyzed - cache_hits) * 0.05  # ~$0.05 per uncached market (research + estimate)
+            self.logger.log_scan_result(
+                dry_run=self.dry_run,
+                markets_scanned=len(markets),
+                opportunities_found=len(opportunities),
+                trades_executed=trades_executed,
+                capital_deployed=capital_deployed,
+                api_cost=api_cost,
+                serenbucks_balance=balances['serenbucks'],
+                polymarket_balance=balances['polymarket']
+            )
 
         print("=" * 60)
         print("Scan complete!")
         print(f"  Fetched:    {len(markets)} markets")
         print(f"  Candidates: {len(candidates)} (after heuristic ranking)")
-        print(f"  Analyzed:   {len(analyze_batch)} (LLM research + fair value)")
+        print(f"  Analyzed:   {analyzed} (LLM research + fair value, {cache_hits} from cache)")
         print(f"  Opportunities: {len(opportunities)}")
         print(f"  Trades executed: {trades_executed}")
         print(f"  Capital deployed: ${capital_deployed:.2f}")
@@ -1463,6 +1656,7 @@ class TradingAgent:
                 )
         except Exception as e:
             print(f"  Calibration error (non-blocking): {e}")
+        self._mark_stage('calibration')
 
         print()
 
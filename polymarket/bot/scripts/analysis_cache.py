@@ -0,0 +1,187 @@
+"""Question-keyed cache for research + fair value estimates.
+
+Polymarket questions are re-ranked into the analysis batch cycle after cycle,
+and most of them have not changed since the last research/fair-value pass.
+This cache keeps the last analysis per question in a local sqlite file so a
+repeat question can skip both publisher calls.
+
+Entries are keyed by a hash of the normalized question text and expire on
+either of two conditions:
+1. TTL — a fraction of the market's remaining time to resolution, clamped to
+   [min_ttl_hours, max_ttl_hours]. Markets far from resolution keep their
+   estimate longer; markets about to resolve are re-analyzed often.
+2. Price band — the market price has moved more than price_band (absolute
+   probability) since the cached estimate was made.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_ANALYSIS_CACHE_SETTINGS = {
+    'enabled': True,
+    'path': 'state/analysis_cache.db',
+    'ttl_fraction': 0.1,
+    'min_ttl_hours': 1.0,
+    'max_ttl_hours': 72.0,
+    'price_band': 0.05,
+}
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _NON_WORD.sub(' ', (question or '').lower()).strip()
+
+
+def question_key(question: str) -> str:
+    """Stable cache key for a market question."""
+    return hashlib.sha256(normalize_question(question).encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """sqlite-backed cache of {research, fair_value, confidence} per question"""
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_fraction: float = DEFAULT_ANALYSIS_CACHE_SETTINGS['ttl_fraction'],
+        min_ttl_hours: float = DEFAULT_ANALYSIS_CACHE_SETTINGS['min_ttl_hours'],
+        max_ttl_hours: float = DEFAULT_ANALYSIS_CACHE_SETTINGS['max_ttl_hours'],
+        price_band: float = DEFAULT_ANALYSIS_CACHE_SETTINGS['price_band'],
+    ):
+        self.path = Path(path)
+        self.ttl_fraction = max(0.0, float(ttl_fraction))
+        self.min_ttl_seconds = max(0.0, float(min_ttl_hours)) * 3600.0
+        self.max_ttl_seconds = max(self.min_ttl_seconds, float(max_ttl_hours) * 3600.0)
+        self.price_band = max(0.0, float(price_band))
+        # Worker threads share one cache; sqlite connections are opened per call.
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    question_key TEXT PRIMARY KEY,
+                    question TEXT NOT NULL,
+                    research TEXT NOT NULL,
+                    fair_value REAL NOT NULL,
+                    confidence TEXT,
+                    price_at_estimate REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("DELETE FROM analysis_cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+
+    @classmethod
+    def from_config(cls, raw: Any, base_dir: Path = SKILL_ROOT) -> Optional['AnalysisCache']:
+        """Build the cache from the `analysis_cache` config section (None if disabled)."""
+        settings = dict(DEFAULT_ANALYSIS_CACHE_SETTINGS)
+        if isinstance(raw, dict):
+            settings.update(raw)
+        if not settings.get('enabled', True):
+            return None
+        path = Path(settings['path'])
+        if not path.is_absolute():
+            path = Path(base_dir) / path
+        return cls(
+            path,
+            ttl_fraction=settings['ttl_fraction'],
+            min_ttl_hours=settings['min_ttl_hours'],
+            max_ttl_hours=settings['max_ttl_hours'],
+            price_band=settings['price_band'],
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def ttl_seconds(self, seconds_to_resolution: Optional[float]) -> float:
+        """TTL for an estimate made with this much time left before resolution."""
+        if seconds_to_resolution is None or seconds_to_resolution <= 0:
+            return self.min_ttl_seconds
+        ttl = seconds_to_resolution * self.ttl_fraction
+        return min(max(ttl, self.min_ttl_seconds), self.max_ttl_seconds)
+
+    def get(
+        self,
+        question: str,
+        current_price: float,
+        now: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached analysis for a question, if still valid
+
+        Expired entries and entries whose price has moved outside the band
+        are deleted and reported as a miss.
+        """
+        now = time.time() if now is None else now
+        key = question_key(question)
+        with self._lock, closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM analysis_cache WHERE question_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            moved = abs(float(current_price) - row['price_at_estimate'])
+            if row['expires_at'] <= now or moved > self.price_band:
+                conn.execute("DELETE FROM analysis_cache WHERE question_key = ?", (key,))
+                conn.commit()
+                return None
+        return {
+            'research': row['research'],
+            'fair_value': row['fair_value'],
+            'confidence': row['confidence'],
+            'price_at_estimate': row['price_at_estimate'],
+            'cached_at': row['created_at'],
+        }
+
+    def put(
+        self,
+        question: str,
+        current_price: float,
+        analysis: Dict[str, Any],
+        seconds_to_resolution: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """Store (or replace) the analysis made at current_price."""
+        now = time.time() if now is None else now
+        expires_at = now + self.ttl_seconds(seconds_to_resolution)
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute("""
+                INSERT INTO analysis_cache (
+                    question_key, question, research, fair_value, confidence,
+                    price_at_estimate, created_at, expires_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(question_key) DO UPDATE SET
+                    question = excluded.question,
+                    research = excluded.research,
+                    fair_value = excluded.fair_value,
+                    confidence = excluded.confidence,
+                    price_at_estimate = excluded.price_at_estimate,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at
+            """, (
+                question_key(question),
+                question,
+                analysis['research'],
+                float(analysis['fair_value']),
+                analysis.get('confidence'),
+                float(current_price),
+                now,
+                expires_at,
+            ))
+            conn.commit()
@@ -4,8 +4,8 @@ Computes data-driven edge thresholds from historical prediction accuracy.
 Non-blocking — runs after the scan/trade pipeline completes.
 
 Components:
-1. resolution_sweep()  — match unresolved predictions against Gamma closed markets
-2. compute_calibration() — compute MAE from resolved predictions
+1. resolution_sweep()  — batched Gamma lookups of unresolved market ids (cursor-based)
+2. compute_calibration() — fold new resolutions into incremental state, derive MAE
 3. load_calibration() / save_calibration() — local state/calibration.json cache
 4. effective_threshold() — returns max(config_threshold, calibrated_threshold)
 """
@@ -13,10 +13,10 @@ Components:
 from __future__ import annotations
 
 import json
-import statistics
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
 
 
 # Minimum resolved predictions before calibration takes effect
@@ -26,6 +26,17 @@ MIN_RESOLVED_FOR_CALIBRATION = 50
 SPREAD_COST = 0.03
 SAFETY_MARGIN = 0.02
 
+# Resolution sweep: unresolved market ids per Gamma lookup, lookups per sweep
+SWEEP_BATCH_SIZE = 50
+SWEEP_MAX_BATCHES = 10
+SWEEP_CURSOR_KEY = "resolution_sweep_cursor"
+
+# Incremental calibration state (stored via SerenDBStorage)
+CALIBRATION_STATE_VERSION = 1
+CALIBRATION_PAGE_SIZE = 500
+CONFIDENCE_BUCKETS = ("low", "medium", "high")
+ERROR_PRECISION = 4  # absolute errors are counted at the precision MAE is reported
+
 STATE_DIR = Path(__file__).resolve().parents[1] / "state"
 CALIBRATION_FILE = STATE_DIR / "calibration.json"
 
@@ -74,103 +85,235 @@ def effective_threshold(config_threshold: float, calibration: Optional[Dict[str,
     return config_threshold, f"config (calibrated {cal_threshold*100:.1f}% is lower)"
 
 
+def _resolution_from_market(market: Dict[str, Any]) -> Optional[tuple[str, float]]:
+    """Return (outcome, actual_probability) for a fully resolved market, else None."""
+    # Resolved markets have prices at 1.0/0.0 (or very close)
+    raw_prices = market.get("outcomePrices")
+    if not raw_prices:
+        return None
+
+    try:
+        if isinstance(raw_prices, str):
+            prices = json.loads(raw_prices)
+        else:
+            prices = raw_prices
+        yes_price = float(str(prices[0]).strip())
+    except (json.JSONDecodeError, IndexError, ValueError, TypeError):
+        return None
+
+    # Resolved YES = price ~1.0, resolved NO = price ~0.0
+    if yes_price > 0.95:
+        return "YES", 1.0
+    if yes_price < 0.05:
+        return "NO", 0.0
+    return None  # Not fully resolved yet
+
+
+def _fetch_closed_markets(polymarket_client: Any, market_ids: List[str]) -> List[Dict[str, Any]]:
+    """Look up one batch of markets on Gamma by condition id (or numeric id)."""
+    condition_ids = [mid for mid in market_ids if mid.startswith("0x")]
+    numeric_ids = [mid for mid in market_ids if not mid.startswith("0x")]
+    query = urlencode(
+        [("closed", "true"), ("limit", len(market_ids))]
+        + [("condition_ids", mid) for mid in condition_ids]
+        + [("id", mid) for mid in numeric_ids]
+    )
+    response = polymarket_client.seren.call_publisher(
+        publisher="polymarket-data",
+        method="GET",
+        path=f"/markets?{query}",
+    )
+    closed_markets = response.get("body", [])
+    if not closed_markets and "data" in response:
+        closed_markets = response.get("data", [])
+    return closed_markets if isinstance(closed_markets, list) else []
+
+
 def resolution_sweep(polymarket_client: Any, storage: Any) -> int:
-    """Sweep recently resolved markets and update prediction outcomes.
+    """Look up unresolved predictions' markets on Gamma and record outcomes.
 
-    Queries Gamma for closed markets, matches against unresolved predictions
-    in SerenDB, and writes resolution outcomes.
+    Walks the distinct unresolved market ids in SerenDB in id order,
+    SWEEP_BATCH_SIZE at a time, and asks Gamma for exactly those markets.
+    At most SWEEP_MAX_BATCHES batches run per call; the last id seen is kept
+    as a cursor so the next sweep continues from there and wraps around once
+    the end is reached.
 
-    Returns number of predictions resolved.
+    Returns number of markets resolved.
     """
     if storage is None:
         return 0
 
     try:
-        unresolved = storage.get_unresolved_predictions()
+        cursor = storage.get_config(SWEEP_CURSOR_KEY, "") or ""
     except Exception:
-        return 0
+        cursor = ""
 
-    if not unresolved:
-        return 0
+    resolved_count = 0
+    now_iso = datetime.now(timezone.utc).isoformat()
 
-    # Build lookup of unresolved market_ids
-    # Handle both dict rows and list rows
-    unresolved_by_id: Dict[str, Dict] = {}
-    for pred in unresolved:
-        if isinstance(pred, dict):
-            mid = pred.get("market_id", "")
-        elif isinstance(pred, (list, tuple)):
-            mid = pred[0] if pred else ""
-        else:
-            continue
-        if mid:
-            unresolved_by_id[mid] = pred
+    for _ in range(SWEEP_MAX_BATCHES):
+        try:
+            market_ids = storage.get_unresolved_market_ids(after=cursor, limit=SWEEP_BATCH_SIZE)
+        except Exception:
+            return resolved_count
+        if not market_ids:
+            cursor = ""
+            break
 
-    if not unresolved_by_id:
-        return 0
+        try:
+            closed_markets = _fetch_closed_markets(polymarket_client, market_ids)
+        except Exception:
+            break
+
+        wanted = set(market_ids)
+        for market in closed_markets:
+            condition_id = market.get("conditionId") or market.get("id", "")
+            if condition_id not in wanted:
+                condition_id = str(market.get("id", ""))
+                if condition_id not in wanted:
+                    continue
+
+            resolution = _resolution_from_market(market)
+            if resolution is None:
+                continue
+            outcome, actual_prob = resolution
+
+            try:
+                storage.update_prediction_resolution(
+                    market_id=condition_id,
+                    resolution_outcome=outcome,
+                    resolution_timestamp=now_iso,
+                    actual_probability=actual_prob,
+                )
+                resolved_count += 1
+            except Exception:
+                continue
+
+        cursor = market_ids[-1]
+        if len(market_ids) < SWEEP_BATCH_SIZE:
+            cursor = ""
+            break
 
-    # Fetch recently closed markets from Gamma
     try:
-        response = polymarket_client.seren.call_publisher(
-            publisher="polymarket-data",
-            method="GET",
-            path="/markets?limit=200&closed=true&active=false",
-        )
-        closed_markets = response.get("body", [])
-        if not closed_markets and "data" in response:
-            closed_markets = response.get("data", [])
+        storage.save_config(SWEEP_CURSOR_KEY, cursor)
     except Exception:
-        return 0
+        pass
 
-    resolved_count = 0
-    now_iso = datetime.now(timezone.utc).isoformat()
+    return resolved_count
 
-    for market in closed_markets:
-        condition_id = market.get("conditionId") or market.get("id", "")
-        if condition_id not in unresolved_by_id:
-            continue
 
-        # Determine resolution outcome from outcomePrices
-        # Resolved markets have prices at 1.0/0.0 (or very close)
-        raw_prices = market.get("outcomePrices")
-        if not raw_prices:
-            continue
+def _empty_error_stats() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "sum_abs_error": 0.0,
+        "brier_sum": 0.0,
+        "error_counts": {},  # rounded absolute error -> count
+    }
 
-        try:
-            if isinstance(raw_prices, str):
-                prices = json.loads(raw_prices)
-            else:
-                prices = raw_prices
-            yes_price = float(str(prices[0]).strip())
-        except (json.JSONDecodeError, IndexError, ValueError, TypeError):
-            continue
-
-        # Resolved YES = price ~1.0, resolved NO = price ~0.0
-        if yes_price > 0.95:
-            outcome = "YES"
-            actual_prob = 1.0
-        elif yes_price < 0.05:
-            outcome = "NO"
-            actual_prob = 0.0
-        else:
-            continue  # Not fully resolved yet
 
-        try:
-            storage.update_prediction_resolution(
-                market_id=condition_id,
-                resolution_outcome=outcome,
-                resolution_timestamp=now_iso,
-                actual_probability=actual_prob,
-            )
-            resolved_count += 1
-        except Exception:
-            continue
+def new_calibration_state() -> Dict[str, Any]:
+    """Empty incremental calibration state (nothing folded in yet)."""
+    return {
+        "version": CALIBRATION_STATE_VERSION,
+        "cursor": None,
+        "overall": _empty_error_stats(),
+        "buckets": {bucket: _empty_error_stats() for bucket in CONFIDENCE_BUCKETS},
+        # Sufficient statistics for regressing outcome on predicted fair value
+        "regression": {"n": 0, "sum_x": 0.0, "sum_y": 0.0, "sum_xx": 0.0, "sum_xy": 0.0},
+    }
 
-    return resolved_count
+
+def _add_error(stats: Dict[str, Any], error: float, brier: float) -> None:
+    stats["count"] += 1
+    stats["sum_abs_error"] += error
+    stats["brier_sum"] += brier
+    key = f"{round(error, ERROR_PRECISION):.{ERROR_PRECISION}f}"
+    stats["error_counts"][key] = stats["error_counts"].get(key, 0) + 1
+
+
+def fold_prediction(state: Dict[str, Any], pred: Dict[str, Any]) -> bool:
+    """Add one resolved prediction to the calibration state. Returns True if used."""
+    fv = pred.get("predicted_fair_value")
+    actual = pred.get("actual_probability")
+    if fv is None or actual is None:
+        return False
+
+    try:
+        fv = float(fv)
+        actual = float(actual)
+    except (ValueError, TypeError):
+        return False
+
+    error = abs(fv - actual)
+    brier = (fv - actual) ** 2
+    _add_error(state["overall"], error, brier)
+
+    confidence = pred.get("confidence", "medium")
+    bucket = str(confidence).lower() if confidence else "medium"
+    if bucket in state["buckets"]:
+        _add_error(state["buckets"][bucket], error, brier)
+
+    reg = state["regression"]
+    reg["n"] += 1
+    reg["sum_x"] += fv
+    reg["sum_y"] += actual
+    reg["sum_xx"] += fv * fv
+    reg["sum_xy"] += fv * actual
+    return True
+
+
+def _median_error(stats: Dict[str, Any]) -> float:
+    """Median absolute error from the rounded error counts."""
+    n = stats["count"]
+    if n == 0:
+        return 0.0
+    ranks = ((n + 1) // 2, n // 2 + 1)
+    values: List[float] = []
+    seen = 0
+    for key in sorted(stats["error_counts"], key=float):
+        seen += stats["error_counts"][key]
+        while len(values) < 2 and seen >= ranks[len(values)]:
+            values.append(float(key))
+        if len(values) == 2:
+            break
+    return sum(values) / 2.0
+
+
+def _regression_line(reg: Dict[str, Any]) -> tuple[Optional[float], Optional[float]]:
+    n = reg["n"]
+    denom = n * reg["sum_xx"] - reg["sum_x"] ** 2
+    if n < 2 or abs(denom) < 1e-12:
+        return None, None
+    slope = (n * reg["sum_xy"] - reg["sum_x"] * reg["sum_y"]) / denom
+    intercept = (reg["sum_y"] - slope * reg["sum_x"]) / n
+    return slope, intercept
+
+
+def _advance_calibration_state(storage: Any, state: Dict[str, Any]) -> int:
+    """Fold predictions resolved after the state cursor. Returns rows read."""
+    read = 0
+    while True:
+        rows = storage.get_resolved_predictions_after(state["cursor"], limit=CALIBRATION_PAGE_SIZE) or []
+        for pred in rows:
+            if isinstance(pred, dict):
+                fold_prediction(state, pred)
+        read += len(rows)
+        if rows:
+            last = rows[-1]
+            state["cursor"] = {
+                "resolution_timestamp": str(last.get("resolution_timestamp")),
+                "id": int(last.get("id") or 0),
+            }
+        if len(rows) < CALIBRATION_PAGE_SIZE:
+            return read
 
 
 def compute_calibration(storage: Any) -> Optional[Dict[str, Any]]:
-    """Compute calibration metrics from resolved predictions.
+    """Update the incremental calibration state and derive calibration metrics.
+
+    Only predictions resolved since the stored cursor are read, so the cost
+    is proportional to new resolutions rather than the full history. The
+    first run (or a state version change) folds the history in once.
 
     Returns calibration dict if enough data, None otherwise.
     """
@@ -178,76 +321,63 @@ def compute_calibration(storage: Any) -> Optional[Dict[str, Any]]:
         return None
 
     try:
-        resolved = storage.get_resolved_predictions(limit=5000)
+        state = storage.get_calibration_state()
+        if not isinstance(state, dict) or state.get("version") != CALIBRATION_STATE_VERSION:
+            state = new_calibration_state()
+        new_rows = _advance_calibration_state(storage, state)
     except Exception:
         return None
 
-    if not resolved or len(resolved) < MIN_RESOLVED_FOR_CALIBRATION:
-        return None
-
-    # Compute MAE per confidence bucket
-    errors_all: List[float] = []
-    errors_by_confidence: Dict[str, List[float]] = {"low": [], "medium": [], "high": []}
-
-    for pred in resolved:
-        if isinstance(pred, dict):
-            fv = pred.get("predicted_fair_value")
-            actual = pred.get("actual_probability")
-            confidence = pred.get("confidence", "medium")
-        elif isinstance(pred, (list, tuple)):
-            # Fallback for list-style rows — positions depend on schema
-            continue
-        else:
-            continue
-
-        if fv is None or actual is None:
-            continue
-
+    if new_rows:
         try:
-            error = abs(float(fv) - float(actual))
-        except (ValueError, TypeError):
-            continue
-
-        errors_all.append(error)
-        bucket = str(confidence).lower() if confidence else "medium"
-        if bucket in errors_by_confidence:
-            errors_by_confidence[bucket].append(error)
+            storage.save_calibration_state(state)
+        except Exception:
+            pass  # Re-folded from the old cursor next time
 
-    if len(errors_all) < MIN_RESOLVED_FOR_CALIBRATION:
+    overall = state["overall"]
+    resolved_count = overall["count"]
+    if resolved_count < MIN_RESOLVED_FOR_CALIBRATION:
         return None
 
-    mae = statistics.median(errors_all)
+    mae = _median_error(overall)
     calibrated_threshold = mae + SPREAD_COST + SAFETY_MARGIN
+    avg_brier = overall["brier_sum"] / resolved_count
+    slope, intercept = _regression_line(state["regression"])
 
     cal = {
-        "resolved_count": len(errors_all),
+        "resolved_count": resolved_count,
         "median_absolute_error": round(mae, 4),
+        "mean_absolute_error": round(overall["sum_abs_error"] / resolved_count, 4),
+        "avg_brier_score": round(avg_brier, 4),
+        "calibration_slope": round(slope, 4) if slope is not None else None,
+        "calibration_intercept": round(intercept, 4) if intercept is not None else None,
         "calibrated_threshold": round(calibrated_threshold, 4),
         "computed_at": datetime.now(timezone.utc).isoformat(),
     }
 
     # Per-confidence MAE (only if bucket has data)
-    for bucket, errors in errors_by_confidence.items():
-        if errors:
-            cal[f"{bucket}_confidence_mae"] = round(statistics.median(errors), 4)
-            cal[f"{bucket}_confidence_count"] = len(errors)
+    for bucket, stats in state["buckets"].items():
+        if stats["count"]:
+            cal[f"{bucket}_confidence_mae"] = round(_median_error(stats), 4)
+            cal[f"{bucket}_confidence_count"] = stats["count"]
 
     # Save to local cache
     save_calibration(cal)
 
-    # Save to SerenDB
-    try:
-        storage.save_performance_metrics({
-            "calculated_at": cal["computed_at"],
-            "total_predictions": len(errors_all),
-            "resolved_predictions": len(errors_all),
-            "avg_brier_score": None,
-            "calibration_slope": None,
-            "calibration_intercept": None,
-            "edge_threshold": calibrated_threshold,
-        })
-    except Exception:
-        pass  # Local cache is sufficient
+    # Save to SerenDB (only when something new resolved)
+    if new_rows:
+        try:
+            storage.save_performance_metrics({
+                "calculated_at": cal["computed_at"],
+                "total_predictions": resolved_count,
+                "resolved_predictions": resolved_count,
+                "avg_brier_score": cal["avg_brier_score"],
+                "calibration_slope": cal["calibration_slope"],
+                "calibration_intercept": cal["calibration_intercept"],
+                "edge_threshold": calibrated_threshold,
+            })
+        except Exception:
+            pass  # Local cache is sufficient
 
     return cal
 
@@ -228,8 +228,9 @@ class PositionTracker:
         if self.serendb:
             # Save to SerenDB
             try:
-                for pos in self.positions.values():
-                    self.serendb.save_position(pos.to_dict())
+                with self.serendb.batch():
+                    for pos in self.positions.values():
+                        self.serendb.save_position(pos.to_dict())
             except Exception as e:
                 print(f"Error saving positions to SerenDB: {e}")
         else:
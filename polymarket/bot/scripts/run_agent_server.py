@@ -2,8 +2,15 @@
 """
 Simple HTTP server for triggering the Polymarket trading agent via seren-cron.
 
-This server provides a single endpoint that seren-cron can call on a schedule
-to trigger autonomous trading scans.
+seren-cron calls POST /run on a schedule. The request only enqueues a scan job
+and returns its id; a single background worker runs scans one at a time, so
+the webhook never waits on a scan and /health stays responsive. A trigger that
+arrives while a scan is already queued or running is folded into that job.
+
+Endpoints:
+    POST /run          enqueue a scan, returns {"job_id": ...} (202)
+    GET  /runs/{id}    job status and per-stage timings
+    GET  /health       health check
 
 Usage:
     python scripts/run_agent_server.py --config config.json [--port 8080] [--dry-run]
@@ -12,73 +19,192 @@ Usage:
 import argparse
 import json
 import os
+import queue
 import sys
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from threading import Thread
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Lock, Thread
+from typing import Any, Dict, Optional, Tuple
 import traceback
 
 # Import agent
 from agent import TradingAgent
 
 
-class AgentRequestHandler(BaseHTTPRequestHandler):
-    """HTTP request handler that triggers the trading agent"""
+# Finished jobs kept for GET /runs/{id}; older ones are forgotten.
+MAX_JOB_HISTORY = 100
 
-    agent = None  # Will be set by main()
-    dry_run = False
 
-    def do_POST(self):
-        """Handle POST request to trigger agent scan"""
-        if self.path != '/run':
-            self.send_error(404, "Endpoint not found")
-            return
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
 
-        try:
-            # Run agent scan cycle
-            print(f"\n[{self._get_timestamp()}] Cron trigger received - starting scan cycle...")
-            self.agent.run_scan_cycle()
-
-            # Send success response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-
-            response = {
-                'status': 'success',
-                'message': 'Trading scan completed',
-                'dry_run': self.dry_run
+
+class ScanJobQueue:
+    """In-memory scan job queue drained by one background worker"""
+
+    def __init__(self, agent, max_history: int = MAX_JOB_HISTORY):
+        self.agent = agent
+        self.max_history = max_history
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._active_id: Optional[str] = None  # queued or running job
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = Lock()
+        self._worker: Optional[Thread] = None
+
+    def start(self) -> None:
+        """Start the background scan worker."""
+        if self._worker is None:
+            self._worker = Thread(target=self._run, name='polymarket-scan-worker', daemon=True)
+            self._worker.start()
+
+    def stop(self) -> None:
+        """Stop the worker after the current job (if any) finishes."""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def submit(self, trigger: str = 'cron') -> Tuple[Dict[str, Any], bool]:
+        """
+        Enqueue a scan unless one is already queued or running
+
+        Returns:
+            (job snapshot, deduplicated) where deduplicated is True if the
+            trigger was folded into an existing job
+        """
+        with self._lock:
+            if self._active_id is not None:
+                job = self._jobs[self._active_id]
+                job['triggers'] += 1
+                return dict(job), True
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'job_id': job_id,
+                'status': 'queued',
+                'trigger': trigger,
+                'triggers': 1,
+                'submitted_at': _utc_now(),
+                'started_at': None,
+                'finished_at': None,
+                'duration_seconds': None,
+                'stage_timings': {},
+                'opportunities': None,
+                'error': None,
             }
-            self.wfile.write(json.dumps(response).encode())
+            self._jobs[job_id] = job
+            self._active_id = job_id
+            self._trim_history()
+            self._queue.put(job_id)
+            return dict(job), False
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def active(self) -> Optional[Dict[str, Any]]:
+        """Snapshot of the queued or running job, if any."""
+        with self._lock:
+            return dict(self._jobs[self._active_id]) if self._active_id else None
+
+    def _trim_history(self) -> None:
+        while len(self._jobs) > self.max_history:
+            oldest = next(iter(self._jobs))
+            if oldest == self._active_id:
+                break
+            self._jobs.pop(oldest)
+
+    def _run(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            self._run_job(job_id)
 
+    def _run_job(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = 'running'
+            job['started_at'] = _utc_now()
+        started = time.monotonic()
+        print(f"\n[{_utc_now()}] Starting scan job {job_id}...")
+
+        status, opportunities, error = 'succeeded', None, None
+        try:
+            opportunities = self.agent.run_scan_cycle()
         except Exception as e:
             print(f"Error running agent: {e}")
             traceback.print_exc()
+            status, error = 'failed', str(e)
 
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
+        with self._lock:
+            job['status'] = status
+            job['opportunities'] = opportunities
+            job['error'] = error
+            job['stage_timings'] = dict(getattr(self.agent, 'last_stage_timings', None) or {})
+            job['finished_at'] = _utc_now()
+            job['duration_seconds'] = round(time.monotonic() - started, 3)
+            if self._active_id == job_id:
+                self._active_id = None
 
-            response = {
-                'status': 'error',
-                'message': str(e)
-            }
-            self.wfile.write(json.dumps(response).encode())
+
+class AgentRequestHandler(BaseHTTPRequestHandler):
+    """HTTP request handler that enqueues trading agent scans"""
+
+    jobs: Optional[ScanJobQueue] = None  # Will be set by main()
+    dry_run = False
+
+    def do_POST(self):
+        """Handle POST request to enqueue an agent scan"""
+        if self.path != '/run':
+            self.send_error(404, "Endpoint not found")
+            return
+
+        job, deduplicated = self.jobs.submit()
+        if deduplicated:
+            print(f"[{self._get_timestamp()}] Cron trigger folded into {job['status']} job {job['job_id']}")
+        else:
+            print(f"[{self._get_timestamp()}] Cron trigger received - queued scan job {job['job_id']}")
+
+        self._send_json(202, {
+            'status': 'accepted',
+            'job_id': job['job_id'],
+            'job_status': job['status'],
+            'deduplicated': deduplicated,
+            'dry_run': self.dry_run,
+        })
 
     def do_GET(self):
-        """Handle GET request for health check"""
+        """Handle GET request for health check and job status"""
         if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-
-            response = {
+            active = self.jobs.active() if self.jobs else None
+            self._send_json(200, {
                 'status': 'healthy',
-                'dry_run': self.dry_run
-            }
-            self.wfile.write(json.dumps(response).encode())
+                'dry_run': self.dry_run,
+                'active_job': active['job_id'] if active else None,
+            })
+        elif self.path.startswith('/runs/'):
+            job = self.jobs.get(self.path[len('/runs/'):])
+            if job is None:
+                self.send_error(404, "Job not found")
+                return
+            self._send_json(200, job)
         else:
             self.send_error(404, "Endpoint not found")
 
+    def _send_json(self, code: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def log_message(self, format, *args):
         """Custom log message format"""
         print(f"[{self._get_timestamp()}] {format % args}")
@@ -86,7 +212,6 @@ class AgentRequestHandler(BaseHTTPRequestHandler):
     @staticmethod
     def _get_timestamp():
         """Get current timestamp"""
-        from datetime import datetime
         return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
 
@@ -122,8 +247,10 @@ def main():
         print("Initializing trading agent...")
         agent = TradingAgent(args.config, dry_run=args.dry_run)
 
-        # Set agent on handler class
-        AgentRequestHandler.agent = agent
+        # Background scan worker shared by all request threads
+        jobs = ScanJobQueue(agent)
+        jobs.start()
+        AgentRequestHandler.jobs = jobs
         AgentRequestHandler.dry_run = args.dry_run
 
         print(f"✓ Agent initialized successfully")
@@ -136,10 +263,12 @@ def main():
 
     # Start HTTP server
     try:
-        server = HTTPServer(('0.0.0.0', args.port), AgentRequestHandler)
+        server = ThreadingHTTPServer(('0.0.0.0', args.port), AgentRequestHandler)
+        server.daemon_threads = True
         print(f"🚀 Agent server running on port {args.port}")
         print(f"   Health check: http://localhost:{args.port}/health")
         print(f"   Trigger endpoint: http://localhost:{args.port}/run")
+        print(f"   Job status: http://localhost:{args.port}/runs/<job_id>")
         print(f"   Dry-run: {args.dry_run}")
         print()
         print("Waiting for seren-cron triggers...")
@@ -9,7 +9,8 @@ Stores trading data in SerenDB cloud database:
 """
 
 import json
-from typing import Dict, List, Optional, Any
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Any
 from datetime import datetime, timezone
 from uuid import uuid4
 from seren_client import SerenClient
@@ -38,6 +39,10 @@ class SerenDBStorage:
         self._normalized_run_id: Optional[str] = None
         self._normalized_dry_run = True
         self._normalized_mode = "paper-sim"
+        # Unit of work: queued multi-row writes while inside batch()
+        self._batch_depth = 0
+        self._pending_writes: Dict[tuple, Dict[Any, tuple]] = {}
+        self._pending_summary: Dict[str, Any] = {}
 
     def setup_database(self) -> bool:
         """
@@ -281,6 +286,11 @@ class SerenDBStorage:
                 )""",
                 """CREATE INDEX IF NOT EXISTS idx_pnl_periods_run_end
                     ON trading.pnl_periods (run_id, period_end DESC)""",
+                # Calibration: resolution sweep by market id, incremental fold by cursor
+                """CREATE INDEX IF NOT EXISTS idx_predictions_unresolved_market
+                    ON predictions (market_id) WHERE resolution_outcome IS NULL""",
+                """CREATE INDEX IF NOT EXISTS idx_predictions_resolved_cursor
+                    ON predictions (resolution_timestamp, id) WHERE resolution_outcome IS NOT NULL""",
             ]
 
             extended_ok = 0
@@ -363,6 +373,84 @@ class SerenDBStorage:
             run_id,
         ))
 
+    # Unit of work
+
+    @contextmanager
+    def batch(self) -> Iterator['SerenDBStorage']:
+        """
+        Queue writes from the save_* methods and flush them on exit
+
+        Rows bound for the same table are sent as one multi-row INSERT and
+        run summary patches are merged into one UPDATE, so a scan cycle costs
+        a handful of gateway round trips instead of several per row. Nested
+        batches flush when the outermost one exits.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+    def flush(self) -> bool:
+        """
+        Send all queued writes
+
+        Returns:
+            True if every statement succeeded
+        """
+        pending, self._pending_writes = self._pending_writes, {}
+        summary, self._pending_summary = self._pending_summary, {}
+        ok = True
+        for (prefix, row_sql, suffix), rows in pending.items():
+            params = tuple(param for row in rows.values() for param in row)
+            query = prefix + ",\n".join([row_sql] * len(rows)) + suffix
+            try:
+                self._execute_sql(query, params)
+            except Exception as e:
+                print(f"Error flushing {len(rows)} queued row(s): {e}")
+                ok = False
+        if summary:
+            try:
+                self._update_normalized_summary(summary)
+            except Exception as e:
+                print(f"Error flushing run summary: {e}")
+                ok = False
+        return ok
+
+    def _write(
+        self,
+        prefix: str,
+        row_sql: str,
+        params: tuple,
+        suffix: str = '',
+        key: Optional[Any] = None,
+    ) -> None:
+        """
+        Execute (or queue, inside batch()) one INSERT row
+
+        Args:
+            prefix: Statement up to and including VALUES
+            row_sql: Placeholder tuple for one row, e.g. "(?, ?, ?)"
+            params: Values for row_sql
+            suffix: Trailing clause such as ON CONFLICT ... DO UPDATE
+            key: Conflict key for upserts; a later queued row with the same
+                key replaces the earlier one (a multi-row upsert cannot touch
+                the same row twice)
+        """
+        if not self._batch_depth:
+            self._execute_sql(prefix + row_sql + suffix, params)
+            return
+        rows = self._pending_writes.setdefault((prefix, row_sql, suffix), {})
+        rows[key if key is not None else object()] = params
+
+    def _queue_summary(self, summary_patch: Dict[str, Any]) -> None:
+        if self._batch_depth:
+            self._pending_summary.update(summary_patch)
+        else:
+            self._update_normalized_summary(summary_patch)
+
     @staticmethod
     def _position_market_value(position: Dict[str, Any]) -> float:
         size = float(position.get('size', 0) or 0)
@@ -396,74 +484,45 @@ class SerenDBStorage:
                 'end_date': position.get('end_date', ''),
             })
 
-            # Try to update existing position first
-            result = self._execute_sql("""
-                UPDATE positions
-                SET current_price = ?,
-                    unrealized_pnl = ?,
-                    quantity = ?,
-                    thesis_side = ?,
-                    event_id = ?,
-                    end_date = ?,
-                    updated_at = ?
-                WHERE market_id = ?
-            """, (
+            self._write("""
+                INSERT INTO positions (
+                    market_id, market, token_id, side, thesis_side,
+                    entry_price, current_price, size, quantity,
+                    unrealized_pnl, event_id, end_date, opened_at, updated_at
+                ) VALUES
+            """, "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                position['market_id'],
+                position['market'],
+                position.get('token_id', ''),
+                position['side'],
+                position.get('thesis_side'),
+                position['entry_price'],
                 position['current_price'],
-                position['unrealized_pnl'],
+                position['size'],
                 position.get('quantity', 0.0),
-                position.get('thesis_side'),
+                position['unrealized_pnl'],
                 position.get('event_id', ''),
                 position.get('end_date', ''),
-                now,
-                position['market_id']
-            ))
-
-            # If no rows updated, insert new position
-            if result.get('changes', 0) == 0:
-                self._execute_sql("""
-                    INSERT INTO positions (
-                        market_id, market, token_id, side, thesis_side,
-                        entry_price, current_price, size, quantity,
-                        unrealized_pnl, event_id, end_date, opened_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    position['market_id'],
-                    position['market'],
-                    position.get('token_id', ''),
-                    position['side'],
-                    position.get('thesis_side'),
-                    position['entry_price'],
-                    position['current_price'],
-                    position['size'],
-                    position.get('quantity', 0.0),
-                    position['unrealized_pnl'],
-                    position.get('event_id', ''),
-                    position.get('end_date', ''),
-                    position['opened_at'],
-                    now
-                ))
+                position['opened_at'],
+                now
+            ), """
+                ON CONFLICT (market_id) DO UPDATE
+                SET current_price = EXCLUDED.current_price,
+                    unrealized_pnl = EXCLUDED.unrealized_pnl,
+                    quantity = EXCLUDED.quantity,
+                    thesis_side = EXCLUDED.thesis_side,
+                    event_id = EXCLUDED.event_id,
+                    end_date = EXCLUDED.end_date,
+                    updated_at = EXCLUDED.updated_at
+            """, key=position['market_id'])
 
-            self._execute_sql("""
+            self._write("""
                 INSERT INTO trading.positions (
                     run_id, position_key, instrument_id, symbol, side, quantity,
                     entry_price, cost_basis_usd, market_price, market_value_usd,
                     unrealized_pnl_usd, realized_pnl_usd, status, opened_at, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?::jsonb)
-                ON CONFLICT (run_id, position_key) DO UPDATE
-                SET instrument_id = EXCLUDED.instrument_id,
-                    symbol = EXCLUDED.symbol,
-                    side = EXCLUDED.side,
-                    quantity = EXCLUDED.quantity,
-                    entry_price = EXCLUDED.entry_price,
-                    cost_basis_usd = EXCLUDED.cost_basis_usd,
-                    market_price = EXCLUDED.market_price,
-                    market_value_usd = EXCLUDED.market_value_usd,
-                    unrealized_pnl_usd = EXCLUDED.unrealized_pnl_usd,
-                    realized_pnl_usd = EXCLUDED.realized_pnl_usd,
-                    status = EXCLUDED.status,
-                    opened_at = COALESCE(EXCLUDED.opened_at, trading.positions.opened_at),
-                    metadata = EXCLUDED.metadata
-            """, (
+                ) VALUES
+            """, "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?::jsonb)", (
                 run_id,
                 position['market_id'],
                 instrument_id,
@@ -479,14 +538,29 @@ class SerenDBStorage:
                 'open',
                 position.get('opened_at', now),
                 metadata_json,
-            ))
-            self._execute_sql("""
+            ), """
+                ON CONFLICT (run_id, position_key) DO UPDATE
+                SET instrument_id = EXCLUDED.instrument_id,
+                    symbol = EXCLUDED.symbol,
+                    side = EXCLUDED.side,
+                    quantity = EXCLUDED.quantity,
+                    entry_price = EXCLUDED.entry_price,
+                    cost_basis_usd = EXCLUDED.cost_basis_usd,
+                    market_price = EXCLUDED.market_price,
+                    market_value_usd = EXCLUDED.market_value_usd,
+                    unrealized_pnl_usd = EXCLUDED.unrealized_pnl_usd,
+                    realized_pnl_usd = EXCLUDED.realized_pnl_usd,
+                    status = EXCLUDED.status,
+                    opened_at = COALESCE(EXCLUDED.opened_at, trading.positions.opened_at),
+                    metadata = EXCLUDED.metadata
+            """, key=(run_id, position['market_id']))
+            self._write("""
                 INSERT INTO trading.position_marks (
                     run_id, position_key, instrument_id, symbol, side, quantity,
                     mark_price, market_value_usd, unrealized_pnl_usd, realized_pnl_usd,
                     mark_time, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?::jsonb)
-            """, (
+                ) VALUES
+            """, "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?::jsonb)", (
                 run_id,
                 position['market_id'],
                 instrument_id,
@@ -582,11 +656,11 @@ class SerenDBStorage:
                 'status': trade.get('status', 'open'),
                 'pnl': trade.get('pnl'),
             })
-            self._execute_sql("""
+            self._write("""
                 INSERT INTO trades (
                     market_id, market, side, price, size, executed_at, tx_hash
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+                ) VALUES
+            """, "(?, ?, ?, ?, ?, ?, ?)", (
                 trade['market_id'],
                 trade['market'],
                 trade['side'],
@@ -595,12 +669,12 @@ class SerenDBStorage:
                 executed_at,
                 trade.get('tx_hash', '')
             ))
-            self._execute_sql("""
+            self._write("""
                 INSERT INTO trading.order_events (
                     run_id, order_id, instrument_id, symbol, side, order_type,
                     event_type, status, price, quantity, notional_usd, event_time, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?::jsonb)
-            """, (
+                ) VALUES
+            """, "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?::jsonb)", (
                 run_id,
                 order_id,
                 trade.get('market_id'),
@@ -615,12 +689,12 @@ class SerenDBStorage:
                 executed_at,
                 metadata_json,
             ))
-            self._execute_sql("""
+            self._write("""
                 INSERT INTO trading.fills (
                     run_id, order_id, venue_fill_id, instrument_id, symbol, side,
                     fill_price, fill_quantity, notional_usd, realized_pnl_usd, fill_time, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?::jsonb)
-            """, (
+                ) VALUES
+            """, "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?::jsonb)", (
                 run_id,
                 order_id,
                 trade.get('tx_hash'),
@@ -673,13 +747,13 @@ class SerenDBStorage:
         """
         try:
             run_id = self._ensure_normalized_run(dry_run=bool(log.get('dry_run', self._normalized_dry_run)))
-            self._execute_sql("""
+            self._write("""
                 INSERT INTO scan_logs (
                     scan_at, markets_scanned, opportunities_found,
                     trades_executed, capital_deployed, api_cost,
                     serenbucks_balance, polymarket_balance
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+                ) VALUES
+            """, "(?, ?, ?, ?, ?, ?, ?, ?)", (
                 log['scan_at'],
                 log['markets_scanned'],
                 log['opportunities_found'],
@@ -689,11 +763,11 @@ class SerenDBStorage:
                 log.get('serenbucks_balance'),
                 log.get('polymarket_balance')
             ))
-            self._execute_sql("""
+            self._write("""
                 INSERT INTO trading.pnl_periods (
                     run_id, period_type, period_end, fees_usd, equity_end_usd, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?::jsonb)
-            """, (
+                ) VALUES
+            """, "(?, ?, ?, ?, ?, ?::jsonb)", (
                 run_id,
                 'scan_cycle',
                 log['scan_at'],
@@ -710,7 +784,7 @@ class SerenDBStorage:
                     'errors': log.get('errors', []),
                 }),
             ))
-            self._update_normalized_summary({
+            self._queue_summary({
                 'last_scan_at': log['scan_at'],
                 'markets_scanned': log['markets_scanned'],
                 'opportunities_found': log['opportunities_found'],
@@ -826,13 +900,13 @@ class SerenDBStorage:
             True if successful
         """
         try:
-            self._execute_sql("""
+            self._write("""
                 INSERT INTO predictions (
                     market_id, market_question, predicted_fair_value,
                     market_price_at_prediction, edge_calculated,
                     prediction_timestamp, traded, trade_size, trade_price
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+                ) VALUES
+            """, "(?, ?, ?, ?, ?, ?, ?, ?, ?)", (
                 prediction['market_id'],
                 prediction['market_question'],
                 prediction['predicted_fair_value'],
@@ -941,6 +1015,68 @@ class SerenDBStorage:
             print(f"Error getting resolved predictions: {e}")
             return []
 
+    def get_unresolved_market_ids(self, after: str = '', limit: int = 50) -> List[str]:
+        """
+        Get distinct market ids with unresolved predictions, in id order
+
+        Args:
+            after: Only return ids greater than this cursor
+            limit: Maximum number to return
+
+        Returns:
+            List of market ids
+        """
+        try:
+            result = self._execute_sql(
+                "SELECT DISTINCT market_id FROM predictions "
+                "WHERE resolution_outcome IS NULL AND market_id > ? "
+                "ORDER BY market_id LIMIT ?",
+                (after or '', int(limit))
+            )
+            return [row['market_id'] for row in result.get('rows', []) if row.get('market_id')]
+        except Exception as e:
+            print(f"Error getting unresolved market ids: {e}")
+            return []
+
+    def get_resolved_predictions_after(
+        self,
+        cursor: Optional[Dict[str, Any]],
+        limit: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Get resolved predictions after a (resolution_timestamp, id) cursor
+
+        Args:
+            cursor: {'resolution_timestamp', 'id'} of the last row already
+                read, or None to start from the beginning
+            limit: Maximum number to return
+
+        Returns:
+            Resolved prediction dicts ordered by (resolution_timestamp, id)
+        """
+        if not cursor:
+            result = self._execute_sql(
+                "SELECT * FROM predictions WHERE resolution_outcome IS NOT NULL "
+                "ORDER BY resolution_timestamp, id LIMIT ?",
+                (int(limit),)
+            )
+        else:
+            result = self._execute_sql(
+                "SELECT * FROM predictions WHERE resolution_outcome IS NOT NULL "
+                "AND (resolution_timestamp, id) > (?, ?) "
+                "ORDER BY resolution_timestamp, id LIMIT ?",
+                (cursor['resolution_timestamp'], int(cursor['id']), int(limit))
+            )
+        return result.get('rows', [])
+
+    def get_calibration_state(self) -> Optional[Dict[str, Any]]:
+        """Get the incremental calibration state (see calibration.py)"""
+        return self.get_config('calibration_state')
+
+    def save_calibration_state(self, state: Dict[str, Any]) -> bool:
+        """Save the incremental calibration state"""
+        return self.save_config('calibration_state', state)
+
     # Performance metrics methods
 
     def save_performance_metrics(self, metrics: Dict[str, Any]) -> bool:
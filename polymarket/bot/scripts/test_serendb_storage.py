@@ -160,3 +160,70 @@ class TestSerenDBStorageRoutes:
         assert any("UPDATE positions" in query or "INSERT INTO positions" in query for query in queries)
         assert any("INSERT INTO trading.positions" in query for query in queries)
         assert any("INSERT INTO trading.position_marks" in query for query in queries)
+
+    def test_batch_flushes_cycle_writes_as_multi_row_statements(self):
+        session = Mock()
+        seren = Mock()
+        seren.gateway_url = "https://api.serendb.com"
+        seren.session = session
+
+        queries = []
+
+        def post_side_effect(url, json, timeout):
+            queries.append(json["query"])
+            return _response({"data": {"rows": [], "changes": 1}})
+
+        session.post.side_effect = post_side_effect
+
+        storage = SerenDBStorage(seren)
+        storage.project_id = "project-123"
+        storage.branch_id = "branch-main"
+        storage.set_run_mode(True)
+        storage._ensure_normalized_run()
+        queries.clear()
+
+        position = {
+            "market": "Will market A resolve YES?",
+            "market_id": "market-a",
+            "token_id": "token-a",
+            "side": "BUY",
+            "entry_price": 0.42,
+            "current_price": 0.53,
+            "size": 80.0,
+            "unrealized_pnl": 20.95,
+            "opened_at": "2026-03-19T10:00:00Z",
+        }
+        with storage.batch():
+            for i in range(30):
+                assert storage.save_prediction({
+                    "market_id": f"market-{i}",
+                    "market_question": f"Question {i}?",
+                    "predicted_fair_value": 0.6,
+                    "market_price_at_prediction": 0.5,
+                    "edge_calculated": 0.1,
+                    "prediction_timestamp": "2026-03-20T10:00:00Z",
+                })
+            # Re-saving the same position in one cycle keeps only the latest row.
+            with storage.batch():
+                storage.save_position(position)
+                storage.save_position(dict(position, current_price=0.55))
+            storage.save_scan_log({
+                "scan_at": "2026-03-20T10:05:00Z",
+                "markets_scanned": 100,
+                "opportunities_found": 2,
+                "trades_executed": 1,
+                "capital_deployed": 10.0,
+                "api_cost": 1.5,
+            })
+            assert queries == []
+
+        prediction_queries = [q for q in queries if "INSERT INTO predictions" in q]
+        assert len(prediction_queries) == 1
+        assert "'Question 29?'" in prediction_queries[0]
+        legacy_positions = [q for q in queries if "INSERT INTO positions" in q]
+        assert len(legacy_positions) == 1
+        assert "0.55" in legacy_positions[0] and "0.53" not in legacy_positions[0]
+        assert "ON CONFLICT (market_id)" in legacy_positions[0]
+        # predictions, positions, trading.positions, position_marks,
+        # scan_logs, pnl_periods, and one merged run summary update
+        assert len(queries) == 7
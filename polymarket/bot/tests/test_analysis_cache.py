@@ -0,0 +1,89 @@
+"""Question-keyed research/fair-value cache tests for polymarket-bot."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from agent import TradingAgent
+from analysis_cache import AnalysisCache, question_key
+
+
+ANALYSIS = {"research": "notes", "fair_value": 0.62, "confidence": "high"}
+
+
+def test_question_key_ignores_case_punctuation_and_whitespace():
+    assert question_key("Will BTC hit $100k by June?") == question_key("  will btc hit 100k by   june ")
+    assert question_key("Will BTC hit $100k by June?") != question_key("Will ETH hit $100k by June?")
+
+
+def test_cache_hit_within_ttl_and_price_band(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache.db", price_band=0.05)
+    cache.put("Will it rain?", 0.40, ANALYSIS, seconds_to_resolution=30 * 86400, now=1000.0)
+
+    hit = cache.get("will it rain", 0.43, now=2000.0)
+
+    assert hit is not None
+    assert hit["fair_value"] == 0.62
+    assert hit["price_at_estimate"] == 0.40
+
+
+def test_cache_invalidates_when_price_leaves_band(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache.db", price_band=0.05)
+    cache.put("Will it rain?", 0.40, ANALYSIS, seconds_to_resolution=30 * 86400, now=1000.0)
+
+    assert cache.get("Will it rain?", 0.47, now=1001.0) is None
+    # The stale entry is dropped, so even a price back inside the band misses.
+    assert cache.get("Will it rain?", 0.40, now=1002.0) is None
+
+
+def test_ttl_scales_with_time_to_resolution(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache.db", ttl_fraction=0.1, min_ttl_hours=1, max_ttl_hours=72)
+
+    assert cache.ttl_seconds(5 * 3600) == 3600  # clamped to min
+    assert cache.ttl_seconds(10 * 86400) == 86400
+    assert cache.ttl_seconds(365 * 86400) == 72 * 3600  # clamped to max
+
+    cache.put("Soon?", 0.5, ANALYSIS, seconds_to_resolution=2 * 3600, now=0.0)
+    cache.put("Later?", 0.5, ANALYSIS, seconds_to_resolution=10 * 86400, now=0.0)
+    assert cache.get("Soon?", 0.5, now=3601.0) is None
+    assert cache.get("Later?", 0.5, now=3601.0) is not None
+
+
+def test_cache_persists_across_instances(tmp_path):
+    AnalysisCache(tmp_path / "cache.db").put("Persist?", 0.3, ANALYSIS, seconds_to_resolution=86400)
+    assert AnalysisCache(tmp_path / "cache.db").get("Persist?", 0.3) is not None
+
+
+def test_analyze_markets_skips_publishers_on_cache_hit(tmp_path):
+    agent = TradingAgent.__new__(TradingAgent)
+    agent.analysis_settings = TradingAgent._resolve_analysis_settings({})
+    agent.analysis_cache = AnalysisCache(tmp_path / "cache.db")
+    calls = []
+
+    def _research(question):
+        calls.append(question)
+        return "notes"
+
+    agent.research_opportunity = _research
+    agent.estimate_fair_value = lambda question, price, research: (0.7, "medium")
+    market = {"market_id": "m1", "question": "Cached?", "price": 0.5, "days_to_resolution": 20}
+
+    first = list(agent.analyze_markets([market]))
+    second = list(agent.analyze_markets([dict(market, price=0.52)]))
+    third = list(agent.analyze_markets([dict(market, price=0.65)]))
+
+    assert calls == ["Cached?", "Cached?"]
+    assert not first[0][1].get("cached")
+    assert second[0][1]["cached"] is True
+    assert second[0][1]["fair_value"] == 0.7
+    assert not third[0][1].get("cached")
+
+
+def test_analysis_cache_disabled_by_config(tmp_path):
+    assert AnalysisCache.from_config({"enabled": False}, base_dir=tmp_path) is None
+    cache = AnalysisCache.from_config({"path": "state/cache.db", "price_band": 0.02}, base_dir=tmp_path)
+    assert cache.path == tmp_path / "state" / "cache.db"
+    assert cache.price_band == 0.02
@@ -0,0 +1,155 @@
+"""Incremental resolution sweep and calibration tests for polymarket-bot."""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import sys
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import calibration
+
+
+class _FakeStorage:
+    """In-memory stand-in for the calibration slice of SerenDBStorage."""
+
+    def __init__(self):
+        self.predictions = []
+        self.config = {}
+        self.resolved_reads = 0
+
+    def add(self, market_id, fair_value):
+        self.predictions.append({
+            "id": len(self.predictions) + 1,
+            "market_id": market_id,
+            "predicted_fair_value": fair_value,
+            "resolution_outcome": None,
+            "resolution_timestamp": None,
+            "actual_probability": None,
+        })
+
+    def get_config(self, key, default=None):
+        return json.loads(self.config[key]) if key in self.config else default
+
+    def save_config(self, key, value):
+        self.config[key] = json.dumps(value)
+        return True
+
+    def get_calibration_state(self):
+        return self.get_config("calibration_state")
+
+    def save_calibration_state(self, state):
+        return self.save_config("calibration_state", state)
+
+    def get_unresolved_market_ids(self, after="", limit=50):
+        ids = sorted({
+            p["market_id"] for p in self.predictions
+            if p["resolution_outcome"] is None and p["market_id"] > after
+        })
+        return ids[:limit]
+
+    def update_prediction_resolution(self, market_id, resolution_outcome, resolution_timestamp, actual_probability):
+        for p in self.predictions:
+            if p["market_id"] == market_id:
+                p["resolution_outcome"] = resolution_outcome
+                p["resolution_timestamp"] = resolution_timestamp
+                p["actual_probability"] = actual_probability
+        return True
+
+    def get_resolved_predictions_after(self, cursor, limit=500):
+        rows = sorted(
+            (p for p in self.predictions if p["resolution_outcome"] is not None),
+            key=lambda p: (p["resolution_timestamp"], p["id"]),
+        )
+        if cursor:
+            key = (cursor["resolution_timestamp"], cursor["id"])
+            rows = [p for p in rows if (p["resolution_timestamp"], p["id"]) > key]
+        rows = rows[:limit]
+        self.resolved_reads += len(rows)
+        return [dict(p) for p in rows]
+
+    def save_performance_metrics(self, metrics):
+        self.metrics = metrics
+        return True
+
+
+class _FakeGamma:
+    """Answers batched /markets lookups from a dict of market_id -> YES price."""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.paths = []
+        self.seren = self
+
+    def call_publisher(self, publisher, method, path):
+        self.paths.append(path)
+        ids = parse_qs(urlparse(path).query).get("condition_ids", [])
+        body = [
+            {"conditionId": mid, "outcomePrices": json.dumps([str(self.prices[mid]), str(1 - self.prices[mid])])}
+            for mid in ids if mid in self.prices
+        ]
+        return {"body": body}
+
+
+def test_resolution_sweep_looks_up_unresolved_ids_in_batches(monkeypatch):
+    monkeypatch.setattr(calibration, "SWEEP_BATCH_SIZE", 3)
+    monkeypatch.setattr(calibration, "SWEEP_MAX_BATCHES", 2)
+    storage = _FakeStorage()
+    for i in range(8):
+        storage.add(f"0x{i:02d}", 0.6)
+    gamma = _FakeGamma({f"0x{i:02d}": (1.0 if i % 2 else 0.0) for i in range(8) if i != 4})
+
+    first = calibration.resolution_sweep(gamma, storage)
+
+    assert first == 5  # 0x04 has no closed market yet
+    assert len(gamma.paths) == 2
+    assert storage.get_config(calibration.SWEEP_CURSOR_KEY) == "0x05"
+
+    # Next sweep resumes after the cursor, then wraps around.
+    second = calibration.resolution_sweep(gamma, storage)
+    assert second == 2
+    assert storage.get_config(calibration.SWEEP_CURSOR_KEY) == ""
+    assert storage.get_unresolved_market_ids() == ["0x04"]
+
+
+def test_compute_calibration_folds_only_new_resolutions(monkeypatch, tmp_path):
+    monkeypatch.setattr(calibration, "CALIBRATION_FILE", tmp_path / "calibration.json")
+    monkeypatch.setattr(calibration, "STATE_DIR", tmp_path)
+    storage = _FakeStorage()
+    fair_values = [0.05 + (i % 90) / 100.0 for i in range(60)]
+    for i, fv in enumerate(fair_values):
+        storage.add(f"m{i:03d}", fv)
+        storage.update_prediction_resolution(f"m{i:03d}", "YES", f"2026-01-01T00:00:{i:02d}", 1.0)
+
+    cal = calibration.compute_calibration(storage)
+
+    errors = [abs(fv - 1.0) for fv in fair_values]
+    assert cal["resolved_count"] == 60
+    assert cal["median_absolute_error"] == round(statistics.median(errors), 4)
+    assert abs(cal["avg_brier_score"] - sum(e * e for e in errors) / 60) < 1e-4
+    assert storage.resolved_reads == 60
+
+    storage.add("m999", 0.9)
+    storage.update_prediction_resolution("m999", "NO", "2026-01-02T00:00:00", 0.0)
+    cal = calibration.compute_calibration(storage)
+
+    assert cal["resolved_count"] == 61
+    assert storage.resolved_reads == 61  # only the new resolution was read
+
+    # Nothing new: state is reused without re-reading history.
+    calibration.compute_calibration(storage)
+    assert storage.resolved_reads == 61
+
+
+def test_regression_sufficient_statistics_recover_line():
+    state = calibration.new_calibration_state()
+    for fv, actual in [(0.2, 0.0), (0.4, 0.0), (0.6, 1.0), (0.8, 1.0)]:
+        calibration.fold_prediction(state, {"predicted_fair_value": fv, "actual_probability": actual})
+
+    slope, intercept = calibration._regression_line(state["regression"])
+
+    assert abs(slope - 2.0) < 1e-9
+    assert abs(intercept - (-0.5)) < 1e-9
@@ -0,0 +1,88 @@
+"""Concurrent research/fair-value analysis stage tests for polymarket-bot."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from agent import FAIR_VALUE_PUBLISHER, RESEARCH_PUBLISHER, TradingAgent
+
+
+def _market(index: int) -> dict:
+    return {"market_id": f"m{index}", "question": f"Question {index}?", "price": 0.4}
+
+
+def _agent(**analysis) -> TradingAgent:
+    agent = TradingAgent.__new__(TradingAgent)
+    agent.analysis_settings = TradingAgent._resolve_analysis_settings(analysis)
+    return agent
+
+
+def test_analyze_markets_yields_in_rank_order_despite_completion_order():
+    agent = _agent(max_workers=4)
+    delays = {"Question 0?": 0.15, "Question 1?": 0.0, "Question 2?": 0.05, "Question 3?": 0.0}
+
+    def _research(question):
+        time.sleep(delays[question])
+        return f"research for {question}"
+
+    agent.research_opportunity = _research
+    agent.estimate_fair_value = lambda question, price, research: (0.6, "high")
+
+    markets = [_market(i) for i in range(4)]
+    results = list(agent.analyze_markets(markets))
+
+    assert [market["market_id"] for market, _ in results] == ["m0", "m1", "m2", "m3"]
+    assert all(analysis["fair_value"] == 0.6 for _, analysis in results)
+
+
+def test_analyze_markets_respects_per_publisher_limits():
+    agent = _agent(max_workers=8, publisher_concurrency={RESEARCH_PUBLISHER: 2, FAIR_VALUE_PUBLISHER: 1})
+    lock = threading.Lock()
+    active = {"research": 0, "fair_value": 0}
+    peak = {"research": 0, "fair_value": 0}
+
+    def _track(kind, fn):
+        with lock:
+            active[kind] += 1
+            peak[kind] = max(peak[kind], active[kind])
+        try:
+            time.sleep(0.02)
+            return fn()
+        finally:
+            with lock:
+                active[kind] -= 1
+
+    agent.research_opportunity = lambda question: _track("research", lambda: "notes")
+    agent.estimate_fair_value = lambda question, price, research: _track("fair_value", lambda: (0.55, "medium"))
+
+    results = list(agent.analyze_markets([_market(i) for i in range(8)]))
+
+    assert len(results) == 8
+    assert peak["research"] <= 2
+    assert peak["fair_value"] == 1
+
+
+def test_analyze_markets_skips_work_past_the_cycle_deadline():
+    agent = _agent(max_workers=2, cycle_deadline_seconds=0.2)
+    release = threading.Event()
+
+    def _research(question):
+        if question == "Question 0?":
+            release.wait(2.0)
+        return "notes"
+
+    agent.research_opportunity = _research
+    agent.estimate_fair_value = lambda question, price, research: (0.7, "high")
+
+    started = time.monotonic()
+    results = list(agent.analyze_markets([_market(i) for i in range(3)]))
+    release.set()
+
+    assert time.monotonic() - started < 1.0
+    assert [market["market_id"] for market, _ in results] == ["m1", "m2"]
+    assert agent._last_analysis_skipped == 1
@@ -0,0 +1,133 @@
+"""Background scan worker and job endpoints for the polymarket-bot agent server."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from run_agent_server import AgentRequestHandler, ScanJobQueue
+
+
+class _SlowAgent:
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = 0
+        self.last_stage_timings = {}
+
+    def run_scan_cycle(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        self.last_stage_timings = {"fetch": 0.1, "analysis": 0.2}
+        return 3
+
+
+class _FailingAgent:
+    def run_scan_cycle(self):
+        raise RuntimeError("gateway down")
+
+
+def _wait_for(jobs, job_id, status):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = jobs.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+def test_overlapping_triggers_fold_into_active_job():
+    agent = _SlowAgent()
+    jobs = ScanJobQueue(agent)
+    jobs.start()
+    try:
+        first, first_dup = jobs.submit()
+        agent.started.wait(5)
+        second, second_dup = jobs.submit()
+
+        assert first_dup is False
+        assert second_dup is True
+        assert second["job_id"] == first["job_id"]
+
+        agent.release.set()
+        job = _wait_for(jobs, first["job_id"], "succeeded")
+        assert job["triggers"] == 2
+        assert job["opportunities"] == 3
+        assert job["stage_timings"] == {"fetch": 0.1, "analysis": 0.2}
+        assert agent.calls == 1
+
+        third, third_dup = jobs.submit()
+        assert third_dup is False
+        assert third["job_id"] != first["job_id"]
+        _wait_for(jobs, third["job_id"], "succeeded")
+    finally:
+        agent.release.set()
+        jobs.stop()
+
+
+def test_failed_scan_is_reported_on_job():
+    jobs = ScanJobQueue(_FailingAgent())
+    jobs.start()
+    try:
+        job, _ = jobs.submit()
+        job = _wait_for(jobs, job["job_id"], "failed")
+        assert job["error"] == "gateway down"
+        assert jobs.active() is None
+    finally:
+        jobs.stop()
+
+
+def test_http_run_returns_job_id_while_health_stays_responsive():
+    agent = _SlowAgent()
+    jobs = ScanJobQueue(agent)
+    jobs.start()
+    AgentRequestHandler.jobs = jobs
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AgentRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def _request(path, method="GET"):
+        req = urllib.request.Request(base + path, method=method, data=b"" if method == "POST" else None)
+        with urllib.request.urlopen(req, timeout=2) as response:
+            return response.status, json.loads(response.read())
+
+    try:
+        status, body = _request("/run", "POST")
+        assert status == 202
+        job_id = body["job_id"]
+        agent.started.wait(5)
+
+        status, health = _request("/health")
+        assert status == 200
+        assert health["active_job"] == job_id
+
+        status, job = _request(f"/runs/{job_id}")
+        assert job["status"] == "running"
+
+        agent.release.set()
+        _wait_for(jobs, job_id, "succeeded")
+        status, job = _request(f"/runs/{job_id}")
+        assert job["stage_timings"]["analysis"] == 0.2
+
+        try:
+            _request("/runs/unknown")
+            raise AssertionError("expected 404")
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        agent.release.set()
+        server.shutdown()
+        server.server_close()
+        jobs.stop()
+        AgentRequestHandler.jobs = None
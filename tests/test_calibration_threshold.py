@@ -76,14 +76,31 @@ class TestEffectiveThreshold:
 # --- compute_calibration ---
 
 
+def _incremental_storage(rows: list) -> MagicMock:
+    """Storage stub with no saved calibration state and one page of new resolutions."""
+    storage = MagicMock()
+    storage.get_calibration_state.return_value = None
+    storage.get_resolved_predictions_after.side_effect = [rows, []]
+    return storage
+
+
+def _resolved(count: int, fair_value: float, confidence: str) -> list:
+    return [
+        {
+            "id": index + 1,
+            "resolution_timestamp": f"2026-01-01T00:{index // 60:02d}:{index % 60:02d}Z",
+            "predicted_fair_value": fair_value,
+            "actual_probability": 1.0,
+            "confidence": confidence,
+        }
+        for index in range(count)
+    ]
+
+
 class TestComputeCalibration:
 
     def test_returns_none_below_minimum(self, cal) -> None:
-        storage = MagicMock()
-        storage.get_resolved_predictions.return_value = [
-            {"predicted_fair_value": 0.7, "actual_probability": 1.0, "confidence": "medium"}
-            for _ in range(30)
-        ]
+        storage = _incremental_storage(_resolved(30, 0.7, "medium"))
         result = cal.compute_calibration(storage)
         assert result is None
 
@@ -94,12 +111,8 @@ class TestComputeCalibration:
         cal.STATE_DIR = tmp_path
 
         try:
-            storage = MagicMock()
             # 60 predictions: predicted 0.6, actual was 1.0 → error = 0.4 each
-            storage.get_resolved_predictions.return_value = [
-                {"predicted_fair_value": 0.6, "actual_probability": 1.0, "confidence": "high"}
-                for _ in range(60)
-            ]
+            storage = _incremental_storage(_resolved(60, 0.6, "high"))
             result = cal.compute_calibration(storage)
             assert result is not None
             assert result["resolved_count"] == 60
@@ -107,6 +120,8 @@ class TestComputeCalibration:
             # calibrated = MAE(0.4) + spread(0.03) + safety(0.02) = 0.45
             assert result["calibrated_threshold"] == 0.45
             assert result["high_confidence_mae"] == 0.4
+            storage.get_resolved_predictions.assert_not_called()
+            storage.save_calibration_state.assert_called_once()
         finally:
             cal.CALIBRATION_FILE = original
             cal.STATE_DIR = original.parent
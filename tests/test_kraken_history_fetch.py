@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_DIRS = [
+    "kraken/1099-da-tax-reconciler",
+    "crypto-bullseye-zone/tax",
+]
+DAY = 86400
+
+
+def _load_fetcher(skill_dir: str):
+    script_dir = REPO_ROOT / skill_dir / "scripts"
+    script_dir_str = str(script_dir)
+    sys.path[:] = [script_dir_str, *[path for path in sys.path if path != script_dir_str]]
+    sys.modules.pop("common", None)
+    spec = importlib.util.spec_from_file_location(
+        f"test_kraken_history_fetch_{skill_dir.replace('/', '_').replace('-', '_')}",
+        script_dir / "kraken_api_fetcher.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    assert spec is not None and spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _FakeKraken:
+    """Serves TradesHistory pages of 50 for (start, end] windows, newest first; start is optional."""
+
+    def __init__(self, trades, fail_after=None):
+        self.trades = trades
+        self.calls = []
+        self.fail_after = fail_after
+        self.lock = threading.Lock()
+
+    def __call__(self, path, api_key, api_secret, params=None):
+        with self.lock:
+            if self.fail_after is not None and len(self.calls) >= self.fail_after:
+                raise RuntimeError("Kraken API error: ['EGeneral:Internal error']")
+            self.calls.append(params)
+        in_window = sorted(
+            (t for t in self.trades.items() if params.get("start", float("-inf")) < t[1]["time"] <= params["end"]),
+            key=lambda item: item[1]["time"],
+            reverse=True,
+        )
+        page = dict(in_window[params["ofs"]:params["ofs"] + 50])
+        return {"trades": {k: dict(v) for k, v in page.items()}, "count": len(in_window)}
+
+
+def _trades(start: int, days: int, per_day: int):
+    return {
+        f"T{i:06d}": {"time": float(start + i * (DAY // per_day) + 1), "pair": "XXBTZUSD", "type": "sell", "vol": "0.1"}
+        for i in range(days * per_day)
+    }
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_rerun_only_fetches_windows_that_are_not_cached(skill_dir: str, tmp_path, monkeypatch) -> None:
+    fetcher = _load_fetcher(skill_dir)
+    start = int(time.time()) - 400 * DAY
+    kraken = _FakeKraken(_trades(start, days=360, per_day=2))
+    monkeypatch.setattr(fetcher, "_kraken_request", kraken)
+    monkeypatch.setattr(fetcher, "API_TIERS", {"starter": (1000, 1000.0)})
+    cache = str(tmp_path / "history.db")
+
+    first = fetcher.fetch_trades("key", "c2VjcmV0", start=start, cache_path=cache, workers=4, window_days=30)
+
+    assert len(first) == 720
+    assert [t["trade_id"] for t in first[:2]] == ["T000719", "T000718"]
+    assert {c["start"] for c in kraken.calls} == {lo for lo, _ in fetcher._windows(start, None, 30)}
+
+    # New trades land in the open window; settled windows come from the cache.
+    kraken.trades.update({"NEW1": {"time": float(time.time() - 60), "pair": "XXBTZUSD", "type": "sell", "vol": "1"}})
+    kraken.calls.clear()
+    second = fetcher.fetch_trades("key", "c2VjcmV0", start=start, cache_path=cache, workers=4, window_days=30)
+
+    assert len(second) == 721
+    assert second[0]["trade_id"] == "NEW1"
+    assert {c["start"] for c in kraken.calls} == {fetcher._windows(start, None, 30)[-1][0]}
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_interrupted_window_resumes_from_last_cached_page(skill_dir: str, tmp_path, monkeypatch) -> None:
+    fetcher = _load_fetcher(skill_dir)
+    start = int(time.time()) - 100 * DAY
+    end = start + 20 * DAY
+    kraken = _FakeKraken(_trades(start, days=20, per_day=10), fail_after=2)
+    monkeypatch.setattr(fetcher, "_kraken_request", kraken)
+    monkeypatch.setattr(fetcher, "API_TIERS", {"starter": (1000, 1000.0)})
+    cache = str(tmp_path / "history.db")
+
+    with pytest.raises(RuntimeError):
+        fetcher.fetch_trades("key", "c2VjcmV0", start=start, end=end, cache_path=cache, workers=1, window_days=30)
+    assert [c["ofs"] for c in kraken.calls] == [0, 50]
+
+    kraken.fail_after = None
+    kraken.calls.clear()
+    trades = fetcher.fetch_trades("key", "c2VjcmV0", start=start, end=end, cache_path=cache, workers=1, window_days=30)
+
+    assert len(trades) == 200
+    assert [c["ofs"] for c in kraken.calls] == [100, 150]
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_open_ended_fetch_starts_windows_at_earliest_entry(skill_dir: str, monkeypatch) -> None:
+    fetcher = _load_fetcher(skill_dir)
+    assert fetcher.DEFAULT_WORKERS == 1
+    monkeypatch.setattr(fetcher, "API_TIERS", {"starter": (1000, 1000.0)})
+
+    small = _FakeKraken(_trades(int(time.time()) - 10 * DAY, days=10, per_day=2))
+    monkeypatch.setattr(fetcher, "_kraken_request", small)
+    assert len(fetcher.fetch_trades("key", "c2VjcmV0")) == 20
+    # Twenty trades fit on one open-ended page, so no windows are fetched.
+    assert len(small.calls) == 1 and "start" not in small.calls[0]
+
+    start = int(time.time()) - 100 * DAY
+    large = _FakeKraken(_trades(start, days=100, per_day=2))
+    monkeypatch.setattr(fetcher, "_kraken_request", large)
+    trades = fetcher.fetch_trades("key", "c2VjcmV0", window_days=30)
+
+    assert len(trades) == 200
+    probe, oldest = large.calls[:2]
+    assert "start" not in probe and oldest["ofs"] == 199
+    # Windows begin just before the earliest trade rather than at KRAKEN_HISTORY_START.
+    assert min(c["start"] for c in large.calls[2:]) == start
+    assert len({c["start"] for c in large.calls[2:]}) == 4
+
+
+def test_token_bucket_waits_for_counter_to_decay() -> None:
+    fetcher = _load_fetcher(SKILL_DIRS[0])
+    now = [0.0]
+    sleeps = []
+
+    def _sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = fetcher.TokenBucket(15, 0.33, clock=lambda: now[0], sleep=_sleep)
+    for _ in range(7):
+        bucket.acquire(fetcher.HISTORY_CALL_COST)
+    assert sleeps == []
+
+    bucket.acquire(fetcher.HISTORY_CALL_COST)
+    assert sleeps == [pytest.approx(1 / 0.33)]
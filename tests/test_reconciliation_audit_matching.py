@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_DIRS = [
+    "kraken/1099-da-tax-reconciler",
+    "crypto-bullseye-zone/tax",
+]
+# Large synthetic-ledger runs are benchmarks, not unit tests; opt in with RUN_SLOW_TESTS=1.
+slow = pytest.mark.skipif(os.getenv("RUN_SLOW_TESTS") != "1", reason="set RUN_SLOW_TESTS=1 to run")
+
+
+def _load_audit_module(skill_dir: str):
+    script_dir = REPO_ROOT / skill_dir / "scripts"
+    script_dir_str = str(script_dir)
+    sys.path[:] = [script_dir_str, *[path for path in sys.path if path != script_dir_str]]
+    sys.modules.pop("common", None)
+    spec = importlib.util.spec_from_file_location(
+        f"test_reconciliation_audit_{skill_dir.replace('/', '_').replace('-', '_')}",
+        script_dir / "reconciliation_audit.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    assert spec is not None and spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _naive_pairs(module, resolved_rows, tax_rows, tolerance_seconds):
+    """Reference pairing: first unmatched tax row accepted by match_records."""
+    unmatched = list(range(len(tax_rows)))
+    pairs = []
+    for resolved in resolved_rows:
+        for idx in unmatched:
+            if module.match_records(resolved, tax_rows[idx], tolerance_seconds=tolerance_seconds):
+                pairs.append(idx)
+                unmatched.remove(idx)
+                break
+        else:
+            pairs.append(None)
+    return pairs
+
+
+def _synthetic_rows(n: int, seed: int, start: datetime = datetime(2025, 1, 1, tzinfo=timezone.utc)):
+    rng = random.Random(seed)
+    assets = ["BTC", "ETH", "SOL", "ADA", "DOGE"]
+    resolved, tax = [], []
+    for i in range(n):
+        asset = rng.choice(assets)
+        qty = round(rng.choice([0.01, 0.05, 0.1, 0.5, 1.0]) * rng.randint(1, 4), 8)
+        when = start + timedelta(seconds=rng.randrange(365 * 86400))
+        proceeds = round(rng.uniform(10, 5000), 2)
+        resolved.append(
+            {
+                "record_id": f"r{i}",
+                "asset": asset,
+                "quantity": qty,
+                "disposed_at": when.isoformat(),
+                "proceeds_usd": proceeds,
+                "cost_basis_usd": proceeds * 0.8,
+                "gain_loss_usd": proceeds * 0.2,
+            }
+        )
+        shifted = when + timedelta(seconds=rng.randrange(-7200, 7200))
+        tax.append(
+            {
+                "record_id": f"t{i}",
+                "asset": asset.lower() if i % 7 == 0 else asset,
+                "quantity": qty + (1e-9 if i % 5 == 0 else 0.0),
+                "disposed_at": shifted.isoformat().replace("+00:00", "Z"),
+                "proceeds_usd": proceeds if i % 11 else proceeds + 1.0,
+                "cost_basis_usd": proceeds * 0.8,
+                "gain_loss_usd": proceeds * 0.2,
+            }
+        )
+    rng.shuffle(tax)
+    return resolved, tax
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_indexed_audit_pairs_rows_like_linear_scan(skill_dir: str) -> None:
+    module = _load_audit_module(skill_dir)
+    resolved, tax = _synthetic_rows(400, seed=5)
+    # Rows with missing quantity or timestamp act as wildcards in match_records.
+    tax[3] = dict(tax[3], quantity=None)
+    tax[9] = dict(tax[9], disposed_at=None)
+    resolved[4] = dict(resolved[4], disposed_at=None)
+    resolved[8] = dict(resolved[8], quantity=None)
+    resolved.append({"record_id": "orphan", "asset": "XRP", "quantity": 1.0, "disposed_at": "2025-03-01T00:00:00Z"})
+    tolerance = 3600
+
+    expected = _naive_pairs(module, resolved, tax, tolerance)
+    index = module.MatchIndex(tax, tolerance_seconds=tolerance)
+    got = [index.take(row) for row in resolved]
+
+    assert got == expected
+    assert index.unmatched() == sorted(set(range(len(tax))) - {idx for idx in expected if idx is not None})
+
+    summary, exceptions = module.audit(resolved, tax, tolerance_seconds=tolerance)
+    assert summary["matched_count"] == sum(idx is not None for idx in expected)
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_audit_counts_matched_partial_and_unmatched_rows(skill_dir: str) -> None:
+    module = _load_audit_module(skill_dir)
+
+    def row(record_id, asset, quantity, disposed_at, proceeds):
+        return {
+            "record_id": record_id,
+            "asset": asset,
+            "quantity": quantity,
+            "disposed_at": disposed_at,
+            "proceeds_usd": proceeds,
+            "cost_basis_usd": 100.0,
+            "gain_loss_usd": proceeds - 100.0,
+        }
+
+    resolved = [
+        row("r1", "BTC", 0.5, "2025-03-01T12:00:00Z", 30000.0),
+        row("r2", "ETH", 1.0, "2025-03-02T12:00:00Z", 2000.0),
+        row("r3", "SOL", 2.0, "2025-03-03T12:00:00Z", 300.0),
+        row("r4", "BTC", 0.5, "2025-03-04T12:00:00Z", 31000.0),
+    ]
+    tax = [
+        row("t1", "btc", 0.5, "2025-03-01T12:10:00Z", 30000.0),
+        row("t2", "ETH", 1.0, "2025-03-02T13:00:00Z", 2005.0),
+        row("t3", "ADA", 3.0, "2025-03-03T12:00:00Z", 2.0),
+        row("t4", "BTC", 0.5, "2025-03-10T12:00:00Z", 31000.0),
+    ]
+
+    summary, exceptions = module.audit(resolved, tax)
+
+    assert summary["matched_count"] == 2
+    assert summary["unmatched_count"] == 4
+    assert summary["partial_matches"] == 1
+    assert summary["total_proceeds_delta_usd"] == -5.0
+    assert sorted((e["id"], e["likely_cause"]) for e in exceptions) == [
+        ("r2", "basis_method_or_fee_treatment_difference"),
+        ("r3", "missing_or_unmapped_disposition"),
+        ("r4", "missing_or_unmapped_disposition"),
+        ("t3", "trade_without_corresponding_1099da_row"),
+        ("t4", "trade_without_corresponding_1099da_row"),
+    ]
+
+
+@slow
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_audit_reconciles_100k_synthetic_rows(skill_dir: str) -> None:
+    module = _load_audit_module(skill_dir)
+    resolved, tax = _synthetic_rows(100_000, seed=17)
+
+    summary, exceptions = module.audit(resolved, tax)
+
+    assert summary["matched_count"] + summary["unmatched_count"] // 2 == 100_000
+    assert summary["partial_matches"] > 0
+    assert len(exceptions) >= summary["partial_matches"]
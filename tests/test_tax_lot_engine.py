@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_DIRS = [
+    "kraken/1099-da-tax-reconciler",
+    "crypto-bullseye-zone/tax",
+]
+# Large synthetic-ledger runs are benchmarks, not unit tests; opt in with RUN_SLOW_TESTS=1.
+slow = pytest.mark.skipif(os.getenv("RUN_SLOW_TESTS") != "1", reason="set RUN_SLOW_TESTS=1 to run")
+
+
+def _load_local_module(skill_dir: str, module_name: str):
+    script_dir = REPO_ROOT / skill_dir / "scripts"
+    script_dir_str = str(script_dir)
+    sys.path[:] = [script_dir_str, *[path for path in sys.path if path != script_dir_str]]
+    for cached_name in ("common", "kraken_api_fetcher", "reconciliation_audit"):
+        sys.modules.pop(cached_name, None)
+    spec = importlib.util.spec_from_file_location(
+        f"test_tax_lot_engine_{skill_dir.replace('/', '_').replace('-', '_')}_{module_name}",
+        script_dir / f"{module_name}.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    assert spec is not None and spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _events(engine_module, rows):
+    return engine_module.sort_events(engine_module.normalize_event(row, idx) for idx, row in enumerate(rows))
+
+
+LEDGER = [
+    {"event_id": "a1", "type": "acquire", "asset": "BTC", "quantity": 1.0, "timestamp": "2023-01-10T00:00:00Z", "cost_usd": 100.0},
+    {"event_id": "a2", "type": "acquire", "asset": "BTC", "quantity": 1.0, "timestamp": "2024-03-01T00:00:00Z", "cost_usd": 400.0},
+    {"event_id": "a3", "type": "acquire", "asset": "BTC", "quantity": 1.0, "timestamp": "2024-05-01T00:00:00Z", "cost_usd": 200.0},
+    {"event_id": "d1", "type": "dispose", "asset": "BTC", "quantity": 1.5, "timestamp": "2024-06-01T00:00:00Z", "proceeds_usd": 900.0},
+]
+
+
+@pytest.mark.parametrize(
+    ("method", "basis", "lots"),
+    [
+        ("fifo", 300.0, [("a1", 1.0), ("a2", 0.5)]),
+        ("lifo", 400.0, [("a3", 1.0), ("a2", 0.5)]),
+        ("hifo", 500.0, [("a2", 1.0), ("a3", 0.5)]),
+    ],
+)
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_relief_methods_split_lots(skill_dir: str, method: str, basis: float, lots) -> None:
+    engine_module = _load_local_module(skill_dir, "tax_lot_engine")
+    engine = engine_module.TaxLotEngine(method=method)
+
+    [record] = list(engine.run(_events(engine_module, LEDGER)))
+
+    assert record["cost_basis_usd"] == pytest.approx(basis)
+    assert record["gain_loss_usd"] == pytest.approx(900.0 - basis)
+    assert [(lot["lot_id"], lot["quantity"]) for lot in record["lots"]] == lots
+    assert sum(lot["proceeds_usd"] for lot in record["lots"]) == pytest.approx(900.0)
+    assert record["holding_period"] == ("mixed" if method == "fifo" else "short-term")
+    assert record["lots"][0]["holding_period"] == ("long-term" if method == "fifo" else "short-term")
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_specific_id_transfers_and_shortfall(skill_dir: str) -> None:
+    engine_module = _load_local_module(skill_dir, "tax_lot_engine")
+    rows = LEDGER[:3] + [
+        {"event_id": "t1", "type": "transfer_out", "asset": "BTC", "quantity": 0.5, "timestamp": "2024-05-15T00:00:00Z"},
+        {"event_id": "d1", "type": "dispose", "asset": "BTC", "quantity": 1.0, "timestamp": "2024-06-01T00:00:00Z",
+         "proceeds_usd": 600.0, "lot_ids": "a3"},
+        {"event_id": "d2", "type": "dispose", "asset": "BTC", "quantity": 2.0, "timestamp": "2024-07-01T00:00:00Z",
+         "proceeds_usd": 1000.0},
+    ]
+    engine = engine_module.TaxLotEngine(method="specific_id")
+
+    first, second = list(engine.run(_events(engine_module, rows)))
+
+    assert [(lot["lot_id"], lot["quantity"]) for lot in first["lots"]] == [("a3", 1.0)]
+    assert first["cost_basis_usd"] == pytest.approx(200.0)
+    # The transfer moved half of a1 out; the rest of a1 and all of a2 cover 1.5 of 2.0.
+    assert [(lot["lot_id"], lot["quantity"]) for lot in second["lots"]] == [("a1", 0.5), ("a2", 1.0)]
+    assert second["unmatched_quantity"] == pytest.approx(0.5)
+    assert second["cost_basis_usd"] is None
+    assert engine.open_lots() == []
+
+
+def _synthetic_ledger(n: int, seed: int):
+    rng = random.Random(seed)
+    start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    held = {asset: 0.0 for asset in ("BTC", "ETH", "SOL", "ADA")}
+    rows = []
+    for i in range(n):
+        asset = rng.choice(tuple(held))
+        when = (start + timedelta(seconds=i * 300)).isoformat()
+        if held[asset] < 1.0 or rng.random() < 0.55:
+            qty = round(rng.uniform(0.1, 2.0), 6)
+            held[asset] += qty
+            rows.append({"event_id": f"e{i:07d}", "type": "acquire", "asset": asset, "quantity": qty,
+                         "timestamp": when, "cost_usd": round(qty * rng.uniform(50, 500), 2)})
+        else:
+            qty = round(rng.uniform(0.05, held[asset]), 6)
+            held[asset] -= qty
+            rows.append({"event_id": f"e{i:07d}", "type": "dispose", "asset": asset, "quantity": qty,
+                         "timestamp": when, "proceeds_usd": round(qty * rng.uniform(50, 500), 2)})
+    return rows
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_checkpointed_runs_match_single_pass(skill_dir: str) -> None:
+    engine_module = _load_local_module(skill_dir, "tax_lot_engine")
+    events = _events(engine_module, _synthetic_ledger(4000, seed=3))
+
+    full = list(engine_module.TaxLotEngine(method="hifo").run(events))
+
+    first = engine_module.TaxLotEngine(method="hifo")
+    part = list(first.run(events[:2500]))
+    resumed = engine_module.TaxLotEngine.from_state(json.loads(json.dumps(first.state())))
+    # Replaying the whole ledger only processes events after the checkpoint.
+    part += list(resumed.run(events))
+
+    assert resumed.skipped_events == 2500
+    assert part == full
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_resolver_fills_missing_basis_from_lots(skill_dir: str) -> None:
+    engine_module = _load_local_module(skill_dir, "tax_lot_engine")
+    [disposal] = list(engine_module.TaxLotEngine(method="fifo").run(_events(engine_module, LEDGER)))
+    resolver = _load_local_module(skill_dir, "cost_basis_resolver")
+
+    [row, untouched] = resolver.resolve(
+        [
+            {"record_id": "r1", "asset": "BTC", "quantity": 1.5, "disposed_at": "2024-06-01T02:00:00+00:00",
+             "proceeds_usd": 900.0},
+            {"record_id": "r2", "asset": "ETH", "quantity": 1.0, "disposed_at": "2024-06-01T00:00:00+00:00",
+             "proceeds_usd": 50.0, "cost_basis_usd": 20.0},
+        ],
+        lot_disposals=[disposal],
+    )
+
+    assert row["cost_basis_usd"] == pytest.approx(300.0)
+    assert row["gain_loss_usd"] == pytest.approx(600.0)
+    assert row["basis_resolution_method"] == "tax_lots_fifo"
+    assert row["holding_period"] == "mixed"
+    assert [lot["lot_id"] for lot in row["lots"]] == ["a1", "a2"]
+    assert untouched["basis_resolution_method"] == "derived_from_proceeds_minus_basis"
+
+
+def _unix(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_kraken_events_canonicalize_assets_and_relieve_both_trade_legs(skill_dir: str) -> None:
+    engine_module = _load_local_module(skill_dir, "tax_lot_engine")
+    trades = [
+        {"trade_id": "T1", "pair": "XXBTZUSD", "type": "buy", "vol": "1.0", "cost": "40000", "fee": "40",
+         "time": _unix("2024-01-01T00:00:00Z")},
+        {"trade_id": "T2", "pair": "XETHXXBT", "type": "buy", "vol": "10", "cost": "0.6", "fee": "0.001",
+         "time": _unix("2024-03-01T00:00:00Z")},
+        {"trade_id": "T3", "pair": "XXBTZUSD", "type": "sell", "vol": "0.8", "cost": "48000", "fee": "48",
+         "time": _unix("2024-04-01T00:00:00Z")},
+    ]
+    ledger = [
+        {"ledger_id": "L1", "type": "deposit", "asset": "XXBT", "amount": "0.5", "time": _unix("2024-02-01T00:00:00Z")},
+        {"ledger_id": "L2", "type": "deposit", "asset": "ZUSD", "amount": "1000", "time": _unix("2024-02-02T00:00:00Z")},
+    ]
+
+    events = engine_module.sort_events(engine_module.events_from_kraken(trades, ledger))
+
+    assert [(e["event_id"], e["type"], e["asset"], e["quantity"]) for e in events] == [
+        ("T1", "acquire", "BTC", 1.0),
+        ("L1", "transfer_in", "BTC", 0.5),
+        ("T2", "acquire", "ETH", 10.0),
+        ("T2:BTC", "dispose", "BTC", pytest.approx(0.601)),
+        ("T3", "dispose", "BTC", 0.8),
+    ]
+
+    engine = engine_module.TaxLotEngine(method="fifo")
+    swap, sale = list(engine.run(events))
+
+    assert [(lot["lot_id"], lot["quantity"]) for lot in swap["lots"]] == [("T1", pytest.approx(0.601))]
+    assert swap["cost_basis_usd"] == pytest.approx(40040.0 * 0.601)
+    assert swap["proceeds_usd"] is None
+    assert [(lot["lot_id"], lot["quantity"]) for lot in sale["lots"]] == [
+        ("T1", pytest.approx(0.399)),
+        ("L1", pytest.approx(0.401)),
+    ]
+    # The deposit's basis and acquisition date are unknown, so the sale stays unresolved.
+    assert sale["lots"][0]["cost_basis_usd"] == pytest.approx(40040.0 * 0.399)
+    assert sale["lots"][1]["acquired_at"] is None
+    assert sale["lots"][1]["holding_period"] is None
+    assert sale["cost_basis_usd"] is None
+    assert sale["proceeds_usd"] == pytest.approx(47952.0)
+    assert sale["unmatched_quantity"] == pytest.approx(0.0)
+    assert [(lot["lot_id"], lot["remaining"]) for lot in engine.open_lots()] == [
+        ("L1", pytest.approx(0.099)),
+        ("T2", 10.0),
+    ]
+
+
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_kraken_pairs_and_assets_split_on_known_codes(skill_dir: str) -> None:
+    engine_module = _load_local_module(skill_dir, "tax_lot_engine")
+    split = engine_module.split_kraken_pair
+
+    assert split("XXBTZUSD") == ("BTC", "USD")
+    assert split("XETHXXBT") == ("ETH", "BTC")
+    assert split("USDTZUSD") == ("USDT", "USD")
+    assert split("XTZUSD") == ("XTZ", "USD")
+    assert split("XTZEUR") == ("XTZ", "EUR")
+    assert split("ZRXXBT") == ("ZRX", "BTC")
+    assert split("XBTUSDT") == ("BTC", "USDT")
+    assert split("ZETAUSD") == ("ZETA", "USD")
+    assert [engine_module.canonical_asset(code) for code in ("XXDG", "ZEUR", "XTZ", "ZRX", "ZETA", "ZEUS")] == [
+        "DOGE", "EUR", "XTZ", "ZRX", "ZETA", "ZEUS",
+    ]
+
+    trades = [
+        {"trade_id": "T1", "pair": "XTZUSD", "type": "buy", "vol": "100", "cost": "100", "fee": "0",
+         "time": _unix("2024-01-01T00:00:00Z")},
+        {"trade_id": "T2", "pair": "ZRXXBT", "type": "buy", "vol": "50", "cost": "0.001", "fee": "0",
+         "time": _unix("2024-01-02T00:00:00Z")},
+    ]
+    ledger = [
+        {"ledger_id": "L1", "type": "withdrawal", "asset": "XTZ", "amount": "40", "time": _unix("2024-02-01T00:00:00Z")},
+    ]
+    events = engine_module.sort_events(engine_module.events_from_kraken(trades, ledger))
+    assert [(e["event_id"], e["type"], e["asset"]) for e in events] == [
+        ("T1", "acquire", "XTZ"),
+        ("T2", "acquire", "ZRX"),
+        ("T2:BTC", "dispose", "BTC"),
+        ("L1", "transfer_out", "XTZ"),
+    ]
+    engine = engine_module.TaxLotEngine(method="fifo")
+    list(engine.run(events))
+    assert [(lot["lot_id"], lot["asset"], lot["remaining"]) for lot in engine.open_lots()] == [
+        ("T1", "XTZ", pytest.approx(60.0)),
+        ("T2", "ZRX", 50.0),
+    ]
+
+
+@slow
+@pytest.mark.parametrize("skill_dir", SKILL_DIRS, ids=SKILL_DIRS)
+def test_engine_streams_500k_event_ledger(skill_dir: str) -> None:
+    engine_module = _load_local_module(skill_dir, "tax_lot_engine")
+    # Synthetic rows are already canonical and time-ordered, so skip normalize_event.
+    events = _synthetic_ledger(500_000, seed=11)
+
+    engine = engine_module.TaxLotEngine(method="fifo")
+    disposals = sum(1 for _ in engine.run(events))
+
+    assert disposals > 100_000
+    assert engine.watermark == (events[-1]["timestamp"], events[-1]["event_id"])